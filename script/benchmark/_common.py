@@ -0,0 +1,78 @@
+"""Shared helpers of the benchmark scripts.
+
+The scripts are run directly from a source checkout, e.g. ``python script/benchmark/fmp4mux.py``,
+and print one JSON object per measurement, so that results can be collected and compared by other tools.
+"""
+import json
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+root = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+sys.path.insert(0, os.path.join(root, "src"))
+
+
+def cpu_times():
+    """Returns the user+system CPU time of this process and of its terminated child processes."""
+    if resource is None:  # pragma: no cover
+        return time.process_time() if hasattr(time, "process_time") else time.clock(), 0.0
+
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    return own.ru_utime + own.ru_stime, children.ru_utime + children.ru_stime
+
+
+def peak_rss():
+    """Returns the peak resident set size of this process in bytes, or None if it's unknown."""
+    if resource is None:  # pragma: no cover
+        return None
+
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class Measurement(object):
+    """Context manager which measures wall clock time and CPU time of the current process and its children."""
+
+    def __init__(self, name, **params):
+        self.name = name
+        self.params = params
+        self.bytes = 0
+        self.extra = {}
+
+    def __enter__(self):
+        self.start = time.time()
+        self.cpu_start = cpu_times()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall = time.time() - self.start
+        cpu_end = cpu_times()
+        self.cpu = cpu_end[0] - self.cpu_start[0]
+        self.cpu_children = cpu_end[1] - self.cpu_start[1]
+
+    def result(self):
+        result = dict(
+            benchmark=self.name,
+            wall=round(self.wall, 6),
+            cpu=round(self.cpu, 6),
+            cpu_children=round(self.cpu_children, 6),
+            bytes=self.bytes,
+            mbps=round(self.bytes / self.wall / 1024 / 1024, 3) if self.wall else None,
+        )
+        result.update(self.params)
+        result.update(self.extra)
+
+        return result
+
+    def report(self, output=sys.stdout):
+        output.write(json.dumps(self.result(), sort_keys=True))
+        output.write("\n")
+        output.flush()
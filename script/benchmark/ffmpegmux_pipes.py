@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""CPU benchmark of the input pipes of the FFmpeg muxer.
+
+Feeds in-memory substreams through FFMPEGMuxer's input pipes and compares named pipes (FIFOs) with the default
+pipe capacity against inherited anonymous pipes with an enlarged pipe capacity.
+
+Without --ffmpeg, a stand-in for FFmpeg is used, which only reads and discards its inputs, so that the costs
+of the pipe transport can be measured on their own. The stand-in accepts both FIFO paths and pipe:N inputs.
+Pass the path of a real FFmpeg executable together with --video and --audio MPEG-TS files for measuring the
+whole muxing process.
+"""
+import argparse
+import io
+import os
+import stat
+import sys
+import tempfile
+
+import _common
+
+from streamlink import Streamlink
+from streamlink.stream.ffmpegmux import FFMPEGMuxer
+from streamlink.utils.named_pipe import AnonymousPipe
+
+
+SINK = """#!{python}
+import os, sys, threading
+def drain(path):
+    fd = int(path[5:]) if path.startswith("pipe:") else os.open(path, os.O_RDONLY)
+    while os.read(fd, 1024 * 1024):
+        pass
+paths = [sys.argv[i + 1] for i, arg in enumerate(sys.argv) if arg == "-i"]
+threads = [threading.Thread(target=drain, args=(path,)) for path in paths]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+"""
+
+
+def create_sink(tmpdir):
+    path = os.path.join(tmpdir, "ffmpeg-sink")
+    with open(path, "w") as fd:
+        fd.write(SINK.format(python=sys.executable))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+
+    return path
+
+
+def run(session, inputs, anonymous, pipe_size):
+    name = "ffmpegmux-pipes-{0}".format("anonymous" if anonymous else "named")
+    FFMPEGMuxer.ANONYMOUS_PIPES = anonymous
+    FFMPEGMuxer.PIPE_SIZE = pipe_size
+    with _common.Measurement(name, pipe_size=pipe_size, streams=len(inputs)) as measurement:
+        measurement.bytes = sum(len(data) for data in inputs)
+        muxer = FFMPEGMuxer(session, *[io.BytesIO(data) for data in inputs], format="mpegts").open()
+        try:
+            while muxer.read(1024 * 1024):
+                pass
+        finally:
+            muxer.close()
+            muxer.process.wait()
+            for thread in muxer.pipe_threads:
+                thread.join()
+
+    measurement.extra["cpu_per_stream"] = round((measurement.cpu + measurement.cpu_children) / len(inputs), 6)
+    measurement.report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ffmpeg", metavar="PATH", help="path of a real FFmpeg executable")
+    parser.add_argument("--video", metavar="FILE", help="MPEG-TS video input for a real FFmpeg executable")
+    parser.add_argument("--audio", metavar="FILE", help="MPEG-TS audio input for a real FFmpeg executable")
+    parser.add_argument("--size", type=int, default=256 * 1024 * 1024, help="size of each synthetic substream")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    session = Streamlink()
+    tmpdir = tempfile.mkdtemp()
+    try:
+        if args.ffmpeg:
+            inputs = []
+            for path in args.video, args.audio:
+                with open(path, "rb") as fd:
+                    inputs.append(fd.read())
+            session.set_option("ffmpeg-ffmpeg", args.ffmpeg)
+        else:
+            chunk = os.urandom(1024 * 1024)
+            inputs = [chunk * (args.size // len(chunk)), chunk * (args.size // len(chunk) // 8)]
+            session.set_option("ffmpeg-ffmpeg", create_sink(tmpdir))
+
+        for _ in range(args.rounds):
+            run(session, inputs, False, None)
+            if AnonymousPipe.is_supported():
+                run(session, inputs, True, 1024 * 1024)
+    finally:
+        for name in os.listdir(tmpdir):
+            os.unlink(os.path.join(tmpdir, name))
+        os.rmdir(tmpdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""Throughput and CPU benchmark of the DASH muxers.
+
+Compares the in-process fMP4 muxer with the FFmpeg muxer. Synthetic fMP4 streams are used by default,
+which only the in-process muxer can handle. Pass real fragmented MP4 files via --video and --audio
+for comparing both muxers. The FFmpeg muxer is skipped if FFmpeg can't be found.
+"""
+import argparse
+import io
+
+import _common
+import media
+
+from streamlink import Streamlink
+from streamlink.stream.ffmpegmux import FFMPEGMuxer
+from streamlink.stream.fmp4mux import FMP4Muxer
+
+
+def run(name, session, muxer_cls, video, audio, chunk_size, **muxer_options):
+    with _common.Measurement(name, input_bytes=len(video) + len(audio)) as measurement:
+        muxer = muxer_cls(session, io.BytesIO(video), io.BytesIO(audio), **muxer_options).open()
+        try:
+            while True:
+                data = muxer.read(chunk_size)
+                if not data:
+                    break
+                measurement.bytes += len(data)
+        finally:
+            muxer.close()
+            process = getattr(muxer, "process", None)
+            if process:
+                process.wait()
+
+    measurement.report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--video", metavar="FILE", help="fragmented MP4 video input")
+    parser.add_argument("--audio", metavar="FILE", help="fragmented MP4 audio input")
+    parser.add_argument("--fragments", type=int, default=600, help="number of synthetic fragments per input")
+    parser.add_argument("--fragment-size", type=int, default=256 * 1024, help="synthetic video fragment size")
+    parser.add_argument("--chunk-size", type=int, default=8192, help="read size of the consumer")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.video and args.audio:
+        with open(args.video, "rb") as fd:
+            video = fd.read()
+        with open(args.audio, "rb") as fd:
+            audio = fd.read()
+        synthetic = False
+    else:
+        video = media.fmp4_stream(args.fragments, args.fragment_size, 2, 90000)
+        audio = media.fmp4_stream(args.fragments, args.fragment_size // 16, 2, 48000)
+        synthetic = True
+
+    session = Streamlink()
+    for _ in range(args.rounds):
+        run("dash-muxer-fmp4", session, FMP4Muxer, video, audio, args.chunk_size)
+        if not synthetic and FFMPEGMuxer.is_usable(session):
+            # same muxer options as DASHStream.open
+            run("dash-muxer-ffmpeg", session, FFMPEGMuxer, video, audio, args.chunk_size, copyts=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""Benchmark of the import time of Streamlink and its CLI.
+
+Imports each target in a fresh interpreter and reports the time of the import statement itself as import_s,
+without the interpreter's startup time, and the number of imported modules. The wall time includes the startup.
+The imports of heavy dependencies are checked by tests/test_imports.py, which doesn't measure any times.
+
+- streamlink: ``import streamlink``
+- streamlink_cli: ``import streamlink_cli.main``
+- streams: the stream classes and the validation schemas which plugins import
+- session: ``from streamlink.session import Streamlink``, which loads all plugins when it gets instantiated
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import _common
+
+
+SCRIPT = """
+import json, sys, time
+started = time.time()
+{statement}
+elapsed = time.time() - started
+print(json.dumps({{"elapsed": elapsed, "modules": len(sys.modules)}}))
+"""
+
+TARGETS = [
+    ("streamlink", "import streamlink"),
+    ("streamlink_cli", "import streamlink_cli.main"),
+    ("streams", "from streamlink.stream import DASHStream, HLSStream; from streamlink.plugin.api import validate"),
+    ("session", "from streamlink.session import Streamlink"),
+]
+
+
+def run(statement):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [os.path.join(_common.root, "src")]
+        + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else [])
+    )
+    output = subprocess.check_output([sys.executable, "-c", SCRIPT.format(statement=statement)], env=env)
+
+    return json.loads(output.decode("utf-8"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", nargs="+", choices=[name for name, statement in TARGETS],
+                        default=[name for name, statement in TARGETS])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    for _ in range(args.rounds):
+        for name, statement in TARGETS:
+            if name not in args.targets:
+                continue
+            with _common.Measurement("import-{0}".format(name)) as measurement:
+                result = run(statement)
+            measurement.extra["import_s"] = round(result["elapsed"], 6)
+            measurement.extra["modules"] = result["modules"]
+            measurement.report()
+
+
+if __name__ == "__main__":
+    main()
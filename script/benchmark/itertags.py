@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+"""CPU benchmark of itertags() on large HTML pages.
+
+Searches for tags in HTML pages of increasing sizes with the previous regex based implementation of itertags()
+(legacy) and with the current single-pass implementation (itertags). The pages are either built from a snippet
+of a typical site, repeated up to each size, or read from the files of --files, e.g. saved pages of real sites.
+Besides all tags, the first tag gets searched (first), like the plugins which only need a single meta tag.
+
+The legacy implementation scans to the end of the page for the closing tag of each tag without one, which makes
+its cost grow quadratically with the page size, so it is only run on pages up to --legacy-max-size.
+Both implementations must find the same tags, which gets checked before the measurements. The CPU time per
+kilobyte of each measurement shows whether the cost grows linearly with the page size.
+"""
+import argparse
+import re
+
+import _common
+
+from streamlink.plugin.api.utils import Tag, attr_re, itertags
+
+
+SNIPPET = """
+<div class="card" data-id="{0}">
+  <meta itemprop="name" content="Video {0}">
+  <meta itemprop="thumbnailUrl" content="https://example.com/thumbs/{0}.jpg">
+  <a href="/watch/{0}" class="card-link"><img src="/thumbs/{0}.jpg" alt="Video {0}" loading="lazy"></a>
+  <span class="title">Video {0}</span>
+  <br>
+  <input type="hidden" name="token" value="{0:08x}">
+  <script>window.cards.push({{"id": {0}, "title": "Video {0}", "duration": 1234}});</script>
+</div>
+"""
+HEAD = """<!doctype html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta property="og:title" content="Channel">
+<meta property="og:video" content="https://example.com/live.m3u8">
+<title>Channel</title>
+<link rel="stylesheet" href="/static/main.css">
+</head>
+<body>
+"""
+TAIL = """
+<script src="/static/main.js"></script>
+</body>
+</html>
+"""
+
+legacy_tag_re = re.compile(r'''(?=<(?P<tag>[a-zA-Z]+)(?P<attr>.*?)(?P<end>/)?>(?:(?P<inner>.*?)</\s*(?P=tag)\s*>)?)''',
+                           re.MULTILINE | re.DOTALL)
+
+
+def legacy(html, tag):
+    for match in legacy_tag_re.finditer(html):
+        if match.group("tag") == tag:
+            attrs = dict((a.group("key").lower(), a.group("value")) for a in attr_re.finditer(match.group("attr")))
+            yield Tag(match.group("tag"), attrs, match.group("inner"))
+
+
+def build_page(size):
+    parts = [HEAD]
+    length = len(HEAD) + len(TAIL)
+    idx = 0
+    while length < size:
+        snippet = SNIPPET.format(idx)
+        parts.append(snippet)
+        length += len(snippet)
+        idx += 1
+    parts.append(TAIL)
+
+    return "".join(parts)
+
+
+def search_all(func, html, tags):
+    return [list(func(html, tag)) for tag in tags]
+
+
+def search_first(func, html, tags):
+    return [next(func(html, tag), None) for tag in tags]
+
+
+MODES = [
+    ("all", search_all),
+    ("first", search_first),
+]
+
+
+def run(name, impl, mode, search, page, html, tags, iterations):
+    with _common.Measurement("itertags-{0}-{1}".format(name, mode), page=page, size=len(html), tags=",".join(tags),
+                             iterations=iterations) as measurement:
+        for _ in range(iterations):
+            search(impl, html, tags)
+    measurement.bytes = len(html) * iterations
+    measurement.extra["us_per_kb"] = round(measurement.cpu / iterations / len(html) * 1024 * 1e6, 3)
+    measurement.report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[16 * 1024, 64 * 1024, 256 * 1024, 1024 * 1024,
+                                                                 4 * 1024 * 1024],
+                        help="sizes of the generated pages in bytes")
+    parser.add_argument("--files", nargs="+", default=[], help="HTML files which get used instead of generated pages")
+    parser.add_argument("--tags", nargs="+", default=["meta", "script", "a", "input"])
+    parser.add_argument("--legacy-max-size", type=int, default=96 * 1024,
+                        help="maximum page size of the legacy implementation")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = []
+    for path in args.files:
+        with open(path, "rb") as fd:
+            pages.append((path, fd.read().decode("utf-8", "replace")))
+    if not args.files:
+        pages = [("generated", build_page(size)) for size in args.sizes]
+
+    implementations = [("legacy", legacy), ("itertags", itertags)]
+    for page, html in pages:
+        if len(html) <= args.legacy_max_size and search_all(legacy, html, args.tags) != search_all(itertags, html, args.tags):
+            parser.error("Mismatch of the found tags of {0} ({1} bytes)".format(page, len(html)))
+
+    for _ in range(args.rounds):
+        for page, html in pages:
+            for name, impl in implementations:
+                if impl is legacy and len(html) > args.legacy_max_size:
+                    continue
+                for mode, search in MODES:
+                    run(name, impl, mode, search, page, html, args.tags, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""CPU benchmark of the JSON parsing of plugins and of HTTPSession.json().
+
+Runs the plugin tests of tests/plugins and records each JSON document which gets parsed, so that the benchmark uses
+the plugins' own test fixtures. The recorded documents get parsed one by one, and as a single large document which
+consists of a list of all recorded documents, repeated --repeat times, like the large API responses of some sites.
+
+- stdlib: json.loads() of the decoded text, like HTTPSession.json() without orjson
+- parse_json: parse_json() of the decoded text, with orjson if it's installed
+- parse_json_content: parse_json_content() of the UTF-8 encoded bytes, like HTTPSession.json() with orjson
+"""
+import argparse
+import json
+import os
+import sys
+
+import _common
+import pytest
+
+from streamlink.utils import parse
+
+
+def record(paths):
+    """Runs the tests of the given paths and returns the parsed JSON documents as UTF-8 encoded bytes."""
+    recorded = []
+    json_loads = parse._json_loads
+    orjson_loads = parse._orjson_loads
+
+    def recorder(func):
+        def wrapper(data, *args, **kwargs):
+            if not recorded or recorded[-1] is not data:
+                recorded.append(data)
+            return func(data, *args, **kwargs)
+
+        return wrapper
+
+    parse._json_loads = recorder(json_loads)
+    parse._orjson_loads = recorder(orjson_loads)
+    stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        pytest.main(["-q", "-p", "no:cacheprovider"] + paths)
+    finally:
+        sys.stdout = stdout
+        parse._json_loads = json_loads
+        parse._orjson_loads = orjson_loads
+
+    documents = []
+    for data in recorded:
+        if not isinstance(data, bytes):
+            data = data.encode("utf-8", "surrogatepass")
+        try:
+            json.loads(data.decode("utf-8"))
+        except ValueError:
+            continue
+        documents.append(data)
+
+    return documents
+
+
+def stdlib(content):
+    return json.loads(content.decode("utf-8"))
+
+
+def parse_json(content):
+    return parse.parse_json(content.decode("utf-8"))
+
+
+def parse_json_content(content):
+    return parse.parse_json_content(content, lambda: content.decode("utf-8"))
+
+
+MODES = [
+    ("stdlib", stdlib),
+    ("parse_json", parse_json),
+    ("parse_json_content", parse_json_content),
+]
+
+
+def run(name, func, documents, iterations, kind):
+    backend = "orjson" if parse.orjson is not None and name != "stdlib" else "json"
+    with _common.Measurement("json-{0}-{1}".format(kind, name), backend=backend, documents=len(documents),
+                             iterations=iterations) as measurement:
+        for _ in range(iterations):
+            for document in documents:
+                func(document)
+    measurement.bytes = sum(len(document) for document in documents) * iterations
+    measurement.report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tests", nargs="+", default=[os.path.join(_common.root, "tests", "plugins")],
+                        help="paths of the tests which get recorded")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5000, help="repetitions of the documents in the large document")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    documents = record(args.tests)
+    if not documents:
+        parser.error("No JSON documents have been parsed by the tests")
+    large = b"[" + b",".join(documents * args.repeat) + b"]"
+
+    for document in documents + [large]:
+        expected = stdlib(document)
+        for name, func in MODES[1:]:
+            if func(document) != expected:
+                sys.stderr.write("Mismatch of {0}: {1!r}\n".format(name, document[:100]))
+                sys.exit(1)
+
+    for _ in range(args.rounds):
+        for name, func in MODES:
+            run(name, func, documents, args.iterations, "fixtures")
+            run(name, func, [large], 1, "large")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""Micro-benchmark of the per-segment logging overhead of the stream workers and writers.
+
+Logs the debug messages of each segment like HLSStreamWorker, HLSStreamWriter, DASHStreamWriter and Restream do,
+with Streamlink's logger and a log file handler, at the info level (the default of the CLI) and at the trace level:
+
+- eager: messages which get formatted before they're logged, like the previous log calls
+- lazy: messages with "{}" style arguments, which only get formatted if the log level is enabled,
+  and the DASH segment name which only gets computed at the debug level
+
+Each mode gets run with a synchronous log file handler (sync) and with a queued one (queue), like --logfile.
+The per_segment_us value is the time per segment which the thread that logs the messages spends on logging,
+and the wall time includes waiting for the queued log records to be written. --write-latency delays each write
+of the log file, like slow storage does.
+"""
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+import _common
+
+from streamlink import logger
+from streamlink.compat import urlparse
+
+
+log = logging.getLogger("streamlink.stream.benchmark")
+
+URL = "https://cdn.example.com/live/stream_1080p/segment_{0}.ts?token=0123456789abcdef"
+
+
+def eager(num, url):
+    log.debug("Adding segment {0} to queue".format(num))
+    log.debug("Waiting for segment: {0} ({1:.01f}s)".format(os.path.basename(urlparse(url).path), 0.5))
+    log.debug("Download of segment {0} complete".format(num))
+    log.debug("Added segment {0} to the restream window".format(num))
+
+
+def lazy(num, url):
+    log.debug("Adding segment {0} to queue", num)
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("Waiting for segment: {0} ({1:.01f}s)", os.path.basename(urlparse(url).path), 0.5)
+    log.debug("Download of segment {0} complete", num)
+    log.debug("Added segment {0} to the restream window", num)
+
+
+class DelayedStream(object):
+    def __init__(self, stream, latency):
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, data):
+        time.sleep(self.latency)
+        self.stream.write(data)
+
+    def flush(self):
+        self.stream.flush()
+
+    def close(self):
+        self.stream.close()
+
+
+MODES = [
+    ("eager", eager),
+    ("lazy", lazy),
+]
+
+
+def run(name, func, level, queue, segments, latency, path):
+    handler = logger.basicConfig(filename=path, level=level, queue=queue)
+    if latency:
+        handler.stream = DelayedStream(handler.stream, latency)
+    queue_handler = logger.root.handlers[-1]
+    urls = [URL.format(num) for num in range(segments)]
+    try:
+        with _common.Measurement("logging-{0}".format(name), level=level, handler="queue" if queue else "sync",
+                                 segments=segments, write_latency=latency) as measurement:
+            start = time.time()
+            for num, url in enumerate(urls):
+                func(num, url)
+            elapsed = time.time() - start
+            logger.flush()
+    finally:
+        logger.root.removeHandler(queue_handler)
+        handler.close()
+    measurement.bytes = os.path.getsize(path)
+    measurement.extra["per_segment_us"] = round(elapsed / segments * 1e6, 3)
+    measurement.report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segments", type=int, default=20000)
+    parser.add_argument("--levels", nargs="+", default=["info", "trace"])
+    parser.add_argument("--write-latency", type=float, default=0.0, help="seconds per write of the log file")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        for _ in range(args.rounds):
+            for level in args.levels:
+                for queue in (False, True):
+                    for name, func in MODES:
+                        path = os.path.join(tmpdir, "{0}-{1}-{2}.log".format(name, level, queue))
+                        run(name, func, level, queue, args.segments, args.write_latency, path)
+                        os.unlink(path)
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    main()
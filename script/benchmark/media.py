@@ -0,0 +1,78 @@
+"""Synthetic media payloads used by the benchmarks."""
+import struct
+
+import _common  # noqa: F401
+
+from streamlink.stream.fmp4mux import Box
+from streamlink.stream.tsmux import ElementaryStream, PACKET_SIZE, build_pat, build_pmt, packetize_section
+
+
+def _fullbox(type, version=0, flags=0, payload=b""):
+    return Box(type, struct.pack(">I", (version << 24) | flags) + payload)
+
+
+def fmp4_init(track_id=1, timescale=90000):
+    """A minimal fMP4 init segment (``ftyp`` + ``moov``) with a single track."""
+    tkhd = _fullbox(b"tkhd", payload=struct.pack(">IIIII", 0, 0, track_id, 0, 0) + b"\x00" * 60)
+    mdhd = _fullbox(b"mdhd", payload=struct.pack(">IIII", 0, 0, timescale, 0) + b"\x00" * 4)
+    trak = Box(b"trak", children=[tkhd, Box(b"mdia", children=[mdhd])])
+    mvhd = _fullbox(b"mvhd", payload=struct.pack(">III", 0, 0, 1000) + b"\x00" * 84 + struct.pack(">I", track_id + 1))
+    trex = _fullbox(b"trex", payload=struct.pack(">IIIII", track_id, 1, 0, 0, 0))
+    moov = Box(b"moov", children=[mvhd, trak, Box(b"mvex", children=[trex])])
+
+    return Box(b"ftyp", b"iso6\x00\x00\x00\x00").serialize() + moov.serialize()
+
+
+def fmp4_fragment(sequence_number, decode_time, size, track_id=1):
+    """A single ``moof`` + ``mdat`` fragment with a payload of ``size`` bytes."""
+    mfhd = _fullbox(b"mfhd", payload=struct.pack(">I", sequence_number))
+    tfhd = _fullbox(b"tfhd", flags=0x020000, payload=struct.pack(">I", track_id))
+    tfdt = _fullbox(b"tfdt", version=1, payload=struct.pack(">Q", decode_time))
+    moof = Box(b"moof", children=[mfhd, Box(b"traf", children=[tfhd, tfdt])])
+
+    return moof.serialize() + Box(b"mdat", b"\x00" * size).serialize()
+
+
+def fmp4_stream(fragments, fragment_size, duration, timescale):
+    """A complete fMP4 stream with an init segment and a number of equally sized fragments."""
+    return fmp4_init(timescale=timescale) + b"".join(
+        fmp4_fragment(n + 1, n * duration * timescale, fragment_size) for n in range(fragments)
+    )
+
+
+def _pes_packets(pid, pts, size, continuity_counter):
+    header = b"\x00\x00\x01\xe0\x00\x00\x80\x80\x05" + struct.pack(
+        ">BHH",
+        0x21 | ((pts >> 30) & 0x07) << 1,
+        ((pts >> 15) & 0x7FFF) << 1 | 1,
+        (pts & 0x7FFF) << 1 | 1,
+    )
+    data = header + b"\x00" * size
+    packets = []
+    for offset in range(0, len(data), PACKET_SIZE - 4):
+        payload = data[offset:offset + PACKET_SIZE - 4]
+        packets.append(
+            struct.pack(">BHB", 0x47, (0x4000 if offset == 0 else 0) | pid, 0x10 | continuity_counter)
+            + payload.ljust(PACKET_SIZE - 4, b"\xff")
+        )
+        continuity_counter = (continuity_counter + 1) & 0x0F
+
+    return b"".join(packets), continuity_counter
+
+
+def ts_stream(segments, frames, frame_size, stream_type=0x1B, frame_duration=3000):
+    """An MPEG-TS stream of a single elementary stream, with a PAT and PMT in front of every segment."""
+    pid = 0x100
+    tables = (
+        packetize_section(0, build_pat(0x1000))[0]
+        + packetize_section(0x1000, build_pmt(pid, [ElementaryStream(stream_type, pid, b"")]))[0]
+    )
+    chunks = []
+    continuity_counter = 0
+    for frame in range(segments * frames):
+        if frame % frames == 0:
+            chunks.append(tables)
+        data, continuity_counter = _pes_packets(pid, frame * frame_duration, frame_size, continuity_counter)
+        chunks.append(data)
+
+    return b"".join(chunks)
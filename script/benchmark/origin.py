@@ -0,0 +1,320 @@
+#!/usr/bin/env python
+"""Local HTTP origin which serves synthetic HLS, DASH and progressive HTTP streams.
+
+URL layout, where MODE is either "vod" or "live":
+
+    /MODE/hls/plain/playlist.m3u8       MPEG-TS segments
+    /MODE/hls/aes/playlist.m3u8         AES-128 encrypted MPEG-TS segments
+    /MODE/hls/byterange/playlist.m3u8   byterange segments of a single MPEG-TS resource
+    /MODE/hls/fmp4/playlist.m3u8        fMP4 segments with an initialization section
+    /MODE/dash/template/manifest.mpd    SegmentTemplate with $Number$ addressing
+    /MODE/dash/timeline/manifest.mpd    SegmentTemplate with a SegmentTimeline
+    /vod/dash/segmentbase/manifest.mpd  a single fMP4 resource (SegmentBase)
+    /vod/http/media.ts                  a progressive MPEG-TS resource with byte range support
+
+Segment N of all streams covers the time from N * duration to (N + 1) * duration after the origin's epoch.
+Live streams start with a full window of segments and advance in real time. All segments of a stream share
+the same payload, so that the origin's own CPU usage is negligible. Requests can be delayed by a fixed latency
+with a random jitter, and segment requests can fail with a configurable probability.
+
+When run directly, the origin prints a single JSON line with its URL and epoch and serves until interrupted.
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from threading import Thread
+
+import _common  # noqa: F401
+import media
+
+from streamlink.utils.crypto import AES, pad
+
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+
+
+AES_KEY = b"\x01" * 16
+AES_IV = b"\x02" * 16
+TIMESCALE = 1000
+
+_segment_re = re.compile(r"^seg(\d+)\.(ts|m4s)$")
+_range_re = re.compile(r"^bytes=(\d+)-(\d*)$")
+
+
+def _isoformat(timestamp):
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(timestamp)) + ".{0:03d}Z".format(int(timestamp * 1000) % 1000)
+
+
+class Origin(object):
+    """The origin's state and its threaded HTTP server."""
+
+    def __init__(self, segment_size=512 * 1024, segment_duration=2.0, segments=30, window=6,
+                 latency=0.0, jitter=0.0, error_rate=0.0, seed=None, host="127.0.0.1", port=0):
+        self.segment_size = segment_size
+        self.segment_duration = segment_duration
+        self.segments = segments
+        self.window = window
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.start_time = time.time()
+        # live streams start with a full window of segments
+        self.epoch = self.start_time - window * segment_duration
+
+        frames = max(int(segment_duration * 30), 1)
+        self.ts_segment = media.ts_stream(1, frames, max(segment_size // frames - 200, 1))
+        self.ts_encrypted = AES.new(AES_KEY, AES.MODE_CBC, AES_IV).encrypt(pad(self.ts_segment, AES.block_size))
+        self.fmp4_init = media.fmp4_init(timescale=TIMESCALE)
+        self.fmp4_fragment = media.fmp4_fragment(1, 0, segment_size)
+
+        origin = self
+
+        class Handler(_Handler):
+            pass
+        Handler.origin = origin
+
+        self.server = _ThreadingHTTPServer((host, port), Handler)
+        self.host, self.port = self.server.server_address[:2]
+        self.thread = Thread(target=self.server.serve_forever, name="Thread-Origin")
+        self.thread.daemon = True
+
+    @property
+    def url(self):
+        return "http://{0}:{1}".format(self.host, self.port)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def clock(self, now=None):
+        """The origin's time in seconds since its epoch."""
+        return (now or time.time()) - self.epoch
+
+    def live_edge(self, now=None):
+        """The number of the newest complete segment of live streams."""
+        return int(self.clock(now) / self.segment_duration) - 1
+
+    def segment_range(self, mode):
+        if mode == "vod":
+            return 0, self.segments - 1
+        last = self.live_edge()
+        return last - self.window + 1, last
+
+    def hls_playlist(self, mode, variant):
+        first, last = self.segment_range(mode)
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:{0}".format(6 if variant == "fmp4" else 4),
+            "#EXT-X-TARGETDURATION:{0}".format(int(self.segment_duration + 0.999)),
+            "#EXT-X-MEDIA-SEQUENCE:{0}".format(first),
+        ]
+        if variant == "aes":
+            lines.append("#EXT-X-KEY:METHOD=AES-128,URI=\"key\",IV=0x{0}".format("02" * 16))
+        elif variant == "fmp4":
+            lines.append("#EXT-X-MAP:URI=\"init.mp4\"")
+        for num in range(first, last + 1):
+            lines.append("#EXTINF:{0:.3f},".format(self.segment_duration))
+            if variant == "byterange":
+                lines.append("#EXT-X-BYTERANGE:{0}@{1}".format(len(self.ts_segment), num * len(self.ts_segment)))
+                lines.append("media.ts")
+            else:
+                lines.append("seg{0}.{1}".format(num, "m4s" if variant == "fmp4" else "ts"))
+        if mode == "vod":
+            lines.append("#EXT-X-ENDLIST")
+
+        return "\n".join(lines) + "\n"
+
+    def dash_manifest(self, mode, variant):
+        duration = int(self.segment_duration * TIMESCALE)
+        first, last = self.segment_range(mode)
+        if variant == "segmentbase":
+            segments = "<BaseURL>media.mp4</BaseURL><SegmentBase/>"
+        elif variant == "timeline":
+            segments = (
+                "<SegmentTemplate timescale=\"{0}\" startNumber=\"{1}\" initialization=\"init.mp4\" media=\"seg$Number$.m4s\">"
+                "<SegmentTimeline><S t=\"{2}\" d=\"{3}\" r=\"{4}\"/></SegmentTimeline></SegmentTemplate>"
+            ).format(TIMESCALE, first, first * duration, duration, last - first)
+        else:
+            segments = (
+                "<SegmentTemplate timescale=\"{0}\" duration=\"{1}\" startNumber=\"0\" initialization=\"init.mp4\""
+                " media=\"seg$Number$.m4s\"/>"
+            ).format(TIMESCALE, duration)
+
+        if mode == "vod":
+            # the segment numbers of static SegmentTemplates without a timeline start at 1
+            attributes = "type=\"static\" mediaPresentationDuration=\"PT{0:.3f}S\"".format(
+                self.segments * self.segment_duration
+            )
+            if variant == "template":
+                segments = segments.replace("startNumber=\"0\"", "startNumber=\"1\"")
+        else:
+            now = time.time()
+            attributes = (
+                "type=\"dynamic\" availabilityStartTime=\"{0}\" publishTime=\"{1}\" minimumUpdatePeriod=\"PT{2:.3f}S\""
+                " timeShiftBufferDepth=\"PT{3:.3f}S\" suggestedPresentationDelay=\"PT{2:.3f}S\""
+            ).format(
+                _isoformat(self.epoch),
+                _isoformat(now),
+                self.segment_duration,
+                self.window * self.segment_duration,
+            )
+
+        return (
+            "<?xml version=\"1.0\" encoding=\"utf-8\"?>\n"
+            "<MPD xmlns=\"urn:mpeg:dash:schema:mpd:2011\" profiles=\"urn:mpeg:dash:profile:isoff-live:2011\""
+            " minBufferTime=\"PT{0:.3f}S\" {1}>"
+            "<Period id=\"0\" start=\"PT0S\"><AdaptationSet mimeType=\"video/mp4\" segmentAlignment=\"true\">"
+            "<Representation id=\"video\" bandwidth=\"{2}\" codecs=\"avc1.64001f\" width=\"1280\" height=\"720\">"
+            "{3}</Representation></AdaptationSet></Period></MPD>\n"
+        ).format(self.segment_duration, attributes, int(self.segment_size * 8 / self.segment_duration), segments)
+
+    def is_available(self, mode, num):
+        # static SegmentTemplates without a timeline are numbered from 1 to the number of segments
+        return 0 <= num <= (self.segments if mode == "vod" else self.live_edge())
+
+    def resource(self, path):
+        """Returns the status code, the content type and the body or a ``(payload, size)`` tuple of a path."""
+        parts = path.split("?")[0].strip("/").split("/")
+        if len(parts) == 3 and parts[:2] == ["vod", "http"] and parts[2] == "media.ts":
+            return 200, "video/mp2t", (self.ts_segment, len(self.ts_segment) * self.segments)
+        if len(parts) != 4 or parts[0] not in ("vod", "live") or parts[1] not in ("hls", "dash"):
+            return 404, "text/plain", b"Not found"
+
+        mode, kind, variant, name = parts
+        if name == "playlist.m3u8" and kind == "hls":
+            return 200, "application/vnd.apple.mpegurl", self.hls_playlist(mode, variant).encode("ascii")
+        if name == "manifest.mpd" and kind == "dash":
+            return 200, "application/dash+xml", self.dash_manifest(mode, variant).encode("ascii")
+        if name == "key":
+            return 200, "application/octet-stream", AES_KEY
+        if name == "init.mp4":
+            return 200, "video/mp4", self.fmp4_init
+        if name == "media.ts":
+            size = len(self.ts_segment) * (self.segments if mode == "vod" else self.live_edge() + 1)
+            return 200, "video/mp2t", (self.ts_segment, size)
+        if name == "media.mp4":
+            return 200, "video/mp4", self.fmp4_init + self.fmp4_fragment * self.segments
+
+        match = _segment_re.match(name)
+        if not match or not self.is_available(mode, int(match.group(1))):
+            return 404, "text/plain", b"Not found"
+        if match.group(2) == "m4s":
+            return 200, "video/iso.segment", self.fmp4_fragment
+
+        return 200, "video/mp2t", self.ts_encrypted if variant == "aes" else self.ts_segment
+
+    def delay(self):
+        delay = self.latency + (self.random.uniform(-self.jitter, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def fail(self, path):
+        return bool(self.error_rate) and _segment_re.match(path.rsplit("/", 1)[-1]) and self.random.random() < self.error_rate
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    origin = None
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.origin.delay()
+        if self.origin.fail(self.path):
+            return self.respond(503, "text/plain", b"Injected error")
+
+        status, content_type, body = self.origin.resource(self.path)
+        self.respond(status, content_type, body)
+
+    def respond(self, status, content_type, body):
+        # repeated payloads are sent as (payload, size) tuples and support byte range requests
+        if isinstance(body, tuple):
+            payload, size = body
+        else:
+            payload, size = body, len(body)
+
+        start, end = 0, size - 1
+        match = _range_re.match(self.headers.get("Range") or "")
+        if status == 200 and match:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            status = 206
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(max(end + 1 - start, 0)))
+        self.send_header("Accept-Ranges", "bytes")
+        if status == 206:
+            self.send_header("Content-Range", "bytes {0}-{1}/{2}".format(start, end, size))
+        self.end_headers()
+
+        offset = start
+        while offset <= end:
+            index = offset % len(payload)
+            chunk = payload[index:index + min(end + 1 - offset, len(payload) - index)]
+            self.wfile.write(chunk)
+            offset += len(chunk)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def add_arguments(parser):
+    parser.add_argument("--segment-size", type=int, default=512 * 1024, help="size of each segment in bytes")
+    parser.add_argument("--segment-duration", type=float, default=2.0, help="duration of each segment in seconds")
+    parser.add_argument("--segments", type=int, default=30, help="number of segments of VOD streams")
+    parser.add_argument("--window", type=int, default=6, help="number of segments in live playlists")
+    parser.add_argument("--latency", type=float, default=0.0, help="delay of each response in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="maximum random deviation of the latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of failed segment requests")
+    parser.add_argument("--seed", type=int, help="seed of the jitter and of the error injection")
+
+
+def origin_options(args):
+    return dict(
+        segment_size=args.segment_size,
+        segment_duration=args.segment_duration,
+        segments=args.segments,
+        window=args.window,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    origin = Origin(host=args.host, port=args.port, **origin_options(args)).start()
+    sys.stdout.write(json.dumps(dict(url=origin.url, epoch=origin.epoch)) + "\n")
+    sys.stdout.flush()
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        origin.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""Benchmark of searching web pages with HTTPSession.search() instead of HTTPSession.get() and res.text.
+
+Serves HTML pages of --page-size bytes from a local HTTP server with a bandwidth of --bandwidth bytes per second
+and searches each page for a stream URL at various positions, like the plugins which only need a single match
+of a watch page:
+
+- get: HTTPSession.get() and a regex search of res.text, which downloads and decodes the whole page
+- search: HTTPSession.search(), which closes the connection once the pattern has matched
+
+The wall time is the resolve latency, and the received bytes are the bytes which the server has sent before the
+connection has been closed. Both modes must find the same match, which gets checked for each measurement.
+"""
+import argparse
+import re
+import socket
+import time
+from threading import Thread
+
+import _common
+
+from streamlink.plugin.api.http_session import HTTPSession
+
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+
+
+FILLER = b'<div class="card"><a href="/watch/123">Video</a><img src="/thumbs/123.jpg"></div>\n'
+SOURCE = b'<video><source src="https://cdn.example.com/live/index.m3u8" type="application/x-mpegURL"></video>\n'
+PATTERN = re.compile(r'<source src="([^"]+)" type="application/x-mpegURL">')
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        page = self.server.pages[self.path]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(page)))
+        self.end_headers()
+        chunk_size = max(self.server.bandwidth // 100, 1)
+        for pos in range(0, len(page), chunk_size):
+            try:
+                self.wfile.write(page[pos:pos + chunk_size])
+                self.wfile.flush()
+            except (IOError, OSError, socket.error):
+                break
+            self.server.sent += min(chunk_size, len(page) - pos)
+            time.sleep(chunk_size / float(self.server.bandwidth))
+
+
+def build_page(size, position):
+    filler = FILLER * (size // len(FILLER) + 1)
+    offset = int(size * position)
+
+    return b"<html><body>\n" + filler[:offset] + SOURCE + filler[offset:size] + b"</body></html>\n"
+
+
+def get(session, url):
+    res = session.get(url)
+    return PATTERN.search(res.text)
+
+
+def search(session, url):
+    match, = session.search(url, PATTERN)
+    return match
+
+
+MODES = [
+    ("get", get),
+    ("search", search),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=1024 * 1024)
+    parser.add_argument("--positions", nargs="+", type=float, default=[0.01, 0.1, 0.5, 1.0],
+                        help="relative positions of the stream URL in the pages")
+    parser.add_argument("--bandwidth", type=int, default=10 * 1024 * 1024, help="bytes per second of the server")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    server = _ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.bandwidth = args.bandwidth
+    server.pages = dict(("/{0}".format(position), build_page(args.page_size, position)) for position in args.positions)
+    thread = Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    base = "http://127.0.0.1:{0}".format(server.server_address[1])
+
+    try:
+        for _ in range(args.rounds):
+            for position in args.positions:
+                url = "{0}/{1}".format(base, position)
+                expected = None
+                for name, func in MODES:
+                    session = HTTPSession()
+                    server.sent = 0
+                    with _common.Measurement("page-search-{0}".format(name), page_size=args.page_size,
+                                             position=position, bandwidth=args.bandwidth) as measurement:
+                        match = func(session, url)
+                    measurement.bytes = server.sent
+                    measurement.report()
+                    session.close()
+                    if expected is None:
+                        expected = match.group(1)
+                    elif match.group(1) != expected:
+                        parser.error("Mismatch of the found stream URLs: {0!r} != {1!r}".format(match.group(1), expected))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+"""End-to-end benchmark of the HLS, DASH and HTTP stream pipelines against a local origin.
+
+Starts the origin of origin.py in a subprocess, so that its CPU usage doesn't get measured, and reads each
+scenario's stream to the end (VOD) or for a fixed duration (live), with one or more concurrent streams.
+By default, each scenario runs in its own subprocess, so that the peak RSS is measured per scenario.
+
+Each measurement is printed as a JSON line with the throughput, the CPU time per stream, the peak RSS,
+the time to the first and to the last byte of each stream, and for live streams the lag behind the origin's
+live edge at the time each segment has been written to the buffer, in seconds. The failed and retried segment
+requests are taken from the session's metrics.
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+import threading
+from collections import OrderedDict
+from time import time
+
+import _common
+import origin as _origin
+
+from streamlink import Streamlink
+from streamlink.stream import DASHStream, HLSStream, HTTPStream
+
+
+SCENARIOS = OrderedDict([
+    ("hls-plain", ("hls", "hls/plain/playlist.m3u8")),
+    ("hls-aes", ("hls", "hls/aes/playlist.m3u8")),
+    ("hls-byterange", ("hls", "hls/byterange/playlist.m3u8")),
+    ("hls-fmp4", ("hls", "hls/fmp4/playlist.m3u8")),
+    ("dash-template", ("dash", "dash/template/manifest.mpd")),
+    ("dash-timeline", ("dash", "dash/timeline/manifest.mpd")),
+    ("dash-segmentbase", ("dash", "dash/segmentbase/manifest.mpd")),
+    ("http", ("http", "http/media.ts")),
+])
+VOD_ONLY = ("dash-segmentbase", "http")
+
+_segment_re = re.compile(r"seg(\d+)\.m4s$")
+
+
+def create_stream(session, kind, url):
+    if kind == "hls":
+        return HLSStream(session, url)
+    if kind == "dash":
+        return next(iter(DASHStream.parse_manifest(session, url).values()))
+
+    return HTTPStream(session, url)
+
+
+class LagRecorder(object):
+    """Records the lag behind the origin's live edge of each segment written to a buffer."""
+
+    def __init__(self, epoch, segment_duration):
+        self.epoch = epoch
+        self.segment_duration = segment_duration
+        self.lags = []
+
+    def __call__(self, event):
+        if event.name != "segment.written":
+            return
+        segment = event.data["segment"]
+        if not isinstance(segment, int):
+            match = _segment_re.search(str(segment))
+            if not match:
+                return
+            segment = int(match.group(1))
+        self.lags.append(event.time - self.epoch - (segment + 1) * self.segment_duration)
+
+
+def read_stream(stream, deadline, chunk_size, result):
+    started = time()
+    fd = stream.open()
+    try:
+        while deadline is None or time() < deadline:
+            data = fd.read(chunk_size)
+            if not data:
+                break
+            if "ttfb" not in result:
+                result["ttfb"] = time() - started
+            result["ttlb"] = time() - started
+            result["bytes"] = result.get("bytes", 0) + len(data)
+    finally:
+        fd.close()
+
+
+def metric_sum(session, name):
+    return sum(metric.value for metric_name, labels, metric in session.metrics.collect() if metric_name == name)
+
+
+def run_scenario(args, name):
+    kind, path = SCENARIOS[name]
+    url = "{0}/{1}/{2}".format(args.origin, args.mode, path)
+    session = Streamlink()
+    session.set_option("stream-segment-threads", args.threads)
+    if args.mode == "live":
+        session.set_option("hls-playlist-reload-time", "segment")
+        session.set_option("hls-live-edge", args.live_edge)
+    lag = LagRecorder(args.epoch, args.segment_duration)
+    session.metrics.subscribe(lag)
+
+    results = [{} for _ in range(args.streams)]
+    params = dict(mode=args.mode, streams=args.streams, threads=args.threads, segment_size=args.segment_size,
+                  latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    with _common.Measurement("pipeline-{0}".format(name), **params) as measurement:
+        deadline = time() + args.duration if args.mode == "live" else None
+        threads = [
+            threading.Thread(target=read_stream, args=(create_stream(session, kind, url), deadline, args.chunk_size, result))
+            for result in results
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    ttfbs = [result["ttfb"] for result in results if "ttfb" in result]
+    ttlbs = [result["ttlb"] for result in results if "ttlb" in result]
+    measurement.bytes = sum(result.get("bytes", 0) for result in results)
+    measurement.extra.update(
+        cpu_per_stream=round(measurement.cpu / args.streams, 6),
+        peak_rss=_common.peak_rss(),
+        ttfb_mean=round(sum(ttfbs) / len(ttfbs), 6) if ttfbs else None,
+        ttfb_max=round(max(ttfbs), 6) if ttfbs else None,
+        ttlb_max=round(max(ttlbs), 6) if ttlbs else None,
+        lag_mean=round(sum(lag.lags) / len(lag.lags), 6) if lag.lags and args.mode == "live" else None,
+        lag_max=round(max(lag.lags), 6) if lag.lags and args.mode == "live" else None,
+        segment_failures=metric_sum(session, "streamlink_segment_failures_total"),
+        segment_retries=metric_sum(session, "streamlink_segment_retries_total"),
+    )
+    measurement.report()
+
+
+def start_origin(args):
+    command = [sys.executable, _origin.__file__.replace(".pyc", ".py")]
+    for key, value in _origin.origin_options(args).items():
+        if value is not None:
+            command += ["--{0}".format(key.replace("_", "-")), str(value)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE)
+    hello = json.loads(process.stdout.readline().decode("utf-8"))
+
+    return process, hello["url"], hello["epoch"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--mode", choices=["vod", "live"], default="vod")
+    parser.add_argument("--duration", type=float, default=20.0, help="reading time of live streams in seconds")
+    parser.add_argument("--streams", type=int, default=1, help="number of concurrent streams of each scenario")
+    parser.add_argument("--threads", type=int, default=1, help="value of the stream-segment-threads option")
+    parser.add_argument("--live-edge", type=int, default=3, help="value of the hls-live-edge option")
+    parser.add_argument("--chunk-size", type=int, default=65536, help="read size of the stream consumers")
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--no-isolate", action="store_true", help="run all scenarios in this process")
+    parser.add_argument("--origin", help=argparse.SUPPRESS)
+    parser.add_argument("--epoch", type=float, help=argparse.SUPPRESS)
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    _origin.add_arguments(parser)
+    args = parser.parse_args()
+
+    # a single isolated scenario, started by the code below
+    if args.run:
+        return run_scenario(args, args.run)
+
+    process = None
+    if not args.origin:
+        process, args.origin, args.epoch = start_origin(args)
+
+    scenarios = [name for name in args.scenarios if args.mode == "vod" or name not in VOD_ONLY]
+    try:
+        for _ in range(args.rounds):
+            for name in scenarios:
+                if args.no_isolate:
+                    run_scenario(args, name)
+                else:
+                    subprocess.check_call(
+                        [sys.executable, __file__] + sys.argv[1:]
+                        + ["--run", name, "--origin", args.origin, "--epoch", repr(args.epoch)]
+                    )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python
+"""Soak test of live HLS and DASH streams, which detects memory, thread and file descriptor leaks.
+
+Starts the origin of origin.py in a subprocess and repeatedly opens, reads and closes live streams,
+with a new session every few cycles. The origin's segments are much shorter than those of real streams,
+so that playlist reloads, segment downloads and buffer writes happen at an accelerated rate: with the
+default segment duration of 0.1s and a simulated segment duration of 6s, a minute of soak time covers
+an hour of simulated stream time.
+
+Each cycle reads an HLS stream, a DASH stream and a muxed stream of both, which goes through the
+FFmpeg muxer's input pipes. This covers the ring buffers of the stream readers, the executors of the
+segmented stream writers, the muxer's pipes and threads and the connection pools of the HTTP sessions.
+Without --ffmpeg, a stand-in for FFmpeg is used, which copies its first input to its output and discards
+all other inputs.
+
+After each cycle, once all threads started during the cycle have terminated, a JSON line is printed with
+the memory traced by tracemalloc, the RSS, the number of threads and the number of open file descriptors.
+Only the samples taken after a session has been closed are compared with each other: the first of these
+after the warm-up cycles is the baseline, and the soak test fails with exit code 1 when the growth of the
+last one exceeds one of the thresholds. The biggest differences of the traced allocations are then written
+to stderr.
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import stat
+import sys
+import tempfile
+import threading
+from time import time
+
+try:
+    import tracemalloc
+except ImportError:  # pragma: no cover
+    tracemalloc = None
+
+import _common  # noqa: F401
+import origin as _origin
+import pipeline
+
+from streamlink import Streamlink
+from streamlink.stream.ffmpegmux import MuxedStream
+
+
+PASSTHROUGH = """#!{python}
+import os, sys, threading
+def copy(path, output):
+    fd = int(path[5:]) if path.startswith("pipe:") else os.open(path, os.O_RDONLY)
+    while True:
+        data = os.read(fd, 65536)
+        if not data:
+            break
+        if output is not None:
+            output.write(data)
+paths = [sys.argv[i + 1] for i, arg in enumerate(sys.argv) if arg == "-i"]
+outputs = [getattr(sys.stdout, "buffer", sys.stdout)] + [None] * (len(paths) - 1)
+threads = [threading.Thread(target=copy, args=args) for args in zip(paths, outputs)]
+for thread in threads:
+    thread.daemon = True
+    thread.start()
+for thread in threads:
+    thread.join()
+"""
+
+STREAMS = ("hls", "dash", "muxed")
+
+_excluded = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<unknown>"),
+) if tracemalloc else ()
+
+
+def create_passthrough(tmpdir):
+    path = os.path.join(tmpdir, "ffmpeg-passthrough")
+    with open(path, "w") as fd:
+        fd.write(PASSTHROUGH.format(python=sys.executable))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+
+    return path
+
+
+def open_fds():
+    """Returns the number of open file descriptors of this process, or None if it's unknown."""
+    for path in "/proc/self/fd", "/dev/fd":
+        if os.path.isdir(path):
+            # listing the directory opens another descriptor
+            return len(os.listdir(path)) - 1
+
+    return None
+
+
+def current_rss():
+    """Returns the current resident set size of this process in bytes, or None if it's unknown."""
+    try:
+        with open("/proc/self/statm") as fd:
+            return int(fd.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (IOError, OSError, ValueError):
+        return _common.peak_rss()
+
+
+def create_streams(session, args):
+    streams = []
+    for name in args.streams:
+        if name == "muxed":
+            streams.append(MuxedStream(
+                session,
+                pipeline.create_stream(session, "hls", "{0}/live/hls/plain/playlist.m3u8".format(args.origin)),
+                pipeline.create_stream(session, "dash", "{0}/live/dash/template/manifest.mpd".format(args.origin)),
+                format="mpegts",
+            ))
+        else:
+            kind, path = pipeline.SCENARIOS["{0}-{1}".format(name, "plain" if name == "hls" else "template")]
+            streams.append(pipeline.create_stream(session, kind, "{0}/live/{1}".format(args.origin, path)))
+
+    return streams
+
+
+def run_cycle(session, args):
+    """Reads all streams concurrently and waits for all threads started in the meantime to terminate."""
+    before = set(threading.enumerate())
+    deadline = time() + args.cycle_time
+    results = []
+    threads = []
+    for stream in create_streams(session, args):
+        result = {}
+        results.append(result)
+        threads.append(threading.Thread(target=pipeline.read_stream, args=(stream, deadline, args.chunk_size, result)))
+    for thread in threads:
+        thread.start()
+
+    settle = deadline + args.settle_time
+    for thread in threads:
+        thread.join()
+    for thread in set(threading.enumerate()) - before:
+        thread.join(max(settle - time(), 0))
+
+    return sum(result.get("bytes", 0) for result in results)
+
+
+def sample(cycle, started, args, size):
+    gc.collect()
+    elapsed = time() - started
+
+    return dict(
+        benchmark="soak",
+        cycle=cycle,
+        wall=round(elapsed, 3),
+        simulated_hours=round(elapsed * args.simulated_segment_duration / args.segment_duration / 3600, 3),
+        bytes=size,
+        traced=tracemalloc.get_traced_memory()[0],
+        rss=current_rss(),
+        threads=threading.active_count(),
+        fds=open_fds(),
+    )
+
+
+def report(data):
+    sys.stdout.write(json.dumps(data, sort_keys=True))
+    sys.stdout.write("\n")
+    sys.stdout.flush()
+
+
+def check(baseline, last, args):
+    """Returns the exceeded thresholds as a list of (name, growth, threshold) tuples."""
+    failures = []
+    for name, threshold in (
+        ("traced", args.max_memory_growth),
+        ("rss", args.max_rss_growth),
+        ("threads", args.max_thread_growth),
+        ("fds", args.max_fd_growth),
+    ):
+        if threshold is None or baseline[name] is None or last[name] is None:
+            continue
+        growth = last[name] - baseline[name]
+        if growth > threshold:
+            failures.append((name, growth, threshold))
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=600.0, help="soak time in seconds")
+    parser.add_argument("--cycle-time", type=float, default=10.0, help="reading time of the streams of each cycle")
+    parser.add_argument("--settle-time", type=float, default=10.0,
+                        help="maximum time to wait for the threads of closed streams to terminate")
+    parser.add_argument("--session-cycles", type=int, default=3, help="number of cycles of each session")
+    parser.add_argument("--warmup", type=int, default=6, help="minimum number of cycles before the baseline sample")
+    parser.add_argument("--streams", nargs="+", choices=STREAMS, default=list(STREAMS))
+    parser.add_argument("--threads", type=int, default=2, help="value of the stream-segment-threads option")
+    parser.add_argument("--chunk-size", type=int, default=65536, help="read size of the stream consumers")
+    parser.add_argument("--simulated-segment-duration", type=float, default=6.0,
+                        help="segment duration of the simulated streams, which sets the simulated time")
+    parser.add_argument("--ffmpeg", metavar="PATH", help="path of a real FFmpeg executable")
+    parser.add_argument("--loglevel", default="critical", help="level of Streamlink's log messages")
+    parser.add_argument("--traceback-frames", type=int, default=10, help="number of frames stored by tracemalloc")
+    parser.add_argument("--max-memory-growth", type=int, default=4 * 1024 * 1024,
+                        help="maximum growth of the memory traced by tracemalloc in bytes")
+    parser.add_argument("--max-rss-growth", type=int, help="maximum growth of the RSS in bytes (unchecked by default)")
+    parser.add_argument("--max-thread-growth", type=int, default=0, help="maximum growth of the number of threads")
+    parser.add_argument("--max-fd-growth", type=int, default=0,
+                        help="maximum growth of the number of open file descriptors")
+    _origin.add_arguments(parser)
+    parser.set_defaults(segment_duration=0.1, segment_size=64 * 1024, window=30)
+    args = parser.parse_args()
+
+    if tracemalloc is None:
+        parser.error("tracemalloc is required")
+    logging.basicConfig(stream=sys.stderr)
+    logging.getLogger("streamlink").setLevel(args.loglevel.upper())
+
+    process, args.origin, args.epoch = pipeline.start_origin(args)
+    tmpdir = tempfile.mkdtemp()
+    ffmpeg = args.ffmpeg or create_passthrough(tmpdir)
+    tracemalloc.start(args.traceback_frames)
+    try:
+        started = time()
+        session = None
+        baseline = snapshot = last = None
+        cycle = 0
+        # the soak time is extended until a session has been closed after it
+        while baseline is None or session is not None or time() - started < args.duration:
+            if session is None:
+                session = Streamlink()
+                session.set_option("stream-segment-threads", args.threads)
+                session.set_option("hls-playlist-reload-time", "segment")
+                session.set_option("ffmpeg-ffmpeg", ffmpeg)
+
+            size = run_cycle(session, args)
+            cycle += 1
+            closed = cycle % args.session_cycles == 0
+            if closed:
+                session.http.close()
+                session = None
+
+            data = sample(cycle, started, args, size)
+            data["session_closed"] = closed
+            report(data)
+            if not closed:
+                continue
+            last = data
+            if baseline is None and cycle >= args.warmup:
+                snapshot = tracemalloc.take_snapshot().filter_traces(_excluded)
+                # the snapshot itself is traced memory which is kept until the end
+                baseline = dict(last, traced=tracemalloc.get_traced_memory()[0])
+
+        failures = check(baseline, last, args)
+        report(dict(
+            benchmark="soak-summary",
+            cycles=cycle,
+            wall=last["wall"],
+            simulated_hours=last["simulated_hours"],
+            growth=dict((name, last[name] - baseline[name]) for name in ("traced", "rss", "threads", "fds")
+                        if last[name] is not None),
+            failures=[name for name, growth, threshold in failures],
+        ))
+        if failures:
+            for name, growth, threshold in failures:
+                sys.stderr.write("{0} grew by {1}, more than {2}\n".format(name, growth, threshold))
+            sys.stderr.write("Biggest differences of the traced allocations:\n")
+            stats = tracemalloc.take_snapshot().filter_traces(_excluded).compare_to(snapshot, "traceback")
+            for stat_diff in stats[:10]:
+                sys.stderr.write("{0}\n".format(stat_diff))
+                for line in stat_diff.traceback.format():
+                    sys.stderr.write("{0}\n".format(line))
+            sys.exit(1)
+    finally:
+        tracemalloc.stop()
+        process.terminate()
+        process.wait()
+        for name in os.listdir(tmpdir):
+            os.unlink(os.path.join(tmpdir, name))
+        os.rmdir(tmpdir)
+
+
+if __name__ == "__main__":
+    main()
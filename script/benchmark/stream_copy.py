@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""Throughput and CPU benchmark of the stream copy loop.
+
+Copies an in-memory stream through a StreamIOThreadWrapper, like a HTTP stream, to /dev/null.
+The "read" mode is the previous copy loop with fixed 8K reads, the "readinto" modes use
+streamlink.buffers.iter_chunks with either fixed chunk sizes or the automatic chunk size.
+"""
+import argparse
+import io
+import os
+from functools import partial
+
+import _common
+
+from streamlink import Streamlink
+from streamlink.buffers import iter_chunks
+from streamlink.stream.wrappers import StreamIOThreadWrapper
+
+
+def run(session, data, mode, chunk_size):
+    session.set_option("stream-chunk-size", chunk_size)
+    name = "copy-{0}".format(mode)
+    with _common.Measurement(name, chunk_size=chunk_size or "auto") as measurement:
+        stream = StreamIOThreadWrapper(session, io.BytesIO(data))
+        with open(os.devnull, "wb") as output:
+            if mode == "read":
+                chunks = iter(partial(stream.read, chunk_size), b"")
+            else:
+                chunks = iter_chunks(stream, chunk_size)
+            for chunk in chunks:
+                output.write(chunk)
+                measurement.bytes += len(chunk)
+        stream.close()
+
+    measurement.report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=512 * 1024 * 1024, help="size of the copied stream")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[8192, 65536, 262144, 0],
+                        help="fixed chunk sizes of the readinto copy loop, 0 for the automatic chunk size")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    data = os.urandom(1024 * 1024) * (args.size // (1024 * 1024))
+    session = Streamlink()
+    for _ in range(args.rounds):
+        run(session, data, "read", 8192)
+        for chunk_size in args.chunk_sizes:
+            run(session, data, "readinto", chunk_size)
+
+
+if __name__ == "__main__":
+    main()
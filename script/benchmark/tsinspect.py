@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""Throughput benchmark of the MPEG-TS packet inspection of segmented streams.
+
+Writes a synthetic MPEG-TS stream in chunks through the TSInspector, with and without NumPy, and with null packet
+dropping. The buffer gets drained after each write, like the reader of a segmented stream would do.
+"""
+import argparse
+
+import _common
+import media
+
+from streamlink.buffers import Buffer
+from streamlink.stream import tsinspect
+from streamlink.stream.tsinspect import TSInspector
+
+
+def run(name, data, chunk_size, **options):
+    with _common.Measurement(name, chunk_size=chunk_size) as measurement:
+        buffer = Buffer()
+        inspector = TSInspector(buffer, **options)
+        for offset in range(0, len(data), chunk_size):
+            inspector.write(data[offset:offset + chunk_size])
+            buffer.read()
+        inspector.close()
+        measurement.bytes = inspector.stats.bytes
+
+    measurement.extra["mbits"] = round(measurement.bytes * 8 / measurement.wall / 1000 / 1000, 1)
+    measurement.report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", metavar="FILE", help="MPEG-TS input instead of the synthetic stream")
+    parser.add_argument("--segments", type=int, default=100, help="number of synthetic segments")
+    parser.add_argument("--chunk-size", type=int, default=8192, help="size of the writes of the stream writer")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, "rb") as fd:
+            data = fd.read()
+    else:
+        data = media.ts_stream(args.segments, 60, 16 * 1024)
+
+    for _ in range(args.rounds):
+        run("tsinspect-python", data, args.chunk_size, use_numpy=False)
+        if tsinspect.numpy is not None:
+            run("tsinspect-numpy", data, args.chunk_size)
+            run("tsinspect-numpy-drop-null", data, args.chunk_size, drop_null=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""Throughput and CPU benchmark of the muxers of HLS streams with external audio renditions.
+
+Compares the in-process MPEG-TS remuxer with the FFmpeg muxer, using the muxer options of MuxedHLSStream.
+Synthetic MPEG-TS streams with one video and one audio input are used by default. Pass real MPEG-TS files
+via --video and --audio for more realistic results. The FFmpeg muxer is skipped if FFmpeg can't be found.
+"""
+import argparse
+import io
+
+import _common
+import media
+
+from streamlink import Streamlink
+from streamlink.stream.ffmpegmux import FFMPEGMuxer
+from streamlink.stream.tsmux import TSMuxer
+
+
+def run(name, session, muxer_cls, video, audio, chunk_size, **muxer_options):
+    with _common.Measurement(name, input_bytes=len(video) + len(audio)) as measurement:
+        muxer = muxer_cls(session, io.BytesIO(video), io.BytesIO(audio), **muxer_options).open()
+        try:
+            while True:
+                data = muxer.read(chunk_size)
+                if not data:
+                    break
+                measurement.bytes += len(data)
+        finally:
+            muxer.close()
+            process = getattr(muxer, "process", None)
+            if process:
+                process.wait()
+
+    measurement.report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--video", metavar="FILE", help="MPEG-TS video input")
+    parser.add_argument("--audio", metavar="FILE", help="MPEG-TS audio input")
+    parser.add_argument("--segments", type=int, default=300, help="number of synthetic segments per input")
+    parser.add_argument("--frame-size", type=int, default=16 * 1024, help="synthetic video frame size")
+    parser.add_argument("--chunk-size", type=int, default=8192, help="read size of the consumer")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.video and args.audio:
+        with open(args.video, "rb") as fd:
+            video = fd.read()
+        with open(args.audio, "rb") as fd:
+            audio = fd.read()
+    else:
+        # two second segments of 30 fps video and of audio frames with 1024 samples at 48kHz
+        video = media.ts_stream(args.segments, 60, args.frame_size)
+        audio = media.ts_stream(args.segments, 94, 384, stream_type=0x0F, frame_duration=1920)
+
+    session = Streamlink()
+    for _ in range(args.rounds):
+        run("hls-muxer-ts", session, TSMuxer, video, audio, args.chunk_size)
+        if FFMPEGMuxer.is_usable(session):
+            # same muxer options as MuxedHLSStream
+            run("hls-muxer-ffmpeg", session, FFMPEGMuxer, video, audio, args.chunk_size,
+                format="mpegts", maps=["0:v?", "0:a?", "1:a"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""CPU benchmark of interpreted and compiled validation schemas.
+
+Runs the plugin tests of tests/plugins and records each schema which gets validated via Schema.validate(),
+together with its input, so that the benchmark uses the plugins' own schemas and test fixtures.
+The recorded inputs are then validated with:
+
+- interpreted: validate(), which walks the schema on every call
+- compiled: a new copy of the schema which gets compiled on every call, like the schemas which plugins create
+  in their methods
+- memoized: a schema which has been compiled once, like the schemas which plugins define on the module level
+
+All modes must have the same results and error messages, which gets checked before the measurements.
+"""
+import argparse
+import copy
+import os
+import sys
+
+import _common
+import pytest
+
+from streamlink.plugin.api.validate import ValidationError, _validate
+from streamlink.plugin.api.validate._compile import _compile, compile_schema
+
+
+def record(paths):
+    """Runs the tests of the given paths and returns the validated (schema, value) pairs."""
+    recorded = []
+    validate_schema = _validate.Schema.validate
+
+    def recorder(schema, value, *args, **kwargs):
+        try:
+            recorded.append((schema, copy.deepcopy(value)))
+        except Exception:
+            recorded.append((schema, value))
+        return validate_schema(schema, value, *args, **kwargs)
+
+    _validate.Schema.validate = recorder
+    stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        pytest.main(["-q", "-p", "no:cacheprovider"] + paths)
+    finally:
+        sys.stdout = stdout
+        _validate.Schema.validate = validate_schema
+
+    return recorded
+
+
+def outcome(func, schema, value):
+    try:
+        return True, func(schema, value)
+    except ValidationError as err:
+        return False, str(err)
+
+
+def interpreted(schema, value):
+    return _validate.validate(schema, value)
+
+
+def compiled(schema, value):
+    return _compile(schema)(value)
+
+
+def memoized(schema, value):
+    return compile_schema(schema)(value)
+
+
+MODES = [
+    ("interpreted", interpreted),
+    ("compiled", compiled),
+    ("memoized", memoized),
+]
+
+
+def run(name, func, pairs, iterations):
+    # compiled schema containers are memoized, so each iteration of the compiled mode needs new schema objects
+    rounds = [
+        [(copy.deepcopy(schema), value) for schema, value in pairs] if func is compiled else pairs
+        for _ in range(iterations)
+    ]
+    with _common.Measurement("validate-{0}".format(name), schemas=len(pairs), iterations=iterations) as measurement:
+        for batch in rounds:
+            for schema, value in batch:
+                try:
+                    func(schema, value)
+                except ValidationError:
+                    pass
+
+    measurement.extra["us_per_validation"] = round(measurement.cpu / iterations / len(pairs) * 1e6, 3)
+    measurement.report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tests", nargs="+", default=[os.path.join(_common.root, "tests", "plugins")],
+                        help="paths of the tests which get recorded")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    pairs = record(args.tests)
+    if not pairs:
+        parser.error("No schemas have been validated by the tests")
+
+    for schema, value in pairs:
+        expected = outcome(interpreted, schema, value)
+        for name, func in MODES[1:]:
+            if outcome(func, schema, value) != expected:
+                sys.stderr.write("Mismatch of the {0} schema: {1!r}\n".format(name, schema))
+                sys.exit(1)
+
+    for _ in range(args.rounds):
+        for name, func in MODES:
+            run(name, func, pairs, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,7 +17,14 @@ __author__ = "Streamlink, Billy2011"
 __copyright__ = "Copyright 2022 Streamlink, Billy2011"
 __credits__ = ["https://github.com/streamlink/streamlink/blob/master/AUTHORS"]
 
-from streamlink.api import streams
 from streamlink.exceptions import (StreamlinkError, PluginError, NoStreamsError,
                                    NoPluginError, StreamError)
-from streamlink.session import Streamlink
+# sets the logger class of Streamlink's loggers, which support the "{}" style of their log messages
+import streamlink.logger  # noqa: F401
+from streamlink.utils.lazy import lazy_attributes
+
+# the session and its dependencies only get imported once they're needed
+lazy_attributes(__name__, {
+    "streams": "streamlink.api",
+    "Streamlink": "streamlink.session",
+})
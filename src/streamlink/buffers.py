@@ -2,6 +2,8 @@ from collections import deque
 from io import BytesIO
 from threading import Event, Lock
 
+from streamlink.compat import is_py2
+
 
 class Chunk(BytesIO):
     """A single chunk, part of the buffer."""
@@ -27,6 +29,9 @@ class Buffer(object):
         self.current_chunk = None
         self.closed = False
         self.length = 0
+        # the total number of bytes which have been written to and read from the buffer
+        self.written = 0
+        self.consumed = 0
 
     def _iterate_chunks(self, size):
         bytes_left = size
@@ -49,9 +54,11 @@ class Buffer(object):
 
     def write(self, data):
         if not self.closed:
-            data = bytes(data)  # Copy so that original buffer may be reused
+            # Copy so that original buffer may be reused
+            data = data.tobytes() if isinstance(data, memoryview) else bytes(data)
             self.chunks.append(data)
             self.length += len(data)
+            self.written += len(data)
 
     def read(self, size=-1):
         if size < 0 or size > self.length:
@@ -62,9 +69,30 @@ class Buffer(object):
 
         data = b"".join(self._iterate_chunks(size))
         self.length -= len(data)
+        self.consumed += len(data)
 
         return data
 
+    def readinto(self, b):
+        """Reads data into the pre-allocated, writable bytes-like object and returns the number of bytes read."""
+        view = memoryview(b)
+        size = min(len(view), self.length)
+        offset = 0
+
+        while offset < size:
+            current_chunk = self.current_chunk or Chunk(self.chunks.popleft())
+            offset += current_chunk.readinto(view[offset:size])
+
+            if current_chunk.empty:
+                self.current_chunk = None
+            else:
+                self.current_chunk = current_chunk
+
+        self.length -= offset
+        self.consumed += offset
+
+        return offset
+
     def close(self):
         self.closed = True
 
@@ -101,7 +129,7 @@ class RingBuffer(Buffer):
 
         return data
 
-    def read(self, size=-1, block=True, timeout=None):
+    def _wait_used(self, block, timeout):
         if block and not self.closed:
             self.event_used.wait(timeout)
 
@@ -109,8 +137,21 @@ class RingBuffer(Buffer):
             if not self.event_used.is_set() and self.length == 0:
                 raise IOError("Read timeout")
 
+    def read(self, size=-1, block=True, timeout=None):
+        self._wait_used(block, timeout)
+
         return self._read(size)
 
+    def readinto(self, b, block=True, timeout=None):
+        self._wait_used(block, timeout)
+
+        with self.buffer_lock:
+            read = Buffer.readinto(self, b)
+
+            self._check_events()
+
+        return read
+
     def write(self, data):
         if self.closed:
             return
@@ -161,4 +202,80 @@ class RingBuffer(Buffer):
         return self.free == 0
 
 
-__all__ = ["Buffer", "RingBuffer"]
+class ChunkSize(object):
+    """The read size of a copy loop, which is either fixed or tuned automatically.
+
+    The automatic chunk size gets doubled whenever a read fills the whole chunk, which means that more data is
+    already waiting, and gets halved whenever reads return less than a quarter of the chunk repeatedly, so that
+    large amounts of data get copied with few iterations, while the read buffer stays small for slow streams.
+    """
+
+    MIN_SIZE = 8192
+    MAX_SIZE = 1024 * 1024
+    SHRINK_READS = 8
+
+    def __init__(self, size=None):
+        self.fixed = bool(size)
+        self.size = size or self.MIN_SIZE
+        self.max_size = size or self.MAX_SIZE
+        self.small_reads = 0
+
+    def update(self, read):
+        """Updates the chunk size after a read of the given number of bytes and returns the new chunk size."""
+        if self.fixed:
+            return self.size
+
+        if read >= self.size:
+            self.size = min(self.size * 2, self.MAX_SIZE)
+            self.small_reads = 0
+        elif read < self.size // 4:
+            self.small_reads += 1
+            if self.small_reads >= self.SHRINK_READS:
+                self.size = max(self.size // 2, self.MIN_SIZE)
+                self.small_reads = 0
+        else:
+            self.small_reads = 0
+
+        return self.size
+
+
+def readinto(fd, b):
+    """Reads data from a file-like object into a writable bytes-like object and returns the number of bytes read.
+
+    Buffered readers, e.g. the stdout pipes of subprocesses, are read via :meth:`readinto1`, which returns the
+    available data like a raw read instead of blocking until the whole buffer is full.
+    Falls back to :meth:`read` if the file-like object doesn't implement :meth:`readinto`.
+    """
+    if hasattr(fd, "readinto1"):
+        return fd.readinto1(b)
+    if hasattr(fd, "readinto"):
+        return fd.readinto(b)
+
+    view = memoryview(b)
+    data = fd.read(len(view))
+    view[:len(data)] = data
+
+    return len(data)
+
+
+def iter_chunks(fd, chunk_size=None):
+    """Yields the data of a file-like object in chunks until the end of the data.
+
+    The data is read into a single pre-allocated buffer, and the yielded memoryviews of that buffer are only valid
+    until the next chunk gets read, so consumers which keep the data need to copy it first.
+
+    Python 2's file objects, e.g. ``sys.stdout``, can't write memoryviews, so the chunks are copied to bytes there.
+    """
+    chunk_size = ChunkSize(chunk_size)
+    view = memoryview(bytearray(chunk_size.max_size))
+
+    while True:
+        read = readinto(fd, view[:chunk_size.size])
+        if not read:
+            break
+
+        yield view[:read].tobytes() if is_py2 else view[:read]
+        chunk_size.update(read)
+
+
+__all__ = ["Buffer", "RingBuffer", "ChunkSize", "iter_chunks", "readinto"]
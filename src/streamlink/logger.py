@@ -1,12 +1,18 @@
+import atexit
 import logging
 import sys
 import warnings
 from logging import CRITICAL, DEBUG, ERROR, INFO, WARNING
 from threading import Lock
 
-from streamlink.compat import is_py2
+from streamlink.compat import is_py2, queue
 from streamlink.utils.encoding import maybe_encode
 
+try:
+    from logging.handlers import QueueHandler, QueueListener
+except ImportError:  # Python 2
+    QueueHandler = QueueListener = None
+
 FORMAT_BASE = "[{name}][{levelname}] {message}"
 FORMAT_STYLE = "{"
 FORMAT_DATE = "%H:%M:%S"
@@ -206,7 +212,41 @@ class LoggerModule(object):
         self.manager.msg(self.module, DEBUG, msg, *args, **kwargs)
 
 
+if QueueHandler is not None:
+    class _QueueHandler(QueueHandler):
+        def prepare(self, record):
+            # merge the message and its arguments in the logging thread, as the arguments could change later on,
+            # but leave the formatting of the log line to the listener's handler
+            record.msg = record.getMessage()
+            record.args = None
+
+            return record
+
+
+_listeners = []
+
+
+def flush():
+    """Waits until the log records of the queued handlers have been written"""
+    for listener in list(_listeners):
+        listener.queue.join()
+
+
+def _stop_listeners():
+    while _listeners:
+        _listeners.pop().stop()
+
+
+atexit.register(_stop_listeners)
+
+
 def basicConfig(**kwargs):
+    """
+    Adds a handler to Streamlink's root logger and returns it.
+
+    If ``queue`` is set, the log records get written by the handler in a separate thread, so that the threads
+    which log messages don't get blocked by I/O, e.g. of log files. This requires Python 3.
+    """
     with _config_lock:
         filename = kwargs.get("filename")
         if filename:
@@ -223,7 +263,13 @@ def basicConfig(**kwargs):
         formatter = StringFormatter(fs, dfs, style=style, remove_base=remove_base)
         handler.setFormatter(formatter)
 
-        root.addHandler(handler)
+        if kwargs.get("queue") and QueueHandler is not None:
+            listener = QueueListener(queue.Queue(), handler)
+            listener.start()
+            _listeners.append(listener)
+            root.addHandler(_QueueHandler(listener.queue))
+        else:
+            root.addHandler(handler)
         level = kwargs.get("level")
         if level is not None:
             root.setLevel(level)
@@ -236,6 +282,7 @@ __all__ = [
     "TRACE",
     "StreamlinkLogger",
     "basicConfig",
+    "flush",
     "root",
     "levels",
 ]
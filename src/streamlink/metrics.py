@@ -0,0 +1,162 @@
+"""Structured events and metrics of a :class:`Streamlink <streamlink.Streamlink>` session.
+
+The segmented streams report the stages of each segment (queued, request sent, first byte received, download
+completed, written to the buffer and consumed by the reader) as events, and keep counters, gauges and histograms
+of the transferred bytes, the retries, the live-edge lag, the buffer fill and the playlist reload latency.
+
+Nothing gets recorded until the metrics get enabled, either by subscribing to the events or by calling
+:meth:`Metrics.enable`, so the instrumented code paths only check a single attribute by default.
+"""
+import bisect
+import time
+from collections import OrderedDict, namedtuple
+from threading import Lock
+
+#: A single event: the event name, its UNIX timestamp, the labels of the stream which has emitted it and a dict of
+#: event specific data, eg. the segment identifier
+MetricsEvent = namedtuple("MetricsEvent", "name time labels data")
+
+#: The default upper bounds of the histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Counter(object):
+    """A value which only increases."""
+
+    type = "counter"
+
+    def __init__(self):
+        self.value = 0
+        # metrics get updated by the threads of the segment downloads
+        self._lock = Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class Gauge(object):
+    """A value which can go up and down."""
+
+    type = "gauge"
+
+    def __init__(self):
+        self.value = 0
+        self._lock = Lock()
+
+    def set(self, value):
+        with self._lock:
+            self.value = value
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self.value -= amount
+
+
+class Histogram(object):
+    """Counts the observed values in buckets, which are defined by their upper bounds, and keeps their sum."""
+
+    type = "histogram"
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0
+        self._lock = Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def cumulative_counts(self):
+        """Returns a list of ``(upper_bound, count)`` tuples of the cumulative bucket counts, ending with ``+Inf``."""
+        with self._lock:
+            counts = list(self.counts)
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            total += count
+            result.append((bound, total))
+
+        return result
+
+
+class Metrics(object):
+    """The event dispatcher and the metrics registry of a session.
+
+    Metrics are identified by their name and their labels, which are a dict of strings, and get created on first
+    use. Event subscribers get called synchronously in the thread which has emitted the event, so they should
+    return quickly.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._explicitly_enabled = False
+        self._subscribers = []
+        self._metrics = OrderedDict()
+        self._lock = Lock()
+
+    def enable(self):
+        """Starts recording the metrics, without subscribing to the events."""
+        self._explicitly_enabled = True
+        self.enabled = True
+
+    def subscribe(self, callback):
+        """Calls the callback with a :class:`MetricsEvent` for each emitted event and enables the metrics."""
+        with self._lock:
+            self._subscribers = self._subscribers + [callback]
+            self.enabled = True
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            self._subscribers = [subscriber for subscriber in self._subscribers if subscriber is not callback]
+            self.enabled = self._explicitly_enabled or bool(self._subscribers)
+
+    def emit(self, name, labels=None, timestamp=None, **data):
+        """Sends an event to all subscribers."""
+        if not self._subscribers:
+            return
+
+        event = MetricsEvent(name, time.time() if timestamp is None else timestamp, labels or {}, data)
+        for callback in self._subscribers:
+            callback(event)
+
+    def _get(self, cls, name, labels, *args):
+        key = name, tuple(sorted((labels or {}).items()))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = self._metrics[key] = cls(*args)
+        if not isinstance(metric, cls):
+            raise TypeError("Metric {0} is a {1}, not a {2}".format(name, metric.type, cls.type))
+
+        return metric
+
+    def counter(self, name, labels=None):
+        return self._get(Counter, name, labels)
+
+    def gauge(self, name, labels=None):
+        return self._get(Gauge, name, labels)
+
+    def histogram(self, name, labels=None, buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, labels, buckets)
+
+    def collect(self):
+        """Returns a list of ``(name, labels, metric)`` tuples of all metrics, in the order of their creation."""
+        with self._lock:
+            items = list(self._metrics.items())
+
+        return [(name, dict(labels), metric) for (name, labels), metric in items]
+
+
+__all__ = ["Counter", "Gauge", "Histogram", "Metrics", "MetricsEvent"]
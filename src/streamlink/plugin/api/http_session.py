@@ -1,3 +1,4 @@
+import codecs
 import ssl
 import time
 try:
@@ -14,7 +15,7 @@ from streamlink.compat import is_py3
 from streamlink.exceptions import PluginError
 from streamlink.packages.requests_file import FileAdapter
 from streamlink.plugin.api import useragents
-from streamlink.utils.parse import parse_json, parse_xml
+from streamlink.utils.parse import parse_json, parse_json_content, parse_xml
 
 
 urllib3_version = tuple(map(int, urllib3.__version__.split(".")[:3]))
@@ -109,12 +110,22 @@ class HTTPSession(Session):
         else:
             return "UTF-8"
 
+    @staticmethod
+    def _is_utf8(encoding):
+        try:
+            return codecs.lookup(encoding).name == "utf-8"
+        except LookupError:
+            return False
+
     @classmethod
     def json(cls, res, *args, **kwargs):
         """Parses JSON from a response."""
         # if an encoding is already set then use the provided encoding
         if res.encoding is None:
             res.encoding = cls.determine_json_encoding(res.content[:4])
+        if cls._is_utf8(res.encoding):
+            # UTF-8 encoded content doesn't need to be decoded first
+            return parse_json_content(res.content, lambda: res.text, *args, **kwargs)
         return parse_json(res.text, *args, **kwargs)
 
     @classmethod
@@ -150,6 +161,88 @@ class HTTPSession(Session):
         """Resolves any redirects and returns the final URL."""
         return self.get(url, stream=True).url
 
+    def search(self, url, *patterns, **kwargs):
+        """Streams the response of a URL and searches its text for the given compiled regex patterns.
+
+        The response gets decoded and searched while it's being downloaded, and the connection gets closed
+        as soon as each pattern has matched, so that the rest of the response doesn't need to be downloaded.
+
+        A match is only accepted once it's followed by at least ``window`` characters or once the response
+        has ended, and patterns are not searched again in text which lies more than ``2 * window``
+        characters behind the end of the downloaded text. The results are therefore the same as those of
+        ``pattern.search(res.text)``, as long as the matches, including the text which is inspected by
+        lookarounds and by the end of greedy repetitions, are not longer than ``window`` characters.
+
+        The text gets decoded with the encoding of the response, or with UTF-8 if it's unknown.
+
+        :param url: the URL of the request
+        :param patterns: compiled regex patterns
+        :param window: the maximum length of the matches in characters
+        :param chunk_size: the size of the downloaded chunks in bytes
+        :param method: the HTTP method of the request
+        :param kwargs: the other keyword arguments of :meth:`request`
+        :return: a list with a match object or ``None`` for each pattern
+        """
+        window = kwargs.pop("window", 8192)
+        chunk_size = kwargs.pop("chunk_size", 16384)
+        method = kwargs.pop("method", "GET")
+
+        # there's nothing to search for, so the request doesn't need to be sent
+        if not patterns:
+            return []
+
+        res = self.request(method, url, stream=True, **kwargs)
+        decoder = codecs.getincrementaldecoder(res.encoding or "utf-8")(errors="replace")
+        # the positions where the patterns get searched from, or None once a pattern has matched
+        positions = [0] * len(patterns)
+        starts = [None] * len(patterns)
+        chunks = []
+        pending = []
+        size = searched = 0
+        # the searched part of the text: patterns can look behind their positions by up to window characters
+        tail = ""
+        offset = 0
+
+        try:
+            iterator = res.iter_content(chunk_size)
+            while True:
+                data = next(iterator, None)
+                done = data is None
+                chunk = decoder.decode(data or b"", final=done)
+                if chunk:
+                    chunks.append(chunk)
+                    pending.append(chunk)
+                    size += len(chunk)
+                # only search the text once enough new text has been downloaded
+                if not done and size - searched < window:
+                    continue
+
+                new_offset = max(offset, min(pos for pos in positions if pos is not None) - window)
+                tail = tail[new_offset - offset:] + "".join(pending)
+                offset = new_offset
+                pending = []
+                searched = size
+                for idx, pattern in enumerate(patterns):
+                    pos = positions[idx]
+                    if pos is None:
+                        continue
+                    match = pattern.search(tail, pos - offset)
+                    if match and (done or match.end() + offset <= size - window):
+                        starts[idx] = match.start() + offset
+                        positions[idx] = None
+                    else:
+                        positions[idx] = max(pos, size - 2 * window)
+
+                if done or all(pos is None for pos in positions):
+                    break
+        finally:
+            res.close()
+
+        # return matches of the whole text, like pattern.search(res.text)
+        text = "".join(chunks)
+
+        return [None if start is None else pattern.search(text, start) for pattern, start in zip(patterns, starts)]
+
     @staticmethod
     def valid_request_args(**req_keywords):
         # type: () -> Dict
@@ -177,6 +270,7 @@ class HTTPSession(Session):
         total_retries = kwargs.pop("retries", 0)
         retry_backoff = kwargs.pop("retry_backoff", 0.3)
         retry_max_backoff = kwargs.pop("retry_max_backoff", 10.0)
+        on_retry = kwargs.pop("on_retry", None)
         retries = 0
 
         if session:
@@ -203,6 +297,8 @@ class HTTPSession(Session):
                     err.err = rerr
                     raise err
                 retries += 1
+                if on_retry is not None:
+                    on_retry(retries, rerr)
                 # back off retrying, but only to a maximum sleep time
                 delay = min(retry_max_backoff,
                             retry_backoff * (2 ** (retries - 1)))
@@ -7,22 +7,50 @@ from streamlink.utils.parse import parse_json, parse_qsd as parse_query, parse_x
 __all__ = ["parse_json", "parse_xml", "parse_query"]
 
 
-tag_re = re.compile(r'''(?=<(?P<tag>[a-zA-Z]+)(?P<attr>.*?)(?P<end>/)?>(?:(?P<inner>.*?)</\s*(?P=tag)\s*>)?)''',
-                    re.MULTILINE | re.DOTALL)
+tag_name_re = re.compile(r"[a-zA-Z]+\Z")
 attr_re = re.compile(r'''\s*(?P<key>[\w-]+)\s*(?:=\s*(?P<quote>["']?)(?P<value>.*?)(?P=quote)\s*)?''')
 Tag = namedtuple("Tag", "tag attributes text")
 
 
 def itertags(html, tag):
     """
-    Brute force regex based HTML tag parser. This is a rough-and-ready searcher to find HTML tags when
+    Brute force HTML tag parser. This is a rough-and-ready searcher to find HTML tags when
     standards compliance is not required. Will find tags that are commented out, or inside script tag etc.
 
+    The tags are found in a single pass over the HTML page, and the page is only scanned as far as needed
+    for the yielded tags, so the generator can be stopped early once the wanted tag has been found.
+
     :param html: HTML page
     :param tag: tag name to find
     :return: generator with Tags
     """
-    for match in tag_re.finditer(html):
-        if match.group("tag") == tag:
-            attrs = dict((a.group("key").lower(), a.group("value")) for a in attr_re.finditer(match.group("attr")))
-            yield Tag(match.group("tag"), attrs, match.group("inner"))
+    # tag names consist of letters only: a tag like <h1> is read as the tag "h" with the attribute "1"
+    if not tag_name_re.match(tag):
+        return
+
+    open_re = re.compile(r"<{0}(?![a-zA-Z])".format(re.escape(tag)))
+    close_re = re.compile(r"</\s*{0}\s*>".format(re.escape(tag)))
+    end = -1
+    close = None
+    close_pos = -1
+
+    for match in open_re.finditer(html):
+        start = match.end()
+        # the attributes end at the first ">", which is shared by subsequent tags without a ">" of their own
+        if end < start:
+            end = html.find(">", start)
+            if end == -1:
+                return
+
+        attr = html[start:end]
+        if attr.endswith("/"):
+            attr = attr[:-1]
+
+        # the text ends at the first closing tag after the tag, even if the tag is self-closing or nested
+        if close_pos <= end:
+            close = close_re.search(html, end + 1)
+            close_pos = len(html) if close is None else close.start()
+        text = None if close is None else html[end + 1:close.start()]
+
+        attrs = dict((a.group("key").lower(), a.group("value")) for a in attr_re.finditer(attr))
+        yield Tag(tag, attrs, text)
@@ -0,0 +1,487 @@
+"""
+Compiler of validation schemas.
+
+:func:`validate` interprets a schema on every call: it dispatches on the type of each schema node, re-checks the
+types of dict keys and formats the messages of all errors, including those of discarded :class:`AnySchema` branches.
+:func:`compile_schema` walks a schema once and turns it into nested functions which are specialized for each node,
+with the same results and the same error messages as :func:`validate`.
+"""
+from collections import OrderedDict
+from copy import copy, deepcopy
+
+from streamlink.compat import Callable, Match, is_py2, singledispatch, str as text_type
+from streamlink.plugin.api.validate._exception import ValidationError
+from streamlink.plugin.api.validate._schemas import (
+    AllSchema,
+    AnySchema,
+    AttrSchema,
+    GetItemSchema,
+    OptionalSchema,
+    SchemaContainer,
+    TransformSchema,
+    UnionGetSchema,
+    UnionSchema,
+    XmlElementSchema,
+)
+from streamlink.utils.lazy import lazy_module
+
+etree = lazy_module("lxml.etree")
+
+
+class _Lazy(object):
+    """
+    Error message argument which gets evaluated when the message is formatted.
+    """
+
+    __slots__ = ("func", "args")
+
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+
+    def __str__(self):
+        return self.func(*self.args)
+
+
+def compile_schema(schema):
+    """
+    Compile a schema into a function which validates its input like :func:`validate`.
+
+    The compiled functions of schema containers, e.g. :class:`Schema` objects, are memoized on the container,
+    so that each container only gets compiled once. Containers should therefore not be modified after their first use.
+    """
+    if not isinstance(schema, SchemaContainer):
+        return _compile(schema)
+
+    compiled = schema.__dict__.get("_compiled")
+    if compiled is None:
+        compiled = schema._compiled = _compile(schema)
+
+    return compiled
+
+
+# ----
+
+
+@singledispatch
+def _compile(schema):
+    # validators of third party schema types, registered on validate(), are used as they are
+    from streamlink.plugin.api.validate._validate import validate
+    if validate.dispatch(type(schema)) is not validate.registry[object]:
+        return lambda value: validate(schema, value)
+
+    expected = repr(schema)
+
+    def validate_equality(value):
+        if schema != value:
+            raise ValidationError(
+                "{value} does not equal {expected}",
+                value=_Lazy(repr, value),
+                expected=expected,
+                schema="equality",
+            )
+
+        return value
+
+    return validate_equality
+
+
+@_compile.register(type)
+def _compile_type(schema):
+    if schema == text_type:
+        schema = str
+    expected = schema.__name__
+
+    def validate_type(value):
+        if is_py2 and type(value) is text_type:
+            value = str(value)
+        if not isinstance(value, schema):
+            raise ValidationError(
+                "Type of {value} should be {expected}, but is {actual}",
+                value=_Lazy(repr, value),
+                expected=expected,
+                actual=type(value).__name__,
+                schema=type,
+            )
+
+        return value
+
+    return validate_type
+
+
+@_compile.register(list)
+@_compile.register(tuple)
+@_compile.register(set)
+@_compile.register(frozenset)
+def _compile_sequence(schema):
+    cls = type(schema)
+    validate_cls = _compile_type(cls)
+    validate_item = _compile_anyschema(AnySchema(*schema))
+
+    def validate_sequence(value):
+        validate_cls(value)
+
+        return cls(
+            validate_item(v) for v in value
+        )
+
+    return validate_sequence
+
+
+@_compile.register(dict)
+def _compile_dict(schema):
+    cls = type(schema)
+    validate_cls = _compile_type(cls)
+    items = []
+    for key, subschema in schema.items():
+        is_optional = isinstance(key, OptionalSchema)
+        if is_optional:
+            key = key.key
+        validate_key = None
+        if type(key) in (type, AllSchema, AnySchema, TransformSchema, UnionSchema):
+            validate_key = compile_schema(key)
+        items.append((is_optional, key, repr(key), validate_key, compile_schema(subschema)))
+
+    def validate_dict(value):
+        validate_cls(value)
+        new = cls()
+
+        for is_optional, key, key_repr, validate_key, validate_value in items:
+            if is_optional and key not in value:
+                continue
+
+            if validate_key is not None:
+                for subkey, subvalue in value.items():
+                    try:
+                        newkey = validate_key(subkey)
+                    except ValidationError as err:
+                        raise ValidationError("Unable to validate key", schema=dict, context=err)
+                    try:
+                        newvalue = validate_value(subvalue)
+                    except ValidationError as err:
+                        raise ValidationError("Unable to validate value", schema=dict, context=err)
+                    new[newkey] = newvalue
+                break
+
+            if key not in value:
+                raise ValidationError(
+                    "Key {key} not found in {value}",
+                    key=key_repr,
+                    value=_Lazy(repr, value),
+                    schema=dict,
+                )
+
+            try:
+                new[key] = validate_value(value[key])
+            except ValidationError as err:
+                raise ValidationError(
+                    "Unable to validate value of key {key}",
+                    key=key_repr,
+                    schema=dict,
+                    context=err,
+                )
+
+        return new
+
+    return validate_dict
+
+
+@_compile.register(Callable)
+def _compile_callable(schema):
+    # type: (Callable)
+    def validate_callable(value):
+        if not schema(value):
+            raise ValidationError(
+                "{callable} is not true",
+                callable=_Lazy("{0}({1!r})".format, schema.__name__, value),
+                schema=Callable,
+            )
+
+        return value
+
+    return validate_callable
+
+
+@_compile.register(AllSchema)
+def _compile_allschema(schema):
+    # type: (AllSchema)
+    validators = tuple(compile_schema(subschema) for subschema in schema.schema)
+    if len(validators) == 1:
+        return validators[0]
+
+    def validate_allschema(value):
+        for validator in validators:
+            value = validator(value)
+
+        return value
+
+    return validate_allschema
+
+
+@_compile.register(AnySchema)
+def _compile_anyschema(schema):
+    # type: (AnySchema)
+    validators = tuple(compile_schema(subschema) for subschema in schema.schema)
+
+    def validate_anyschema(value):
+        errors = []
+        for validator in validators:
+            try:
+                return validator(value)
+            except ValidationError as err:
+                errors.append(err)
+
+        raise ValidationError(*errors, schema=AnySchema)
+
+    return validate_anyschema
+
+
+@_compile.register(TransformSchema)
+def _compile_transformschema(schema):
+    # type: (TransformSchema)
+    func, args, kwargs = schema.func, schema.args, schema.kwargs
+    if not isinstance(func, Callable):
+        validate_func = _compile_type(Callable)
+
+        def validate_transformschema(value):
+            validate_func(func)
+
+        return validate_transformschema
+
+    def validate_transformschema(value):
+        return func(value, *args, **kwargs)
+
+    return validate_transformschema
+
+
+@_compile.register(GetItemSchema)
+def _compile_getitemschema(schema):
+    # type: (GetItemSchema)
+    item = schema.item if type(schema.item) is tuple and not schema.strict else (schema.item,)
+    default = schema.default
+    iselement = etree.iselement
+
+    def validate_getitemschema(value):
+        idx = 0
+        key = None
+        try:
+            for key in item:
+                if iselement(value):
+                    value = value.attrib[key]
+                elif isinstance(value, Match):
+                    value = value.group(key)
+                else:
+                    value = value[key]
+                idx += 1
+            return value
+        except (KeyError, IndexError):
+            # only return default value on last item in nested lookup
+            if idx < len(item) - 1:
+                raise ValidationError(
+                    "Item {key} was not found in object {value}",
+                    key=repr(key),
+                    value=_Lazy(repr, value),
+                    schema=GetItemSchema,
+                )
+            return default
+        except (TypeError, AttributeError) as err:
+            raise ValidationError(
+                "Could not get key {key} from object {value}",
+                key=repr(key),
+                value=_Lazy(repr, value),
+                schema=GetItemSchema,
+                context=err,
+            )
+
+    return validate_getitemschema
+
+
+@_compile.register(AttrSchema)
+def _compile_attrschema(schema):
+    # type: (AttrSchema)
+    attributes = tuple((key, repr(key), compile_schema(subschema)) for key, subschema in schema.schema.items())
+
+    def validate_attrschema(value):
+        new = copy(value)
+
+        # the validated attribute replaces the input object, like in validate()
+        for key, key_repr, validator in attributes:
+            if not hasattr(value, key):
+                raise ValidationError(
+                    "Attribute {key} not found on object {value}",
+                    key=key_repr,
+                    value=_Lazy(repr, value),
+                    schema=AttrSchema,
+                )
+
+            try:
+                value = validator(getattr(value, key))
+            except ValidationError as err:
+                raise ValidationError(
+                    "Could not validate attribute {key}",
+                    key=key_repr,
+                    schema=AttrSchema,
+                    context=err,
+                )
+
+            setattr(new, key, value)
+
+        return new
+
+    return validate_attrschema
+
+
+@_compile.register(XmlElementSchema)
+def _compile_xmlelementschema(schema):
+    # type: (XmlElementSchema)
+    validate_element = _compile_callable(etree.iselement)
+    validate_tag = None if schema.tag is None else compile_schema(schema.tag)
+    validate_attrib = None if schema.attrib is None else compile_schema(schema.attrib)
+    validate_text = None if schema.text is None else compile_schema(schema.text)
+    validate_tail = None if schema.tail is None else compile_schema(schema.tail)
+
+    def validate_xmlelementschema(value):
+        validate_element(value)
+        tag = value.tag
+        attrib = value.attrib
+        text = value.text
+        tail = value.tail
+
+        if validate_tag is not None:
+            try:
+                tag = validate_tag(value.tag)
+            except ValidationError as err:
+                raise ValidationError(
+                    "Unable to validate XML tag: {0}".format(err),
+                    schema=XmlElementSchema,
+                    context=err,
+                )
+
+        if validate_attrib is not None:
+            try:
+                attrib = validate_attrib(OrderedDict(value.attrib))
+            except ValidationError as err:
+                raise ValidationError(
+                    "Unable to validate XML attributes: {0}".format(err),
+                    schema=XmlElementSchema,
+                    context=err,
+                )
+
+        if validate_text is not None:
+            try:
+                text = validate_text(value.text)
+            except ValidationError as err:
+                raise ValidationError(
+                    "Unable to validate XML text: {0}".format(err),
+                    schema=XmlElementSchema,
+                    context=err,
+                )
+
+        if validate_tail is not None:
+            try:
+                tail = validate_tail(value.tail)
+            except ValidationError as err:
+                raise ValidationError(
+                    "Unable to validate XML tail: {0}".format(err),
+                    schema=XmlElementSchema,
+                    context=err,
+                )
+
+        new = etree.Element(tag, attrib)
+        new.text = text
+        new.tail = tail
+        for child in value:
+            new.append(deepcopy(child))
+
+        return new
+
+    return validate_xmlelementschema
+
+
+@_compile.register(UnionGetSchema)
+def _compile_uniongetschema(schema):
+    # type: (UnionGetSchema)
+    seq = schema.seq
+    getters = tuple(compile_schema(getter) for getter in schema.getters)
+
+    def validate_uniongetschema(value):
+        return seq(
+            getter(value) for getter in getters
+        )
+
+    return validate_uniongetschema
+
+
+@_compile.register(UnionSchema)
+def _compile_unionschema(schema):
+    # type: (UnionSchema)
+    validate_union = _compile_union(schema.schema)
+
+    def validate_unionschema(value):
+        try:
+            return validate_union(value)
+        except ValidationError as err:
+            raise ValidationError("Could not validate union", schema=UnionSchema, context=err)
+
+    return validate_unionschema
+
+
+# ----
+
+
+@singledispatch
+def _compile_union(schema):
+    def validate_union(value):
+        raise ValidationError(
+            "Invalid union type: {type}",
+            type=type(schema).__name__,
+        )
+
+    return validate_union
+
+
+@_compile_union.register(dict)
+def _compile_union_dict(schema):
+    cls = type(schema)
+    items = []
+    for key, subschema in schema.items():
+        is_optional = isinstance(key, OptionalSchema)
+        if is_optional:
+            key = key.key
+        items.append((is_optional, key, repr(key), compile_schema(subschema)))
+
+    def validate_union_dict(value):
+        new = cls()
+        for is_optional, key, key_repr, validator in items:
+            try:
+                new[key] = validator(value)
+            except ValidationError as err:
+                if is_optional:
+                    continue
+
+                raise ValidationError(
+                    "Unable to validate union {key}",
+                    key=key_repr,
+                    schema=dict,
+                    context=err,
+                )
+
+        return new
+
+    return validate_union_dict
+
+
+@_compile_union.register(list)
+@_compile_union.register(tuple)
+@_compile_union.register(set)
+@_compile_union.register(frozenset)
+def _compile_union_sequence(schemas):
+    cls = type(schemas)
+    validators = tuple(compile_schema(schema) for schema in schemas)
+
+    def validate_union_sequence(value):
+        return cls(
+            validator(value) for validator in validators
+        )
+
+    return validate_union_sequence
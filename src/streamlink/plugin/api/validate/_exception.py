@@ -12,10 +12,26 @@ class ValidationError(ValueError):
         # type: Optional[Union[str, object]]
         self.context = kwargs.pop("context", None)
         # type: Optional[Union[Exception]]
+        self._template = None
+        self._kwargs = None
         if len(error) == 1 and type(error[0]) is str:
-            self.errors = (self._truncate(error[0], **kwargs), )
+            if kwargs:
+                # the message gets formatted on demand, as errors of AnySchema branches are mostly discarded
+                self._template = error[0]
+                self._kwargs = kwargs
+                self._errors = None
+            else:
+                self._errors = (self._truncate(error[0]), )
         else:
-            self.errors = error
+            self._errors = error
+
+    @property
+    def errors(self):
+        if self._errors is None:
+            self._errors = (self._truncate(self._template, **self._kwargs), )
+            self._template = self._kwargs = None
+
+        return self._errors
 
     def _ellipsis(self, string):
         # type: (str)
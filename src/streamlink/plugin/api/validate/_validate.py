@@ -1,10 +1,9 @@
 from collections import OrderedDict
 from copy import copy, deepcopy
 
-from lxml.etree import Element, iselement
-
 from streamlink.compat import Callable, Match, is_py2, singledispatch, str as text_type
 from streamlink.exceptions import PluginError
+from streamlink.plugin.api.validate._compile import compile_schema
 from streamlink.plugin.api.validate._exception import ValidationError
 from streamlink.plugin.api.validate._schemas import (
     AllSchema,
@@ -17,16 +16,21 @@ from streamlink.plugin.api.validate._schemas import (
     UnionSchema,
     XmlElementSchema,
 )
+from streamlink.utils.lazy import lazy_module
+
+etree = lazy_module("lxml.etree")
 
 
 class Schema(AllSchema):
     """
     Wrapper class for :class:`AllSchema` with a validate method which raises :class:`PluginError` by default on error.
+
+    The schema gets compiled on its first validation, see :func:`compile_schema`.
     """
 
     def validate(self, value, name="result", exception=PluginError):
         try:
-            return validate(self, value)
+            return compile_schema(self)(value)
         except ValidationError as err:
             raise exception("Unable to validate {0}: {1}".format(name, err))
 
@@ -174,7 +178,7 @@ def _validate_getitemschema(schema, value):
     key = None
     try:
         for key in item:
-            if iselement(value):
+            if etree.iselement(value):
                 value = value.attrib[key]
             elif isinstance(value, Match):
                 value = value.group(key)
@@ -234,7 +238,7 @@ def _validate_attrschema(schema, value):
 @validate.register(XmlElementSchema)
 def _validate_xmlelementschema(schema, value):
     # type: (XmlElementSchema)
-    validate(iselement, value)
+    validate(etree.iselement, value)
     tag = value.tag
     attrib = value.attrib
     text = value.text
@@ -264,7 +268,7 @@ def _validate_xmlelementschema(schema, value):
         except ValidationError as err:
             raise ValidationError("Unable to validate XML tail: {0}".format(err), schema=XmlElementSchema, context=err)
 
-    new = Element(tag, attrib)
+    new = etree.Element(tag, attrib)
     new.text = text
     new.tail = tail
     for child in value:
@@ -1,11 +1,10 @@
 from typing import Any, Callable
 
-from lxml.etree import iselement
-
 from streamlink.compat import urlparse
 from streamlink.plugin.api.validate._exception import ValidationError
 from streamlink.plugin.api.validate._schemas import AllSchema, AnySchema, TransformSchema
 from streamlink.plugin.api.validate._validate import validate
+from streamlink.utils.lazy import lazy_module
 from streamlink.utils.parse import (
     parse_html as _parse_html,
     parse_json as _parse_json,
@@ -13,6 +12,8 @@ from streamlink.utils.parse import (
     parse_xml as _parse_xml,
 )
 
+etree = lazy_module("lxml.etree")
+
 
 # String related validators
 
@@ -226,7 +227,7 @@ def validator_xml_find(xpath):
     """
 
     def xpath_find(value):
-        validate(iselement, value)
+        validate(etree.iselement, value)
         value = value.find(xpath)
         if value is None:
             raise ValidationError(
@@ -235,7 +236,7 @@ def validator_xml_find(xpath):
                 schema="xml_find",
             )
 
-        return validate(iselement, value)
+        return validate(etree.iselement, value)
 
     return TransformSchema(xpath_find)
 
@@ -247,7 +248,7 @@ def validator_xml_findall(xpath):
     """
 
     def xpath_findall(value):
-        validate(iselement, value)
+        validate(etree.iselement, value)
         return value.findall(xpath)
 
     return TransformSchema(xpath_findall)
@@ -272,7 +273,7 @@ def validator_xml_xpath(xpath):
     """
 
     def transform_xpath(value):
-        validate(iselement, value)
+        validate(etree.iselement, value)
         return value.xpath(xpath) or None
 
     return TransformSchema(transform_xpath)
@@ -10,12 +10,13 @@ try:
 except ImportError:
     pass
 
-import requests.cookies
-
 from streamlink.cache import Cache
 from streamlink.compat import str
 from streamlink.exceptions import FatalPluginError, NoStreamsError, PluginError
 from streamlink.options import Arguments, Options
+from streamlink.utils.lazy import lazy_module
+
+requests = lazy_module("requests")
 
 log = logging.getLogger(__name__)
 
@@ -20,8 +20,7 @@ class Sportal(Plugin):
     _hls_re = re.compile(r'''["'](?P<url>[^"']+\.m3u8[^"']*?)["']''')
 
     def _get_streams(self):
-        res = self.session.http.get(self.url)
-        m = self._hls_re.search(res.text)
+        m, = self.session.http.search(self.url, self._hls_re)
         if not m:
             return
 
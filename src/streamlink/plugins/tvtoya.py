@@ -21,8 +21,7 @@ class TVToya(Plugin):
 
     def _get_streams(self):
         self.session.set_option('hls-live-edge', 10)
-        res = self.session.http.get(self.url)
-        playlist_m = self._playlist_re.search(res.text)
+        playlist_m, = self.session.http.search(self.url, self._playlist_re)
 
         if playlist_m:
             return HLSStream.parse_variant_playlist(self.session, playlist_m.group(1))
@@ -11,6 +11,7 @@ import logging
 import re
 from collections import namedtuple
 from random import random
+from time import time
 
 from streamlink.compat import str, urlparse
 from streamlink.exceptions import NoStreamsError, PluginError
@@ -30,6 +31,8 @@ log = logging.getLogger(__name__)
 Segment = namedtuple("Segment", "uri duration title key discontinuity ad byterange date map prefetch")
 
 LOW_LATENCY_MAX_LIVE_EDGE = 2
+# access tokens only get reused if they don't expire within this number of seconds
+ACCESS_TOKEN_EXPIRY_MARGIN = 60
 
 
 class TwitchM3U8(M3U8):
@@ -210,8 +213,21 @@ class TwitchAPI:
             "Client-ID": "kimne78kx3ncx6brgo4mv6wki5h1ko",
         }
         self.headers.update(**{k: v for k, v in session.get_plugin_option("twitch", "api-header") or []})
+        # the responses of prefetched queries, which haven't been used yet
+        self._prefetched = {}
+
+    @staticmethod
+    def _query_key(query):
+        return json.dumps(query, sort_keys=True)
 
     def call(self, data, schema=None):
+        queries = data if isinstance(data, list) else [data]
+        keys = [self._query_key(query) for query in queries]
+        if all(key in self._prefetched for key in keys):
+            responses = [self._prefetched.pop(key) for key in keys]
+            response = responses if isinstance(data, list) else responses[0]
+            return schema.validate(response, name="JSON") if schema else response
+
         res = self.session.http.post(
             "https://gql.twitch.tv/gql",
             data=json.dumps(data),
@@ -220,6 +236,24 @@ class TwitchAPI:
 
         return self.session.http.json(res, schema=schema)
 
+    def prefetch(self, *queries):
+        """
+        Sends the queries of multiple API calls in a single batched request and keeps their responses,
+        so that the subsequent API calls with the same queries don't need to send their own requests.
+
+        :param queries: the queries or lists of queries of the API calls
+        """
+        queries = [query for item in queries for query in (item if isinstance(item, list) else [item])]
+        self._prefetched = {}
+        try:
+            responses = self.call(queries, schema=validate.Schema([dict]))
+        except PluginError as err:
+            log.debug("Failed to prefetch API queries: {0}".format(err))
+            return
+
+        if len(responses) == len(queries):
+            self._prefetched = dict(zip(map(self._query_key, queries), responses))
+
     @staticmethod
     def _gql_persisted_query(operationname, sha256hash, **variables):
         return {
@@ -243,16 +277,73 @@ class TwitchAPI:
             validate.get(("chansub", "restricted_bitrates"))
         ))
 
-    # GraphQL API calls
+    @staticmethod
+    def parse_token_expiry(tokenstr):
+        return parse_json(tokenstr, schema=validate.Schema(
+            {"expires": int},
+            validate.get("expires")
+        ))
 
-    def metadata_video(self, video_id):
-        query = self._gql_persisted_query(
+    # GraphQL API queries
+
+    @classmethod
+    def query_metadata_video(cls, video_id):
+        return cls._gql_persisted_query(
             "VideoMetadata",
             "cb3b1eb2f2d2b2f65b8389ba446ec521d76c3aa44f5424a1b1d235fe21eb4806",
             channelLogin="",  # parameter can be empty
             videoID=video_id
         )
 
+    @classmethod
+    def query_metadata_channel(cls, channel):
+        return [
+            cls._gql_persisted_query(
+                "ChannelShell",
+                "c3ea5a669ec074a58df5c11ce3c27093fa38534c94286dc14b68a25d5adcbf55",
+                login=channel,
+                lcpVideosEnabled=False
+            ),
+            cls._gql_persisted_query(
+                "StreamMetadata",
+                "059c4653b788f5bdb2f5a2d2a24b0ddc3831a15079001a3d927556a96fb0517f",
+                channelLogin=channel
+            )
+        ]
+
+    @classmethod
+    def query_access_token(cls, is_live, channel_or_vod):
+        return cls._gql_persisted_query(
+            "PlaybackAccessToken",
+            "0828119ded1c13477966434e15800ff57ddacf13ba1911c129dc2200705b0712",
+            isLive=is_live,
+            login=channel_or_vod if is_live else "",
+            isVod=not is_live,
+            vodID=channel_or_vod if not is_live else "",
+            playerType="embed"
+        )
+
+    @classmethod
+    def query_stream_metadata(cls, channel):
+        return cls._gql_persisted_query(
+            "StreamMetadata",
+            "1c719a40e481453e5c48d9bb585d971b8b372f8ebb105b17076722264dfa5b3e",
+            channelLogin=channel
+        )
+
+    @classmethod
+    def query_hosted_channel(cls, channel):
+        return cls._gql_persisted_query(
+            "UseHosting",
+            "427f55a3daca510f726c02695a898ef3a0de4355b39af328848876052ea6b337",
+            channelLogin=channel
+        )
+
+    # GraphQL API calls
+
+    def metadata_video(self, video_id):
+        query = self.query_metadata_video(video_id)
+
         return self.call(query, schema=validate.Schema(
             {"data": {"video": {
                 "id": str,
@@ -274,19 +365,7 @@ class TwitchAPI:
         ))
 
     def metadata_channel(self, channel):
-        queries = [
-            self._gql_persisted_query(
-                "ChannelShell",
-                "c3ea5a669ec074a58df5c11ce3c27093fa38534c94286dc14b68a25d5adcbf55",
-                login=channel,
-                lcpVideosEnabled=False
-            ),
-            self._gql_persisted_query(
-                "StreamMetadata",
-                "059c4653b788f5bdb2f5a2d2a24b0ddc3831a15079001a3d927556a96fb0517f",
-                channelLogin=channel
-            )
-        ]
+        queries = self.query_metadata_channel(channel)
 
         return self.call(queries, schema=validate.Schema(
             [
@@ -355,15 +434,7 @@ class TwitchAPI:
         ))
 
     def access_token(self, is_live, channel_or_vod):
-        query = self._gql_persisted_query(
-            "PlaybackAccessToken",
-            "0828119ded1c13477966434e15800ff57ddacf13ba1911c129dc2200705b0712",
-            isLive=is_live,
-            login=channel_or_vod if is_live else "",
-            isVod=not is_live,
-            vodID=channel_or_vod if not is_live else "",
-            playerType="embed"
-        )
+        query = self.query_access_token(is_live, channel_or_vod)
         subschema = validate.any(None, validate.all(
             {
                 "value": validate.text,
@@ -421,23 +492,15 @@ class TwitchAPI:
         ))
 
     def stream_metadata(self, channel):
-        query = self._gql_persisted_query(
-            "StreamMetadata",
-            "1c719a40e481453e5c48d9bb585d971b8b372f8ebb105b17076722264dfa5b3e",
-            channelLogin=channel
-        )
+        query = self.query_stream_metadata(channel)
 
-        return self.call_gql(query, schema=validate.Schema(
+        return self.call(query, schema=validate.Schema(
             {"data": {"user": {"stream": {"type": validate.text}}}},
             validate.get(("data", "user", "stream"))
         ))
 
     def hosted_channel(self, channel):
-        query = self._gql_persisted_query(
-            "UseHosting",
-            "427f55a3daca510f726c02695a898ef3a0de4355b39af328848876052ea6b337",
-            channelLogin=channel
-        )
+        query = self.query_hosted_channel(channel)
 
         return self.call(query, schema=validate.Schema(
             {"data": {"user": {
@@ -528,6 +591,8 @@ class Twitch(Plugin):
         self.channel = None
         self.clip_name = None
         self._checked_metadata = False
+        # access tokens by (is_live, channel_or_vod), which get reused by subsequent calls of _get_streams()
+        self._access_tokens = {}
 
         if self.subdomain == "player":
             # pop-out player
@@ -572,7 +637,17 @@ class Twitch(Plugin):
         except (PluginError, TypeError):
             pass
 
+    def _cached_access_token(self, is_live, channel_or_vod):
+        expires, access_token = self._access_tokens.get((is_live, channel_or_vod), (0, None))
+        if expires > time() + ACCESS_TOKEN_EXPIRY_MARGIN:
+            return access_token
+
     def _access_token(self, is_live, channel_or_vod):
+        access_token = self._cached_access_token(is_live, channel_or_vod)
+        if access_token:
+            log.debug("Reusing access token")
+            return access_token
+
         try:
             sig, token = self.api.access_token(is_live, channel_or_vod)
         except (PluginError, TypeError):
@@ -583,7 +658,30 @@ class Twitch(Plugin):
         except PluginError:
             restricted_bitrates = []
 
-        return sig, token, restricted_bitrates
+        access_token = sig, token, restricted_bitrates
+        try:
+            self._access_tokens[(is_live, channel_or_vod)] = self.api.parse_token_expiry(token), access_token
+        except PluginError:
+            pass
+
+        return access_token
+
+    def _prefetch(self, queries):
+        # independent API calls only need a single request
+        if len(queries) > 1:
+            self.api.prefetch(*queries)
+
+    def _prefetch_live(self, hosting=True):
+        queries = []
+        if hosting:
+            queries.append(self.api.query_hosted_channel(self.channel))
+        if self.options.get("disable_reruns"):
+            queries.append(self.api.query_stream_metadata(self.channel))
+        if not self._cached_access_token(True, self.channel):
+            queries.append(self.api.query_access_token(True, self.channel))
+        if not self._checked_metadata:
+            queries.append(self.api.query_metadata_channel(self.channel))
+        self._prefetch(queries)
 
     def _switch_to_hosted_channel(self):
         disabled = self.options.get("disable_hosting")
@@ -624,8 +722,13 @@ class Twitch(Plugin):
         return False
 
     def _get_hls_streams_live(self):
+        channel = self.channel
+        self._prefetch_live()
         if self._switch_to_hosted_channel():
             return
+        if self.channel != channel:
+            # the hosting status of the hosted channel has already been checked
+            self._prefetch_live(hosting=False)
         if self._check_for_rerun():
             return
 
@@ -642,6 +745,12 @@ class Twitch(Plugin):
 
     def _get_hls_streams_video(self):
         log.debug("Getting HLS streams for video ID {0}".format(self.video_id))
+        queries = []
+        if not self._cached_access_token(False, self.video_id):
+            queries.append(self.api.query_access_token(False, self.video_id))
+        if not self._checked_metadata:
+            queries.append(self.api.query_metadata_video(self.video_id))
+        self._prefetch(queries)
         sig, token, restricted_bitrates = self._access_token(False, self.video_id)
         url = self.usher.video(self.video_id, nauthsig=sig, nauth=token)
 
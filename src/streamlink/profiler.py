@@ -0,0 +1,171 @@
+"""Profiling of all threads of a Streamlink process.
+
+Python's profilers only see the thread they have been enabled in, while most of the work of a stream happens in the
+worker, writer and executor threads of segmented streams, in the filler threads of stream wrappers and in the pipe
+threads of the FFmpeg muxer. The :class:`Profiler` covers all of these threads, either deterministically with a
+:class:`cProfile.Profile` for each thread, or by sampling the stacks of all threads at a fixed interval.
+"""
+import cProfile
+import logging
+import pstats
+import re
+import sys
+import threading
+from collections import defaultdict
+
+log = logging.getLogger(__name__)
+
+_thread_index_re = re.compile(r"(?:[-_]\d+)+$")
+
+
+def thread_tags(thread):
+    """Returns the role and the stream type of a thread, eg. ``("HLSStreamWriter", "hls")``.
+
+    The role is the thread's name without the ``Thread-`` prefix and without the numeric suffixes of executor and
+    anonymous threads. The stream type is only known for threads which keep a reference to their stream.
+    """
+    if thread is None:
+        return "unknown", None
+
+    role = _thread_index_re.sub("", thread.name)
+    if role.startswith("Thread-"):
+        role = role[len("Thread-"):]
+
+    stream = getattr(thread, "stream", None)
+    shortname = getattr(stream, "shortname", None)
+
+    return role, shortname() if callable(shortname) else None
+
+
+class Profiler(object):
+    """Profiles all threads of the process.
+
+    :param format: ``"pstats"`` profiles each thread with :mod:`cProfile`, which only includes threads started after
+                   :meth:`start`, and merges the profiles into a single pstats file. ``"collapsed"`` samples the
+                   stacks of all threads and writes them in the collapsed stack format of flame graph tools, with the
+                   role and the stream type of the thread as the root frames.
+    :param interval: the sampling interval of the ``"collapsed"`` format, in seconds
+    """
+
+    FORMATS = ("collapsed", "pstats")
+
+    def __init__(self, format="collapsed", interval=0.005):
+        if format not in self.FORMATS:
+            raise ValueError("Invalid profile format: {0}".format(format))
+
+        self.format = format
+        self.interval = interval
+        self.running = False
+        self.samples = defaultdict(int)
+        self.profiles = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._sampler = None
+        self._code_names = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._stopped.clear()
+
+        if self.format == "pstats":
+            threading.setprofile(self._bootstrap)
+            self._add_profile(threading.current_thread()).enable()
+        else:
+            self._sampler = threading.Thread(target=self._sample, name="Thread-Profiler")
+            self._sampler.daemon = True
+            self._sampler.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+
+        if self.format == "pstats":
+            threading.setprofile(None)
+            current = threading.current_thread()
+            for thread, profile in self.profiles:
+                if thread is current:
+                    profile.disable()
+        else:
+            self._stopped.set()
+            self._sampler.join()
+
+    def _add_profile(self, thread):
+        profile = cProfile.Profile()
+        with self._lock:
+            self.profiles.append((thread, profile))
+
+        return profile
+
+    def _bootstrap(self, frame, event, arg):
+        # called by the first profiling event of each new thread: replace this function with the thread's own profiler
+        sys.setprofile(None)
+        if self.running:
+            self._add_profile(threading.current_thread()).enable()
+
+    def _code_name(self, frame):
+        code = frame.f_code
+        name = self._code_names.get(code)
+        if name is None:
+            name = self._code_names[code] = "{0}:{1}".format(frame.f_globals.get("__name__", "?"), code.co_name)
+
+        return name
+
+    def _sample(self):
+        own = threading.current_thread().ident
+        while not self._stopped.wait(self.interval):
+            threads = dict((thread.ident, thread) for thread in threading.enumerate())
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._code_name(frame))
+                    frame = frame.f_back
+                role, stream = thread_tags(threads.get(ident))
+                stack.append("stream={0}".format(stream or "-"))
+                stack.append(role)
+                self.samples[";".join(reversed(stack))] += 1
+
+    def get_stats(self):
+        """Returns the merged :class:`pstats.Stats` of all profiled threads of the ``"pstats"`` format."""
+        with self._lock:
+            profiles = [profile for thread, profile in self.profiles]
+
+        stats = None
+        for profile in profiles:
+            profile.create_stats()
+            if not profile.stats:
+                continue
+            if stats is None:
+                stats = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+
+        return stats
+
+    def dump(self, path):
+        """Writes the pstats file or the collapsed stacks of the profile."""
+        if self.format == "pstats":
+            stats = self.get_stats()
+            if stats is None:
+                log.warning("No profiling data has been recorded")
+                return
+            stats.dump_stats(path)
+        else:
+            with open(path, "w") as fd:
+                for stack, count in sorted(self.samples.items()):
+                    fd.write("{0} {1}\n".format(stack, count))
+        log.info("Wrote profile to {0}".format(path))
+
+
+__all__ = ["Profiler", "thread_tags"]
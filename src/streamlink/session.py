@@ -18,10 +18,11 @@ from streamlink import __version__, plugins
 from streamlink.compat import is_win32, lru_cache
 from streamlink.exceptions import NoPluginError, PluginError
 from streamlink.logger import Logger, StreamlinkLogger
+from streamlink.metrics import Metrics
 from streamlink.options import Options
 from streamlink.plugin.api.http_session import HTTPSession
 from streamlink.plugin.plugin import NORMAL_PRIORITY, NO_PRIORITY, Plugin
-from streamlink.utils.l10n import Localization
+from streamlink.profiler import Profiler
 from streamlink.utils.url import update_scheme
 
 # Ensure that the Logger class returned is Streamslink's for using the API (for backwards compatibility)
@@ -55,10 +56,16 @@ class PythonDeprecatedWarning(UserWarning):
 
 class Streamlink(object):
     """A Streamlink session is used to keep track of plugins,
-       options and log settings."""
+       options and log settings.
+
+       The segment events and the metrics of the session's streams
+       are available via the :class:`streamlink.metrics.Metrics`
+       instance in the ``metrics`` attribute, and the threads of its
+       streams can be profiled via :meth:`start_profiling`."""
 
     def __init__(self, options=None):
         self.http = HTTPSession()
+        self.metrics = Metrics()
         self.options = Options({
             "interface": None,
             "ipv4": False,
@@ -66,17 +73,24 @@ class Streamlink(object):
             "hls-live-edge": 3,
             "hls-segment-ignore-names": [],
             "hls-segment-stream-data": False,
+            "hls-segment-coalesce-size": 0,
             "hls-playlist-reload-attempts": 3,
             "hls-playlist-reload-time": "default",
             "hls-start-offset": 0,
             "hls-duration": None,
+            "hls-muxer": "ffmpeg",
+            "http-stream-connections": 1,
             "ringbuffer-size": 1024 * 1024 * 16,  # 16 MB
             "rtmp-rtmpdump": is_win32 and "rtmpdump.exe" or "rtmpdump",
             "rtmp-proxy": None,
+            "stream-chunk-size": 0,
             "stream-segment-attempts": 3,
             "stream-segment-threads": 1,
             "stream-segment-timeout": 10.0,
             "stream-timeout": 60.0,
+            "stream-ts-inspect": False,
+            "stream-ts-drop-null": False,
+            "stream-ts-repair": False,
             "subprocess-errorlog": False,
             "subprocess-errorlog-path": None,
             "ffmpeg-ffmpeg": None,
@@ -85,6 +99,7 @@ class Streamlink(object):
             "ffmpeg-audio-transcode": None,
             "ffmpeg-copyts": False,
             "ffmpeg-start-at-zero": False,
+            "dash-muxer": "ffmpeg",
             "mux-subtitles": False,
             "locale": None,
             "user-input-requester": None
@@ -94,6 +109,7 @@ class Streamlink(object):
         self.plugins = OrderedDict({})
         self.load_builtin_plugins()
         self._logger = None
+        self.profiler = None
 
     @property
     def logger(self):
@@ -133,6 +149,16 @@ class Streamlink(object):
         hls-segment-stream-data  (bool) Stream HLS segment downloads,
                                  default: ``False``
 
+        hls-segment-coalesce-size (int) Fetch adjacent EXT-X-BYTERANGE
+                                 segments of the same resource with
+                                 single requests of up to this many bytes,
+                                 default: ``0`` (disabled)
+
+        hls-muxer                (str) The muxer used for HLS streams with
+                                 external audio renditions, either
+                                 ``ffmpeg`` or ``ts`` (in-process
+                                 MPEG-TS remuxer), default: ``ffmpeg``
+
         http-proxy               (str) Specify a HTTP proxy to use for
                                  all HTTP requests
 
@@ -168,6 +194,10 @@ class Streamlink(object):
                                  requests except the ones covered by
                                  other options, default: ``20.0``
 
+        http-stream-connections  (int) The number of concurrent byte range
+                                 requests used by HTTP streams if the server
+                                 supports them, default: ``1``
+
         subprocess-errorlog      (bool) Log errors from subprocesses to
                                  a file located in the temp directory
 
@@ -213,9 +243,19 @@ class Streamlink(object):
                                  shift input timestamps so they start at zero
                                  default: ``False``
 
+        dash-muxer               (str) The muxer used for DASH streams with
+                                 separate video and audio representations,
+                                 either ``ffmpeg`` or ``fmp4`` (in-process
+                                 fragmented MP4 muxer), default: ``ffmpeg``
+
         mux-subtitles            (bool) Mux available subtitles into the
                                  output stream.
 
+        stream-chunk-size        (int) The read size used when copying
+                                 stream data between buffers, or ``0``
+                                 for adjusting it automatically to the
+                                 stream's bitrate, default: ``0``
+
         stream-segment-attempts  (int) How many attempts should be done
                                  to download each segment, default: ``3``.
 
@@ -228,6 +268,21 @@ class Streamlink(object):
         stream-timeout           (float) Timeout for reading data from
                                  stream, default: ``60.0``.
 
+        stream-ts-inspect        (bool) Inspect the MPEG-TS packets of
+                                 segmented streams and keep track of
+                                 sync losses, continuity counter errors,
+                                 PCR discontinuities and the bitrate,
+                                 default: ``False``
+
+        stream-ts-drop-null      (bool) Inspect the MPEG-TS packets of
+                                 segmented streams and drop null packets,
+                                 default: ``False``
+
+        stream-ts-repair         (bool) Inspect the MPEG-TS packets of
+                                 segmented streams, drop unsynchronized
+                                 data and mark continuity counter gaps
+                                 as discontinuities, default: ``False``
+
         locale                   (str) Locale setting, in the RFC 1766 format
                                  eg. en_US or es_ES
                                  default: ``system locale``.
@@ -513,19 +568,48 @@ class Streamlink(object):
             plugin.bind(self, plugin_name, user_input_requester)
 
             if plugin.module in self.plugins:
-                log.debug("Plugin {0} is being overridden by {1}".format(plugin.module, pathname))
+                log.debug("Plugin {0} is being overridden by {1}", plugin.module, pathname)
 
             self.plugins[plugin.module] = plugin
 
         if file:
             file.close()
 
+    def start_profiling(self, format="collapsed", interval=0.005):
+        """Starts profiling all threads of the process, including the threads of the session's streams.
+
+        :param format: the format of the :class:`streamlink.profiler.Profiler`
+        :param interval: the sampling interval of the ``"collapsed"`` format, in seconds
+        :return: the running profiler, which is also available via the ``profiler`` attribute
+        """
+        if self.profiler is None or not self.profiler.running:
+            self.profiler = Profiler(format=format, interval=interval)
+            self.profiler.start()
+
+        return self.profiler
+
+    def stop_profiling(self, path=None):
+        """Stops profiling and writes the profile if a path is set.
+
+        :param path: the path of the pstats file or of the collapsed stacks of the profile
+        :return: the stopped profiler, or ``None`` if profiling hasn't been started
+        """
+        profiler = self.profiler
+        if profiler is None:
+            return
+        profiler.stop()
+        if path:
+            profiler.dump(path)
+
+        return profiler
+
     @property
     def version(self):
         return __version__
 
     @property
     def localization(self):
+        from streamlink.utils.l10n import Localization
         return Localization(self.get_option("locale"))
 
 
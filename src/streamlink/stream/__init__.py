@@ -1,7 +1,13 @@
-from streamlink.stream.dash import DASHStream
-from streamlink.stream.hls import HLSStream
-from streamlink.stream.http import HTTPStream
-from streamlink.stream.rtmpdump import RTMPStream
-from streamlink.stream.stream import Stream
-from streamlink.stream.streamprocess import StreamProcess
-from streamlink.stream.wrappers import StreamIOIterWrapper, StreamIOThreadWrapper, StreamIOWrapper
+from streamlink.utils.lazy import lazy_attributes
+
+lazy_attributes(__name__, {
+    "DASHStream": "streamlink.stream.dash",
+    "HLSStream": "streamlink.stream.hls",
+    "HTTPStream": "streamlink.stream.http",
+    "RTMPStream": "streamlink.stream.rtmpdump",
+    "Stream": "streamlink.stream.stream",
+    "StreamProcess": "streamlink.stream.streamprocess",
+    "StreamIOIterWrapper": "streamlink.stream.wrappers",
+    "StreamIOThreadWrapper": "streamlink.stream.wrappers",
+    "StreamIOWrapper": "streamlink.stream.wrappers",
+})
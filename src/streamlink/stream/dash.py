@@ -4,14 +4,16 @@ import itertools
 import logging
 import os.path
 from collections import defaultdict
+from time import time
 
 from streamlink import PluginError, StreamError
 from streamlink.compat import range, urlparse, urlunparse
 from streamlink.stream.dash_manifest import MPD, freeze_timeline, sleep_until, sleeper, utc
 from streamlink.stream.ffmpegmux import FFMPEGMuxer
+from streamlink.stream.fmp4mux import FMP4Muxer
 from streamlink.stream.segmented import SegmentedStreamReader, SegmentedStreamWorker, SegmentedStreamWriter
 from streamlink.stream.stream import Stream
-from streamlink.utils.l10n import Language
+from streamlink.stream.vod import VODDownloader
 from streamlink.utils.parse import parse_xml
 
 log = logging.getLogger(__name__)
@@ -27,9 +29,10 @@ class DASHStreamWriter(SegmentedStreamWriter):
             headers = request_args.pop("headers", {})
             now = datetime.datetime.now(tz=utc)
             if segment.available_at > now:
-                time_to_wait = (segment.available_at - now).total_seconds()
-                fname = os.path.basename(urlparse(segment.url).path)
-                log.debug("Waiting for segment: {fname} ({wait:.01f}s)".format(fname=fname, wait=time_to_wait))
+                if log.isEnabledFor(logging.DEBUG):
+                    time_to_wait = (segment.available_at - now).total_seconds()
+                    fname = os.path.basename(urlparse(segment.url).path)
+                    log.debug("Waiting for segment: {0} ({1:.01f}s)", fname, time_to_wait)
                 sleep_until(segment.available_at)
 
             if segment.range:
@@ -47,9 +50,19 @@ class DASHStreamWriter(SegmentedStreamWriter):
                                          **request_args)
         except StreamError as err:
             log.error("Failed to open segment {0}: {1}", segment.url, err)
+            if retries > 1 and self.metrics.enabled:
+                self.metrics.counter("streamlink_segment_retries_total", self.reader.metrics_labels).inc()
+                self.trace("segment.retry", segment, error=str(err))
             return self.fetch(segment, retries - 1)
 
+    def segment_id(self, segment):
+        return segment.url
+
     def write(self, segment, res, chunk_size=8192):
+        restream = self.reader.restream
+        if restream is not None:
+            restream.start_segment()
+
         for chunk in res.iter_content(chunk_size):
             if not self.closed:
                 self.reader.buffer.write(chunk)
@@ -57,7 +70,13 @@ class DASHStreamWriter(SegmentedStreamWriter):
                 log.warning("Download of segment: {} aborted".format(segment.url))
                 return
 
-        log.debug("Download of segment: {} complete".format(segment.url))
+        if restream is not None:
+            if segment.init and not segment.content:
+                restream.finish_map()
+            else:
+                restream.finish_segment(segment.duration)
+
+        log.debug("Download of segment: {0} complete", segment.url)
 
 
 class DASHStreamWorker(SegmentedStreamWorker):
@@ -107,7 +126,8 @@ class DASHStreamWorker(SegmentedStreamWorker):
             return
 
         self.reader.buffer.wait_free()
-        log.debug("Reloading manifest ({0}:{1})".format(self.reader.representation_id, self.reader.mime_type))
+        log.debug("Reloading manifest ({0}:{1})", self.reader.representation_id, self.reader.mime_type)
+        started = time()
         res = self.session.http.get(self.mpd.url, exception=StreamError, **self.stream.args)
 
         new_mpd = MPD(self.session.http.xml(res, ignore_ns=True),
@@ -122,9 +142,43 @@ class DASHStreamWorker(SegmentedStreamWorker):
         if changed:
             self.mpd = new_mpd
 
+        if self.writer.metrics.enabled:
+            duration = time() - started
+            labels = self.reader.metrics_labels
+            self.writer.metrics.histogram("streamlink_playlist_reload_seconds", labels).observe(duration)
+            self.writer.metrics.emit("playlist.reload", labels, duration=duration, changed=changed)
+
         return changed
 
 
+class DASHVODDownloader(VODDownloader):
+    """Downloads the segments of a single representation of a static MPD concurrently into a file."""
+
+    def __init__(self, stream, representation, **kwargs):
+        self.stream = stream
+        segments = list(representation.segments(init=True))
+        identifier = self.create_identifier(
+            stream.mpd.url or "",
+            *["{0} {1}".format(urlparse(segment.url).path, segment.range) for segment in segments]
+        )
+        super(DASHVODDownloader, self).__init__(stream.session, segments, identifier, **kwargs)
+
+    def fetch(self, segment):
+        request_args = copy.deepcopy(self.stream.args)
+        headers = request_args.pop("headers", {})
+        if segment.range:
+            start, length = segment.range
+            end = start + length - 1 if length else ""
+            headers["Range"] = "bytes={0}-{1}".format(start, end)
+
+        return self.session.http.get(segment.url,
+                                     stream=True,
+                                     timeout=self.timeout,
+                                     exception=StreamError,
+                                     headers=headers,
+                                     **request_args)
+
+
 class DASHStreamReader(SegmentedStreamReader):
     __worker__ = DASHStreamWorker
     __writer__ = DASHStreamWriter
@@ -133,7 +187,10 @@ class DASHStreamReader(SegmentedStreamReader):
         SegmentedStreamReader.__init__(self, stream, *args, **kwargs)
         self.mime_type = mime_type
         self.representation_id = representation_id
-        log.debug("Opening DASH reader for: {0} ({1})".format(self.representation_id, self.mime_type))
+        if mime_type:
+            # distinguishes the metrics of the substreams
+            self.metrics_labels["track"] = mime_type.split("/")[0]
+        log.debug("Opening DASH reader for: {0} ({1})", self.representation_id, self.mime_type)
 
 
 class DASHStream(Stream):
@@ -214,6 +271,7 @@ class DASHStream(Stream):
         if not audio:
             audio = [None]
 
+        from streamlink.utils.l10n import Language
         locale = session.localization
         locale_lang = locale.language
         lang = None
@@ -276,6 +334,38 @@ class DASHStream(Stream):
                     ret_new['{0}_alt{1}'.format(q, n)] = items[n]
         return ret_new
 
+    def to_vod_downloader(self, **kwargs):
+        # type: () -> DASHVODDownloader
+        """Returns a :class:`DASHVODDownloader` of a static MPD with a single representation, or ``None`` otherwise."""
+        if self.mpd.type != "static":
+            return None
+        if self.video_representation and self.audio_representation:
+            log.debug("Muxed DASH streams are not supported when downloading VODs in parallel")
+            return None
+
+        return DASHVODDownloader(self, self.video_representation or self.audio_representation, **kwargs)
+
+    def open_restream(self, window):
+        """Opens a single representation in restream mode."""
+        if self.video_representation and self.audio_representation:
+            raise TypeError("<{0} [{1}]> with muxed representations cannot be restreamed".format(
+                self.__class__.__name__, self.shortname()))
+
+        representation = self.video_representation or self.audio_representation
+        reader = DASHStreamReader(self, representation.id, representation.mimeType, restream=window)
+        reader.open()
+
+        return reader
+
+    @staticmethod
+    def can_remux(session):
+        return not (
+            session.options.get("ffmpeg-fout")
+            or session.options.get("ffmpeg-video-transcode")
+            or session.options.get("ffmpeg-audio-transcode")
+            or session.options.get("ffmpeg-copyts")
+        )
+
     def open(self):
         if self.video_representation:
             video = DASHStreamReader(self, self.video_representation.id, self.video_representation.mimeType)
@@ -286,6 +376,13 @@ class DASHStream(Stream):
             audio.open()
 
         if self.video_representation and self.audio_representation:
+            if self.session.options.get("dash-muxer") == "fmp4":
+                if not self.can_remux(self.session):
+                    log.debug("FFmpeg output, transcode or copyts options are set, falling back to FFmpeg")
+                elif FMP4Muxer.is_supported(self.video_representation.mimeType, self.audio_representation.mimeType):
+                    return FMP4Muxer(self.session, video, audio).open()
+                else:
+                    log.debug("Unsupported representations for the fMP4 muxer, falling back to FFmpeg")
             return FFMPEGMuxer(self.session, video, audio, copyts=True).open()
         elif self.video_representation:
             return video
@@ -10,9 +10,10 @@ from collections import defaultdict, namedtuple
 from contextlib import contextmanager
 from itertools import count, repeat
 
-from isodate import Duration, parse_datetime, parse_duration
-
 from streamlink.compat import izip, range as xrange, urljoin, urlparse, urlsplit, urlunparse, urlunsplit
+from streamlink.utils.lazy import lazy_module
+
+isodate = lazy_module("isodate")
 
 if hasattr(datetime, "timezone"):
     utc = datetime.timezone.utc
@@ -90,11 +91,11 @@ class MPDParsers(object):
 
     @staticmethod
     def duration(duration):
-        return parse_duration(duration)
+        return isodate.parse_duration(duration)
 
     @staticmethod
     def datetime(dt):
-        return parse_datetime(dt).replace(tzinfo=utc)
+        return isodate.parse_datetime(dt).replace(tzinfo=utc)
 
     @staticmethod
     def segment_template(url_template):
@@ -232,7 +233,7 @@ class MPD(MPDNode):
         self.id = self.attr(u"id")
         self.profiles = self.attr(u"profiles", required=True)
         self.type = self.attr(u"type", default=u"static", parser=MPDParsers.type)
-        self.minimumUpdatePeriod = self.attr(u"minimumUpdatePeriod", parser=MPDParsers.duration, default=Duration())
+        self.minimumUpdatePeriod = self.attr(u"minimumUpdatePeriod", parser=MPDParsers.duration, default=isodate.Duration())
         self.minBufferTime = self.attr(u"minBufferTime", parser=MPDParsers.duration, required=True)
         self.timeShiftBufferDepth = self.attr(u"timeShiftBufferDepth", parser=MPDParsers.duration)
         self.availabilityStartTime = self.attr(u"availabilityStartTime", parser=MPDParsers.datetime,
@@ -300,8 +301,8 @@ class Period(MPDNode):
         self.i = kwargs.get(u"i", 0)
         self.id = self.attr(u"id")
         self.bitstreamSwitching = self.attr(u"bitstreamSwitching", parser=MPDParsers.bool_str)
-        self.duration = self.attr(u"duration", default=Duration(), parser=MPDParsers.duration)
-        self.start = self.attr(u"start", default=Duration(), parser=MPDParsers.duration)
+        self.duration = self.attr(u"duration", default=isodate.Duration(), parser=MPDParsers.duration)
+        self.start = self.attr(u"start", default=isodate.Duration(), parser=MPDParsers.duration)
 
         if self.start is None and self.i == 0 and self.root.type == "static":
             self.start = 0
@@ -471,7 +472,7 @@ class SegmentTemplate(MPDNode):
         in the simplest case the segment number is based on the time since the availabilityStartTime
         :return:
         """
-        log.debug("Generating segment numbers for {0} playlist (id={1})".format(self.root.type, self.parent.id))
+        log.debug("Generating segment numbers for {0} playlist (id={1})", self.root.type, self.parent.id)
         if self.root.type == u"static":
             available_iter = repeat(epoch_start)
             duration = self.period.duration.seconds or self.root.mediaPresentationDuration.seconds
@@ -516,7 +517,7 @@ class SegmentTemplate(MPDNode):
                 # workaround for invalid `self.root.timelines[self.parent.id]`
                 # creates a timeline for every mimeType instead of one for both
                 self.parent.id = self.parent.mimeType
-            log.debug("Generating segment timeline for {0} playlist (id={1}))".format(self.root.type, self.parent.id))
+            log.debug("Generating segment timeline for {0} playlist (id={1}))", self.root.type, self.parent.id)
             if self.root.type == "dynamic":
                 # if there is no delay, use a delay of 3 seconds
                 suggested_delay = datetime.timedelta(seconds=(self.root.suggestedPresentationDelay.total_seconds()
@@ -4,9 +4,10 @@ import sys
 import threading
 
 from streamlink import StreamError
+from streamlink.buffers import iter_chunks, readinto
 from streamlink.compat import devnull, which
 from streamlink.stream.stream import Stream, StreamIO
-from streamlink.utils.named_pipe import NamedPipe, NamedPipeBase
+from streamlink.utils.named_pipe import AnonymousPipe, NamedPipe, NamedPipeBase
 
 log = logging.getLogger(__name__)
 
@@ -27,14 +28,14 @@ class MuxedStream(Stream):
         # only update the maps values if they haven't been set
         update_maps = not maps
         for i, substream in enumerate(self.substreams):
-            log.debug("Opening {0} substream".format(substream.shortname()))
+            log.debug("Opening {0} substream", substream.shortname())
             if update_maps:
                 maps.append(len(fds))
             fds.append(substream and substream.open())
 
         for i, subtitle in enumerate(self.subtitles.items()):
             language, substream = subtitle
-            log.debug("Opening {0} subtitle stream".format(substream.shortname()))
+            log.debug("Opening {0} subtitle stream", substream.shortname())
             if update_maps:
                 maps.append(len(fds))
             fds.append(substream and substream.open())
@@ -55,27 +56,35 @@ class FFMPEGMuxer(StreamIO):
     DEFAULT_OUTPUT_FORMAT = "matroska"
     DEFAULT_VIDEO_CODEC = "copy"
     DEFAULT_AUDIO_CODEC = "copy"
+    # the capacity of the input pipes, the default capacity of 64K makes ffmpeg and the copy threads switch constantly
+    PIPE_SIZE = 1024 * 1024
+    # feed ffmpeg through inherited anonymous pipes instead of named pipes, where supported
+    ANONYMOUS_PIPES = AnonymousPipe.is_supported()
 
     @staticmethod
-    def copy_to_pipe(stream, pipe):
-        # type: (StreamIO, NamedPipeBase)
-        log.debug("Starting copy to pipe: {0}".format(pipe.path))
+    def copy_to_pipe(stream, pipe, chunk_size=None):
+        # type: (StreamIO, NamedPipeBase, int)
+        log.debug("Starting copy to pipe: {0}", pipe.path)
         pipe.open()
+        chunks = iter_chunks(stream, chunk_size)
         while not stream.closed:
             try:
-                data = stream.read(8192)
-                if len(data):
-                    pipe.write(data)
-                else:
+                data = next(chunks, None)
+                if data is None:
                     break
+                pipe.write(data)
             except (IOError, OSError):
                 log.error("Pipe copy aborted: {0}".format(pipe.path))
                 break
         try:
-            pipe.close()
+            # the read end of an anonymous pipe belongs to the muxer, which closes it once ffmpeg has inherited it
+            if isinstance(pipe, AnonymousPipe):
+                pipe.close_write_end()
+            else:
+                pipe.close()
         except (IOError, OSError):  # might fail closing, but that should be ok for the pipe
             pass
-        log.debug("Pipe copy complete: {0}".format(pipe.path))
+        log.debug("Pipe copy complete: {0}", pipe.path)
 
     def __init__(self, session, *streams, **options):
         if not self.is_usable(session):
@@ -85,8 +94,12 @@ class FFMPEGMuxer(StreamIO):
         self.process = None
         self.streams = streams
 
-        self.pipes = [NamedPipe() for _ in self.streams]
-        self.pipe_threads = [threading.Thread(target=self.copy_to_pipe, args=(stream, np))
+        self.anonymous_pipes = self.ANONYMOUS_PIPES
+        pipe_cls = AnonymousPipe if self.anonymous_pipes else NamedPipe
+        self.pipes = [pipe_cls(size=self.PIPE_SIZE) for _ in self.streams]
+        chunk_size = session.options.get("stream-chunk-size")
+        self.pipe_threads = [threading.Thread(target=self.copy_to_pipe, args=(stream, np, chunk_size),
+                                              name="Thread-{0}-pipe".format(self.__class__.__name__))
                              for stream, np in
                              zip(self.streams, self.pipes)]
 
@@ -124,7 +137,7 @@ class FFMPEGMuxer(StreamIO):
                 self._cmd.extend(["-metadata{0}".format(stream_id), datum])
 
         self._cmd.extend(['-f', ofmt, outpath])
-        log.debug("ffmpeg command: {0}".format(' '.join(self._cmd)))
+        log.debug("ffmpeg command: {0}", ' '.join(self._cmd))
         self.close_errorlog = False
 
         if session.options.get("ffmpeg-verbose"):
@@ -135,11 +148,32 @@ class FFMPEGMuxer(StreamIO):
         else:
             self.errorlog = devnull()
 
-    def open(self):
+    def _start_pipe_threads(self):
         for t in self.pipe_threads:
             t.daemon = True
             t.start()
-        self.process = subprocess.Popen(self._cmd, stdout=subprocess.PIPE, stdin=subprocess.PIPE, stderr=self.errorlog)
+
+    def open(self):
+        kwargs = {}
+        if self.anonymous_pipes:
+            # the copy threads only get started once ffmpeg has inherited the read ends
+            if self.pipes:
+                kwargs["pass_fds"] = [pipe.read_fd for pipe in self.pipes]
+        else:
+            self._start_pipe_threads()
+        try:
+            self.process = subprocess.Popen(self._cmd, stdout=subprocess.PIPE, stdin=subprocess.PIPE,
+                                            stderr=self.errorlog, **kwargs)
+        except Exception:
+            if self.anonymous_pipes:
+                for pipe in self.pipes:
+                    pipe.close()
+            raise
+        if self.anonymous_pipes:
+            # only ffmpeg may keep the read ends open, so that writes fail once ffmpeg has terminated
+            for pipe in self.pipes:
+                pipe.close_read_end()
+            self._start_pipe_threads()
 
         return self
 
@@ -160,6 +194,9 @@ class FFMPEGMuxer(StreamIO):
         data = self.process.stdout.read(size)
         return data
 
+    def readinto(self, b):
+        return readinto(self.process.stdout, b)
+
     def close(self):
         if self.closed:
             return
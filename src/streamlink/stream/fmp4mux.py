@@ -0,0 +1,420 @@
+import logging
+import struct
+from fractions import Fraction
+
+from streamlink.buffers import Buffer
+from streamlink.stream.stream import StreamIO
+
+log = logging.getLogger(__name__)
+
+# boxes which only contain other boxes and which need to be parsed for rewriting track IDs
+CONTAINER_BOXES = (b"moov", b"trak", b"mdia", b"minf", b"stbl", b"mvex", b"moof", b"traf", b"edts", b"dinf")
+# index boxes reference byte offsets of the input, which are invalid after interleaving the fragments
+INDEX_BOXES = (b"sidx", b"ssix", b"mfra")
+
+TFHD_BASE_DATA_OFFSET_PRESENT = 0x000001
+
+_header = struct.Struct(">I4s")
+_uint32 = struct.Struct(">I")
+_uint64 = struct.Struct(">Q")
+
+
+class Box(object):
+    """A single ISO BMFF box.
+
+    Container boxes keep a list of their parsed children, all other boxes keep their raw payload.
+    """
+
+    def __init__(self, type, payload=b"", children=None):
+        self.type = type
+        self.payload = payload
+        self.children = children
+
+    def __repr__(self):
+        return "<Box {0!r}>".format(self.type)
+
+    @classmethod
+    def parse(cls, type, payload):
+        if type not in CONTAINER_BOXES:
+            return cls(type, payload)
+
+        children = []
+        offset, end = 0, len(payload)
+        while offset + _header.size <= end:
+            size, child_type = _header.unpack_from(payload, offset)
+            header_size = _header.size
+            if size == 1:
+                size = _uint64.unpack_from(payload, offset + header_size)[0]
+                header_size += _uint64.size
+            elif size == 0:
+                size = end - offset
+            if size < header_size or offset + size > end:
+                raise ValueError("Invalid {0!r} box size".format(child_type))
+            children.append(cls.parse(child_type, payload[offset + header_size:offset + size]))
+            offset += size
+
+        return cls(type, children=children)
+
+    def find(self, type):
+        for child in self.children or []:
+            if child.type == type:
+                return child
+
+    def find_all(self, type):
+        return [child for child in self.children or [] if child.type == type]
+
+    def serialize(self):
+        if self.children is not None:
+            payload = b"".join(child.serialize() for child in self.children)
+        else:
+            payload = self.payload
+
+        size = _header.size + len(payload)
+        if size > 0xFFFFFFFF:
+            return _header.pack(1, self.type) + _uint64.pack(size + _uint64.size) + payload
+
+        return _header.pack(size, self.type) + payload
+
+    # full box helpers
+
+    @property
+    def version(self):
+        return bytearray(self.payload[:1])[0]
+
+    @property
+    def flags(self):
+        return _uint32.unpack(b"\x00" + self.payload[1:4])[0]
+
+    def get_uint(self, offset, size):
+        if size == 8:
+            return _uint64.unpack_from(self.payload, offset)[0]
+        return _uint32.unpack_from(self.payload, offset)[0]
+
+    def set_uint(self, offset, size, value):
+        packed = _uint64.pack(value) if size == 8 else _uint32.pack(value)
+        self.payload = self.payload[:offset] + packed + self.payload[offset + size:]
+
+
+def _tkhd_fields(tkhd):
+    # (track_ID offset, duration offset, duration size)
+    if tkhd.version == 1:
+        return 20, 28, 8
+    return 12, 20, 4
+
+
+def _mdhd_timescale(mdhd):
+    return mdhd.get_uint(20 if mdhd.version == 1 else 12, 4)
+
+
+def _mvhd_timescale(mvhd):
+    return mvhd.get_uint(20 if mvhd.version == 1 else 12, 4)
+
+
+class FMP4Input(object):
+    """Reads the init segment and the fragments of a single fragmented MP4 input stream."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.position = 0
+        self.eof = False
+        self.ftyp = None
+        self.moov = None
+        self.timescale = 1
+        self.track_ids = {}
+        self.timescales = {}
+        self.time = Fraction(0)
+        self.fragment = None
+
+    def _read(self, size):
+        chunks = []
+        while size > 0:
+            data = self.stream.read(size)
+            if not data:
+                break
+            chunks.append(data)
+            size -= len(data)
+        data = b"".join(chunks)
+        self.position += len(data)
+
+        return data
+
+    def read_box(self):
+        """Returns the next top level box as a ``(type, payload, position)`` tuple or ``None`` at the end of the stream."""
+        position = self.position
+        header = self._read(_header.size)
+        if len(header) < _header.size:
+            return None
+
+        size, type = _header.unpack(header)
+        header_size = _header.size
+        if size == 1:
+            largesize = self._read(_uint64.size)
+            if len(largesize) < _uint64.size:
+                return None
+            size = _uint64.unpack(largesize)[0]
+            header_size += _uint64.size
+
+        if size == 0:
+            payload = self._read_all()
+        elif size < header_size:
+            raise ValueError("Invalid {0!r} box size".format(type))
+        else:
+            payload = self._read(size - header_size)
+            if len(payload) < size - header_size:
+                return None
+
+        return type, payload, position
+
+    def _read_all(self):
+        chunks = []
+        while True:
+            data = self._read(8192)
+            if not data:
+                return b"".join(chunks)
+            chunks.append(data)
+
+    def read_init(self):
+        while self.moov is None:
+            box = self.read_box()
+            if box is None:
+                raise IOError("fMP4 stream ended before the initialization segment")
+
+            type, payload, _ = box
+            if type == b"ftyp":
+                self.ftyp = Box(type, payload)
+            elif type == b"moov":
+                self.moov = Box.parse(type, payload)
+
+        mvhd = self.moov.find(b"mvhd")
+        if mvhd:
+            self.timescale = _mvhd_timescale(mvhd)
+
+    def read_fragment(self):
+        """Reads boxes until a ``moof`` and its ``mdat`` are complete and stores them as the pending fragment."""
+        boxes = []
+        moof = None
+        while True:
+            box = self.read_box()
+            if box is None:
+                self.eof = True
+                self.fragment = None
+                return None
+
+            type, payload, position = box
+            if type in INDEX_BOXES or type in (b"ftyp", b"moov"):
+                continue
+
+            if type == b"moof":
+                moof = Box.parse(type, payload)
+                boxes.append(moof)
+                self._update_time(moof)
+                moof.input_position = position
+            else:
+                boxes.append(Box(type, payload))
+                if type == b"mdat" and moof is not None:
+                    self.fragment = boxes, moof
+                    return self.fragment
+
+    def _update_time(self, moof):
+        for traf in moof.find_all(b"traf"):
+            tfhd = traf.find(b"tfhd")
+            tfdt = traf.find(b"tfdt")
+            if not tfhd or not tfdt:
+                continue
+            track_id = tfhd.get_uint(4, 4)
+            timescale = self.timescales.get(track_id) or 1
+            decode_time = tfdt.get_uint(4, 8 if tfdt.version == 1 else 4)
+            self.time = Fraction(decode_time, timescale)
+            return
+
+
+class FMP4Muxer(StreamIO):
+    """Interleaves multiple fragmented MP4 streams into a single fragmented MP4 stream.
+
+    The init segments of all input streams get merged into a single ``moov`` box with renumbered track IDs,
+    and the ``moof``/``mdat`` fragments of all inputs get interleaved by their decode time.
+    """
+
+    MIME_TYPES = ("video/mp4", "audio/mp4")
+
+    def __init__(self, session, *streams):
+        self.session = session
+        self.streams = streams
+        self.inputs = [FMP4Input(stream) for stream in streams]
+        self.buffer = Buffer()
+        self.sequence_number = 0
+        self.position = 0
+        self._header_written = False
+
+    @classmethod
+    def is_supported(cls, *mime_types):
+        return all(mime_type in cls.MIME_TYPES for mime_type in mime_types)
+
+    def open(self):
+        return self
+
+    def _write(self, data):
+        self.buffer.write(data)
+        self.position += len(data)
+
+    def _write_header(self):
+        for fmp4input in self.inputs:
+            fmp4input.read_init()
+
+        moov = self.merge_moov([fmp4input.moov for fmp4input in self.inputs])
+        ftyp = next((fmp4input.ftyp for fmp4input in self.inputs if fmp4input.ftyp), None)
+        if ftyp:
+            self._write(ftyp.serialize())
+        self._write(moov.serialize())
+        self._header_written = True
+
+    def merge_moov(self, moovs):
+        output = self.inputs[0]
+        mvhd = moovs[0].find(b"mvhd")
+        mvex = moovs[0].find(b"mvex")
+        if mvex is None:
+            mvex = Box(b"mvex", children=[])
+            moovs[0].children.append(mvex)
+
+        track_id = 0
+        for fmp4input, moov in zip(self.inputs, moovs):
+            traks = moov.find_all(b"trak")
+            trexs = (moov.find(b"mvex") or Box(b"mvex", children=[])).find_all(b"trex")
+            for trak in traks:
+                track_id += 1
+                tkhd = trak.find(b"tkhd")
+                track_id_offset, duration_offset, duration_size = _tkhd_fields(tkhd)
+                old_track_id = tkhd.get_uint(track_id_offset, 4)
+                tkhd.set_uint(track_id_offset, 4, track_id)
+                fmp4input.track_ids[old_track_id] = track_id
+
+                mdhd = (trak.find(b"mdia") or Box(b"mdia", children=[])).find(b"mdhd")
+                if mdhd:
+                    fmp4input.timescales[old_track_id] = _mdhd_timescale(mdhd)
+
+                if fmp4input is not output:
+                    # movie timescale based values need to be converted to the movie timescale of the output
+                    self._rescale_trak(trak, tkhd, duration_offset, duration_size, fmp4input.timescale, output.timescale)
+                    moov.children.remove(trak)
+                    self._insert_trak(moovs[0], trak)
+
+            for trex in trexs:
+                old_track_id = trex.get_uint(4, 4)
+                if old_track_id in fmp4input.track_ids:
+                    trex.set_uint(4, 4, fmp4input.track_ids[old_track_id])
+                if fmp4input is not output:
+                    mvex.children.append(trex)
+
+            if fmp4input is not output:
+                moovs[0].children.extend(moov.find_all(b"pssh"))
+
+        if mvhd:
+            mvhd.set_uint(len(mvhd.payload) - 4, 4, track_id + 1)
+
+        return moovs[0]
+
+    @staticmethod
+    def _insert_trak(moov, trak):
+        # keep the tracks next to each other, in front of the mvex box
+        index = max(i for i, child in enumerate(moov.children) if child.type in (b"mvhd", b"trak")) + 1
+        moov.children.insert(index, trak)
+
+    @staticmethod
+    def _rescale_trak(trak, tkhd, duration_offset, duration_size, timescale, output_timescale):
+        if timescale == output_timescale or not timescale:
+            return
+
+        def rescale(value):
+            return value * output_timescale // timescale
+
+        duration = tkhd.get_uint(duration_offset, duration_size)
+        if duration not in (0, (1 << duration_size * 8) - 1):
+            tkhd.set_uint(duration_offset, duration_size, rescale(duration))
+
+        edts = trak.find(b"edts")
+        elst = edts and edts.find(b"elst")
+        if elst:
+            entry_size, field_size = (20, 8) if elst.version == 1 else (12, 4)
+            for entry in range(elst.get_uint(4, 4)):
+                offset = 8 + entry * entry_size
+                elst.set_uint(offset, field_size, rescale(elst.get_uint(offset, field_size)))
+
+    def _write_fragment(self, fmp4input):
+        boxes, moof = fmp4input.fragment
+        fmp4input.fragment = None
+
+        self.sequence_number += 1
+        mfhd = moof.find(b"mfhd")
+        if mfhd:
+            mfhd.set_uint(4, 4, self.sequence_number)
+
+        moof_position = self.position
+        for box in boxes:
+            if box is moof:
+                break
+            moof_position += len(box.serialize())
+
+        for traf in moof.find_all(b"traf"):
+            tfhd = traf.find(b"tfhd")
+            if not tfhd:
+                continue
+            old_track_id = tfhd.get_uint(4, 4)
+            tfhd.set_uint(4, 4, fmp4input.track_ids.get(old_track_id, old_track_id))
+            if tfhd.flags & TFHD_BASE_DATA_OFFSET_PRESENT:
+                # absolute offsets need to be moved to the new position of the moof box in the output
+                base_data_offset = tfhd.get_uint(8, 8)
+                tfhd.set_uint(8, 8, base_data_offset - moof.input_position + moof_position)
+
+        for box in boxes:
+            self._write(box.serialize())
+
+    def _next(self):
+        if not self._header_written:
+            self._write_header()
+            return True
+
+        pending = []
+        for fmp4input in self.inputs:
+            if fmp4input.fragment is None and not fmp4input.eof:
+                fmp4input.read_fragment()
+            if fmp4input.fragment is not None:
+                pending.append(fmp4input)
+
+        if not pending:
+            return False
+
+        self._write_fragment(min(pending, key=lambda i: i.time))
+
+        return True
+
+    def _fill(self):
+        try:
+            while not self.buffer.length and not self.closed:
+                if not self._next():
+                    break
+        except ValueError as err:
+            raise IOError("Failed to parse fMP4 stream: {0}".format(err))
+
+    def read(self, size=-1):
+        self._fill()
+
+        return self.buffer.read(size)
+
+    def readinto(self, b):
+        self._fill()
+
+        return self.buffer.readinto(b)
+
+    def close(self):
+        if self.closed:
+            return
+
+        log.debug("Closing fMP4 muxer")
+        for stream in self.streams:
+            if hasattr(stream, "close") and callable(stream.close):
+                stream.close()
+
+        super(FMP4Muxer, self).close()
+
+
+__all__ = ["FMP4Muxer"]
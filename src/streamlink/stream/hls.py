@@ -2,41 +2,64 @@ import logging
 import re
 import struct
 from collections import OrderedDict, defaultdict, namedtuple
+from concurrent import futures
+from threading import Lock
+from time import time
 
 from requests.exceptions import ChunkedEncodingError, ConnectionError, ContentDecodingError
 
-from streamlink.compat import str, urlparse
+from streamlink.compat import range, str, urlparse
 from streamlink.exceptions import StreamError
 from streamlink.stream.ffmpegmux import FFMPEGMuxer, MuxedStream
 from streamlink.stream.hls_playlist import load as load_hls_playlist
 from streamlink.stream.http import HTTPStream
 from streamlink.stream.segmented import SegmentedStreamReader, SegmentedStreamWorker, SegmentedStreamWriter
-from streamlink.utils.crypto import AES, unpad
+from streamlink.stream.stream import Stream
+from streamlink.stream.tsmux import TSMuxer
+from streamlink.stream.vod import VODDownloader
 from streamlink.utils.formatter import Formatter
+from streamlink.utils.lazy import lazy_module
+
+# PyCryptodome only gets imported for encrypted streams
+crypto = lazy_module("streamlink.utils.crypto")
 
 log = logging.getLogger(__name__)
 Sequence = namedtuple("Sequence", "num segment")
 
 
-class HLSStreamWriter(SegmentedStreamWriter):
-    def __init__(self, reader, *args, **kwargs):
-        options = reader.stream.session.options
-        kwargs["ignore_names"] = options.get("hls-segment-ignore-names")
-        SegmentedStreamWriter.__init__(self, reader, *args, **kwargs)
+class HLSSegmentData(object):
+    """The already fetched data of a segment, e.g. from a coalesced byterange request.
+
+    Provides the subset of the response interface used by :meth:`HLSStreamWriter.write`.
+    """
+
+    def __init__(self, content):
+        self.content = content
 
+    def iter_content(self, chunk_size=1):
+        for offset in range(0, len(self.content), chunk_size):
+            yield self.content[offset:offset + chunk_size]
+
+
+class HLSSegmentRequestMixin(object):
+    """Creates the request parameters and the decryptors of HLS segments.
+
+    Shared by :class:`HLSStreamWriter` and :class:`HLSVODDownloader`, which need to set the
+    :attr:`session`, :attr:`reader` and :attr:`retries` attributes and call :meth:`init_segment_requests`.
+    """
+
+    def init_segment_requests(self, options):
         self.byterange_offsets = defaultdict(int)
         self.key_data = None
         self.key_uri = None
         self.key_uri_override = options.get("hls-segment-key-uri")
-        self.stream_data = options.get("hls-segment-stream-data")
 
-        if self.ignore_names:
-            # creates a regex from a list of segment names,
-            # this will be used to ignore segments.
-            self.ignore_names = list(set(self.ignore_names))
-            self.ignore_names = "|".join(list(map(re.escape, self.ignore_names)))
-            self.ignore_names_re = re.compile(r"(?:{blacklist})\.ts".format(
-                blacklist=self.ignore_names), re.IGNORECASE)
+    @staticmethod
+    def create_ignore_names_re(ignore_names):
+        # creates a regex from a list of segment names,
+        # this will be used to ignore segments.
+        ignore_names = "|".join(list(map(re.escape, set(ignore_names))))
+        return re.compile(r"(?:{blacklist})\.ts".format(blacklist=ignore_names), re.IGNORECASE)
 
     @staticmethod
     def num_to_iv(n):
@@ -76,26 +99,187 @@ class HLSStreamWriter(SegmentedStreamWriter):
         # Pad IV if needed
         iv = b"\x00" * (16 - len(iv)) + iv
 
-        return AES.new(self.key_data, AES.MODE_CBC, iv)
+        return crypto.AES.new(self.key_data, crypto.AES.MODE_CBC, iv)
 
     def create_request_params(self, sequence):
         request_params = dict(self.reader.request_params)
-        headers = request_params.pop("headers", {})
+        headers = dict(request_params.pop("headers", {}))
 
         if sequence.segment.byterange:
-            bytes_start = self.byterange_offsets[sequence.segment.uri]
-            if sequence.segment.byterange.offset is not None:
-                bytes_start = sequence.segment.byterange.offset
+            bytes_start, bytes_end = self.create_byterange(sequence)
+            headers["Range"] = "bytes={0}-{1}".format(bytes_start, bytes_end)
+
+        request_params["headers"] = headers
+
+        return request_params
+
+    def create_byterange(self, sequence):
+        bytes_start = self.byterange_offsets[sequence.segment.uri]
+        if sequence.segment.byterange.offset is not None:
+            bytes_start = sequence.segment.byterange.offset
+
+        bytes_len = max(sequence.segment.byterange.range - 1, 0)
+        bytes_end = bytes_start + bytes_len
+        self.byterange_offsets[sequence.segment.uri] = bytes_end + 1
+
+        return bytes_start, bytes_end
 
-            bytes_len = max(sequence.segment.byterange.range - 1, 0)
-            bytes_end = bytes_start + bytes_len
+    def create_map_request_params(self, map_):
+        request_params = dict(self.reader.request_params)
+        headers = dict(request_params.pop("headers", {}))
+
+        if map_.byterange:
+            bytes_start = map_.byterange.offset or 0
+            bytes_end = bytes_start + max(map_.byterange.range - 1, 0)
             headers["Range"] = "bytes={0}-{1}".format(bytes_start, bytes_end)
-            self.byterange_offsets[sequence.segment.uri] = bytes_end + 1
 
         request_params["headers"] = headers
 
         return request_params
 
+
+class HLSStreamWriter(HLSSegmentRequestMixin, SegmentedStreamWriter):
+    MAP_CACHE_SIZE = 16
+
+    def __init__(self, reader, *args, **kwargs):
+        options = reader.stream.session.options
+        kwargs["ignore_names"] = options.get("hls-segment-ignore-names")
+        SegmentedStreamWriter.__init__(self, reader, *args, **kwargs)
+        self.init_segment_requests(options)
+
+        self.map_cache = OrderedDict()
+        self.map_last = None
+        self.stream_data = options.get("hls-segment-stream-data")
+        # streamed segment data can't be split up, so coalesced requests are incompatible
+        self.coalesce_size = 0 if self.stream_data else options.get("hls-segment-coalesce-size")
+        self.coalesced = []
+
+        if self.ignore_names:
+            self.ignore_names_re = self.create_ignore_names_re(self.ignore_names)
+
+    def put(self, sequence):
+        if self.closed:
+            return
+
+        if sequence is None:
+            self.flush()
+            SegmentedStreamWriter.put(self, sequence)
+            return
+
+        map_future = None
+        # queue the segment's initialization section first if it has changed or if a discontinuity starts
+        if sequence.segment.map is not None:
+            map_ = sequence.segment.map
+            map_cached = self.map_cache.get(map_)
+            # try again with this segment if fetching the map has failed
+            if map_cached is not None and self.map_failed(map_cached):
+                del self.map_cache[map_]
+                map_cached = None
+                self.map_last = None
+            if map_ != self.map_last or sequence.segment.discontinuity:
+                self.map_last = map_
+                map_future = map_cached
+                if map_future is None:
+                    map_future = self.executor.submit(self.fetch_map, sequence, retries=self.retries)
+                    self.map_cache[map_] = map_future
+                    while len(self.map_cache) > self.MAP_CACHE_SIZE:
+                        self.map_cache.popitem(last=False)
+
+        coalesce = self.can_coalesce(sequence)
+        if map_future is not None or not coalesce:
+            self.flush()
+        if map_future is not None:
+            self.queue(self.futures, (sequence, map_future))
+
+        if coalesce:
+            self.coalesce(sequence)
+        else:
+            SegmentedStreamWriter.put(self, sequence)
+
+    @staticmethod
+    def map_failed(future):
+        return future.done() and (future.cancelled() or future.exception() is not None or future.result() is None)
+
+    def can_coalesce(self, sequence):
+        return bool(
+            self.coalesce_size
+            and sequence.segment.byterange
+            and not (self.ignore_names and self.ignore_names_re.search(sequence.segment.uri))
+        )
+
+    def coalesce(self, sequence):
+        """Adds a byterange segment to the pending coalesced request, or starts a new one if it's not adjacent."""
+        bytes_start, bytes_end = self.create_byterange(sequence)
+        if self.coalesced:
+            first_sequence, first_start, _ = self.coalesced[0]
+            _, _, last_end = self.coalesced[-1]
+            if (
+                first_sequence.segment.uri != sequence.segment.uri
+                or bytes_start != last_end + 1
+                or bytes_end + 1 - first_start > self.coalesce_size
+            ):
+                self.flush()
+
+        self.coalesced.append((sequence, bytes_start, bytes_end))
+
+    def flush(self):
+        """Submits the pending coalesced request and queues a future for each of its segments."""
+        if not self.coalesced:
+            return
+
+        coalesced, self.coalesced = self.coalesced, []
+        results = [futures.Future() for _ in coalesced]
+        self.executor.submit(self.fetch_coalesced, coalesced, results)
+        for (sequence, _, _), future in zip(coalesced, results):
+            self.queue(self.futures, (sequence, future))
+            self.trace("segment.queued", sequence)
+
+    def fetch_coalesced(self, coalesced, results):
+        first_sequence, bytes_start, _ = coalesced[0]
+        last_sequence, _, bytes_end = coalesced[-1]
+        request_params = dict(self.reader.request_params)
+        headers = dict(request_params.pop("headers", {}))
+        headers["Range"] = "bytes={0}-{1}".format(bytes_start, bytes_end)
+
+        try:
+            if self.closed:
+                raise StreamError("Writer has been closed")
+            log.debug("Fetching segments {0}-{1} with a single request", first_sequence.num, last_sequence.num)
+            res = self.session.http.get(first_sequence.segment.uri,
+                                        timeout=self.timeout,
+                                        exception=StreamError,
+                                        retries=self.retries,
+                                        on_retry=self.retry_callback(first_sequence),
+                                        headers=headers,
+                                        **request_params)
+            # the server may ignore the Range header and respond with the whole resource
+            offset = bytes_start if res.status_code == 206 else 0
+            content = res.content
+            if len(content) < bytes_end + 1 - offset:
+                raise StreamError("Incomplete response")
+        except (StreamError, ChunkedEncodingError, ContentDecodingError, ConnectionError) as err:
+            log.error("Failed to fetch segments {0}-{1}: {2}", first_sequence.num, last_sequence.num, err)
+            for future in results:
+                future.set_result(None)
+            return
+
+        for (sequence, start, end), future in zip(coalesced, results):
+            future.set_result(HLSSegmentData(content[start - offset:end + 1 - offset]))
+
+    def fetch_map(self, sequence, retries=None):
+        map_ = sequence.segment.map
+        try:
+            res = self.session.http.get(map_.uri,
+                                        timeout=self.timeout,
+                                        exception=StreamError,
+                                        retries=retries,
+                                        on_retry=self.retry_callback(sequence),
+                                        **self.create_map_request_params(map_))
+            return res.content
+        except (StreamError, ChunkedEncodingError, ContentDecodingError, ConnectionError) as err:
+            # the failed map gets fetched again with the next segment, see put()
+            log.error("Failed to fetch map of segment {0}: {1}", sequence.num, err)
+
     def fetch(self, sequence, retries=None):
         if self.closed or not retries:
             return
@@ -104,7 +288,7 @@ class HLSStreamWriter(SegmentedStreamWriter):
             request_params = self.create_request_params(sequence)
             # skip ignored segment names
             if self.ignore_names and self.ignore_names_re.search(sequence.segment.uri):
-                log.debug("Skipping segment {0}".format(sequence.num))
+                log.debug("Skipping segment {0}", sequence.num)
                 return
 
             return self.session.http.get(sequence.segment.uri,
@@ -112,12 +296,36 @@ class HLSStreamWriter(SegmentedStreamWriter):
                                          timeout=self.timeout,
                                          exception=StreamError,
                                          retries=self.retries,
+                                         on_retry=self.retry_callback(sequence),
                                          **request_params)
         except StreamError as err:
             log.error("Failed to open segment {0}: {1}", sequence.num, err)
             return
 
+    def write_map(self, sequence, data):
+        key = sequence.segment.map.key
+        if key and key.method != "NONE":
+            try:
+                decryptor = self.create_decryptor(key, sequence.num)
+                data = crypto.unpad(decryptor.decrypt(data), crypto.AES.block_size, style="pkcs7")
+            except (StreamError, ValueError) as err:
+                log.error("Error while decrypting map of segment {0}: {1}".format(sequence.num, err))
+                return
+
+        if self.reader.restream is not None:
+            self.reader.restream.set_map(data)
+        else:
+            self.reader.buffer.write(data)
+        log.debug("Writing map of segment {0}", sequence.num)
+
     def write(self, sequence, result, chunk_size=8192):
+        # initialization sections are fetched and cached as bytes, see put()
+        if isinstance(result, bytes):
+            return self.write_map(sequence, result)
+
+        if self.reader.restream is not None:
+            self.reader.restream.start_segment()
+
         if sequence.segment.key and sequence.segment.key.method != "NONE":
             try:
                 decryptor = self.create_decryptor(sequence.segment.key,
@@ -134,7 +342,7 @@ class HLSStreamWriter(SegmentedStreamWriter):
                 # we defer the buffer writes by one read call and apply the unpad call only to the last read call.
                 encrypted_chunk = result.content
                 decrypted_chunk = decryptor.decrypt(encrypted_chunk)
-                chunk = unpad(decrypted_chunk, AES.block_size, style="pkcs7")
+                chunk = crypto.unpad(decrypted_chunk, crypto.AES.block_size, style="pkcs7")
                 self.reader.buffer.write(chunk)
             except (ChunkedEncodingError, ContentDecodingError, ConnectionError) as err:
                 log.error("Download of segment {0} failed: {1}".format(sequence.num, err))
@@ -150,7 +358,18 @@ class HLSStreamWriter(SegmentedStreamWriter):
                 log.error("Download of segment {0} failed: {1}".format(sequence.num, err))
                 return
 
-        log.debug("Download of segment {0} complete".format(sequence.num))
+        if self.reader.restream is not None:
+            self.reader.restream.finish_segment(sequence.segment.duration, sequence.segment.discontinuity)
+
+        log.debug("Download of segment {0} complete", sequence.num)
+
+    def segment_id(self, sequence):
+        return sequence.num
+
+    def on_written(self, sequence, result, size):
+        # initialization sections are not segments of their own
+        if not isinstance(result, bytes):
+            SegmentedStreamWriter.on_written(self, sequence, result, size)
 
 
 class HLSStreamWorker(SegmentedStreamWorker):
@@ -180,8 +399,8 @@ class HLSStreamWorker(SegmentedStreamWorker):
 
         if self.playlist_end is None:
             if self.duration_offset_start > 0:
-                log.debug("Time offsets negative for live streams, skipping back {0} seconds".format(
-                          self.duration_offset_start))
+                log.debug("Time offsets negative for live streams, skipping back {0} seconds",
+                          self.duration_offset_start)
             # live playlist, force offset durations back to None
             self.duration_offset_start = -self.duration_offset_start
 
@@ -189,11 +408,11 @@ class HLSStreamWorker(SegmentedStreamWorker):
             self.playlist_sequence = self.duration_to_sequence(self.duration_offset_start, self.playlist_sequences)
 
         if self.playlist_sequences:
-            log.debug("First Sequence: {0}; Last Sequence: {1}".format(
-                      self.playlist_sequences[0].num, self.playlist_sequences[-1].num))
-            log.debug("Start offset: {0}; Duration: {1}; Start Sequence: {2}; End Sequence: {3}".format(
+            log.debug("First Sequence: {0}; Last Sequence: {1}",
+                      self.playlist_sequences[0].num, self.playlist_sequences[-1].num)
+            log.debug("Start offset: {0}; Duration: {1}; Start Sequence: {2}; End Sequence: {3}",
                       self.duration_offset_start, self.duration_limit,
-                      self.playlist_sequence, self.playlist_end))
+                      self.playlist_sequence, self.playlist_end)
 
     def _reload_playlist(self, *args, **kwargs):
         return load_hls_playlist(*args, **kwargs)
@@ -204,6 +423,7 @@ class HLSStreamWorker(SegmentedStreamWorker):
 
         self.reader.buffer.wait_free()
         log.debug("Reloading playlist")
+        started = time()
         res = self.session.http.get(
             self.stream.url,
             exception=StreamError,
@@ -232,6 +452,20 @@ class HLSStreamWorker(SegmentedStreamWorker):
         if sequences:
             self.process_sequences(playlist, sequences)
 
+        if self.writer.metrics.enabled:
+            self.on_playlist_reload(playlist, sequences, time() - started)
+
+    def on_playlist_reload(self, playlist, sequences, duration):
+        """Records the reload latency and the live-edge lag. Only gets called if the metrics are enabled."""
+        metrics, labels = self.writer.metrics, self.reader.metrics_labels
+        metrics.histogram("streamlink_playlist_reload_seconds", labels).observe(duration)
+        metrics.emit("playlist.reload", labels, duration=duration, segments=len(sequences))
+        if self.playlist_end is None:
+            # the duration of the playlist's segments which have not been written to the buffer yet
+            written = self.writer.written_segment
+            lag = sum(s.segment.duration for s in sequences if written is None or s.num > written.num)
+            metrics.gauge("streamlink_live_edge_lag_seconds", labels).set(lag)
+
     def _playlist_reload_time(self, playlist, sequences):
         if self.playlist_reload_time_override == "segment" and sequences:
             return sequences[-1].segment.duration
@@ -291,7 +525,7 @@ class HLSStreamWorker(SegmentedStreamWorker):
         total_duration = 0
         while not self.closed:
             for sequence in filter(self.valid_sequence, self.playlist_sequences):
-                log.debug("Adding segment {0} to queue".format(sequence.num))
+                log.debug("Adding segment {0} to queue", sequence.num)
                 yield sequence
                 total_duration += sequence.segment.duration
                 if self.duration_limit and total_duration >= self.duration_limit:
@@ -305,6 +539,9 @@ class HLSStreamWorker(SegmentedStreamWorker):
 
                 self.playlist_sequence = sequence.num + 1
 
+            # don't hold back coalesced segments while waiting for the next playlist
+            self.writer.flush()
+
             if self.wait(self.playlist_reload_time):
                 try:
                     self.reload_playlist()
@@ -318,6 +555,8 @@ class HLSStreamReader(SegmentedStreamReader):
 
     def __init__(self, stream, *args, **kwargs):
         SegmentedStreamReader.__init__(self, stream, *args, **kwargs)
+        if stream.track:
+            self.metrics_labels["track"] = stream.track
         self.request_params = dict(stream.args)
 
         # These params are reserved for internal use
@@ -327,6 +566,80 @@ class HLSStreamReader(SegmentedStreamReader):
         self.request_params.pop("url", None)
 
 
+class HLSVODDownloader(HLSSegmentRequestMixin, VODDownloader):
+    """Downloads the segments of a finished HLS playlist concurrently into a file.
+
+    Each item of :attr:`segments` is a tuple of a sequence and either the segment's map, for writing
+    the initialization section in front of the segment, or ``None``, for writing the segment itself.
+    """
+
+    def __init__(self, reader, playlist, **kwargs):
+        options = reader.session.options
+        self.reader = reader
+        self.init_segment_requests(options)
+        self.decryptor_lock = Lock()
+
+        media_sequence = playlist.media_sequence or 0
+        sequences = [Sequence(media_sequence + i, s) for i, s in enumerate(playlist.segments)]
+
+        # byterange offsets depend on the previous segments, so the request params need to be created in order
+        self.request_params = {sequence.num: self.create_request_params(sequence) for sequence in sequences}
+        ignore_names = options.get("hls-segment-ignore-names")
+        if ignore_names:
+            ignore_names_re = self.create_ignore_names_re(ignore_names)
+            sequences = [s for s in sequences if not ignore_names_re.search(s.segment.uri)]
+
+        items = []
+        map_last = None
+        for sequence in sequences:
+            map_ = sequence.segment.map
+            if map_ is not None and (map_ != map_last or sequence.segment.discontinuity):
+                map_last = map_
+                items.append((sequence, map_))
+            items.append((sequence, None))
+
+        identifier = self.create_identifier(
+            urlparse(reader.stream.url).path,
+            *["{0} {1} {2}".format(urlparse(s.segment.uri).path, s.segment.duration, s.segment.byterange) if m is None
+              else "map {0} {1}".format(urlparse(m.uri).path, m.byterange)
+              for s, m in items]
+        )
+        super(HLSVODDownloader, self).__init__(reader.session, items, identifier, **kwargs)
+
+    def fetch(self, item):
+        sequence, map_ = item
+        if map_ is not None:
+            uri, request_params = map_.uri, self.create_map_request_params(map_)
+        else:
+            uri, request_params = sequence.segment.uri, self.request_params[sequence.num]
+
+        return self.session.http.get(uri,
+                                     stream=True,
+                                     timeout=self.timeout,
+                                     exception=StreamError,
+                                     **request_params)
+
+    @staticmethod
+    def get_key(item):
+        # initialization sections are only encrypted if a key was in effect at their EXT-X-MAP tag
+        sequence, map_ = item
+        return map_.key if map_ is not None else sequence.segment.key
+
+    def needs_processing(self, item):
+        key = self.get_key(item)
+        return bool(key and key.method != "NONE")
+
+    def process(self, item, data):
+        if not self.needs_processing(item):
+            return data
+
+        sequence, map_ = item
+        with self.decryptor_lock:
+            decryptor = self.create_decryptor(self.get_key(item), sequence.num)
+
+        return crypto.unpad(decryptor.decrypt(data), crypto.AES.block_size, style="pkcs7")
+
+
 class MuxedHLSStream(MuxedStream):
     __shortname__ = "hls-multi"
 
@@ -340,7 +653,10 @@ class MuxedHLSStream(MuxedStream):
                 tracks.append(audio)
         for i in range(1, len(tracks)):
             maps.append("{0}:a".format(i))
-        substreams = map(lambda url: HLSStream(session, url, force_restart=force_restart, **args), tracks)
+        # distinguishes the metrics of the substreams
+        names = ["video"] + (["audio"] if len(tracks) == 2 else ["audio{0}".format(i) for i in range(1, len(tracks))])
+        substreams = [HLSStream(session, url, force_restart=force_restart, track=name, **args)
+                      for url, name in zip(tracks, names)]
         ffmpeg_options = ffmpeg_options or {}
 
         super(MuxedHLSStream, self).__init__(session, *substreams, format="mpegts", maps=maps, **ffmpeg_options)
@@ -352,6 +668,46 @@ class MuxedHLSStream(MuxedStream):
 
         return self.url_master
 
+    def open(self):
+        if self.session.options.get("hls-muxer") == "ts":
+            if self.can_remux(self.session):
+                fds = []
+                try:
+                    for substream in self.substreams:
+                        fds.append(substream.open())
+                except Exception:
+                    for fd in fds:
+                        fd.close()
+                    raise
+
+                try:
+                    return TSMuxer(self.session, *fds).open()
+                except StreamError as err:
+                    # the data which has been read already can't be passed to FFmpeg, so reopen the substreams
+                    for fd in fds:
+                        fd.close()
+                    # is_usable() doesn't require FFmpeg for the TS muxer
+                    if not FFMPEGMuxer.is_usable(self.session):
+                        raise StreamError("{0}, and FFmpeg, which is required for muxing other formats, "
+                                          "could not be found".format(err))
+                    log.debug("{0}, falling back to FFmpeg", err)
+            else:
+                log.debug("FFmpeg output or transcode options are set, falling back to FFmpeg")
+
+        return super(MuxedHLSStream, self).open()
+
+    @staticmethod
+    def can_remux(session):
+        return (
+            session.options.get("ffmpeg-fout") in (None, "mpegts")
+            and not session.options.get("ffmpeg-video-transcode")
+            and not session.options.get("ffmpeg-audio-transcode")
+        )
+
+    @classmethod
+    def is_usable(cls, session):
+        return session.options.get("hls-muxer") == "ts" and cls.can_remux(session) or FFMPEGMuxer.is_usable(session)
+
 
 class HLSStream(HTTPStream):
     """Implementation of the Apple HTTP Live Streaming protocol
@@ -367,12 +723,14 @@ class HLSStream(HTTPStream):
     __shortname__ = "hls"
     __reader__ = HLSStreamReader
 
-    def __init__(self, session_, url, url_master=None, force_restart=False, start_offset=0, duration=None, **args):
+    def __init__(self, session_, url, url_master=None, force_restart=False, start_offset=0, duration=None, track=None,
+                 **args):
         super(HLSStream, self).__init__(session_, url, **args)
         self.url_master = url_master
         self.force_restart = force_restart
         self.start_offset = start_offset
         self.duration = duration
+        self.track = track
 
     def __json__(self):
         json = HTTPStream.__json__(self)
@@ -401,6 +759,42 @@ class HLSStream(HTTPStream):
 
         return reader
 
+    def open_restream(self, window):
+        reader = self.__reader__(self, restream=window)
+        reader.open()
+
+        return reader
+
+    def to_vod_downloader(self, **kwargs):
+        # type: () -> HLSVODDownloader
+        """Returns a :class:`HLSVODDownloader` of the playlist, or ``None`` if the playlist has not ended yet."""
+        if self.__reader__ is not HLSStreamReader:
+            # custom readers can't be replaced by the downloader, and the playlist is not a file of HTTPStream
+            return Stream.to_vod_downloader(self, **kwargs)
+
+        options = self.session.options
+        if self.start_offset or self.duration or options.get("hls-start-offset") or options.get("hls-duration"):
+            log.debug("Time offsets and durations are not supported when downloading VODs in parallel")
+            return None
+
+        reader = self.__reader__(self)
+        res = self.session.http.get(
+            self.url,
+            exception=StreamError,
+            retries=options.get("hls-playlist-reload-attempts"),
+            **reader.request_params
+        )
+        res.encoding = "utf-8"
+        try:
+            playlist = load_hls_playlist(res)
+        except ValueError as err:
+            raise StreamError(err)
+
+        if playlist.is_master or playlist.iframes_only or not playlist.is_endlist:
+            return None
+
+        return HLSVODDownloader(reader, playlist, **kwargs)
+
     @classmethod
     def _get_variant_playlist(cls, *args, **kwargs):
         return load_hls_playlist(*args, **kwargs)
@@ -514,7 +908,7 @@ class HLSStream(HTTPStream):
 
             external_audio = preferred_audio or default_audio or fallback_audio
 
-            if external_audio and FFMPEGMuxer.is_usable(session_):
+            if external_audio and MuxedHLSStream.is_usable(session_):
                 external_audio_msg = u", ".join([
                     u"(language={0}, name={1})".format(x.language, (x.name or "N/A"))
                     for x in external_audio
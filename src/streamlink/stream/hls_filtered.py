@@ -1,7 +1,7 @@
 import logging
 from threading import Event
 
-from streamlink.stream.hls import HLSStreamReader, HLSStreamWriter
+from streamlink.stream.hls import HLSSegmentData, HLSStreamReader, HLSStreamWriter
 
 log = logging.getLogger(__name__)
 
@@ -22,7 +22,9 @@ class FilteredHLSStreamWriter(HLSStreamWriter):
         else:
             # Read and discard any remaining HTTP response data in the response connection.
             # Unread data in the HTTPResponse connection blocks the connection from being released back to the pool.
-            result.raw.drain_conn()
+            # Initialization sections and coalesced segments have already been read completely.
+            if not isinstance(result, (bytes, HLSSegmentData)):
+                result.raw.drain_conn()
 
             # block reader thread if filtering out segments
             if self.reader.filter_event.is_set():
@@ -37,14 +39,20 @@ class FilteredHLSStreamReader(HLSStreamReader):
         self.filter_event.set()
 
     def read(self, size):
+        return self._read_filtered(super(FilteredHLSStreamReader, self).read, size, b"")
+
+    def readinto(self, b):
+        return self._read_filtered(super(FilteredHLSStreamReader, self).readinto, b, 0)
+
+    def _read_filtered(self, read, arg, empty):
         while True:
             try:
-                return super(FilteredHLSStreamReader, self).read(size)
+                return read(arg)
             except IOError:
                 # wait indefinitely until filtering ends
                 self.filter_event.wait()
                 if self.buffer.closed:
-                    return b""
+                    return empty
                 # if data is available, try reading again
                 if self.buffer.length > 0:
                     continue
@@ -6,10 +6,12 @@ from collections import namedtuple
 from datetime import timedelta
 from itertools import starmap
 
-from isodate import ISO8601Error, parse_datetime
 from requests import Response
 
 from streamlink.compat import str, urljoin, urlparse
+from streamlink.utils.lazy import lazy_module
+
+isodate = lazy_module("isodate")
 
 log = logging.getLogger(__name__)
 
@@ -28,7 +30,7 @@ DateRange = namedtuple("DateRange", "id classname start_date end_date duration p
 Key = namedtuple("Key", "method uri iv key_format key_format_versions")
 
 # EXT-X-MAP
-Map = namedtuple("Map", "uri byterange")
+Map = namedtuple("Map", "uri byterange key")
 
 # EXT-X-MEDIA
 Media = namedtuple("Media", "uri type group_id language name default autoselect forced characteristics")
@@ -163,8 +165,8 @@ class M3U8Parser(object):
     @staticmethod
     def parse_iso8601(value):
         try:
-            return None if value is None else parse_datetime(value)
-        except (ISO8601Error, ValueError):
+            return None if value is None else isodate.parse_datetime(value)
+        except (isodate.ISO8601Error, ValueError):
             return None
 
     @staticmethod
@@ -266,7 +268,8 @@ class M3U8Parser(object):
     def parse_tag_ext_x_map(self, value):  # version >= 5
         attr = self.parse_attributes(value)
         byterange = self.parse_byterange(attr.get("BYTERANGE", ""))
-        self.state["map"] = Map(self.uri(attr.get("URI")), byterange)
+        # the initialization section is encrypted with the key in effect at the EXT-X-MAP tag, if any
+        self.state["map"] = Map(self.uri(attr.get("URI")), byterange, self.state.get("key"))
 
     def parse_tag_ext_x_i_frame_stream_inf(self, value):
         attr = self.parse_attributes(value)
@@ -1,7 +1,134 @@
+import logging
+import re
+from collections import namedtuple
+
+from requests.exceptions import ChunkedEncodingError, ConnectionError, ContentDecodingError
+
+from streamlink.compat import urlparse
 from streamlink.exceptions import StreamError
+from streamlink.stream.segmented import SegmentedStreamReader, SegmentedStreamWorker, SegmentedStreamWriter
 from streamlink.stream.stream import Stream
+from streamlink.stream.vod import VODDownloader
 from streamlink.stream.wrappers import StreamIOIterWrapper, StreamIOThreadWrapper
 
+log = logging.getLogger(__name__)
+Range = namedtuple("Range", "num start end")
+
+
+def get_range_size(res):
+    """Returns the size of the response's content if the server supports byte range requests, otherwise ``None``."""
+    if res.status_code != 200 or res.headers.get("Accept-Ranges", "").lower() != "bytes":
+        return None
+    if res.headers.get("Content-Encoding", "identity") != "identity":
+        return None
+    try:
+        return int(res.headers["Content-Length"])
+    except (KeyError, ValueError):
+        return None
+
+
+def get_content_range_size(res):
+    """Returns the full size of the content from the response to a ``bytes=0-0`` range request, otherwise ``None``."""
+    if res.status_code != 206 or res.headers.get("Content-Encoding", "identity") != "identity":
+        return None
+    match = re.match(r"bytes 0-0/(\d+)$", res.headers.get("Content-Range", ""))
+    if not match:
+        return None
+
+    return int(match.group(1))
+
+
+def iter_ranges(size, range_size):
+    for num, start in enumerate(range(0, size, range_size)):
+        yield Range(num, start, min(start + range_size, size) - 1)
+
+
+class HTTPRangeStreamWriter(SegmentedStreamWriter):
+    def __init__(self, reader, *args, **kwargs):
+        kwargs.setdefault("threads", reader.connections)
+        # limit the number of downloaded but not yet written ranges
+        kwargs.setdefault("size", reader.connections * 2)
+        SegmentedStreamWriter.__init__(self, reader, *args, **kwargs)
+
+    def fetch(self, range_, retries=None):
+        """Downloads a byte range and resumes it from the current position if the connection drops."""
+        data = bytearray()
+        for attempt in range(1, retries + 1):
+            if self.closed:
+                return
+            start = range_.start + len(data)
+            try:
+                res = self.reader.stream.request_range(start, range_.end, timeout=self.timeout)
+                for chunk in res.iter_content(8192):
+                    if self.closed:
+                        return
+                    data += chunk
+                if len(data) == range_.end - range_.start + 1:
+                    return bytes(data)
+                raise IOError("Incomplete range")
+            except (StreamError, IOError, ChunkedEncodingError, ConnectionError, ContentDecodingError) as err:
+                log.error("Failed to fetch range {0}-{1} ({2}/{3}): {4}", start, range_.end, attempt, retries, err)
+
+        # the failure is handled by the writer thread once the preceding ranges have been written, see write()
+        return IOError("Failed to fetch range {0}-{1}".format(range_.start, range_.end))
+
+    def write(self, range_, data):
+        # a missing range can't be skipped, so stop the writer and let the reader fail once the buffer has been drained
+        if isinstance(data, IOError):
+            self.reader.error = data
+            self.close()
+            return
+
+        self.reader.buffer.write(data)
+        log.debug("Download of range {0}-{1} complete", range_.start, range_.end)
+
+
+class HTTPRangeStreamWorker(SegmentedStreamWorker):
+    def iter_segments(self):
+        for range_ in iter_ranges(self.reader.size, self.reader.range_size):
+            if self.closed:
+                return
+            yield range_
+
+
+class HTTPRangeStreamReader(SegmentedStreamReader):
+    """Reads a HTTP resource with multiple concurrent byte range requests, reassembled in order."""
+
+    __worker__ = HTTPRangeStreamWorker
+    __writer__ = HTTPRangeStreamWriter
+
+    def __init__(self, stream, size, connections, range_size, *args, **kwargs):
+        SegmentedStreamReader.__init__(self, stream, *args, **kwargs)
+        self.size = size
+        self.connections = connections
+        self.range_size = range_size
+        self.error = None
+
+    def read(self, size):
+        data = SegmentedStreamReader.read(self, size)
+        if not data and self.error:
+            raise self.error
+
+        return data
+
+    def readinto(self, b):
+        read = SegmentedStreamReader.readinto(self, b)
+        if not read and self.error:
+            raise self.error
+
+        return read
+
+
+class HTTPVODDownloader(VODDownloader):
+    """Downloads a HTTP resource with concurrent byte range requests into a file."""
+
+    def __init__(self, stream, size, identifier, range_size, **kwargs):
+        self.stream = stream
+        super(HTTPVODDownloader, self).__init__(stream.session, iter_ranges(size, range_size), identifier, **kwargs)
+
+    def fetch(self, range_):
+        return self.stream.request_range(range_.start, range_.end, timeout=self.timeout)
+
 
 class HTTPStream(Stream):
     """A HTTP stream using the requests library.
@@ -16,6 +143,8 @@ class HTTPStream(Stream):
 
     __shortname__ = "http"
 
+    range_size = 4 * 1024 * 1024
+
     def __init__(self, session_, url, buffered=True, **args):
         Stream.__init__(self, session_)
 
@@ -44,19 +173,77 @@ class HTTPStream(Stream):
 
         return self.session.http.prepare_new_request(**self.args).url
 
-    def open(self):
+    def request(self, **kwargs):
         reqargs = self.session.http.valid_request_args(**self.args)
         reqargs.setdefault("method", "GET")
-        timeout = self.session.options.get("stream-timeout")
-        res = self.session.http.request(
+        headers = dict(reqargs.pop("headers", None) or {})
+        headers.update(kwargs.pop("headers", {}))
+
+        return self.session.http.request(
             stream=True,
             exception=StreamError,
-            timeout=timeout,
-            **reqargs
+            headers=headers,
+            **dict(reqargs, **kwargs)
         )
 
+    def request_range(self, start, end, **kwargs):
+        """Requests the byte range from *start* to *end* (inclusive) of the stream."""
+        res = self.request(headers={"Range": "bytes={0}-{1}".format(start, end)}, **kwargs)
+        if res.status_code != 206:
+            res.close()
+            raise StreamError("Server didn't respond with partial content to a byte range request")
+
+        return res
+
+    def _range_size(self, size, connections):
+        if connections <= 1 or self.args.get("method", "GET").upper() != "GET":
+            return None
+
+        if size is None or size <= self.range_size:
+            return None
+
+        return size
+
+    def open(self):
+        timeout = self.session.options.get("stream-timeout")
+        connections = self.session.options.get("http-stream-connections")
+        res = self.request(timeout=timeout)
+
+        size = self._range_size(get_range_size(res), connections)
+        if size is not None:
+            log.debug("Downloading {0} bytes with {1} connections", size, connections)
+            res.close()
+            reader = HTTPRangeStreamReader(self, size, connections, self.range_size, timeout=timeout)
+            reader.open()
+
+            return reader
+
         fd = StreamIOIterWrapper(res.iter_content(8192))
         if self.buffered:
             fd = StreamIOThreadWrapper(self.session, fd, timeout=timeout)
 
         return fd
+
+    def to_vod_downloader(self, **kwargs):
+        # type: () -> HTTPVODDownloader
+        """Returns a :class:`HTTPVODDownloader` if the server supports byte range requests, otherwise ``None``."""
+        # probe the range support and the size of the content without requesting the whole content
+        res = self.request(headers={"Range": "bytes=0-0"}, timeout=self.session.options.get("stream-timeout"))
+        res.close()
+
+        size = self._range_size(
+            get_content_range_size(res),
+            kwargs.get("threads") or self.session.options.get("http-stream-connections")
+        )
+        if size is None:
+            return None
+
+        url = urlparse(res.url)
+        identifier = VODDownloader.create_identifier(
+            url.netloc + url.path,
+            str(size),
+            res.headers.get("ETag", ""),
+            res.headers.get("Last-Modified", ""),
+        )
+
+        return HTTPVODDownloader(self, size, identifier, self.range_size, **kwargs)
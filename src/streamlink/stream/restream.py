@@ -0,0 +1,195 @@
+import logging
+import math
+import os
+from collections import deque, namedtuple
+from threading import Lock
+
+log = logging.getLogger(__name__)
+RestreamSegment = namedtuple("RestreamSegment", "num name duration discontinuity map")
+
+
+class SegmentWindow(object):
+    """A rolling window of the most recent segments of a stream, which can be served as a live HLS media playlist.
+
+    In restream mode, the window replaces the ring buffer of a segmented stream reader. The stream writer writes
+    the data of each segment to the window, like it does to the ring buffer, but also marks the beginning and the
+    end of each segment, so that the window can keep complete segments instead of a continuous stream of bytes.
+    Segments get kept in memory, or in files of the given directory, until they fall out of the window.
+    """
+
+    def __init__(self, size=10, path=None):
+        self.size = size
+        self.path = path
+        self.segments = deque()
+        self.data = {}
+        self.lock = Lock()
+        self.pending = []
+        self.pending_discontinuity = False
+        self.sequence = 0
+        self.discontinuity_sequence = 0
+        self.map = None
+        self.map_data = None
+        self.map_num = 0
+        self.closed = False
+        self.ended = False
+
+        if self.path and not os.path.isdir(self.path):
+            os.makedirs(self.path)
+
+    # writer interface
+
+    def start_segment(self):
+        """Discards the data of an incomplete segment, e.g. after a failed download."""
+        self.pending = []
+
+    def write(self, data):
+        if not self.closed:
+            self.pending.append(data)
+
+    def wait_free(self, timeout=None):
+        # the window never blocks the writer, old segments get discarded instead
+        return True
+
+    def set_map(self, data):
+        """Sets the initialization section of the following segments."""
+        if data == self.map_data:
+            return
+
+        with self.lock:
+            if self.map and not any(segment.map == self.map for segment in self.segments):
+                self._remove(self.map)
+            self.map_num += 1
+            self.map = "init-{0}.mp4".format(self.map_num)
+            self.map_data = data
+            self._store(self.map, data)
+            if self.segments:
+                self.pending_discontinuity = True
+
+    def finish_map(self):
+        """Uses the data of the current segment as the initialization section of the following segments."""
+        data = b"".join(self.pending)
+        self.pending = []
+        if data:
+            self.set_map(data)
+
+    def finish_segment(self, duration, discontinuity=False):
+        """Adds the data of the current segment to the window."""
+        data = b"".join(self.pending)
+        self.pending = []
+        if not data or self.closed:
+            return
+
+        with self.lock:
+            num = self.sequence
+            self.sequence += 1
+            name = "{0}.{1}".format(num, "m4s" if self.map else "ts")
+            self._store(name, data)
+            self.segments.append(RestreamSegment(
+                num,
+                name,
+                duration,
+                (discontinuity or self.pending_discontinuity) and len(self.segments) > 0,
+                self.map,
+            ))
+            self.pending_discontinuity = False
+
+            while len(self.segments) > self.size:
+                segment = self.segments.popleft()
+                self._remove(segment.name)
+                if segment.discontinuity:
+                    self.discontinuity_sequence += 1
+                if segment.map and segment.map != self.segments[0].map:
+                    self._remove(segment.map)
+
+        log.debug("Added segment {0} to the restream window", num)
+
+    def close(self):
+        """Closes the window for the writer of the current stream. The window keeps serving its segments."""
+        self.closed = True
+
+    # server interface
+
+    def restart(self):
+        """Continues the window with a new stream after the previous one has been closed."""
+        with self.lock:
+            self.closed = False
+            self.ended = False
+            self.pending = []
+            self.pending_discontinuity = True
+
+    def end(self):
+        """Marks the end of the stream in the playlist."""
+        self.ended = True
+
+    def playlist(self):
+        with self.lock:
+            segments = list(self.segments)
+            discontinuity_sequence = self.discontinuity_sequence
+
+        duration = max([segment.duration or 0 for segment in segments] or [1])
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:{0}".format(7 if any(segment.map for segment in segments) else 3),
+            "#EXT-X-TARGETDURATION:{0}".format(int(math.ceil(duration))),
+            "#EXT-X-MEDIA-SEQUENCE:{0}".format(segments[0].num if segments else self.sequence),
+        ]
+        if discontinuity_sequence:
+            lines.append("#EXT-X-DISCONTINUITY-SEQUENCE:{0}".format(discontinuity_sequence))
+
+        current_map = None
+        for segment in segments:
+            if segment.discontinuity:
+                lines.append("#EXT-X-DISCONTINUITY")
+            if segment.map and segment.map != current_map:
+                lines.append("#EXT-X-MAP:URI=\"{0}\"".format(segment.map))
+                current_map = segment.map
+            lines.append("#EXTINF:{0:.3f},".format(segment.duration or 0))
+            lines.append(segment.name)
+
+        if self.ended:
+            lines.append("#EXT-X-ENDLIST")
+
+        return "\n".join(lines) + "\n"
+
+    def get(self, name):
+        """Returns the data of a segment or an initialization section of the window, or ``None``."""
+        with self.lock:
+            if name not in self.data:
+                return None
+            if self.path is None:
+                return self.data[name]
+            try:
+                with open(self.data[name], "rb") as fd:
+                    return fd.read()
+            except (IOError, OSError):
+                return None
+
+    def clear(self):
+        """Removes all segments of the window."""
+        with self.lock:
+            for name in list(self.data):
+                self._remove(name)
+            self.segments.clear()
+
+    # storage
+
+    def _store(self, name, data):
+        if self.path is None:
+            self.data[name] = data
+            return
+
+        filename = os.path.join(self.path, name)
+        with open(filename, "wb") as fd:
+            fd.write(data)
+        self.data[name] = filename
+
+    def _remove(self, name):
+        value = self.data.pop(name, None)
+        if self.path is not None and value is not None:
+            try:
+                os.unlink(value)
+            except OSError:
+                pass
+
+
+__all__ = ["SegmentWindow"]
@@ -1,17 +1,42 @@
 import logging
+from collections import deque
 from concurrent import futures
 from concurrent.futures.thread import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import count
 from sys import version_info
 from threading import Event, Thread, current_thread
+from time import time
 
 from streamlink.buffers import RingBuffer
 from streamlink.compat import queue
 from streamlink.stream.stream import StreamIO
+from streamlink.stream.tsinspect import TSInspector
 
 log = logging.getLogger(__name__)
 
 
 class CompatThreadPoolExecutor(ThreadPoolExecutor):
+    def __init__(self, max_workers=None, thread_name_prefix=""):
+        # ThreadPoolExecutor's thread_name_prefix argument requires Python 3.6 or futures 3.2,
+        # so the executor's threads rename themselves when they run their first task instead
+        ThreadPoolExecutor.__init__(self, max_workers=max_workers)
+        self._compat_thread_name_prefix = thread_name_prefix
+        self._compat_thread_counter = count()
+
+    def submit(self, fn, *args, **kwargs):
+        if not self._compat_thread_name_prefix:
+            return ThreadPoolExecutor.submit(self, fn, *args, **kwargs)
+
+        return ThreadPoolExecutor.submit(self, self._compat_run_named, fn, *args, **kwargs)
+
+    def _compat_run_named(self, fn, *args, **kwargs):
+        thread = current_thread()
+        if not thread.name.startswith(self._compat_thread_name_prefix):
+            thread.name = "{0}_{1}".format(self._compat_thread_name_prefix, next(self._compat_thread_counter))
+
+        return fn(*args, **kwargs)
+
     if version_info < (3, 9):
         def shutdown(self, wait=True, cancel_futures=False):
             with self._shutdown_lock:
@@ -116,8 +141,12 @@ class SegmentedStreamWriter(Thread):
         self.retries = retries
         self.timeout = timeout
         self.ignore_names = ignore_names
-        self.executor = CompatThreadPoolExecutor(max_workers=threads)
+        self.executor = CompatThreadPoolExecutor(max_workers=threads,
+                                                 thread_name_prefix="Thread-{0}-executor".format(self.__class__.__name__))
         self.futures = queue.Queue(size)
+        self.metrics = self.session.metrics
+        # the last segment which has been written to the buffer
+        self.written_segment = None
 
         Thread.__init__(self, name="Thread-{0}".format(self.__class__.__name__))
         self.daemon = True
@@ -137,7 +166,9 @@ class SegmentedStreamWriter(Thread):
             return
 
         if segment is not None:
-            future = self.executor.submit(self.fetch, segment,
+            self.trace("segment.queued", segment)
+            fetch = self.fetch_traced if self.metrics.enabled else self.fetch
+            future = self.executor.submit(fetch, segment,
                                           retries=self.retries)
         else:
             future = None
@@ -153,6 +184,29 @@ class SegmentedStreamWriter(Thread):
             except queue.Full:
                 continue
 
+    def segment_id(self, segment):
+        """Returns the identifier of a segment in the metrics events.
+
+        Should be overridden by the inheriting class.
+        """
+        return segment
+
+    def trace(self, name, segment, **data):
+        """Emits a metrics event of a segment, if the session's metrics are enabled."""
+        if self.metrics.enabled:
+            self.metrics.emit(name, self.reader.metrics_labels, segment=self.segment_id(segment), **data)
+
+    def retry_callback(self, segment):
+        """Returns the on_retry callback of the segment's HTTP requests, or None if the metrics are disabled."""
+        if not self.metrics.enabled:
+            return None
+
+        def on_retry(retries, err):
+            self.metrics.counter("streamlink_segment_retries_total", self.reader.metrics_labels).inc()
+            self.trace("segment.retry", segment, retries=retries, error=str(err))
+
+        return on_retry
+
     def fetch(self, segment):
         """Fetches a segment.
 
@@ -160,6 +214,30 @@ class SegmentedStreamWriter(Thread):
         """
         pass
 
+    def fetch_traced(self, segment, retries=None):
+        """Fetches a segment and records the timings of its request."""
+        labels = self.reader.metrics_labels
+        started = time()
+        self.trace("segment.request", segment, timestamp=started)
+        result = self.fetch(segment, retries=retries)
+        completed = time()
+
+        if result is None:
+            self.metrics.counter("streamlink_segment_failures_total", labels).inc()
+            self.trace("segment.failed", segment, timestamp=completed)
+            return result
+
+        # the time between sending the request and parsing the response headers
+        elapsed = getattr(result, "elapsed", None)
+        if isinstance(elapsed, timedelta):
+            first_byte = started + elapsed.total_seconds()
+            self.metrics.histogram("streamlink_segment_first_byte_seconds", labels).observe(first_byte - started)
+            self.trace("segment.first_byte", segment, timestamp=first_byte)
+        self.metrics.histogram("streamlink_segment_download_seconds", labels).observe(completed - started)
+        self.trace("segment.complete", segment, timestamp=completed, duration=completed - started)
+
+        return result
+
     def write(self, segment, result):
         """Writes a segment to the buffer.
 
@@ -167,6 +245,17 @@ class SegmentedStreamWriter(Thread):
         """
         pass
 
+    def on_written(self, segment, result, size):
+        """Records a segment which has been written to the buffer. Only gets called if the metrics are enabled."""
+        labels = self.reader.metrics_labels
+        self.metrics.counter("streamlink_segments_total", labels).inc()
+        if size is not None:
+            buffer = self.reader.buffer
+            self.metrics.counter("streamlink_segment_bytes_total", labels).inc(size)
+            self.metrics.gauge("streamlink_buffer_fill_bytes", labels).set(buffer.length)
+            self.reader.segment_ends.append((buffer.written, self.segment_id(segment)))
+        self.trace("segment.written", segment, size=size)
+
     def run(self):
         while not self.closed:
             try:
@@ -187,7 +276,14 @@ class SegmentedStreamWriter(Thread):
                     break
 
                 if result is not None:
-                    self.write(segment, result)
+                    if self.metrics.enabled:
+                        written = getattr(self.reader.buffer, "written", None)
+                        self.write(segment, result)
+                        size = self.reader.buffer.written - written if written is not None else None
+                        self.on_written(segment, result, size)
+                    else:
+                        self.write(segment, result)
+                    self.written_segment = segment
 
                 break
 
@@ -198,19 +294,34 @@ class SegmentedStreamReader(StreamIO):
     __worker__ = SegmentedStreamWorker
     __writer__ = SegmentedStreamWriter
 
-    def __init__(self, stream, timeout=None):
+    def __init__(self, stream, timeout=None, restream=None):
         StreamIO.__init__(self)
         self.session = stream.session
         self.stream = stream
+        # a SegmentWindow which replaces the ring buffer in restream mode
+        self.restream = restream
 
         if not timeout:
             timeout = self.session.options.get("stream-timeout")
 
         self.timeout = timeout
+        self.metrics = self.session.metrics
+        self.metrics_labels = {"stream": stream.shortname()}
+        # the buffer offsets at which the written segments end, see SegmentedStreamWriter.on_written()
+        self.segment_ends = deque()
 
     def open(self):
-        buffer_size = self.session.get_option("ringbuffer-size")
-        self.buffer = RingBuffer(buffer_size)
+        if self.restream is not None:
+            self.buffer = self.restream
+        else:
+            buffer_size = self.session.get_option("ringbuffer-size")
+            self.buffer = RingBuffer(buffer_size)
+            drop_null = self.session.get_option("stream-ts-drop-null")
+            repair = self.session.get_option("stream-ts-repair")
+            if self.session.get_option("stream-ts-inspect") or drop_null or repair:
+                self.buffer = TSInspector(self.buffer, drop_null=drop_null, repair=repair)
+        if self.metrics.enabled and self.restream is None:
+            self.metrics.gauge("streamlink_buffer_size_bytes", self.metrics_labels).set(self.buffer.buffer_size)
         self.writer = self.__writer__(self)
         self.worker = self.__worker__(self)
 
@@ -232,5 +343,26 @@ class SegmentedStreamReader(StreamIO):
         if not self.buffer:
             return b""
 
-        return self.buffer.read(size, block=self.writer.is_alive(),
+        data = self.buffer.read(size, block=self.writer.is_alive(),
                                 timeout=self.timeout)
+        if self.segment_ends:
+            self._check_consumed()
+
+        return data
+
+    def readinto(self, b):
+        if not self.buffer:
+            return 0
+
+        read = self.buffer.readinto(b, block=self.writer.is_alive(),
+                                    timeout=self.timeout)
+        if self.segment_ends:
+            self._check_consumed()
+
+        return read
+
+    def _check_consumed(self):
+        consumed = self.buffer.consumed
+        while self.segment_ends and self.segment_ends[0][0] <= consumed:
+            _, segment_id = self.segment_ends.popleft()
+            self.metrics.emit("segment.consumed", self.metrics_labels, segment=segment_id)
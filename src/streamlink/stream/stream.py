@@ -44,6 +44,24 @@ class Stream(object):
     def to_manifest_url(self):
         raise TypeError("<{0} [{1}]> cannot be translated to a manifest URL".format(self.__class__.__name__, self.shortname()))
 
+    def to_vod_downloader(self, **kwargs):
+        """
+        Returns a :class:`VODDownloader <streamlink.stream.vod.VODDownloader>`, which downloads
+        the stream concurrently into a file, or ``None`` if the stream is not a finished VOD.
+
+        Raises :exc:`TypeError` if the stream type doesn't support it.
+        """
+        raise TypeError("<{0} [{1}]> cannot be downloaded in parallel".format(self.__class__.__name__, self.shortname()))
+
+    def open_restream(self, window):
+        """
+        Opens the stream in restream mode, where the stream's segments get written to the
+        :class:`SegmentWindow <streamlink.stream.restream.SegmentWindow>` instead of the returned reader's buffer.
+
+        Raises :exc:`TypeError` if the stream type doesn't support it.
+        """
+        raise TypeError("<{0} [{1}]> cannot be restreamed".format(self.__class__.__name__, self.shortname()))
+
     def open(self):
         # type: () -> "StreamIO"
         """
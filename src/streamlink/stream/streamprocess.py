@@ -150,7 +150,7 @@ class StreamProcess(Stream):
             # kill after the timeout has expired and the process still hasn't ended
             if not process.poll():
                 try:
-                    log.debug("Process timeout expired ({0}s), killing process".format(timeout))
+                    log.debug("Process timeout expired ({0}s), killing process", timeout)
                     process.kill()
                 except Exception:
                     pass
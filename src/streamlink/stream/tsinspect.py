@@ -0,0 +1,309 @@
+import logging
+import struct
+
+from streamlink.compat import lru_cache
+from streamlink.stream.tsmux import NULL_PID, PACKET_SIZE, SYNC_BYTE, TIMESTAMP_WRAP
+from streamlink.utils.lazy import lazy_module
+
+# NumPy is optional, and it only gets imported by the first TSInspector
+numpy = lazy_module("numpy")
+
+log = logging.getLogger(__name__)
+
+# PCR jumps of more than one second (PCR base, 90kHz) are discontinuities, the PCR interval should be at most 100ms
+PCR_JUMP_THRESHOLD = 90000
+
+# the overhead of the NumPy calls only pays off for larger writes, smaller ones get iterated
+NUMPY_MIN_PACKETS = 128
+
+_pcr = struct.Struct(">IB")
+
+
+@lru_cache(maxsize=1)
+def numpy_available():
+    try:
+        return numpy.uint8 is not None
+    except ImportError:
+        return False
+
+
+class PIDStats(object):
+    def __init__(self):
+        self.packets = 0
+        self.continuity_errors = 0
+        self.pcr_discontinuities = 0
+
+
+class TSStats(object):
+    """Counters of a :class:`TSInspector`."""
+
+    def __init__(self):
+        self.packets = 0
+        self.bytes = 0
+        self.null_packets = 0
+        self.dropped_packets = 0
+        self.sync_losses = 0
+        self.skipped_bytes = 0
+        self.continuity_errors = 0
+        self.repaired_packets = 0
+        self.pcr_discontinuities = 0
+        self.pcr_bits = 0
+        self.pcr_time = 0
+        self.pids = {}
+
+    @property
+    def bitrate(self):
+        """The average bitrate in bits per second, measured between the PCRs of the stream, or ``None``."""
+        if not self.pcr_time:
+            return None
+
+        return self.pcr_bits * 90000 // self.pcr_time
+
+    def to_dict(self):
+        return dict(
+            packets=self.packets,
+            bytes=self.bytes,
+            null_packets=self.null_packets,
+            dropped_packets=self.dropped_packets,
+            sync_losses=self.sync_losses,
+            skipped_bytes=self.skipped_bytes,
+            continuity_errors=self.continuity_errors,
+            repaired_packets=self.repaired_packets,
+            pcr_discontinuities=self.pcr_discontinuities,
+            bitrate=self.bitrate,
+        )
+
+
+class TSInspector(object):
+    """Inspects the MPEG-TS packets written to a buffer and forwards them.
+
+    The inspector sits between a stream writer and its buffer and keeps track of the sync, the continuity counters
+    and the PCRs of the stream. Packets are scanned in bulk: with NumPy, all packets of a large write call get
+    inspected as a single array, otherwise the header bytes get sliced out with strides and get iterated.
+
+    Null packets can optionally be dropped. With ``repair``, unsynchronized bytes get dropped and the discontinuity
+    indicator gets set on packets with an adaptation field which follow a continuity counter gap.
+
+    Streams which don't start with transport stream packets are passed through unchanged.
+    All other attributes are delegated to the wrapped buffer.
+    """
+
+    def __init__(self, buffer, drop_null=False, repair=False, use_numpy=True):
+        self.buffer = buffer
+        self.drop_null = drop_null
+        self.repair = repair
+        self.use_numpy = use_numpy and numpy_available()
+        self.stats = TSStats()
+        self.is_ts = None
+        self.remainder = b""
+        self.continuity = {}
+        self.pcrs = {}
+
+    def __getattr__(self, name):
+        return getattr(self.buffer, name)
+
+    def write(self, data):
+        data = self.remainder + (data.tobytes() if isinstance(data, memoryview) else bytes(data))
+        self.remainder = b""
+
+        if self.is_ts is None:
+            if len(data) < PACKET_SIZE * 2:
+                self.remainder = data
+                return
+            self.is_ts = data[:1] == SYNC_BYTE and data[PACKET_SIZE:PACKET_SIZE + 1] == SYNC_BYTE
+            if not self.is_ts:
+                log.debug("Not an MPEG-TS stream, disabling the packet inspection")
+
+        if not self.is_ts:
+            self.buffer.write(data)
+            return
+
+        output = []
+        offset = 0
+        size = len(data)
+        while size - offset >= PACKET_SIZE:
+            if data[offset:offset + 1] != SYNC_BYTE:
+                index = self._resync(data, offset)
+                self.stats.sync_losses += 1
+                self.stats.skipped_bytes += index - offset
+                log.debug("Lost MPEG-TS sync, skipped {0} bytes", index - offset)
+                if not self.repair:
+                    output.append(data[offset:index])
+                offset = index
+                continue
+
+            packets = (size - offset) // PACKET_SIZE
+            syncs = data[offset:offset + packets * PACKET_SIZE:PACKET_SIZE]
+            packets -= len(syncs.lstrip(SYNC_BYTE))
+            end = offset + packets * PACKET_SIZE
+            if self.use_numpy and packets >= NUMPY_MIN_PACKETS:
+                output.append(self._inspect_numpy(data[offset:end], packets))
+            else:
+                output.append(self._inspect(data[offset:end], packets))
+            offset = end
+
+        self.remainder = data[offset:]
+        data = b"".join(output)
+        if data:
+            self.buffer.write(data)
+
+    @staticmethod
+    def _resync(data, offset):
+        # the next sync byte which is followed by another sync byte, or which is too close to the end for checking it
+        index = data.find(SYNC_BYTE, offset + 1)
+        while index >= 0:
+            if index + PACKET_SIZE >= len(data) or data[index + PACKET_SIZE:index + PACKET_SIZE + 1] == SYNC_BYTE:
+                return index
+            index = data.find(SYNC_BYTE, index + 1)
+
+        return max(len(data) - PACKET_SIZE + 1, offset + 1)
+
+    def _pid_stats(self, pid):
+        stats = self.stats.pids.get(pid)
+        if stats is None:
+            stats = self.stats.pids[pid] = PIDStats()
+
+        return stats
+
+    def _continuity_error(self, pid, index):
+        self.stats.continuity_errors += 1
+        self._pid_stats(pid).continuity_errors += 1
+        log.debug("Continuity counter error on PID {0} at packet {1}", pid, self.stats.packets + index)
+
+    def _pcr(self, pid, index, pcr, discontinuity):
+        position = self.stats.packets + index
+        last = self.pcrs.get(pid)
+        self.pcrs[pid] = pcr, position
+        if last is None:
+            return
+
+        delta = (pcr - last[0]) % TIMESTAMP_WRAP
+        if delta > PCR_JUMP_THRESHOLD:
+            if not discontinuity:
+                self.stats.pcr_discontinuities += 1
+                self._pid_stats(pid).pcr_discontinuities += 1
+                log.debug("PCR discontinuity on PID {0} at packet {1}", pid, position)
+        elif delta:
+            self.stats.pcr_bits += (position - last[1]) * PACKET_SIZE * 8
+            self.stats.pcr_time += delta
+
+    def _update_stats(self, packets, counts):
+        self.stats.packets += packets
+        self.stats.bytes += packets * PACKET_SIZE
+        self.stats.null_packets += counts.get(NULL_PID, 0)
+        for pid, count in counts.items():
+            self._pid_stats(pid).packets += count
+        if self.drop_null:
+            self.stats.dropped_packets += counts.get(NULL_PID, 0)
+
+    def _inspect(self, data, packets):
+        """Inspects the packets of the data by iterating the header bytes, which get sliced out with strides."""
+        pid_high = bytearray(data[1::PACKET_SIZE])
+        pid_low = bytearray(data[2::PACKET_SIZE])
+        flags = bytearray(data[3::PACKET_SIZE])
+        af_length = bytearray(data[4::PACKET_SIZE])
+        af_flags = bytearray(data[5::PACKET_SIZE])
+
+        counts = {}
+        errors = []
+        for index in range(packets):
+            pid = (pid_high[index] & 0x1F) << 8 | pid_low[index]
+            counts[pid] = counts.get(pid, 0) + 1
+            if pid == NULL_PID:
+                continue
+
+            flag = flags[index]
+            has_af = flag & 0x20 and af_length[index] > 0
+            discontinuity = has_af and af_flags[index] & 0x80
+            if flag & 0x10:
+                cc = flag & 0x0F
+                last = self.continuity.get(pid)
+                self.continuity[pid] = cc
+                if last is not None and ((cc - last) & 0x0F) > 1 and not discontinuity:
+                    errors.append(index)
+                    self._continuity_error(pid, index)
+            if has_af and af_flags[index] & 0x10:
+                base, low = _pcr.unpack_from(data, index * PACKET_SIZE + 6)
+                self._pcr(pid, index, base << 1 | low >> 7, discontinuity)
+
+        repair = self.repair and [index for index in errors if flags[index] & 0x20 and af_length[index] > 0]
+        if repair:
+            data = bytearray(data)
+            for index in repair:
+                data[index * PACKET_SIZE + 5] |= 0x80
+            data = bytes(data)
+            self.stats.repaired_packets += len(repair)
+
+        self._update_stats(packets, counts)
+        if self.drop_null and NULL_PID in counts:
+            data = b"".join(
+                data[index * PACKET_SIZE:(index + 1) * PACKET_SIZE]
+                for index in range(packets)
+                if (pid_high[index] & 0x1F) << 8 | pid_low[index] != NULL_PID
+            )
+
+        return data
+
+    def _inspect_numpy(self, data, packets):
+        """Inspects all packets of the data at once as a two-dimensional NumPy array."""
+        array = numpy.frombuffer(data, dtype=numpy.uint8, count=packets * PACKET_SIZE).reshape(packets, PACKET_SIZE)
+        pids = (array[:, 1].astype(numpy.uint16) & 0x1F) << 8 | array[:, 2]
+        flags = array[:, 3]
+        has_af = ((flags & 0x20) != 0) & (array[:, 4] > 0)
+        discontinuity = has_af & ((array[:, 5] & 0x80) != 0)
+        has_payload = (flags & 0x10) != 0
+
+        unique, unique_counts = numpy.unique(pids, return_counts=True)
+        counts = dict(zip(unique.tolist(), unique_counts.tolist()))
+        errors = []
+        for pid in counts:
+            if pid == NULL_PID:
+                continue
+            indexes = numpy.flatnonzero((pids == pid) & has_payload)
+            if not len(indexes):
+                continue
+            ccs = (flags[indexes] & 0x0F).astype(numpy.int8)
+            last = self.continuity.get(pid)
+            self.continuity[pid] = int(ccs[-1])
+            if last is not None:
+                ccs = numpy.concatenate(([last], ccs))
+            gaps = (((ccs[1:] - ccs[:-1]) & 0x0F) > 1) & ~discontinuity[indexes[len(indexes) - len(ccs) + 1:]]
+            for index in indexes[len(indexes) - len(ccs) + 1:][gaps].tolist():
+                errors.append(index)
+                self._continuity_error(pid, index)
+
+        for index in numpy.flatnonzero(has_af & ((array[:, 5] & 0x10) != 0)).tolist():
+            base, low = _pcr.unpack_from(data, index * PACKET_SIZE + 6)
+            self._pcr(int(pids[index]), index, base << 1 | low >> 7, bool(discontinuity[index]))
+
+        repair = self.repair and [index for index in errors if has_af[index]]
+        if repair:
+            array = array.copy()
+            array[repair, 5] |= 0x80
+            self.stats.repaired_packets += len(repair)
+
+        self._update_stats(packets, counts)
+        if self.drop_null and NULL_PID in counts:
+            array = array[pids != NULL_PID]
+
+        return array.tobytes() if repair or self.drop_null and NULL_PID in counts else data
+
+    def close(self):
+        if self.buffer.closed:
+            return
+
+        if self.remainder:
+            if self.is_ts:
+                self.stats.skipped_bytes += len(self.remainder)
+            if not self.repair or not self.is_ts:
+                self.buffer.write(self.remainder)
+            self.remainder = b""
+
+        if self.is_ts and self.stats.packets:
+            log.debug("MPEG-TS stats: {0}".format(", ".join(
+                "{0}={1}".format(key, value) for key, value in sorted(self.stats.to_dict().items())
+            )))
+        self.buffer.close()
+
+
+__all__ = ["TSInspector", "TSStats"]
@@ -0,0 +1,525 @@
+import logging
+import struct
+from collections import namedtuple
+
+from streamlink.buffers import Buffer
+from streamlink.exceptions import StreamError
+from streamlink.stream.stream import StreamIO
+
+log = logging.getLogger(__name__)
+
+PACKET_SIZE = 188
+SYNC_BYTE = b"\x47"
+READ_SIZE = PACKET_SIZE * 256
+
+PAT_PID = 0x0000
+NULL_PID = 0x1FFF
+# the PMT PID and the first elementary stream PID of the output, which are also FFmpeg's defaults
+PMT_PID = 0x1000
+FIRST_PID = 0x0100
+PROGRAM_NUMBER = 1
+
+PAT_TABLE_ID = 0x00
+PMT_TABLE_ID = 0x02
+
+VIDEO_STREAM_TYPES = (0x01, 0x02, 0x10, 0x1B, 0x24, 0x42, 0xD1, 0xDB, 0xEA)
+AUDIO_STREAM_TYPES = (0x03, 0x04, 0x0F, 0x11, 0x1C, 0x81, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87, 0x8A, 0xC1, 0xC2, 0xCF)
+# private PES data streams are audio streams if they have an AC-3, DTS, E-AC-3 or AAC descriptor
+PRIVATE_STREAM_TYPE = 0x06
+AUDIO_DESCRIPTOR_TAGS = (0x6A, 0x73, 0x7A, 0x7B, 0x7C)
+
+TIMESTAMP_WRAP = 1 << 33
+# timestamp jumps of more than ten seconds (90kHz clock) are discontinuities and not gaps in the stream
+DISCONTINUITY_THRESHOLD = 10 * 90000
+
+ElementaryStream = namedtuple("ElementaryStream", "stream_type pid descriptors")
+
+_header = struct.Struct(">BHB")
+_uint8 = struct.Struct(">B")
+_uint16 = struct.Struct(">H")
+_uint32 = struct.Struct(">I")
+_timestamp = struct.Struct(">BHH")
+
+
+def _crc32_table():
+    table = []
+    for i in range(256):
+        crc = i << 24
+        for _ in range(8):
+            crc = (crc << 1) ^ 0x04C11DB7 if crc & 0x80000000 else crc << 1
+        table.append(crc & 0xFFFFFFFF)
+
+    return table
+
+
+CRC32_TABLE = _crc32_table()
+
+
+def crc32(data):
+    """The CRC-32/MPEG-2 checksum of PSI sections. Complete sections including their CRC field yield zero."""
+    crc = 0xFFFFFFFF
+    for byte in bytearray(data):
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ CRC32_TABLE[(crc >> 24) ^ byte]
+
+    return crc
+
+
+def parse_pat(section):
+    """Returns the PMT PIDs of a program association section by program number."""
+    programs = {}
+    for offset in range(8, len(section) - 4, 4):
+        program_number, pid = struct.unpack_from(">HH", section, offset)
+        if program_number != 0:
+            programs[program_number] = pid & 0x1FFF
+
+    return programs
+
+
+def parse_pmt(section):
+    """Returns the PCR PID and the elementary streams of a program map section."""
+    pcr_pid, program_info_length = struct.unpack_from(">HH", section, 8)
+    offset = 12 + (program_info_length & 0x0FFF)
+    end = len(section) - 4
+    streams = []
+    while offset + 5 <= end:
+        stream_type, pid, es_info_length = struct.unpack_from(">BHH", section, offset)
+        es_info_length &= 0x0FFF
+        descriptors = section[offset + 5:offset + 5 + es_info_length]
+        streams.append(ElementaryStream(stream_type, pid & 0x1FFF, bytes(descriptors)))
+        offset += 5 + es_info_length
+
+    return pcr_pid & 0x1FFF, streams
+
+
+def descriptor_tags(descriptors):
+    tags = []
+    offset = 0
+    while offset + 2 <= len(descriptors):
+        tag, length = struct.unpack_from(">BB", descriptors, offset)
+        tags.append(tag)
+        offset += 2 + length
+
+    return tags
+
+
+def is_video(stream):
+    return stream.stream_type in VIDEO_STREAM_TYPES
+
+
+def is_audio(stream):
+    if stream.stream_type == PRIVATE_STREAM_TYPE:
+        return any(tag in AUDIO_DESCRIPTOR_TAGS for tag in descriptor_tags(stream.descriptors))
+
+    return stream.stream_type in AUDIO_STREAM_TYPES
+
+
+def build_section(table_id, table_id_extension, version, payload):
+    section_length = 5 + len(payload) + 4
+    section = struct.pack(
+        ">BHHBBB",
+        table_id,
+        0xB000 | section_length,
+        table_id_extension,
+        0xC1 | (version & 0x1F) << 1,
+        0,
+        0,
+    ) + payload
+
+    return section + _uint32.pack(crc32(section))
+
+
+def build_pat(pmt_pid, version=0):
+    return build_section(PAT_TABLE_ID, 1, version, struct.pack(">HH", PROGRAM_NUMBER, 0xE000 | pmt_pid))
+
+
+def build_pmt(pcr_pid, streams, version=0):
+    payload = [struct.pack(">HH", 0xE000 | pcr_pid, 0xF000)]
+    for stream in streams:
+        payload.append(struct.pack(">BHH", stream.stream_type, 0xE000 | stream.pid, 0xF000 | len(stream.descriptors)))
+        payload.append(stream.descriptors)
+
+    return build_section(PMT_TABLE_ID, PROGRAM_NUMBER, version, b"".join(payload))
+
+
+def packetize_section(pid, section, continuity_counter=0):
+    """Splits a PSI section into transport stream packets and returns the packets and the next continuity counter."""
+    data = b"\x00" + section
+    packets = []
+    for offset in range(0, len(data), PACKET_SIZE - 4):
+        payload = data[offset:offset + PACKET_SIZE - 4]
+        header = struct.pack(
+            ">BHB",
+            0x47,
+            (0x4000 if offset == 0 else 0) | pid,
+            0x10 | continuity_counter,
+        )
+        packets.append(header + payload + b"\xff" * (PACKET_SIZE - 4 - len(payload)))
+        continuity_counter = (continuity_counter + 1) & 0x0F
+
+    return b"".join(packets), continuity_counter
+
+
+def parse_timestamp(packet, offset):
+    """Returns the decode timestamp, or the presentation timestamp, of a PES header at the given packet offset."""
+    if offset + 14 > PACKET_SIZE or packet[offset:offset + 3] != b"\x00\x00\x01":
+        return None
+
+    flags = _uint8.unpack_from(packet, offset + 7)[0] >> 6
+    if flags == 3:
+        offset += 14
+    elif flags == 2:
+        offset += 9
+    else:
+        return None
+
+    if offset + _timestamp.size > PACKET_SIZE:
+        return None
+    high, middle, low = _timestamp.unpack_from(packet, offset)
+
+    return ((high >> 1) & 0x07) << 30 | (middle >> 1) << 15 | low >> 1
+
+
+class TSInput(object):
+    """Reads the transport stream packets of a single MPEG-TS input stream.
+
+    The packets of the selected elementary streams get grouped into units, each starting with a PES packet
+    which has a timestamp. Timestamps are converted to a continuous clock, which doesn't wrap around and which
+    doesn't jump on discontinuities, so that the units of all inputs can be interleaved by their time.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.data = b""
+        self.offset = 0
+        self.eof = False
+        self.sections = {}
+        self.pmt_pid = None
+        self.pmt = None
+        self.pmt_changed = False
+        self.tables = False
+        self.pids = {}
+        self.unit = None
+        self.unit_pids = {}
+        self.time = None
+        self.next = None
+        self.pushback = None
+        self.last_timestamp = None
+        self.clock = 0
+        self.skipped = 0
+
+    def _fill(self, size):
+        chunks = [self.data[self.offset:]]
+        length = len(chunks[0])
+        while length < size:
+            data = self.stream.read(READ_SIZE)
+            if not data:
+                break
+            chunks.append(data)
+            length += len(data)
+        self.data = b"".join(chunks)
+        self.offset = 0
+
+        return length >= size
+
+    def probe(self):
+        """Checks whether the input stream starts with transport stream packets."""
+        self._fill(PACKET_SIZE * 2)
+        data = self.data[:PACKET_SIZE * 2]
+
+        if not data:
+            return True
+
+        return data[:1] == SYNC_BYTE and (len(data) <= PACKET_SIZE or data[PACKET_SIZE:PACKET_SIZE + 1] == SYNC_BYTE)
+
+    def read_packet(self):
+        if self.pushback is not None:
+            packet, self.pushback = self.pushback, None
+            return packet
+
+        while True:
+            if self.offset + PACKET_SIZE > len(self.data) and not self._fill(PACKET_SIZE):
+                return None
+
+            if self.data[self.offset:self.offset + 1] == SYNC_BYTE:
+                packet = self.data[self.offset:self.offset + PACKET_SIZE]
+                self.offset += PACKET_SIZE
+                return packet
+
+            # lost sync, skip to the next sync byte
+            index = self.data.find(SYNC_BYTE, self.offset + 1)
+            if index < 0:
+                index = len(self.data)
+            self.skipped += index - self.offset
+            self.offset = index
+
+    def _read_section(self, pid, packet, pusi, payload_offset):
+        payload = packet[payload_offset:]
+        if pusi:
+            pointer = _uint8.unpack_from(payload)[0] if payload else 0
+            section = payload[1 + pointer:]
+        elif pid in self.sections:
+            section = self.sections[pid] + payload
+        else:
+            return None
+
+        if len(section) < 3:
+            self.sections[pid] = section
+            return None
+        length = 3 + (_uint16.unpack_from(section, 1)[0] & 0x0FFF)
+        if len(section) < length:
+            self.sections[pid] = section
+            return None
+
+        self.sections.pop(pid, None)
+        section = section[:length]
+        if crc32(section) != 0:
+            log.debug("Invalid PSI section CRC on PID {0}", pid)
+            return None
+
+        return section
+
+    def _read_table(self, pid, packet, pusi, payload_offset):
+        section = self._read_section(pid, packet, pusi, payload_offset)
+        if section is None:
+            return
+
+        table_id = _uint8.unpack_from(section)[0]
+        if pid == PAT_PID and table_id == PAT_TABLE_ID:
+            programs = parse_pat(section)
+            if programs:
+                self.pmt_pid = programs[min(programs)]
+            self.tables = True
+        elif pid == self.pmt_pid and table_id == PMT_TABLE_ID:
+            pmt = parse_pmt(section)
+            if pmt != self.pmt:
+                self.pmt_changed = self.pmt is not None
+                self.pmt = pmt
+
+    def _update_clock(self, timestamp):
+        if self.last_timestamp is not None:
+            delta = (timestamp - self.last_timestamp) % TIMESTAMP_WRAP
+            if delta >= TIMESTAMP_WRAP // 2:
+                delta -= TIMESTAMP_WRAP
+            if abs(delta) <= DISCONTINUITY_THRESHOLD:
+                self.clock += delta
+        else:
+            self.clock = timestamp
+        self.last_timestamp = timestamp
+
+        return self.clock
+
+    def read_pmt(self):
+        """Reads packets until the program map table is known and discards them."""
+        while self.pmt is None:
+            packet = self.read_packet()
+            if packet is None:
+                raise IOError("MPEG-TS stream ended before the program map table")
+            _, pid_field, flags = _header.unpack_from(packet)
+            pid = pid_field & 0x1FFF
+            if pid == PAT_PID or pid == self.pmt_pid:
+                self._read_table(pid, packet, pid_field & 0x4000, self._payload_offset(packet, flags))
+        self.tables = False
+
+    @staticmethod
+    def _payload_offset(packet, flags):
+        if not flags & 0x10:
+            return PACKET_SIZE
+        if flags & 0x20:
+            return 5 + _uint8.unpack_from(packet, 4)[0]
+        return 4
+
+    def read_unit(self):
+        """Reads the packets of the selected PIDs up to the next timestamped PES packet or up to the next tables."""
+        if self.next is not None:
+            unit, time = [self.next[0]], self.next[1]
+            self.next = None
+        else:
+            unit, time = [], None
+
+        while True:
+            packet = self.read_packet()
+            if packet is None:
+                self.eof = True
+                break
+
+            _, pid_field, flags = _header.unpack_from(packet)
+            pid = pid_field & 0x1FFF
+            if pid == PAT_PID or pid == self.pmt_pid:
+                self._read_table(pid, packet, pid_field & 0x4000, self._payload_offset(packet, flags))
+                continue
+            if self.tables or self.pmt_changed:
+                # the muxer needs to handle the tables first, the packet gets read again by the next unit
+                self.pushback = packet
+                break
+            if pid not in self.pids:
+                continue
+
+            timestamp = None
+            if pid_field & 0x4000:
+                timestamp = parse_timestamp(packet, self._payload_offset(packet, flags))
+            if timestamp is not None:
+                clock = self._update_clock(timestamp)
+                if unit:
+                    self.next = packet, clock
+                    break
+                time = clock
+            unit.append(packet)
+
+        self.unit = unit if unit else None
+        self.unit_pids = self.pids
+        self.time = time
+
+        return self.unit
+
+
+class TSMuxer(StreamIO):
+    """Remuxes multiple MPEG-TS streams into a single MPEG-TS stream with one program.
+
+    The video and audio streams of the first input and the audio streams of all other inputs get selected, like
+    FFmpeg's ``0:v? 0:a? 1:a ...`` stream maps. Their PIDs get rewritten, the PAT and PMT get regenerated and get
+    repeated at the PAT positions of the first input, and the packets get interleaved by their PES timestamps.
+    Packet payloads are left untouched.
+    """
+
+    def __init__(self, session, *streams):
+        self.session = session
+        self.streams = streams
+        self.inputs = [TSInput(stream) for stream in streams]
+        self.buffer = Buffer()
+        self.output_pids = {}
+        self.next_pid = FIRST_PID
+        self.pcr_pid = NULL_PID
+        self.elementary_streams = []
+        self.version = 0
+        self.continuity_counters = {PAT_PID: 0, PMT_PID: 0}
+        self._header_written = False
+
+    def open(self):
+        for index, tsinput in enumerate(self.inputs):
+            if not tsinput.probe():
+                raise StreamError("Input stream {0} is not an MPEG-TS stream".format(index))
+
+        return self
+
+    def _output_pid(self, index, pid):
+        key = index, pid
+        if key not in self.output_pids:
+            self.output_pids[key] = self.next_pid
+            self.next_pid += 1
+
+        return self.output_pids[key]
+
+    def update_streams(self):
+        """Selects the elementary streams of all inputs and maps their PIDs to the PIDs of the output."""
+        elementary_streams = []
+        pcr_pid = NULL_PID
+        for index, tsinput in enumerate(self.inputs):
+            input_pcr_pid, streams = tsinput.pmt
+            pids = {}
+            for stream in streams:
+                if is_audio(stream) or index == 0 and is_video(stream):
+                    pids[stream.pid] = self._output_pid(index, stream.pid)
+                    elementary_streams.append(stream._replace(pid=pids[stream.pid]))
+            if index == 0 and input_pcr_pid != NULL_PID:
+                # keep the packets of the first input's PCR PID, even if it's not an elementary stream of the output
+                pids.setdefault(input_pcr_pid, self._output_pid(index, input_pcr_pid))
+                pcr_pid = pids[input_pcr_pid]
+            tsinput.pids = pids
+
+        if not elementary_streams:
+            raise IOError("No video or audio streams in the MPEG-TS input streams")
+        if pcr_pid == NULL_PID:
+            pcr_pid = elementary_streams[0].pid
+
+        self.elementary_streams = elementary_streams
+        self.pcr_pid = pcr_pid
+
+    def _write_tables(self):
+        for pid, section in (
+            (PAT_PID, build_pat(PMT_PID, self.version)),
+            (PMT_PID, build_pmt(self.pcr_pid, self.elementary_streams, self.version)),
+        ):
+            data, self.continuity_counters[pid] = packetize_section(pid, section, self.continuity_counters[pid])
+            self.buffer.write(data)
+
+    def _write_header(self):
+        for tsinput in self.inputs:
+            tsinput.read_pmt()
+        self.update_streams()
+        self._write_tables()
+        self._header_written = True
+
+    def _write_unit(self, tsinput):
+        data = bytearray(b"".join(tsinput.unit))
+        pids = tsinput.unit_pids
+        tsinput.unit = None
+        for offset in range(0, len(data), PACKET_SIZE):
+            pid = pids[(data[offset + 1] & 0x1F) << 8 | data[offset + 2]]
+            data[offset + 1] = data[offset + 1] & 0xE0 | pid >> 8
+            data[offset + 2] = pid & 0xFF
+        self.buffer.write(bytes(data))
+
+    def _next(self):
+        if not self._header_written:
+            self._write_header()
+            return True
+
+        pending = []
+        for tsinput in self.inputs:
+            if tsinput.unit is None and not tsinput.eof:
+                tsinput.read_unit()
+            if tsinput.unit is not None:
+                pending.append(tsinput)
+
+        if pending:
+            # units without a timestamp get written first
+            self._write_unit(min(pending, key=lambda i: (i.time is not None, i.time or 0)))
+
+        # tables of the inputs get handled once the units in front of them have been written
+        flushed = [tsinput for tsinput in self.inputs if tsinput.unit is None]
+        tables = self.inputs[0] in flushed and self.inputs[0].tables
+        if any(tsinput.pmt_changed for tsinput in flushed):
+            self.update_streams()
+            self.version = (self.version + 1) & 0x1F
+            tables = True
+        for tsinput in flushed:
+            tsinput.tables = tsinput.pmt_changed = False
+        if tables:
+            self._write_tables()
+
+        return bool(pending) or not all(tsinput.eof for tsinput in self.inputs)
+
+    def _fill(self):
+        try:
+            while not self.buffer.length and not self.closed:
+                if not self._next():
+                    break
+        except (ValueError, struct.error) as err:
+            raise IOError("Failed to parse MPEG-TS stream: {0}".format(err))
+
+    def read(self, size=-1):
+        self._fill()
+
+        return self.buffer.read(size)
+
+    def readinto(self, b):
+        self._fill()
+
+        return self.buffer.readinto(b)
+
+    def close(self):
+        if self.closed:
+            return
+
+        log.debug("Closing MPEG-TS muxer")
+        for tsinput in self.inputs:
+            if tsinput.skipped:
+                log.debug("Skipped {0} bytes of unsynchronized MPEG-TS data", tsinput.skipped)
+        for stream in self.streams:
+            if hasattr(stream, "close") and callable(stream.close):
+                stream.close()
+
+        super(TSMuxer, self).close()
+
+
+__all__ = ["TSMuxer"]
@@ -0,0 +1,328 @@
+import hashlib
+import json
+import logging
+import os
+from threading import Condition, Lock
+
+from requests.exceptions import ChunkedEncodingError, ConnectionError, ContentDecodingError
+
+from streamlink.exceptions import StreamError
+from streamlink.stream.segmented import CompatThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+
+class VODJournal(object):
+    """A small append-only journal of a VOD download, stored next to the output file.
+
+    The first line identifies the download, every other line records either the size of a segment,
+    once it's known, or the completion of a segment, once its data has been written to the output file.
+    Incomplete lines, e.g. after a crash, are ignored when loading the journal.
+    """
+
+    VERSION = 1
+    SUFFIX = ".streamlink-journal"
+
+    def __init__(self, path, identifier):
+        self.path = path + self.SUFFIX
+        self.identifier = identifier
+        self.sizes = {}
+        self.done = set()
+        self.fd = None
+        self.lock = Lock()
+
+    def load(self):
+        """Loads the journal and returns whether it belongs to the current download."""
+        try:
+            with open(self.path, "r") as fd:
+                lines = fd.read().splitlines()
+        except (IOError, OSError):
+            return False
+
+        entries = []
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+
+        if not entries or entries[0] != {"version": self.VERSION, "id": self.identifier}:
+            return False
+
+        for entry in entries[1:]:
+            num = entry.get("num")
+            if "size" in entry:
+                self.sizes[num] = entry["size"]
+            if entry.get("done"):
+                self.done.add(num)
+
+        return True
+
+    def open(self, resume):
+        self.fd = open(self.path, "a" if resume else "w")
+        if not resume:
+            self._write({"version": self.VERSION, "id": self.identifier})
+
+    def _write(self, entry):
+        with self.lock:
+            if self.fd is None:
+                return
+            self.fd.write(json.dumps(entry, sort_keys=True) + "\n")
+            self.fd.flush()
+
+    def set_size(self, num, size):
+        self._write({"num": num, "size": size})
+
+    def set_done(self, num):
+        self._write({"num": num, "done": True})
+
+    def close(self):
+        with self.lock:
+            if self.fd is not None:
+                self.fd.close()
+                self.fd = None
+
+    def remove(self):
+        self.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+class VODDownloader(object):
+    """Downloads the segments of a finished (VOD) stream concurrently into a file.
+
+    Segments get written to their final offset in the output file as soon as the sizes of all previous segments
+    are known, which is either when the response headers of the previous segments have been received, or when the
+    previous segments have been downloaded and processed completely, e.g. when they need to be decrypted first.
+    The progress is kept in a :class:`VODJournal`, so that interrupted downloads can be resumed.
+
+    Subclasses need to implement :meth:`fetch` and may implement :meth:`process`.
+    """
+
+    def __init__(self, session, segments, identifier, threads=None, retries=None, timeout=None, chunk_size=8192):
+        self.session = session
+        self.segments = list(segments)
+        self.identifier = identifier
+        self.threads = threads or session.options.get("stream-segment-threads")
+        self.retries = retries or session.options.get("stream-segment-attempts")
+        self.timeout = timeout or session.options.get("stream-segment-timeout")
+        self.chunk_size = chunk_size
+
+        self.closed = False
+        self.error = None
+        self.executor = None
+        self.fd = None
+        self.fd_lock = Lock()
+        self.journal = None
+        # the number of bytes which have been written to the file, but which haven't been reported by download() yet,
+        # and the finished downloads of segments which haven't been checked by download() yet
+        self.written = 0
+        self.finished = []
+        self.written_condition = Condition()
+
+        count = len(self.segments)
+        self.sizes = [None] * count
+        self.offsets = [None] * count
+        self.offsets_resolved = 0
+        self.offsets_condition = Condition()
+
+    @staticmethod
+    def create_identifier(*parts):
+        return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def fetch(self, segment):
+        """Returns a streamed response of the segment.
+
+        Should be overridden by the inheriting class.
+        """
+        raise NotImplementedError
+
+    def process(self, segment, data):
+        """Processes the complete data of a segment, e.g. decrypts it.
+
+        May be overridden by the inheriting class.
+        """
+        return data
+
+    def needs_processing(self, segment):
+        """Whether the segment data needs to be processed by :meth:`process` before being written.
+
+        May be overridden by the inheriting class.
+        """
+        return False
+
+    @staticmethod
+    def content_size(res):
+        # the content length of encoded responses doesn't match the size of the decoded data
+        if res.headers.get("Content-Encoding", "identity") != "identity":
+            return None
+        try:
+            return int(res.headers["Content-Length"])
+        except (KeyError, ValueError):
+            return None
+
+    def can_resume(self, path):
+        """Whether an interrupted download of this stream into the file at the given path can be resumed."""
+        return os.path.isfile(path) and VODJournal(path, self.identifier).load()
+
+    # offsets
+
+    def _set_size(self, num, size):
+        with self.offsets_condition:
+            if self.sizes[num] is not None:
+                if self.sizes[num] != size:
+                    raise StreamError("Size of segment {0} has changed".format(num))
+                return
+
+            self.sizes[num] = size
+            self.journal.set_size(num, size)
+            self._resolve_offsets()
+            self.offsets_condition.notify_all()
+
+    def _resolve_offsets(self):
+        count = len(self.segments)
+        while self.offsets_resolved < count:
+            num = self.offsets_resolved
+            if num == 0:
+                self.offsets[0] = 0
+            elif self.sizes[num - 1] is not None:
+                self.offsets[num] = self.offsets[num - 1] + self.sizes[num - 1]
+            else:
+                break
+            self.offsets_resolved += 1
+
+    def _get_offset(self, num):
+        with self.offsets_condition:
+            while self.offsets[num] is None:
+                if self.closed:
+                    raise StreamError("Download has been aborted")
+                self.offsets_condition.wait(0.5)
+
+            return self.offsets[num]
+
+    # output
+
+    def _write(self, data, offset):
+        if hasattr(os, "pwrite"):
+            os.pwrite(self.fd.fileno(), data, offset)
+        else:
+            with self.fd_lock:
+                self.fd.seek(offset)
+                self.fd.write(data)
+
+    # download
+
+    def _download(self, num):
+        segment = self.segments[num]
+        for attempt in range(1, self.retries + 1):
+            if self.closed:
+                return
+            try:
+                res = self.fetch(segment)
+                size = None if self.needs_processing(segment) else self.content_size(res)
+                if size is None:
+                    data = self.process(segment, res.content)
+                    size = len(data)
+                    chunks = [data]
+                else:
+                    chunks = res.iter_content(self.chunk_size)
+
+                self._set_size(num, size)
+                offset = written = self._get_offset(num)
+                for chunk in chunks:
+                    if self.closed:
+                        return
+                    self._write(chunk, written)
+                    written += len(chunk)
+                    with self.written_condition:
+                        self.written += len(chunk)
+                        self.written_condition.notify_all()
+
+                if written - offset != size:
+                    raise IOError("Segment {0} is incomplete".format(num))
+
+                self.journal.set_done(num)
+                log.debug("Download of segment {0} complete", num)
+                return
+            except (StreamError, IOError, ValueError, ChunkedEncodingError, ContentDecodingError, ConnectionError) as err:
+                if self.closed:
+                    return
+                log.error("Download of segment {0} failed ({1}/{2}): {3}", num, attempt, self.retries, err)
+
+        raise StreamError("Failed to download segment {0}".format(num))
+
+    def _finish(self, future):
+        with self.written_condition:
+            self.finished.append(future)
+            self.written_condition.notify_all()
+
+    def download(self, path):
+        """Downloads all segments into the file at the given path.
+
+        Yields the number of bytes which have been written to the file since the previous yield,
+        so that the progress can be reported without keeping the data. Raises :exc:`StreamError` on failure.
+        """
+        self.journal = VODJournal(path, self.identifier)
+        resume = self.can_resume(path) and self.journal.load()
+        if resume:
+            for num, size in self.journal.sizes.items():
+                if 0 <= num < len(self.segments):
+                    self.sizes[num] = size
+            self._resolve_offsets()
+            log.info("Resuming download, {0} of {1} segments are complete".format(len(self.journal.done), len(self.segments)))
+
+        head = os.path.dirname(path)
+        if head and not os.path.isdir(head):
+            os.makedirs(head)
+
+        self.fd = open(path, "r+b" if resume else "wb")
+        self.journal.open(resume)
+        self.executor = CompatThreadPoolExecutor(max_workers=self.threads,
+                                                 thread_name_prefix="Thread-{0}-executor".format(self.__class__.__name__))
+        pending = 0
+        for num in range(len(self.segments)):
+            if num not in self.journal.done:
+                self.executor.submit(self._download, num).add_done_callback(self._finish)
+                pending += 1
+
+        while True:
+            with self.written_condition:
+                if not self.written and not self.finished and pending:
+                    self.written_condition.wait(0.5)
+                written, self.written = self.written, 0
+                finished, self.finished = self.finished, []
+
+            if written:
+                yield written
+
+            for future in finished:
+                pending -= 1
+                err = None if future.cancelled() else future.exception()
+                if err is not None:
+                    self.close()
+                    raise err if isinstance(err, StreamError) else StreamError(err)
+
+            if not pending:
+                break
+
+        size = self.offsets[-1] + self.sizes[-1] if self.segments else 0
+        self.fd.truncate(size)
+        self.close()
+        self.journal.remove()
+
+    def close(self):
+        if self.closed:
+            return
+
+        self.closed = True
+        if self.executor:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+        if self.journal:
+            self.journal.close()
+        if self.fd:
+            self.fd.close()
+
+
+__all__ = ["VODDownloader", "VODJournal"]
@@ -1,7 +1,7 @@
 import io
 from threading import Thread
 
-from streamlink.buffers import Buffer, RingBuffer
+from streamlink.buffers import Buffer, ChunkSize, RingBuffer, readinto
 
 
 class StreamIOWrapper(io.IOBase):
@@ -13,6 +13,9 @@ class StreamIOWrapper(io.IOBase):
     def read(self, size=-1):
         return self.fd.read(size)
 
+    def readinto(self, b):
+        return readinto(self.fd, b)
+
     def close(self):
         if hasattr(self.fd, "close"):
             self.fd.close()
@@ -25,10 +28,7 @@ class StreamIOIterWrapper(io.IOBase):
         self.iterator = iterator
         self.buffer = Buffer()
 
-    def read(self, size=-1):
-        if size < 0:
-            size = self.buffer.length
-
+    def _fill(self, size):
         while self.buffer.length < size:
             try:
                 chunk = next(self.iterator)
@@ -36,8 +36,21 @@ class StreamIOIterWrapper(io.IOBase):
             except StopIteration:
                 break
 
+    def read(self, size=-1):
+        if size < 0:
+            size = self.buffer.length
+
+        self._fill(size)
+
         return self.buffer.read(size)
 
+    def readinto(self, b):
+        # like a raw read, return the available data instead of waiting for more
+        if not self.buffer.length:
+            self._fill(1)
+
+        return self.buffer.readinto(b)
+
     def close(self):
         pass
 
@@ -50,29 +63,35 @@ class StreamIOThreadWrapper(io.IOBase):
     """
 
     class Filler(Thread):
-        def __init__(self, fd, buffer):
-            Thread.__init__(self)
+        def __init__(self, fd, buffer, chunk_size=None):
+            Thread.__init__(self, name="Thread-{0}".format(self.__class__.__name__))
 
             self.error = None
             self.fd = fd
             self.buffer = buffer
+            self.chunk_size = chunk_size
             self.daemon = True
             self.running = False
 
         def run(self):
             self.running = True
 
+            # read into a single reusable buffer, the ring buffer copies the data
+            chunk_size = ChunkSize(self.chunk_size)
+            view = memoryview(bytearray(chunk_size.max_size))
+
             while self.running:
                 try:
-                    data = self.fd.read(8192)
+                    read = readinto(self.fd, view[:chunk_size.size])
                 except IOError as error:
                     self.error = error
                     break
 
-                if len(data) == 0:
+                if not read:
                     break
 
-                self.buffer.write(data)
+                self.buffer.write(view[:read])
+                chunk_size.update(read)
 
             self.stop()
 
@@ -91,7 +110,7 @@ class StreamIOThreadWrapper(io.IOBase):
         self.fd = fd
         self.timeout = timeout
 
-        self.filler = StreamIOThreadWrapper.Filler(self.fd, self.buffer)
+        self.filler = StreamIOThreadWrapper.Filler(self.fd, self.buffer, session.get_option("stream-chunk-size"))
         self.filler.start()
 
     def read(self, size=-1):
@@ -101,6 +120,13 @@ class StreamIOThreadWrapper(io.IOBase):
         return self.buffer.read(size, block=self.filler.is_alive(),
                                 timeout=self.timeout)
 
+    def readinto(self, b):
+        if self.filler.error and self.buffer.length == 0:
+            raise self.filler.error
+
+        return self.buffer.readinto(b, block=self.filler.is_alive(),
+                                    timeout=self.timeout)
+
     def close(self):
         self.filler.stop()
 
@@ -1,12 +1,25 @@
-from streamlink.utils.cache import LRUCache
-from streamlink.utils.data import search_dict
-from streamlink.utils.encoding import get_filesystem_encoding
-from streamlink.utils.module import load_module
-from streamlink.utils.named_pipe import NamedPipe
-from streamlink.utils.parse import parse_html, parse_json, parse_qsd, parse_xml
-from streamlink.utils.rtmp import escape_librtmp, rtmpparse
-from streamlink.utils.swf import swfdecompress
-from streamlink.utils.url import absolute_url, prepend_www, update_qsd, update_scheme, url_concat, url_equal
+from streamlink.utils.lazy import lazy_attributes
+
+lazy_attributes(__name__, {
+    "LRUCache": "streamlink.utils.cache",
+    "search_dict": "streamlink.utils.data",
+    "get_filesystem_encoding": "streamlink.utils.encoding",
+    "load_module": "streamlink.utils.module",
+    "NamedPipe": "streamlink.utils.named_pipe",
+    "parse_html": "streamlink.utils.parse",
+    "parse_json": "streamlink.utils.parse",
+    "parse_qsd": "streamlink.utils.parse",
+    "parse_xml": "streamlink.utils.parse",
+    "escape_librtmp": "streamlink.utils.rtmp",
+    "rtmpparse": "streamlink.utils.rtmp",
+    "swfdecompress": "streamlink.utils.swf",
+    "absolute_url": "streamlink.utils.url",
+    "prepend_www": "streamlink.utils.url",
+    "update_qsd": "streamlink.utils.url",
+    "update_scheme": "streamlink.utils.url",
+    "url_concat": "streamlink.utils.url",
+    "url_equal": "streamlink.utils.url",
+})
 
 
 __all__ = [
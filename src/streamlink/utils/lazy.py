@@ -0,0 +1,84 @@
+"""
+Deferred imports of heavy modules, so that importing Streamlink and starting its CLI stays fast.
+
+:func:`lazy_module` returns a proxy of a module which gets imported on its first attribute access,
+and :func:`lazy_attributes` defers the imports of a module's attributes via a module level ``__getattr__``
+function (PEP 562). Python versions which don't support module level ``__getattr__`` functions import
+these attributes immediately instead.
+
+Module level ``__getattr__`` functions are only called for attribute accesses on the module object,
+not for global name lookups inside the module itself, so lazy attributes must not be used by their own module.
+"""
+import sys
+from importlib import import_module
+
+_pep562 = sys.version_info >= (3, 7)
+
+
+class LazyModule(object):
+    """Proxy of a module which gets imported when one of its attributes gets accessed for the first time."""
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            module = self.__dict__["_module"] = import_module(self._name)
+
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr):
+        delattr(self._load(), attr)
+
+    def __repr__(self):
+        return "<LazyModule {0!r}>".format(self._name)
+
+
+def lazy_module(name):
+    """
+    Return a proxy of the module with the given name, which gets imported on its first attribute access.
+
+    :param name: the absolute name of the module
+    """
+    module = sys.modules.get(name)
+
+    return LazyModule(name) if module is None else module
+
+
+def lazy_attributes(module, attributes):
+    """
+    Defer the imports of a module's attributes until they get accessed for the first time.
+
+    :param module: the name of the module, usually ``__name__``
+    :param attributes: a mapping of attribute names to the absolute names of the modules which define them
+    """
+    mod = sys.modules[module]
+
+    if not _pep562:
+        for name, source in attributes.items():
+            setattr(mod, name, getattr(import_module(source), name))
+        return
+
+    def __getattr__(name):
+        try:
+            source = attributes[name]
+        except KeyError:
+            raise AttributeError("module {0!r} has no attribute {1!r}".format(module, name))
+        value = getattr(import_module(source), name)
+        setattr(mod, name, value)
+
+        return value
+
+    def __dir__():
+        return sorted(set(vars(mod)) | set(attributes))
+
+    mod.__getattr__ = __getattr__
+    mod.__dir__ = __dir__
@@ -1,7 +1,9 @@
 import abc
+import errno
 import logging
 import os
 import random
+import sys
 import tempfile
 import threading
 
@@ -9,6 +11,8 @@ from streamlink.compat import is_py3, is_win32
 
 if is_win32:
     from ctypes import windll, cast, c_ulong, c_void_p, byref
+else:
+    import fcntl
 
 
 log = logging.getLogger(__name__)
@@ -17,11 +21,35 @@ _lock = threading.Lock()
 _id = 0
 ABC = abc.ABCMeta('ABC', (object,), {'__slots__': ()})
 
+# fcntl.F_SETPIPE_SZ is only available since Python 3.10
+F_SETPIPE_SZ = getattr(fcntl, "F_SETPIPE_SZ", 1031) if not is_win32 else None
+
+
+def set_pipe_size(fd, size):
+    """Tries to set the capacity of a pipe on Linux and returns the new capacity, or ``None`` if it can't be set.
+
+    Unprivileged processes are limited to /proc/sys/fs/pipe-max-size, so smaller sizes are tried as well.
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+
+    while size >= 65536:
+        try:
+            return fcntl.fcntl(fd, F_SETPIPE_SZ, size)
+        except (IOError, OSError) as err:
+            if err.errno not in (errno.EPERM, errno.EBUSY):
+                return None
+        size //= 2
+
+    return None
+
 
 class NamedPipeBase(ABC):
 
-    def __init__(self):
+    def __init__(self, size=None):
         global _id
+        # the requested buffer size of the pipe, or None for the system's default
+        self.size = size
         with _lock:
             _id += 1
             self.name = "streamlinkpipe-{0}-{1}-{2}".format(os.getpid(), _id, random.randint(0, 9999))
@@ -60,6 +88,8 @@ class NamedPipePosix(NamedPipeBase):
 
     def open(self):
         self.fifo = open(self.path, self.mode)
+        if self.size:
+            set_pipe_size(self.fifo.fileno(), self.size)
 
     def write(self, data):
         return self.fifo.write(data)
@@ -99,8 +129,8 @@ class NamedPipeWindows(NamedPipeBase):
             self.PIPE_ACCESS_OUTBOUND,
             self.PIPE_TYPE_BYTE | self.PIPE_READMODE_BYTE | self.PIPE_WAIT,
             self.PIPE_UNLIMITED_INSTANCES,
-            self.bufsize,
-            self.bufsize,
+            self.size or self.bufsize,
+            self.size or self.bufsize,
             0,
             None
         )
@@ -111,6 +141,8 @@ class NamedPipeWindows(NamedPipeBase):
         windll.kernel32.ConnectNamedPipe(self.pipe, None)
 
     def write(self, data):
+        if isinstance(data, memoryview):
+            data = data.tobytes()
         written = c_ulong(0)
         windll.kernel32.WriteFile(
             self.pipe,
@@ -128,4 +160,50 @@ class NamedPipeWindows(NamedPipeBase):
             self.pipe = None
 
 
+class AnonymousPipePosix(NamedPipeBase):
+    """An anonymous pipe, whose read end gets inherited by a child process, e.g. as ffmpeg's ``pipe:N`` input.
+
+    The read end needs to be passed to the child process via :class:`subprocess.Popen`'s ``pass_fds`` argument
+    and needs to be closed in the current process afterwards with :meth:`close_read_end`.
+    Data gets written directly to the file descriptor of the write end without any additional buffering.
+    """
+
+    def _create(self):
+        self.read_fd, self.write_fd = os.pipe()
+        self.path = "pipe:{0}".format(self.read_fd)
+        if self.size:
+            set_pipe_size(self.write_fd, self.size)
+
+    def open(self):
+        pass
+
+    def write(self, data):
+        view = memoryview(data)
+        total = len(view)
+        while view:
+            view = view[os.write(self.write_fd, view):]
+
+        return total
+
+    def close_read_end(self):
+        if self.read_fd is not None:
+            os.close(self.read_fd)
+            self.read_fd = None
+
+    def close_write_end(self):
+        if self.write_fd is not None:
+            os.close(self.write_fd)
+            self.write_fd = None
+
+    def close(self):
+        self.close_read_end()
+        self.close_write_end()
+
+    @staticmethod
+    def is_supported():
+        # inheriting specific file descriptors requires Popen's pass_fds argument
+        return is_py3 and not is_win32
+
+
 NamedPipe = NamedPipePosix if not is_win32 else NamedPipeWindows
+AnonymousPipe = AnonymousPipePosix
@@ -1,10 +1,16 @@
 import json
 import re
 
-from lxml.etree import HTML, XML
-
 from streamlink.compat import is_py2, is_py3, parse_qsl, str
-from streamlink.plugin import PluginError
+from streamlink.exceptions import PluginError
+from streamlink.utils.lazy import lazy_module
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+etree = lazy_module("lxml.etree")
 
 
 def _parse(parser, data, name, exception, schema, *args, **kwargs):
@@ -23,6 +29,40 @@ def _parse(parser, data, name, exception, schema, *args, **kwargs):
     return parsed
 
 
+_missing = object()
+
+# maps digits to "0" and all other bytes to " ", for finding long numbers
+_digits_table = bytes(bytearray(48 if 48 <= i <= 57 else 32 for i in range(256)))
+_long_number = b"0" * 19
+
+
+def _orjson_loads(data):
+    # orjson is stricter than the json module: data which orjson rejects or which contains long numbers gets
+    # parsed by the json module instead, so that the results and the error messages are the same as without orjson
+    if isinstance(data, str):
+        data = data.encode("utf-8", "surrogatepass")
+    elif not isinstance(data, bytes):
+        return _missing
+
+    # integers which don't fit into 64 bits get parsed as floats by orjson
+    if _long_number in data.translate(_digits_table):
+        return _missing
+
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return _missing
+
+
+def _json_loads(data, *args, **kwargs):
+    if orjson is not None and not args and not kwargs:
+        parsed = _orjson_loads(data)
+        if parsed is not _missing:
+            return parsed
+
+    return json.loads(data, *args, **kwargs)
+
+
 def parse_json(
     data,
     name="JSON",
@@ -33,9 +73,34 @@ def parse_json(
     """Wrapper around json.loads.
 
     Provides these extra features:
+     - Uses orjson if it's installed and if no extra arguments for json.loads are set
      - Wraps errors in custom exception with a snippet of the data in the message
     """
-    return _parse(json.loads, data, name, exception, schema, *args, **kwargs)
+    return _parse(_json_loads, data, name, exception, schema, *args, **kwargs)
+
+
+def parse_json_content(
+    content,
+    text,
+    name="JSON",
+    exception=PluginError,
+    schema=None,
+    *args, **kwargs
+):
+    """Parses UTF-8 encoded JSON data without decoding it first, if possible.
+
+    orjson parses the bytes directly. Otherwise, or if orjson rejects them, the decoded data returned by
+    the text callable gets parsed by :func:`parse_json`.
+    """
+    if orjson is not None and not args and not kwargs:
+        parsed = _orjson_loads(content)
+        if parsed is not _missing:
+            if schema:
+                parsed = schema.validate(parsed, name=name, exception=exception)
+
+            return parsed
+
+    return parse_json(text(), name, exception, schema, *args, **kwargs)
 
 
 def parse_html(
@@ -54,7 +119,7 @@ def parse_html(
     if isinstance(data, str) and data.lstrip().startswith("<?xml"):
         data = re.sub(r"^\s*<\?xml.+?\?>", "", data)
 
-    return _parse(HTML, data, name, exception, schema, *args, **kwargs)
+    return _parse(etree.HTML, data, name, exception, schema, *args, **kwargs)
 
 
 def parse_xml(
@@ -82,7 +147,7 @@ def parse_xml(
     if invalid_char_entities:
         data = re.sub(br"&(?!(?:#(?:[0-9]+|[Xx][0-9A-Fa-f]+)|[A-Za-z0-9]+);)", b"&amp;", data)
 
-    return _parse(XML, data, name, exception, schema, *args, **kwargs)
+    return _parse(etree.XML, data, name, exception, schema, *args, **kwargs)
 
 
 def parse_qsd(
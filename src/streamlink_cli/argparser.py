@@ -477,6 +477,53 @@ def build_parser():
         enabled. Omit or set to 0 to use a random high ( >1024) port.
         """
     )
+    player.add_argument(
+        "--player-external-http-clients",
+        metavar="CLIENTS",
+        type=num(int, min=1),
+        help="""
+        Serve the stream of the external HTTP server to up to CLIENTS concurrent clients, which all share a single
+        stream connection, instead of opening a new stream for each client request, one client at a time.
+
+        Clients which fall behind by more than the --ringbuffer-size get disconnected. Clients can join MPEG-TS
+        streams at any time, but streams of other formats only while their beginning is still buffered, as their
+        header is required for playback.
+
+        Default is disabled.
+        """
+    )
+    player.add_argument(
+        "--player-external-http-restream",
+        action="store_true",
+        help="""
+        Serve the stream of the external HTTP server as a live HLS playlist of the most recent segments,
+        instead of a continuous stream of data. Any number of clients can then fetch the cached segments
+        without additional connections to the stream.
+
+        The playlist URLs will be printed to the console. Only HLS streams and DASH streams with a single
+        representation are supported.
+
+        See --player-external-http-clients for the maximum number of concurrent client connections (default: 32).
+        """
+    )
+    player.add_argument(
+        "--restream-window",
+        metavar="SEGMENTS",
+        type=num(int, min=1),
+        default=10,
+        help="""
+        The number of the most recent segments served by --player-external-http-restream.
+
+        Default is 10.
+        """
+    )
+    player.add_argument(
+        "--restream-dir",
+        metavar="DIRECTORY",
+        help="""
+        Store the segments of --player-external-http-restream as files in DIRECTORY instead of keeping them in memory.
+        """
+    )
     player.add_argument(
         "--player-passthrough",
         metavar="TYPES",
@@ -615,6 +662,63 @@ def build_parser():
             %(prog)s --record-and-pipe "~/recordings/{author}/{category}/{id}-{time:%%Y%%m%%d%%H%%M%%S}.ts" <URL> [STREAM]
         """
     )
+    output.add_argument(
+        "--vod-download-threads",
+        type=num(int, min=1, max=32),
+        metavar="THREADS",
+        help="""
+        When using -o and the selected stream is a finished HLS playlist, a static single-representation DASH stream,
+        or a HTTP stream whose server supports byte range requests, download its segments or byte ranges with THREADS parallel
+        connections and write them directly to their final position in FILENAME, instead of passing them through the regular
+        sequential stream buffer. Minimum value is 1 and maximum is 32.
+
+        The download progress is recorded in a FILENAME.streamlink-journal file next to the output file, so that an
+        interrupted download can be resumed by running the same command again. The journal gets removed once the download
+        has finished.
+
+        Streams which don't support this, like live streams, are written sequentially as usual.
+
+        Default is disabled.
+        """
+    )
+    output.add_argument(
+        "--sink-buffer-size",
+        metavar="SIZE",
+        type=filesize,
+        help="""
+        Write the stream data to the player, the HTTP client of --player-http or --player-external-http,
+        the output file or stdout, and to the recording file of --record or --record-and-pipe, from separate threads,
+        each with its own buffer of SIZE bytes, so that a slow output doesn't hold back the other one.
+        Mega- or kilobytes can be specified via the M or K suffix respectively.
+
+        The lag and the dropped bytes of each output are included in the metrics of --metrics-port and --metrics-file.
+
+        Default is 0 (disabled, all outputs get written to sequentially).
+        """
+    )
+    output.add_argument(
+        "--sink-buffer-policy",
+        choices=["block", "drop", "disconnect"],
+        metavar="POLICY",
+        help="""
+        What to do when the buffer of an output set up by --sink-buffer-size is full:
+
+          block: Wait until the output has caught up, which also holds back the other outputs
+          drop: Discard the new stream data for this output
+          disconnect: Stop writing to this output. The stream ends once the player or main output and its recording
+                      have both been disconnected.
+
+        Default is block.
+        """
+    )
+    output.add_argument(
+        "--record-sink-buffer-policy",
+        choices=["block", "drop", "disconnect"],
+        metavar="POLICY",
+        help="""
+        Overrides --sink-buffer-policy for the recording file of --record or --record-and-pipe.
+        """
+    )
     output.add_argument(
         "--fs-safe-rules",
         choices=["POSIX", "Windows"],
@@ -759,6 +863,7 @@ def build_parser():
 
     transport = parser.add_argument_group("Stream transport options")
     transport_hls = transport.add_argument_group("HLS options")
+    transport_dash = transport.add_argument_group("DASH options")
     transport_rtmp = transport.add_argument_group("RTMP options")
     transport_subprocess = transport.add_argument_group("Subprocess options")
     transport_ffmpeg = transport.add_argument_group("FFmpeg options")
@@ -786,6 +891,18 @@ def build_parser():
         some extra processing to avoid unnecessary background processing.
         """
     )
+    transport.add_argument(
+        "--stream-chunk-size",
+        metavar="SIZE",
+        type=filesize,
+        help="""
+        The size of the chunks in which the stream data gets copied between the stream, the ringbuffer and the output.
+        Mega- or kilobytes can be specified via the M or K suffix respectively.
+
+        Larger chunks reduce the CPU usage of high bitrate streams. By default, the chunk size gets adjusted
+        automatically between 8K and 1M, depending on how much data is available when reading from the stream.
+        """
+    )
     transport.add_argument(
         "--stream-segment-attempts",
         type=num(int, min=0),
@@ -834,6 +951,32 @@ def build_parser():
         Default is 60.0.
         """
     )
+    transport.add_argument(
+        "--stream-ts-inspect",
+        action="store_true",
+        help="""
+        Inspect the MPEG-TS packets of segmented streams, such as HLS, and log sync losses, continuity counter errors
+        and PCR discontinuities, as well as a summary including the bitrate when the stream ends.
+
+        Non-MPEG-TS streams are not affected. The inspection is faster if NumPy is installed.
+        """
+    )
+    transport.add_argument(
+        "--stream-ts-drop-null",
+        action="store_true",
+        help="""
+        Drop the null packets of MPEG-TS segmented streams. Implies --stream-ts-inspect.
+        """
+    )
+    transport.add_argument(
+        "--stream-ts-repair",
+        action="store_true",
+        help="""
+        Drop unsynchronized data of MPEG-TS segmented streams, e.g. after a failed segment download, and set the
+        discontinuity indicator of packets following a continuity counter gap, where the packet has an adaptation
+        field. Implies --stream-ts-inspect.
+        """
+    )
     transport.add_argument(
         "--mux-subtitles",
         action="store_true",
@@ -871,6 +1014,20 @@ def build_parser():
         Immediately write segment data into output buffer while downloading.
         """
     )
+    transport_hls.add_argument(
+        "--hls-segment-coalesce-size",
+        metavar="SIZE",
+        type=filesize,
+        help="""
+        Fetch runs of adjacent EXT-X-BYTERANGE segments of the same resource with a single byte range request of up to
+        SIZE bytes, instead of sending one request per segment. Mega- or kilobytes can be specified via the M or K suffix
+        respectively.
+
+        This has no effect if --hls-segment-stream-data is set.
+
+        Default is 0 (disabled).
+        """
+    )
     transport_hls.add_argument(
         "--hls-playlist-reload-attempts",
         type=num(int, min=0),
@@ -982,13 +1139,61 @@ def build_parser():
         Skip to the beginning of a live stream, or as far back as possible.
         """
     )
+    transport_hls.add_argument(
+        "--hls-muxer",
+        choices=["ffmpeg", "ts"],
+        metavar="MUXER",
+        help="""
+        The muxer used for HLS streams with external audio renditions.
+
+          ffmpeg: Mux the streams with an FFmpeg subprocess
+          ts: Remux the MPEG-TS streams in-process without FFmpeg.
+              The output format is always MPEG-TS. Falls back to FFmpeg
+              if the renditions are not MPEG-TS, e.g. packed audio or fMP4,
+              or if FFmpeg output or transcode options are set.
+
+        Default is ffmpeg.
+        """
+    )
     transport_hls.add_argument("--hls-segment-attempts", help=argparse.SUPPRESS)
     transport_hls.add_argument("--hls-segment-threads", help=argparse.SUPPRESS)
     transport_hls.add_argument("--hls-segment-timeout", help=argparse.SUPPRESS)
     transport_hls.add_argument("--hls-timeout", help=argparse.SUPPRESS)
 
+    transport.add_argument(
+        "--http-stream-connections",
+        type=num(int, min=1, max=16),
+        metavar="CONNECTIONS",
+        help="""
+        The number of concurrent connections used to download progressive HTTP streams, e.g. MP4 files.
+        Minimum value is 1 and maximum is 16.
+
+        If the server supports byte range requests, the file gets downloaded in parts which are reassembled in order,
+        and dropped connections get resumed from the last received byte.
+
+        Default is 1.
+        """
+    )
     transport.add_argument("--http-stream-timeout", help=argparse.SUPPRESS)
 
+    transport_dash.add_argument(
+        "--dash-muxer",
+        choices=["ffmpeg", "fmp4"],
+        metavar="MUXER",
+        help="""
+        The muxer used for DASH streams with separate video and audio representations.
+
+          ffmpeg: Mux the streams with an FFmpeg subprocess
+          fmp4: Interleave the fragmented MP4 streams in-process without FFmpeg.
+                The output format is always fragmented MP4. Falls back to FFmpeg
+                if the representations are not MP4, e.g. WebM, or if any of the
+                --ffmpeg-fout, --ffmpeg-video-transcode, --ffmpeg-audio-transcode
+                or --ffmpeg-copyts options are set.
+
+        Default is ffmpeg.
+        """
+    )
+
     transport_rtmp.add_argument(
         "--rtmp-rtmpdump",
         metavar="FILENAME",
@@ -1219,6 +1424,89 @@ def build_parser():
         """
     )
 
+    metrics = parser.add_argument_group("Metrics options")
+    metrics.add_argument(
+        "--metrics-port",
+        metavar="PORT",
+        type=num(int, min=0, max=65535),
+        help="""
+        Serve the metrics of the session in the Prometheus text format on this port, at the /metrics path.
+        Set to 0 to use a random port.
+
+        The metrics include the downloaded bytes, the download latency, the retries and the failures of the segments
+        of HLS and DASH streams, the playlist reload latency, the live-edge lag, the ring buffer fill,
+        the written bytes and the write stalls of the output, and the lag and the dropped bytes of the outputs of
+        --sink-buffer-size.
+        """
+    )
+    metrics.add_argument(
+        "--metrics-host",
+        metavar="HOST",
+        default="127.0.0.1",
+        help="""
+        The address which --metrics-port binds to. Set to 0.0.0.0 to allow remote scrapers.
+
+        Default is 127.0.0.1.
+        """
+    )
+    metrics.add_argument(
+        "--metrics-file",
+        metavar="FILENAME",
+        help="""
+        Periodically write the metrics of the session in the Prometheus text format to this file,
+        e.g. for the textfile collector of node_exporter. The file gets replaced atomically.
+        """
+    )
+    metrics.add_argument(
+        "--metrics-interval",
+        metavar="SECONDS",
+        type=num(float, min=1),
+        default=15.0,
+        help="""
+        The interval in seconds between the writes of --metrics-file.
+
+        Default is 15.0.
+        """
+    )
+
+    profiling = parser.add_argument_group("Profiling options")
+    profiling.add_argument(
+        "--profile",
+        metavar="FILENAME",
+        help="""
+        Profile all threads of Streamlink, including the worker, writer and download threads of HLS and DASH streams,
+        and write the profile to FILENAME when Streamlink exits.
+        """
+    )
+    profiling.add_argument(
+        "--profile-format",
+        choices=["collapsed", "pstats"],
+        metavar="FORMAT",
+        default="collapsed",
+        help="""
+        The format of the --profile output.
+
+          collapsed: Sample the stacks of all threads and write them in the collapsed stack format of flame graph
+                     tools, e.g. flamegraph.pl or speedscope. The root frames of each stack are the role of the
+                     thread and its stream type.
+          pstats: Profile each thread deterministically with cProfile and write the merged profile, which can be
+                  inspected with Python's pstats module or snakeviz. Adds a lot more overhead than sampling.
+
+        Default is collapsed.
+        """
+    )
+    profiling.add_argument(
+        "--profile-interval",
+        metavar="SECONDS",
+        type=num(float, min=0),
+        default=0.005,
+        help="""
+        The sampling interval of the collapsed --profile format in seconds.
+
+        Default is 0.005.
+        """
+    )
+
     return parser
 
 
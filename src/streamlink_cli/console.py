@@ -3,6 +3,7 @@ import logging
 import sys
 from getpass import getpass
 
+from streamlink import logger
 from streamlink.plugin.plugin import UserInputRequester
 from streamlink_cli.compat import input
 from streamlink_cli.utils import JSONEncoder
@@ -71,6 +72,8 @@ class ConsoleOutput(object):
         formatted = msg.format(*args, **kwargs)
         formatted = u"{0}\n".format(formatted)
 
+        # keep the order of the queued log records which get written to the same output
+        logger.flush()
         self.output.write(formatted)
 
     def msg_json(self, obj):
@@ -1,4 +1,5 @@
 import argparse
+import atexit
 import datetime
 import errno
 import logging
@@ -9,29 +10,28 @@ import sys
 from collections import OrderedDict
 from contextlib import closing
 from distutils.version import StrictVersion
-from functools import partial
 from gettext import gettext
 from itertools import chain
-from time import sleep
-
-import requests
-from socks import __version__ as socks_version
-from websocket import __version__ as websocket_version
+from time import sleep, time
 
 import streamlink.logger as logger
-from streamlink import NoPluginError, PluginError, StreamError, Streamlink, __version__ as streamlink_version
+from streamlink import NoPluginError, PluginError, StreamError, __version__ as streamlink_version
+from streamlink.buffers import iter_chunks
 from streamlink.cache import Cache
 from streamlink.exceptions import FatalPluginError
 from streamlink.plugin import PluginOptions
+from streamlink.profiler import Profiler
+from streamlink.stream.restream import SegmentWindow
 from streamlink.stream.streamprocess import StreamProcess
 from streamlink.utils.encoding import get_filesystem_encoding, maybe_decode
 from streamlink.utils.named_pipe import NamedPipe
+from streamlink_cli import utils as cli_utils
 from streamlink_cli.argparser import build_parser
 from streamlink_cli.compat import is_py2, is_win32, stdout
 from streamlink_cli.console import ConsoleOutput, ConsoleUserInputRequester
 from streamlink_cli.constants import CONFIG_FILES, DEFAULT_STREAM_METADATA, LOG_DIR, PLUGINS_DIR, STREAM_SYNONYMS
-from streamlink_cli.output import FileOutput, PlayerOutput
-from streamlink_cli.utils import Formatter, HTTPServer, ignored, progress
+from streamlink_cli.output import FileOutput, HTTPOutput, PlayerOutput
+from streamlink_cli.utils import Formatter, ignored, progress
 
 if is_py2:
     reload(sys)  # noqa: F821
@@ -149,6 +149,27 @@ def create_output(formatter):
     return out
 
 
+def setup_output_sinks(out):
+    """Decouples the output and its recording from each other with separate writer threads and buffers."""
+    if not args.sink_buffer_size:
+        return
+
+    policy = args.sink_buffer_policy or "block"
+    metrics = getattr(streamlink, "metrics", None)
+    if isinstance(out, PlayerOutput):
+        name = "player"
+    elif isinstance(out, HTTPOutput):
+        name = "http"
+    elif out.fd is stdout:
+        name = "stdout"
+    else:
+        name = "file"
+    out.set_sink(name, args.sink_buffer_size, policy, metrics)
+
+    if out.record:
+        out.record.set_sink("record", args.sink_buffer_size, args.record_sink_buffer_policy or policy, metrics)
+
+
 def create_http_server(*_args, **_kwargs):
     """Creates a HTTP server listening on a given host and port.
 
@@ -157,7 +178,7 @@ def create_http_server(*_args, **_kwargs):
     """
 
     try:
-        http = HTTPServer()
+        http = cli_utils.HTTPServer()
         http.bind(*_args, **_kwargs)
     except OSError as err:
         console.exit("Failed to create HTTP server: {0}", err)
@@ -188,10 +209,133 @@ def iter_http_requests(server, player):
             continue
 
 
+def open_http_stream(plugin, initial_streams, player=None, opener=None):
+    """Fetches the streams until the selected stream is available and opens it."""
+    stream_fd = prebuffer = None
+    while not stream_fd and (not player or player.running):
+        try:
+            streams = initial_streams or fetch_streams(plugin)
+            initial_streams = None
+
+            for stream_name in (resolve_stream_name(streams, s) for s in args.stream):
+                if stream_name in streams:
+                    stream = streams[stream_name]
+                    break
+            else:
+                log.info("Stream not available, will re-fetch "
+                         "streams in 10 sec")
+                sleep(10)
+                continue
+        except PluginError as err:
+            log.error(u"Unable to fetch new streams: {0}".format(err))
+            continue
+
+        try:
+            log.info("Opening stream: {0} ({1})".format(stream_name,
+                                                        type(stream).shortname()))
+            stream_fd, prebuffer = (opener or open_stream)(stream)
+        except StreamError as err:
+            log.error("{0}".format(err))
+
+    return stream_fd, prebuffer
+
+
+def output_stream_http_shared(plugin, initial_streams, port=0):
+    """Continuously output the stream over HTTP to multiple concurrent clients, which share a single stream."""
+    try:
+        server = cli_utils.HTTPStreamServer(max_clients=args.player_external_http_clients,
+                                            buffer_size=streamlink.get_option("ringbuffer-size"))
+        server.bind(host=None, port=port)
+    except OSError as err:
+        console.exit("Failed to create HTTP server: {0}", err)
+
+    server.start()
+    log.info("Starting server for up to {0} clients, access with one of:".format(server.max_clients))
+    for url in server.urls:
+        log.info(" " + url)
+
+    try:
+        while True:
+            if not server.wait_for_clients(timeout=2.5):
+                continue
+
+            stream_fd, prebuffer = open_http_stream(plugin, initial_streams)
+            initial_streams = None
+
+            if stream_fd:
+                log.debug("Writing stream to clients")
+                try:
+                    chunk_size = streamlink.get_option("stream-chunk-size")
+                    for data in chain([prebuffer], iter_chunks(stream_fd, chunk_size)):
+                        server.write(data)
+                except IOError as err:
+                    if server.streaming:
+                        log.error("Error when reading from stream: {0}".format(err))
+                    else:
+                        log.info("All clients have disconnected")
+                finally:
+                    stream_fd.close()
+                    log.info("Stream ended")
+
+            server.end_stream()
+    finally:
+        server.close()
+
+
+def output_stream_restream(plugin, initial_streams, port=0):
+    """Continuously serve the most recent segments of the stream as a live HLS playlist over HTTP."""
+    window = SegmentWindow(size=args.restream_window, path=args.restream_dir)
+    try:
+        server = cli_utils.RestreamServer(window, max_clients=args.player_external_http_clients or 32)
+        server.bind(host=None, port=port)
+    except OSError as err:
+        console.exit("Failed to create HTTP server: {0}", err)
+
+    def open_restream(stream):
+        try:
+            return stream.open_restream(window), None
+        except TypeError as err:
+            console.exit("{0}", err)
+
+    server.start()
+    log.info("Starting restream server, access the playlist with one of:")
+    for url in server.urls:
+        log.info(" " + url)
+
+    try:
+        while True:
+            stream_fd, _ = open_http_stream(plugin, initial_streams, opener=open_restream)
+            initial_streams = None
+
+            try:
+                while not window.closed:
+                    sleep(0.5)
+            finally:
+                stream_fd.close()
+
+            if not args.player_continuous_http:
+                window.end()
+                log.info("Stream ended, serving the remaining segments until interrupted")
+                while True:
+                    sleep(0.5)
+
+            log.info("Stream ended, re-opening stream")
+            window.restart()
+    finally:
+        server.close()
+        window.clear()
+
+
 def output_stream_http(plugin, initial_streams, external=False, port=0):
     """Continuously output the stream over HTTP."""
     global output
 
+    if external and args.player_external_http_restream:
+        return output_stream_restream(plugin, initial_streams, port=port)
+
+    if external and args.player_external_http_clients:
+        return output_stream_http_shared(plugin, initial_streams, port=port)
+
     if not external:
         if not args.player:
             console.exit("The default player (VLC) does not seem to be "
@@ -224,35 +368,16 @@ def output_stream_http(plugin, initial_streams, external=False, port=0):
         user_agent = req.headers.get("User-Agent") or "unknown player"
         log.info("Got HTTP request from {0}".format(user_agent))
 
-        stream_fd = prebuffer = None
-        while not stream_fd and (not player or player.running):
-            try:
-                streams = initial_streams or fetch_streams(plugin)
-                initial_streams = None
-
-                for stream_name in (resolve_stream_name(streams, s) for s in args.stream):
-                    if stream_name in streams:
-                        stream = streams[stream_name]
-                        break
-                else:
-                    log.info("Stream not available, will re-fetch "
-                             "streams in 10 sec")
-                    sleep(10)
-                    continue
-            except PluginError as err:
-                log.error(u"Unable to fetch new streams: {0}".format(err))
-                continue
-
-            try:
-                log.info("Opening stream: {0} ({1})".format(stream_name,
-                                                            type(stream).shortname()))
-                stream_fd, prebuffer = open_stream(stream)
-            except StreamError as err:
-                log.error("{0}".format(err))
+        stream_fd, prebuffer = open_http_stream(plugin, initial_streams, player)
+        initial_streams = None
 
         if stream_fd and prebuffer:
             log.debug("Writing stream to player")
-            read_stream(stream_fd, server, prebuffer)
+            http_output = HTTPOutput(server)
+            setup_output_sinks(http_output)
+            http_output.open()
+            with closing(http_output):
+                read_stream(stream_fd, http_output, prebuffer)
 
         server.close(True)
 
@@ -320,12 +445,53 @@ def open_stream(stream):
     return stream_fd, prebuffer
 
 
+def output_stream_vod(formatter, stream):
+    """Downloads a finished VOD stream in parallel into the output file.
+
+    Returns ``None`` if the stream doesn't support it.
+    """
+    try:
+        downloader = stream.to_vod_downloader(threads=args.vod_download_threads)
+    except TypeError:
+        return None
+    except StreamError as err:
+        log.error("Could not prepare the parallel VOD download: {0}".format(err))
+        return None
+
+    if downloader is None:
+        return None
+
+    filename = formatter.path(args.output, args.fs_safe_rules)
+    if downloader.can_resume(filename):
+        log.info("Resuming output to:\n{0}".format(os.path.abspath(filename)))
+    else:
+        check_file_output(filename, args.force)
+
+    log.debug("Downloading {0} segments with {1} threads".format(len(downloader.segments), downloader.threads))
+    stream_iterator = downloader.download(filename)
+    if sys.stdout.isatty() or args.force_progress:
+        # the downloader yields the number of written bytes
+        stream_iterator = progress(stream_iterator, prefix=os.path.basename(filename), size=int)
+
+    try:
+        for _ in stream_iterator:
+            pass
+    except StreamError as err:
+        console.exit("Error when downloading stream: {0}, exiting", err)
+    finally:
+        downloader.close()
+        log.info("Stream ended")
+
+    return True
+
+
 def output_stream(formatter, stream, last_stream):
     """Open stream, create output and finally write the stream to output."""
     global output
 
     # create output before opening the stream, so file outputs can prompt on existing output
     output = create_output(formatter)
+    setup_output_sinks(output)
 
     success_open = False
     for i in range(args.retry_open):
@@ -355,10 +521,13 @@ def output_stream(formatter, stream, last_stream):
     return True
 
 
-def read_stream(stream, output, prebuffer, chunk_size=8192):
-    """Reads data from stream and then writes it to the output."""
+def read_stream(stream, output, prebuffer, chunk_size=None):
+    """Reads data from stream and then writes it to the output.
+
+    The data gets read into a reusable buffer, see :func:`streamlink.buffers.iter_chunks`.
+    """
     is_player = isinstance(output, PlayerOutput)
-    is_http = isinstance(output, HTTPServer)
+    is_http = isinstance(output, (HTTPOutput, cli_utils.HTTPServer))
     is_fifo = is_player and output.namedpipe
     show_progress = (
         isinstance(output, FileOutput)
@@ -372,9 +541,11 @@ def read_stream(stream, output, prebuffer, chunk_size=8192):
         and (sys.stdout.isatty() or args.force_progress)
     )
 
+    metrics = streamlink.metrics if streamlink.metrics.enabled else None
+
     stream_iterator = chain(
         [prebuffer],
-        iter(partial(stream.read, chunk_size), b"")
+        iter_chunks(stream, chunk_size or streamlink.get_option("stream-chunk-size"))
     )
     if show_progress:
         stream_iterator = progress(stream_iterator,
@@ -396,7 +567,12 @@ def read_stream(stream, output, prebuffer, chunk_size=8192):
                     break
 
             try:
-                output.write(data)
+                if metrics is not None:
+                    started = time()
+                    output.write(data)
+                    cli_utils.record_output_write(metrics, len(data), time() - started)
+                else:
+                    output.write(data)
             except IOError as err:
                 if is_player and err.errno in ACCEPTABLE_ERRNO:
                     log.info("Player closed")
@@ -406,6 +582,11 @@ def read_stream(stream, output, prebuffer, chunk_size=8192):
                     console.exit("Error when writing to output: {0}, exiting", err)
 
                 break
+
+            # keep writing to the recording if only the output itself has been disconnected
+            if getattr(output, "disconnected", False):
+                log.info("Output has been disconnected")
+                break
     except IOError as err:
         console.exit("Error when reading from stream: {0}, exiting", err)
     finally:
@@ -485,7 +666,11 @@ def handle_stream(plugin, streams, stream_name):
             else:
                 log.info("Opening stream: {0} ({1})".format(stream_name,
                                                             stream_type))
-                success = output_stream(formatter, stream, count == len(stream_names))
+                success = None
+                if args.vod_download_threads and args.output and args.output != "-":
+                    success = output_stream_vod(formatter, stream)
+                if success is None:
+                    success = output_stream(formatter, stream, count == len(stream_names))
 
             if success:
                 break
@@ -676,7 +861,7 @@ def load_plugins(dirs):
 
 
 def setup_args(parser, config_files=[], ignore_unknown=False):
-    """Parses arguments."""
+    """Parses arguments and returns the unknown ones."""
     global args
     arglist = sys.argv[1:]
 
@@ -696,6 +881,8 @@ def setup_args(parser, config_files=[], ignore_unknown=False):
     if not args.url and args.url_param:
         args.url = args.url_param
 
+    return unknown
+
 
 def setup_config_args(parser, ignore_unknown=False):
     config_files = []
@@ -716,7 +903,9 @@ def setup_config_args(parser, ignore_unknown=False):
             config_files += ["{0}.{1}".format(fn, pluginclass(resolved_url).module) for fn in CONFIG_FILES]
 
     if config_files:
-        setup_args(parser, config_files, ignore_unknown=ignore_unknown)
+        return setup_args(parser, config_files, ignore_unknown=ignore_unknown)
+
+    return []
 
 
 def setup_signals():
@@ -774,10 +963,51 @@ def setup_plugins(extra_plugin_dir=None):
 def setup_streamlink():
     """Creates the Streamlink session."""
     global streamlink
+    # the session's dependencies are only imported when they're needed, e.g. not for --help or --version
+    from streamlink.session import Streamlink
 
     streamlink = Streamlink({"user-input-requester": ConsoleUserInputRequester(console)})
 
 
+def setup_profiler():
+    """Starts profiling all threads if requested and writes the profile when exiting."""
+    if not args.profile:
+        return
+
+    profiler = Profiler(format=args.profile_format, interval=args.profile_interval)
+
+    def stop():
+        profiler.stop()
+        try:
+            profiler.dump(args.profile)
+        except (IOError, OSError) as err:
+            log.error("Failed to write the profile: {0}".format(err))
+
+    profiler.start()
+    atexit.register(stop)
+
+
+def setup_metrics():
+    """Starts the exporters of the session's metrics and returns them."""
+    exporters = []
+
+    if args.metrics_port is not None:
+        try:
+            server = cli_utils.MetricsServer(streamlink.metrics, host=args.metrics_host, port=args.metrics_port)
+        except (IOError, OSError) as err:
+            console.exit("Failed to create the metrics server: {0}", err)
+        server.start()
+        log.info("Serving metrics at {0}".format(server.url))
+        exporters.append(server)
+
+    if args.metrics_file:
+        metrics_file = cli_utils.MetricsFile(streamlink.metrics, args.metrics_file, interval=args.metrics_interval)
+        metrics_file.start()
+        exporters.append(metrics_file)
+
+    return exporters
+
+
 def setup_options():
     """Sets Streamlink options."""
     if args.interface:
@@ -789,6 +1019,9 @@ def setup_options():
 
     if args.ringbuffer_size:
         streamlink.set_option("ringbuffer-size", args.ringbuffer_size)
+
+    if args.stream_chunk_size:
+        streamlink.set_option("stream-chunk-size", args.stream_chunk_size)
     if args.mux_subtitles:
         streamlink.set_option("mux-subtitles", args.mux_subtitles)
 
@@ -796,6 +1029,8 @@ def setup_options():
         streamlink.set_option("hls-live-edge", args.hls_live_edge)
     if args.hls_segment_stream_data:
         streamlink.set_option("hls-segment-stream-data", args.hls_segment_stream_data)
+    if args.hls_segment_coalesce_size:
+        streamlink.set_option("hls-segment-coalesce-size", args.hls_segment_coalesce_size)
 
     if args.hls_playlist_reload_attempts:
         streamlink.set_option("hls-playlist-reload-attempts", args.hls_playlist_reload_attempts)
@@ -813,6 +1048,8 @@ def setup_options():
         streamlink.set_option("hls-duration", args.hls_duration)
     if args.hls_live_restart:
         streamlink.set_option("hls-live-restart", args.hls_live_restart)
+    if args.hls_muxer:
+        streamlink.set_option("hls-muxer", args.hls_muxer)
 
     if args.rtmp_rtmpdump:
         streamlink.set_option("rtmp-rtmpdump", args.rtmp_rtmpdump)
@@ -844,6 +1081,12 @@ def setup_options():
         streamlink.set_option("stream-segment-timeout", args.stream_segment_timeout)
     if args.stream_timeout:
         streamlink.set_option("stream-timeout", args.stream_timeout)
+    if args.stream_ts_inspect:
+        streamlink.set_option("stream-ts-inspect", args.stream_ts_inspect)
+    if args.stream_ts_drop_null:
+        streamlink.set_option("stream-ts-drop-null", args.stream_ts_drop_null)
+    if args.stream_ts_repair:
+        streamlink.set_option("stream-ts-repair", args.stream_ts_repair)
 
     if args.ffmpeg_ffmpeg:
         streamlink.set_option("ffmpeg-ffmpeg", args.ffmpeg_ffmpeg)
@@ -862,22 +1105,51 @@ def setup_options():
     if args.ffmpeg_start_at_zero:
         streamlink.set_option("ffmpeg-start-at-zero", args.ffmpeg_start_at_zero)
 
+    if args.http_stream_connections:
+        streamlink.set_option("http-stream-connections", args.http_stream_connections)
+
+    if args.dash_muxer:
+        streamlink.set_option("dash-muxer", args.dash_muxer)
+
     streamlink.set_option("subprocess-errorlog", args.subprocess_errorlog)
     streamlink.set_option("subprocess-errorlog-path", args.subprocess_errorlog_path)
     streamlink.set_option("locale", args.locale)
 
 
-def setup_plugin_args(session, parser):
-    """Sets Streamlink plugin options."""
+def setup_plugin_args(session, parser, pnames=None):
+    """Sets Streamlink plugin options.
+
+    Only the arguments of the plugins in pnames get added to the parser if it's set,
+    and subsequent calls add the arguments of the remaining plugins.
+    The default plugin options of all plugins get set by the first call.
+    """
+
+    plugin_args = next((grp for grp in parser._action_groups if grp.title == "Plugin options"), None)
+    if plugin_args is None:
+        plugin_args = parser.add_argument_group("Plugin options")
+        plugin_args.plugins = set()
+        setup_plugin_defaults(session, parser)
+
+    for pname, plugin in session.plugins.items():
+        if pname in plugin_args.plugins or pnames is not None and pname not in pnames:
+            continue
+        plugin_args.plugins.add(pname)
+
+        pargs = [parg for parg in plugin.arguments if not parg.is_global]
+        if pargs:
+            group = plugin_args.add_argument_group(pname.capitalize())
+            for parg in pargs:
+                group.add_argument(parg.argument_name(pname), **parg.options)
+
+
+def setup_plugin_defaults(session, parser):
+    """Sets the default plugin options of all plugins."""
 
-    plugin_args = parser.add_argument_group("Plugin options")
     for pname, plugin in session.plugins.items():
         defaults = {}
-        group = plugin_args.add_argument_group(pname.capitalize())
 
         for parg in plugin.arguments:
             if not parg.is_global:
-                group.add_argument(parg.argument_name(pname), **parg.options)
                 defaults[parg.dest] = parg.default
             else:
                 pargdest = parg.dest
@@ -904,7 +1176,8 @@ def setup_plugin_options(session, plugin):
         if parg.options.get("help") == argparse.SUPPRESS:
             continue
 
-        value = getattr(args, parg.dest if parg.is_global else parg.namespace_dest(pname))
+        # arguments of plugins which haven't been added to the parser can't be set
+        value = getattr(args, parg.dest) if parg.is_global else getattr(args, parg.namespace_dest(pname), parg.default)
         session.set_plugin_option(pname, parg.dest, value)
 
         if not parg.is_global:
@@ -953,6 +1226,10 @@ def log_current_versions():
     log.debug("OS:         {0}".format(os_version))
     log.debug("Python:     {0}".format(platform.python_version()))
     log.debug("Streamlink: {0}".format(streamlink_version))
+
+    import requests
+    from socks import __version__ as socks_version
+    from websocket import __version__ as websocket_version
     log.debug("Requests({0}), Socks({1}), Websocket({2})".format(
         requests.__version__, socks_version, websocket_version))
 
@@ -1029,7 +1306,9 @@ def setup_logger_and_console(stream=sys.stdout, filename=None, level="info", jso
         level=level,
         style="{",
         format=("[{asctime},{msecs:03.0f}]" if level == "trace" else "") + "[{name}][{levelname}] {message}",
-        datefmt="%H:%M:%S"
+        datefmt="%H:%M:%S",
+        # don't block the stream's threads while writing to the log file
+        queue=bool(filename)
     )
 
     console = ConsoleOutput(streamhandler.stream, streamlink, json)
@@ -1055,14 +1334,27 @@ def main():
     log_level = args.loglevel if not silent_log else "none"
     log_file = args.logfile if log_level != "none" else None
     setup_logger_and_console(console_out, log_file, log_level, args.json)
+    setup_profiler()
 
     setup_streamlink()
     # load additional plugins
     setup_plugins(args.plugin_dirs)
-    setup_plugin_args(streamlink, parser)
+    # only add the arguments of the plugin which can handle the URL, unless the help text gets printed
+    pnames = None
+    if args.url and not args.help:
+        with ignored(NoPluginError):
+            pnames = [streamlink.resolve_url_no_redirect(args.url)[0].module]
+    setup_plugin_args(streamlink, parser, pnames)
     # call setup args again once the plugin specific args have been added
-    setup_args(parser)
-    setup_config_args(parser)
+    if pnames is not None:
+        unknown = setup_args(parser, ignore_unknown=True) + setup_config_args(parser, ignore_unknown=True)
+        # unknown arguments could be the arguments of other plugins, so parse them again with all plugin arguments
+        if unknown or args.help:
+            setup_plugin_args(streamlink, parser)
+            pnames = None
+    if pnames is None:
+        setup_args(parser)
+        setup_config_args(parser)
 
     # update the logging level if changed by a plugin specific config
     log_level = args.loglevel if not silent_log else "none"
@@ -1099,8 +1391,10 @@ def main():
         except KeyboardInterrupt:
             error_code = 130
     elif args.url:
+        exporters = []
         try:
             setup_options()
+            exporters = setup_metrics()
             handle_url()
         except KeyboardInterrupt:
             # Close output
@@ -1115,6 +1409,8 @@ def main():
                     stream_fd.close()
                 except KeyboardInterrupt:
                     error_code = 130
+            for exporter in exporters:
+                exporter.close()
     else:
         usage = parser.format_usage()
         """
@@ -1133,6 +1429,7 @@ def main():
 
 
 def parser_helper():
+    from streamlink.session import Streamlink
     session = Streamlink()
     parser = build_parser()
     setup_plugin_args(session, parser)
@@ -5,6 +5,8 @@ import re
 import shlex
 import subprocess
 import sys
+from collections import deque
+from threading import Condition, Thread
 from time import sleep
 
 from streamlink.utils.encoding import get_filesystem_encoding, maybe_decode, maybe_encode
@@ -18,17 +20,196 @@ if is_win32:
 log = logging.getLogger("streamlink.cli.output")
 
 
+class OutputSink(Thread):
+    """Writes the data of an output from a separate thread, decoupled by a bounded buffer.
+
+    The overflow policy decides what happens when the buffer is full:
+
+    - ``block``: wait until the output has caught up
+    - ``drop``: discard the new data
+    - ``disconnect``: discard all buffered and future data of this output
+
+    The lag, the written and dropped bytes and the disconnect status get recorded as metrics labeled by the output's
+    name, if a :class:`streamlink.metrics.Metrics` object is set and enabled.
+    """
+
+    POLICIES = ("block", "drop", "disconnect")
+    CLOSE_TIMEOUT = 10.0
+
+    def __init__(self, output, name, size, policy="block", metrics=None):
+        if policy not in self.POLICIES:
+            raise ValueError("Invalid overflow policy: {0}".format(policy))
+
+        Thread.__init__(self, name="Thread-OutputSink-{0}".format(name))
+        self.daemon = True
+
+        self.output = output
+        self.sink_name = name
+        self.size = size
+        self.policy = policy
+        self.session_metrics = metrics
+
+        self.chunks = deque()
+        self.condition = Condition()
+        self.closed = False
+        self.disconnected = False
+        self.error = None
+
+        self.buffered = 0
+        self.buffered_max = 0
+        self.written = 0
+        self.dropped = 0
+
+    @property
+    def lag(self):
+        """The number of bytes which have been accepted but not yet written to the output."""
+        return self.buffered
+
+    def metrics(self):
+        return dict(
+            name=self.sink_name,
+            policy=self.policy,
+            lag=self.buffered,
+            lag_max=self.buffered_max,
+            written=self.written,
+            dropped=self.dropped,
+            disconnected=self.disconnected,
+        )
+
+    def _record_metrics(self, written=0, dropped=0):
+        metrics = self.session_metrics
+        if metrics is None or not metrics.enabled:
+            return
+
+        labels = {"output": self.sink_name}
+        metrics.gauge("streamlink_output_sink_lag_bytes", labels).set(self.buffered)
+        metrics.gauge("streamlink_output_sink_disconnected", labels).set(1 if self.disconnected else 0)
+        if written:
+            metrics.counter("streamlink_output_sink_written_bytes_total", labels).inc(written)
+        if dropped:
+            metrics.counter("streamlink_output_sink_dropped_bytes_total", labels).inc(dropped)
+
+    def _drop(self, size):
+        self.dropped += size
+        self._record_metrics(dropped=size)
+
+    def write(self, data):
+        if self.error:
+            raise self.error
+
+        with self.condition:
+            if self.disconnected:
+                self._drop(len(data))
+                return
+
+            # always accept a chunk if the buffer is empty, so that chunks larger than the buffer don't get stuck
+            while self.buffered and self.buffered + len(data) > self.size:
+                if self.policy == "drop":
+                    self._drop(len(data))
+                    return
+                if self.policy == "disconnect":
+                    log.warning("Output {0} can't keep up, disconnecting it".format(self.sink_name))
+                    self.disconnected = True
+                    dropped = self.buffered + len(data)
+                    self.buffered = 0
+                    self.chunks.clear()
+                    self._drop(dropped)
+                    self.condition.notify_all()
+                    return
+
+                self.condition.wait(0.5)
+                if self.error:
+                    raise self.error
+                if self.closed:
+                    return
+
+            # the data may be a view of the reader's reusable buffer
+            self.chunks.append(data.tobytes() if isinstance(data, memoryview) else data)
+            self.buffered += len(data)
+            self.buffered_max = max(self.buffered_max, self.buffered)
+            self._record_metrics()
+            self.condition.notify_all()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.chunks and not self.closed:
+                    self.condition.wait()
+                if not self.chunks:
+                    return
+                data = self.chunks.popleft()
+
+            try:
+                self.output._write(data)
+            except (IOError, OSError) as err:
+                with self.condition:
+                    self.error = err
+                    self.chunks.clear()
+                    self.buffered = 0
+                    self.condition.notify_all()
+                return
+
+            with self.condition:
+                self.buffered -= len(data)
+                self.written += len(data)
+                self._record_metrics(written=len(data))
+                self.condition.notify_all()
+
+    def close(self):
+        """Writes the remaining buffered data and stops the thread."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+        if self.is_alive():
+            self.join(self.CLOSE_TIMEOUT)
+            if self.is_alive():
+                log.warning("Output {0} didn't finish writing its buffered data".format(self.sink_name))
+
+        log.debug("Output {name} ({policy}): {written} bytes written, {dropped} bytes dropped, max lag {lag_max} bytes"
+                  .format(**self.metrics()))
+
+
 class Output(object):
     def __init__(self):
         self.opened = False
+        self.sink = None
+        # the recording is a separate output, which gets the same data, but which can have its own sink
+        self.record = None
+
+    def set_sink(self, name, size, policy="block", metrics=None):
+        """Writes the output's data from its own thread through a bounded buffer. See :class:`OutputSink`."""
+        self.sink = OutputSink(self, name, size, policy, metrics)
+
+    @property
+    def disconnected(self):
+        """Whether the sinks of the output and of its recording have been disconnected."""
+        disconnected = self.sink is not None and self.sink.disconnected
+        if self.record:
+            disconnected = disconnected and self.record.disconnected
+
+        return disconnected
 
     def open(self):
-        self._open()
+        if self.record:
+            self.record.open()
+        try:
+            self._open()
+        except Exception:
+            if self.record:
+                self.record.close()
+            raise
         self.opened = True
+        if self.sink:
+            self.sink.start()
 
     def close(self):
         if self.opened:
+            if self.sink:
+                self.sink.close()
             self._close()
+            if self.record:
+                self.record.close()
 
         self.opened = False
 
@@ -36,6 +217,12 @@ class Output(object):
         if not self.opened:
             raise IOError("Output is not opened")
 
+        if self.record:
+            self.record.write(data)
+
+        if self.sink:
+            return self.sink.write(data)
+
         return self._write(data)
 
     def _open(self):
@@ -63,22 +250,26 @@ class FileOutput(Output):
 
             self.fd = open(self.filename, "wb")
 
-        if self.record:
-            self.record.open()
-
         if is_win32:
             msvcrt.setmode(self.fd.fileno(), os.O_BINARY)
 
     def _close(self):
         if self.fd is not stdout:
             self.fd.close()
-        if self.record:
-            self.record.close()
 
     def _write(self, data):
         self.fd.write(data)
-        if self.record:
-            self.record.write(data)
+
+
+class HTTPOutput(Output):
+    """Writes to the client of a :class:`streamlink_cli.utils.HTTPServer`."""
+
+    def __init__(self, http):
+        super(HTTPOutput, self).__init__()
+        self.http = http
+
+    def _write(self, data):
+        self.http.write(data)
 
 
 class PlayerOutput(Output):
@@ -196,8 +387,6 @@ class PlayerOutput(Output):
 
     def _open(self):
         try:
-            if self.record:
-                self.record.open()
             if self.call and self.filename:
                 self._open_call()
             else:
@@ -253,9 +442,6 @@ class PlayerOutput(Output):
         elif not self.filename:
             self.player.stdin.close()
 
-        if self.record:
-            self.record.close()
-
         if self.kill:
             with ignored(Exception):
                 self.player.terminate()
@@ -270,9 +456,6 @@ class PlayerOutput(Output):
         self.player.wait()
 
     def _write(self, data):
-        if self.record:
-            self.record.write(data)
-
         if self.namedpipe:
             self.namedpipe.write(data)
         elif self.http:
@@ -281,4 +464,4 @@ class PlayerOutput(Output):
             self.player.stdin.write(data)
 
 
-__all__ = ["PlayerOutput", "FileOutput"]
+__all__ = ["PlayerOutput", "FileOutput", "HTTPOutput", "OutputSink"]
@@ -1,14 +1,24 @@
 import json
 from contextlib import contextmanager
 
+from streamlink.utils.lazy import lazy_attributes
 from streamlink_cli.utils.formatter import Formatter
-from streamlink_cli.utils.http_server import HTTPServer
 from streamlink_cli.utils.player import find_default_player
 from streamlink_cli.utils.progress import progress
 
+# the HTTP servers are only imported when they're needed
+lazy_attributes(__name__, {
+    "HTTPServer": "streamlink_cli.utils.http_server",
+    "HTTPStreamServer": "streamlink_cli.utils.http_server",
+    "RestreamServer": "streamlink_cli.utils.http_server",
+    "MetricsFile": "streamlink_cli.utils.metrics",
+    "MetricsServer": "streamlink_cli.utils.metrics",
+    "record_output_write": "streamlink_cli.utils.metrics",
+})
+
 __all__ = [
-    "Formatter", "HTTPServer", "JSONEncoder",
-    "find_default_player", "ignored", "progress",
+    "Formatter", "HTTPServer", "HTTPStreamServer", "JSONEncoder", "MetricsFile", "MetricsServer", "RestreamServer",
+    "find_default_player", "ignored", "progress", "record_output_write",
 ]
 
 
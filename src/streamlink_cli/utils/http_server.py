@@ -1,11 +1,18 @@
+import logging
 import socket
+from collections import deque
 from io import BytesIO
+from threading import Condition, Lock, Thread
+
+from streamlink.compat import urlparse
 
 try:
     from BaseHTTPServer import BaseHTTPRequestHandler
 except ImportError:
     from http.server import BaseHTTPRequestHandler
 
+log = logging.getLogger("streamlink.cli.http_server")
+
 
 class HTTPRequest(BaseHTTPRequestHandler):
     def __init__(self, request_text):
@@ -116,3 +123,357 @@ class HTTPServer(object):
             except (OSError, socket.error):
                 pass
             self.socket.close()
+
+
+class ClientLagError(IOError):
+    pass
+
+
+class SharedStreamBuffer(object):
+    """A buffer of the most recent stream data, which is read by multiple clients with their own cursors.
+
+    Writing never blocks. Data gets discarded once the buffer exceeds its size, and clients whose cursors
+    point to discarded data have fallen too far behind.
+    """
+
+    MPEGTS_SYNC_BYTE = b"\x47"
+
+    def __init__(self, size):
+        self.size = size
+        self.chunks = deque()
+        self.start = 0
+        self.end = 0
+        self.mpegts = None
+        self.closed = False
+        self.condition = Condition()
+
+    def join(self):
+        """Returns the cursor of a new client, or ``None`` if the stream can't be joined anymore.
+
+        MPEG-TS can be joined at any position, so new clients start at the end of the buffer.
+        Other formats like matroska or fragmented MP4 require their header or initialization section,
+        so new clients start at the beginning of the stream, as long as it is still buffered.
+        """
+        with self.condition:
+            if self.end == 0 or self.mpegts:
+                return self.end
+            if self.start == 0:
+                return 0
+
+    def write(self, data):
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        with self.condition:
+            if self.mpegts is None and data:
+                self.mpegts = data[:1] == self.MPEGTS_SYNC_BYTE
+            self.chunks.append((self.end, data))
+            self.end += len(data)
+            while len(self.chunks) > 1 and self.end - self.start > self.size:
+                _, chunk = self.chunks.popleft()
+                self.start += len(chunk)
+            self.condition.notify_all()
+
+    def read(self, cursor, size=65536, timeout=None):
+        """Returns the data after the cursor and the new cursor, or no data at the end of the stream or on timeout."""
+        with self.condition:
+            if cursor >= self.end and not self.closed:
+                self.condition.wait(timeout)
+            if cursor < self.start:
+                raise ClientLagError("Client has fallen too far behind")
+            if cursor >= self.end:
+                return b"", cursor
+
+            # clients are usually close to the end of the buffer
+            index = len(self.chunks) - 1
+            while self.chunks[index][0] > cursor:
+                index -= 1
+
+            data = []
+            length = 0
+            for index in range(index, len(self.chunks)):
+                offset, chunk = self.chunks[index]
+                if offset < cursor:
+                    chunk = chunk[cursor - offset:]
+                data.append(chunk)
+                length += len(chunk)
+                if length >= size:
+                    break
+
+            return b"".join(data), cursor + length
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+class ThreadedHTTPServer(HTTPServer):
+    """A HTTP server which handles each client connection in its own thread.
+
+    Connections support persistent connections and are limited to a maximum number of concurrent clients.
+    Subclasses need to implement :meth:`_handle_request`.
+    """
+
+    REQUEST_TIMEOUT = 60.0
+
+    def __init__(self, max_clients=10):
+        super(ThreadedHTTPServer, self).__init__()
+        self.max_clients = max_clients
+        self.clients = set()
+        self.lock = Lock()
+        self.closed = False
+        self.thread = None
+
+    def bind(self, *args, **kwargs):
+        super(ThreadedHTTPServer, self).bind(*args, **kwargs)
+        self.socket.listen(max(self.max_clients, 5))
+
+    def start(self):
+        self.thread = Thread(target=self._accept, name="Thread-{0}".format(self.__class__.__name__))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _accept(self):
+        self.socket.settimeout(None)
+        while not self.closed:
+            try:
+                conn, addr = self.socket.accept()
+            except (OSError, socket.error):
+                if self.closed:
+                    return
+                continue
+
+            with self.lock:
+                full = len(self.clients) >= self.max_clients
+                if not full:
+                    self.clients.add(conn)
+            if full:
+                log.info("Rejecting client {0}: too many clients".format(addr[0]))
+                try:
+                    conn.sendall(b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                except socket.error:
+                    pass
+                conn.close()
+                continue
+
+            thread = Thread(target=self._handle, args=(conn, addr), name="Thread-HTTPClient")
+            thread.daemon = True
+            thread.start()
+
+    @staticmethod
+    def _read_request(rfile):
+        lines = []
+        while True:
+            line = rfile.readline(65537)
+            if not line:
+                return None
+            if line in (b"\r\n", b"\n"):
+                if lines:
+                    break
+                continue
+            lines.append(line)
+
+        return HTTPRequest(b"".join(lines) + b"\r\n")
+
+    @staticmethod
+    def _keep_alive(req):
+        connection = (req.headers.get("Connection") or "").lower()
+        return connection == "keep-alive" or req.request_version == "HTTP/1.1" and connection != "close"
+
+    @staticmethod
+    def _send_response(conn, status, headers, keep_alive):
+        lines = [
+            "HTTP/1.1 {0}".format(status).encode("ascii"),
+            b"Server: Streamlink",
+            b"Connection: keep-alive" if keep_alive else b"Connection: close",
+        ]
+        lines.extend("{0}: {1}".format(name, value).encode("ascii") for name, value in headers)
+        conn.sendall(b"\r\n".join(lines) + b"\r\n\r\n")
+
+    def _handle(self, conn, addr):
+        conn.settimeout(self.REQUEST_TIMEOUT)
+        rfile = conn.makefile("rb")
+        try:
+            while not self.closed:
+                req = self._read_request(rfile)
+                if req is None:
+                    break
+                if req.error_code or req.command not in ("GET", "HEAD"):
+                    self._send_response(conn, "501 Not Implemented", [("Content-Length", 0)], False)
+                    break
+                if not self._handle_request(conn, addr, req):
+                    break
+        except ClientLagError as err:
+            log.warning("Disconnecting client {0}: {1}".format(addr[0], err))
+        except (IOError, OSError, socket.error):
+            pass
+        finally:
+            with self.lock:
+                self.clients.discard(conn)
+            rfile.close()
+            conn.close()
+
+    def _handle_request(self, conn, addr, req):
+        """Responds to a GET or HEAD request and returns whether the connection should be kept alive.
+
+        Should be overridden by the inheriting class.
+        """
+        pass
+
+    def close(self, client_only=False):
+        self.closed = True
+        with self.lock:
+            clients = list(self.clients)
+        for conn in clients:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except (OSError, socket.error):
+                pass
+        super(ThreadedHTTPServer, self).close()
+
+
+class HTTPStreamServer(ThreadedHTTPServer):
+    """A HTTP server which shares the data of a single stream with multiple concurrent clients.
+
+    Streaming clients of MPEG-TS streams start reading at the current position of the shared buffer,
+    clients of other formats can only join while the beginning of the stream is still buffered, see
+    :meth:`SharedStreamBuffer.join`. Clients get disconnected if they fall behind by more than the buffer size.
+    """
+
+    READ_TIMEOUT = 0.5
+
+    def __init__(self, max_clients=10, buffer_size=1024 * 1024 * 16):
+        super(HTTPStreamServer, self).__init__(max_clients=max_clients)
+        self.buffer_size = buffer_size
+        self.buffer = SharedStreamBuffer(buffer_size)
+        self.streaming = 0
+        self.condition = Condition()
+
+    def _handle_request(self, conn, addr, req):
+        if req.command == "GET":
+            with self.condition:
+                buffer = self.buffer
+            cursor = buffer.join()
+            if cursor is None:
+                log.info("Rejecting client {0}: the stream isn't MPEG-TS and can't be joined after it has started".format(
+                    addr[0]
+                ))
+                self._send_response(conn, "503 Service Unavailable", [("Content-Length", 0)], False)
+                return False
+
+        chunked = req.request_version == "HTTP/1.1"
+        # the end of non-chunked responses can only be signaled by closing the connection
+        keep_alive = self._keep_alive(req) and (req.command == "HEAD" or chunked)
+
+        headers = [("Content-Type", "video/unknown")]
+        if chunked:
+            headers.append(("Transfer-Encoding", "chunked"))
+        self._send_response(conn, "200 OK", headers, keep_alive)
+
+        if req.command == "GET":
+            user_agent = req.headers.get("User-Agent") or "unknown player"
+            log.info("Got HTTP request from {0} ({1})".format(addr[0], user_agent))
+            self._stream(conn, chunked, buffer, cursor)
+
+        return keep_alive
+
+    def _stream(self, conn, chunked, buffer, cursor):
+        with self.condition:
+            self.streaming += 1
+            self.condition.notify_all()
+
+        try:
+            while not self.closed:
+                data, cursor = buffer.read(cursor, timeout=self.READ_TIMEOUT)
+                if not data:
+                    if buffer.closed:
+                        break
+                    continue
+                if chunked:
+                    data = "{0:x}\r\n".format(len(data)).encode("ascii") + data + b"\r\n"
+                conn.sendall(data)
+            if chunked:
+                conn.sendall(b"0\r\n\r\n")
+        finally:
+            with self.condition:
+                self.streaming -= 1
+                self.condition.notify_all()
+
+    def wait_for_clients(self, timeout=None):
+        """Waits until at least one client requests the stream."""
+        with self.condition:
+            if not self.streaming and not self.closed:
+                self.condition.wait(timeout)
+
+            return self.streaming > 0
+
+    def write(self, data):
+        if not self.streaming:
+            raise IOError("No clients")
+
+        self.buffer.write(data)
+
+    def end_stream(self):
+        """Ends the responses of the current clients. Clients requesting the stream afterwards wait for new data."""
+        with self.condition:
+            buffer, self.buffer = self.buffer, SharedStreamBuffer(self.buffer_size)
+        buffer.close()
+
+    def close(self, client_only=False):
+        if client_only:
+            return self.end_stream()
+
+        self.closed = True
+        self.buffer.close()
+        with self.condition:
+            self.condition.notify_all()
+        super(HTTPStreamServer, self).close()
+
+
+class RestreamServer(ThreadedHTTPServer):
+    """A HTTP server which serves the segments of a :class:`SegmentWindow` as a live HLS stream.
+
+    The playlist is available at ``/`` and ``/playlist.m3u8``, segments and initialization sections
+    are available at the names used in the playlist.
+    """
+
+    PLAYLIST_PATHS = ("", "playlist.m3u8")
+    CONTENT_TYPES = {
+        "m3u8": "application/vnd.apple.mpegurl",
+        "ts": "video/mp2t",
+        "m4s": "video/iso.segment",
+        "mp4": "video/mp4",
+    }
+
+    def __init__(self, window, max_clients=32):
+        super(RestreamServer, self).__init__(max_clients=max_clients)
+        self.window = window
+
+    @property
+    def urls(self):
+        for url in super(RestreamServer, self).urls:
+            yield url + "playlist.m3u8"
+
+    def _handle_request(self, conn, addr, req):
+        keep_alive = self._keep_alive(req)
+        name = urlparse(req.path).path.lstrip("/")
+        if name in self.PLAYLIST_PATHS:
+            name = "playlist.m3u8"
+            data = self.window.playlist().encode("utf-8")
+        else:
+            data = self.window.get(name)
+
+        if data is None:
+            self._send_response(conn, "404 Not Found", [("Content-Length", 0)], keep_alive)
+            return keep_alive
+
+        content_type = self.CONTENT_TYPES.get(name.rpartition(".")[2], "application/octet-stream")
+        self._send_response(conn, "200 OK", [
+            ("Content-Type", content_type),
+            ("Content-Length", len(data)),
+            ("Cache-Control", "no-cache" if name == "playlist.m3u8" else "max-age=3600"),
+        ], keep_alive)
+        if req.command == "GET":
+            conn.sendall(data)
+
+        return keep_alive
@@ -0,0 +1,166 @@
+import logging
+import os
+import re
+from threading import Event, Thread
+from time import time
+
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer as _HTTPServer
+    from SocketServer import ThreadingMixIn
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer as _HTTPServer
+    from socketserver import ThreadingMixIn
+
+log = logging.getLogger("streamlink.cli.metrics")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# output writes which take longer than this are counted as stalls, e.g. when the player stops reading
+OUTPUT_STALL_THRESHOLD = 1.0
+
+_escape_re = re.compile(r"[\\\"\n]")
+_escapes = {"\\": "\\\\", "\"": "\\\"", "\n": "\\n"}
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float):
+        return repr(value)
+
+    return str(value)
+
+
+def _format_labels(labels, **extra):
+    items = sorted(labels.items()) + sorted(extra.items())
+    if not items:
+        return ""
+
+    return "{{{0}}}".format(",".join(
+        "{0}=\"{1}\"".format(key, _escape_re.sub(lambda m: _escapes[m.group(0)], str(value)))
+        for key, value in items
+    ))
+
+
+def format_metrics(metrics):
+    """Returns the metrics of a :class:`streamlink.metrics.Metrics` object in the Prometheus text format."""
+    families = {}
+    for name, labels, metric in metrics.collect():
+        families.setdefault(name, []).append((labels, metric))
+
+    lines = []
+    for name in sorted(families):
+        samples = families[name]
+        lines.append("# TYPE {0} {1}".format(name, samples[0][1].type))
+        for labels, metric in samples:
+            if metric.type == "histogram":
+                for bound, count in metric.cumulative_counts():
+                    lines.append("{0}_bucket{1} {2}".format(name, _format_labels(labels, le=_format_value(bound)), count))
+                lines.append("{0}_sum{1} {2}".format(name, _format_labels(labels), _format_value(metric.sum)))
+                lines.append("{0}_count{1} {2}".format(name, _format_labels(labels), metric.count))
+            else:
+                lines.append("{0}{1} {2}".format(name, _format_labels(labels), _format_value(metric.value)))
+
+    return "\n".join(lines) + "\n"
+
+
+def record_output_write(metrics, size, duration):
+    """Records a write call of the output, see :func:`streamlink_cli.main.read_stream`."""
+    metrics.counter("streamlink_output_bytes_total").inc(size)
+    metrics.histogram("streamlink_output_write_seconds").observe(duration)
+    if duration >= OUTPUT_STALL_THRESHOLD:
+        metrics.counter("streamlink_output_write_stalls_total").inc()
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, _HTTPServer):
+    daemon_threads = True
+
+
+class MetricsServer(Thread):
+    """Serves the metrics of a session to Prometheus scrapers."""
+
+    def __init__(self, metrics, host="127.0.0.1", port=0):
+        self.metrics = metrics
+        metrics.enable()
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+
+                body = format_metrics(metrics).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # don't log the requests of scrapers
+                pass
+
+        self.server = _ThreadingHTTPServer((host or "", port), Handler)
+        self.host, self.port = self.server.server_address[:2]
+
+        Thread.__init__(self, name="Thread-{0}".format(self.__class__.__name__))
+        self.daemon = True
+
+    @property
+    def url(self):
+        return "http://{0}:{1}/metrics".format(self.host if self.host != "0.0.0.0" else "127.0.0.1", self.port)
+
+    def run(self):
+        self.server.serve_forever()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class MetricsFile(Thread):
+    """Periodically writes the metrics of a session to a file, eg. for the textfile collector of node_exporter.
+
+    The file gets replaced atomically, so that readers never see a partially written file.
+    """
+
+    def __init__(self, metrics, path, interval=15.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._closed = Event()
+        metrics.enable()
+
+        Thread.__init__(self, name="Thread-{0}".format(self.__class__.__name__))
+        self.daemon = True
+
+    def write(self):
+        tmp_path = "{0}.{1}.tmp".format(self.path, os.getpid())
+        try:
+            with open(tmp_path, "wb") as fd:
+                fd.write(format_metrics(self.metrics).encode("utf-8"))
+            if hasattr(os, "replace"):
+                os.replace(tmp_path, self.path)
+            else:
+                if os.name == "nt" and os.path.exists(self.path):
+                    os.unlink(self.path)
+                os.rename(tmp_path, self.path)
+        except (IOError, OSError) as err:
+            log.error("Failed to write the metrics file: {0}", err)
+
+    def run(self):
+        deadline = time()
+        while not self._closed.is_set():
+            self.write()
+            deadline += self.interval
+            self._closed.wait(max(deadline - time(), 0))
+
+    def close(self):
+        self._closed.set()
+        if self.is_alive():
+            self.join()
+        # always end with the final values
+        self.write()
+
+
+__all__ = ["MetricsFile", "MetricsServer", "format_metrics", "record_output_write"]
@@ -107,13 +107,15 @@ def create_status_line(**params):
     return status
 
 
-def progress(iterator, prefix):
+def progress(iterator, prefix, size=len):
     """Progress an iterator and updates a pretty status line to the terminal.
 
     The status line contains:
      - Amount of data read from the iterator
      - Time elapsed
      - Average speed, based on the last few seconds.
+
+    The size function returns the number of bytes of each item of the iterator.
     """
     if terminal_width(prefix) > 25:
         prefix = (".." + get_cut_prefix(prefix, 23))
@@ -126,7 +128,7 @@ def progress(iterator, prefix):
 
         now = time()
         elapsed = now - start
-        written += len(data)
+        written += size(data)
 
         speed_elapsed = now - speed_updated
         if speed_elapsed >= 0.5:
@@ -1,3 +1,4 @@
+import json
 import unittest
 from datetime import datetime, timedelta
 
@@ -658,3 +659,126 @@ class TestTwitchReruns(unittest.TestCase):
     def test_enable_reruns(self, mock_log):
         self.assertFalse(self.subject(stream_type="rerun", disable=False))
         self.assertNotIn(self.log_call, mock_log.info.call_args_list)
+
+
+class TestTwitchAPIBatching(unittest.TestCase):
+    def setUp(self):
+        self.mock = requests_mock.Mocker()
+        self.mock.register_uri(requests_mock.ANY, requests_mock.ANY, exc=requests_mock.exceptions.InvalidRequest)
+        self.mock.start()
+        self.session = Streamlink()
+        Twitch.bind(self.session, "tests.plugins.test_twitch")
+
+    def tearDown(self):
+        self.mock.stop()
+
+    @staticmethod
+    def token(expires):
+        return json.dumps({"expires": expires, "chansub": {"restricted_bitrates": []}})
+
+    def response_token(self, expires=2000000000, key="streamPlaybackAccessToken"):
+        return {"data": {key: {"value": self.token(expires), "signature": "sig", "__typename": "PlaybackAccessToken"}}}
+
+    @staticmethod
+    def response_hosting():
+        return {"data": {"user": {"id": "1", "hosting": None}}}
+
+    @staticmethod
+    def response_metadata_channel():
+        return [
+            {"data": {"userOrError": {"displayName": "channel name"}}},
+            {"data": {"user": {
+                "lastBroadcast": {"title": "channel status"},
+                "stream": {"id": "stream id", "game": {"name": "channel game"}}
+            }}}
+        ]
+
+    def subject(self, url):
+        plugin = Twitch(url)
+        plugin._get_hls_streams = MagicMock(return_value={})
+        plugin.usher.channel = MagicMock(return_value="https://usher/channel.m3u8")
+        plugin.usher.video = MagicMock(return_value="https://usher/video.m3u8")
+
+        return plugin
+
+    def test_live_batch(self):
+        mock = self.mock.post("https://gql.twitch.tv/gql", json=[
+            self.response_hosting(),
+            self.response_token(),
+        ] + self.response_metadata_channel())
+        plugin = self.subject("https://twitch.tv/foo")
+        plugin._get_hls_streams_live()
+        self.assertEqual(plugin.get_title(), "channel status")
+        self.assertEqual(mock.call_count, 1, "Sends all queries in a single request")
+        self.assertEqual([query["operationName"] for query in mock.request_history[0].json()], [
+            "UseHosting",
+            "PlaybackAccessToken",
+            "ChannelShell",
+            "StreamMetadata",
+        ])
+        plugin.usher.channel.assert_called_once_with("foo", sig="sig", token=self.token(2000000000), fast_bread=True)
+
+    def test_live_batch_invalid_response(self):
+        mock = self.mock.post("https://gql.twitch.tv/gql", response_list=[
+            {"json": {"error": "invalid"}},
+            {"json": self.response_hosting()},
+            {"json": self.response_token()},
+        ])
+        plugin = self.subject("https://twitch.tv/foo")
+        plugin._get_hls_streams_live()
+        self.assertEqual(mock.call_count, 3, "Falls back to individual requests")
+        self.assertEqual(mock.request_history[2].json()["operationName"], "PlaybackAccessToken")
+        plugin.usher.channel.assert_called_once_with("foo", sig="sig", token=self.token(2000000000), fast_bread=True)
+
+    def test_video_batch(self):
+        mock = self.mock.post("https://gql.twitch.tv/gql", json=[
+            self.response_token(key="videoPlaybackAccessToken"),
+            {"data": {"video": {
+                "id": "video id",
+                "title": "video title",
+                "game": {"displayName": "video game"},
+                "owner": {"displayName": "channel name"}
+            }}},
+        ])
+        plugin = self.subject("https://twitch.tv/videos/1337")
+        plugin._get_hls_streams_video()
+        self.assertEqual(plugin.get_title(), "video title")
+        self.assertEqual(mock.call_count, 1, "Sends all queries in a single request")
+        self.assertEqual([query["operationName"] for query in mock.request_history[0].json()], [
+            "PlaybackAccessToken",
+            "VideoMetadata",
+        ])
+
+    @patch("streamlink.plugins.twitch.time", MagicMock(return_value=1000000000))
+    def test_access_token_reuse(self):
+        mock = self.mock.post("https://gql.twitch.tv/gql", response_list=[
+            {"json": [self.response_hosting(), self.response_token(1000000600)] + self.response_metadata_channel()},
+            {"json": self.response_hosting()},
+        ])
+        plugin = self.subject("https://twitch.tv/foo")
+        plugin._get_hls_streams_live()
+        plugin.get_title()
+        plugin._get_hls_streams_live()
+        self.assertEqual(mock.call_count, 2)
+        self.assertEqual(mock.request_history[1].json()["operationName"], "UseHosting", "Reuses the valid access token")
+        self.assertEqual(plugin.usher.channel.call_count, 2)
+
+    @patch("streamlink.plugins.twitch.time", MagicMock(return_value=1000000000))
+    def test_access_token_expired(self):
+        mock = self.mock.post("https://gql.twitch.tv/gql", response_list=[
+            {"json": [self.response_hosting(), self.response_token(1000000030)] + self.response_metadata_channel()},
+            {"json": [self.response_hosting(), self.response_token(1000000600)]},
+        ])
+        plugin = self.subject("https://twitch.tv/foo")
+        plugin._get_hls_streams_live()
+        plugin.get_title()
+        plugin._get_hls_streams_live()
+        self.assertEqual(mock.call_count, 2)
+        self.assertEqual([query["operationName"] for query in mock.request_history[1].json()], [
+            "UseHosting",
+            "PlaybackAccessToken",
+        ], "Refreshes access tokens which are about to expire")
+        self.assertEqual(plugin.usher.channel.call_args_list, [
+            call("foo", sig="sig", token=self.token(1000000030), fast_bread=True),
+            call("foo", sig="sig", token=self.token(1000000600), fast_bread=True),
+        ])
@@ -1,7 +1,7 @@
 import unittest
 
 from streamlink import PluginError
-from streamlink.stream.dash import DASHStream, DASHStreamWorker
+from streamlink.stream.dash import DASHStream, DASHStreamReader, DASHStreamWorker
 from streamlink.stream.dash_manifest import MPD
 from tests.mock import ANY, MagicMock, Mock, call, patch
 from tests.resources import text, xml
@@ -241,6 +241,65 @@ class TestDASHStream(unittest.TestCase):
         self.assertSequenceEqual(muxer.mock_calls, [call(self.session, open_reader, open_reader, copyts=True),
                                                     call().open()])
 
+    @patch('streamlink.stream.dash.DASHStreamReader')
+    @patch('streamlink.stream.dash.FMP4Muxer')
+    @patch('streamlink.stream.dash.FFMPEGMuxer')
+    def test_stream_open_video_audio_fmp4(self, muxer, fmp4muxer, reader):
+        self.session.options.get.side_effect = lambda key: "fmp4" if key == "dash-muxer" else None
+        stream = DASHStream(self.session, Mock(), Mock(id=1, mimeType="video/mp4"), Mock(id=2, mimeType="audio/mp4", lang='en'))
+        fmp4muxer.is_supported.return_value = True
+        open_reader = reader.return_value = Mock()
+
+        stream.open()
+
+        fmp4muxer.is_supported.assert_called_with("video/mp4", "audio/mp4")
+        self.assertSequenceEqual(fmp4muxer.mock_calls[1:], [call(self.session, open_reader, open_reader),
+                                                            call().open()])
+        muxer.assert_not_called()
+
+    @patch('streamlink.stream.dash.DASHStreamReader')
+    @patch('streamlink.stream.dash.FMP4Muxer')
+    @patch('streamlink.stream.dash.FFMPEGMuxer')
+    def test_stream_open_video_audio_fmp4_unsupported(self, muxer, fmp4muxer, reader):
+        self.session.options.get.side_effect = lambda key: "fmp4" if key == "dash-muxer" else None
+        stream = DASHStream(self.session, Mock(), Mock(id=1, mimeType="video/webm"),
+                            Mock(id=2, mimeType="audio/webm", lang="en"))
+        fmp4muxer.is_supported.return_value = False
+        open_reader = reader.return_value = Mock()
+
+        stream.open()
+
+        self.assertSequenceEqual(fmp4muxer.mock_calls, [call.is_supported("video/webm", "audio/webm")])
+        self.assertSequenceEqual(muxer.mock_calls, [call(self.session, open_reader, open_reader, copyts=True),
+                                                    call().open()])
+
+    @patch('streamlink.stream.dash.log')
+    @patch('streamlink.stream.dash.DASHStreamReader')
+    @patch('streamlink.stream.dash.FMP4Muxer')
+    @patch('streamlink.stream.dash.FFMPEGMuxer')
+    def test_stream_open_video_audio_fmp4_ffmpeg_options(self, muxer, fmp4muxer, reader, mock_log):
+        for option, value in (("ffmpeg-fout", "mpegts"), ("ffmpeg-video-transcode", "h264"),
+                              ("ffmpeg-audio-transcode", "aac"), ("ffmpeg-copyts", True)):
+            options = {"dash-muxer": "fmp4", option: value}
+            self.session.options.get.side_effect = options.get
+            stream = DASHStream(self.session, Mock(), Mock(id=1, mimeType="video/mp4"),
+                                Mock(id=2, mimeType="audio/mp4", lang="en"))
+            fmp4muxer.is_supported.return_value = True
+            open_reader = reader.return_value = Mock()
+            muxer.reset_mock()
+
+            stream.open()
+
+            fmp4muxer.assert_not_called()
+            self.assertSequenceEqual(muxer.mock_calls, [call(self.session, open_reader, open_reader, copyts=True),
+                                                        call().open()], option)
+            mock_log.debug.assert_called_with("FFmpeg output, transcode or copyts options are set, falling back to FFmpeg")
+
+    def test_reader_metrics_labels(self):
+        stream = DASHStream(self.session, Mock(), Mock(id=1, mimeType="video/mp4"), Mock(id=2, mimeType="audio/mp4"))
+        self.assertEqual(DASHStreamReader(stream, 1, "video/mp4").metrics_labels, {"stream": "dash", "track": "video"})
+        self.assertEqual(DASHStreamReader(stream, 2, "audio/mp4").metrics_labels, {"stream": "dash", "track": "audio"})
+
     @patch('streamlink.stream.dash.MPD')
     def test_segments_number_time(self, mpdClass):
         with xml("dash/test_9.mpd") as mpd_xml:
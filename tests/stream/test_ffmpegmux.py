@@ -1,7 +1,11 @@
+import io
+import os
+
 import pytest
 
 from streamlink.stream.ffmpegmux import FFMPEGMuxer
-from tests.mock import ANY, patch
+from streamlink.utils.named_pipe import AnonymousPipe
+from tests.mock import ANY, Mock, call, patch
 
 
 @pytest.fixture
@@ -291,3 +295,85 @@ def test_ffmpeg_open_metadata_title(session):
                                      stderr=ANY,
                                      stdout=ANY,
                                      stdin=ANY)
+
+
+def test_ffmpeg_open_anonymous_pipes(session):
+    with patch('streamlink.stream.ffmpegmux.which', return_value="ffmpeg"), \
+         patch('streamlink.stream.ffmpegmux.FFMPEGMuxer.ANONYMOUS_PIPES', True), \
+         patch('streamlink.stream.ffmpegmux.FFMPEGMuxer.copy_to_pipe'), \
+         patch('streamlink.stream.ffmpegmux.AnonymousPipe') as mock_pipe:
+        pipes = [Mock(path="pipe:5", read_fd=5), Mock(path="pipe:6", read_fd=6)]
+        mock_pipe.side_effect = pipes
+        f = FFMPEGMuxer(session, Mock(), Mock())
+        assert mock_pipe.call_args_list == [call(size=FFMPEGMuxer.PIPE_SIZE)] * 2
+        with patch('subprocess.Popen') as popen:
+            f.open()
+            popen.assert_called_with(['ffmpeg', '-nostats', '-y', '-i', 'pipe:5', '-i', 'pipe:6',
+                                      '-c:v', FFMPEGMuxer.DEFAULT_VIDEO_CODEC, '-c:a', FFMPEGMuxer.DEFAULT_AUDIO_CODEC,
+                                      '-f', 'matroska', 'pipe:1'],
+                                     stderr=ANY,
+                                     stdout=ANY,
+                                     stdin=ANY,
+                                     pass_fds=[5, 6])
+        for pipe in pipes:
+            pipe.close_read_end.assert_called_once_with()
+
+
+def test_ffmpeg_open_anonymous_pipes_thread_order(session):
+    with patch('streamlink.stream.ffmpegmux.which', return_value="ffmpeg"), \
+         patch('streamlink.stream.ffmpegmux.FFMPEGMuxer.ANONYMOUS_PIPES', True), \
+         patch('streamlink.stream.ffmpegmux.AnonymousPipe') as mock_pipe:
+        manager = Mock()
+        pipe = manager.pipe
+        pipe.configure_mock(path="pipe:5", read_fd=5)
+        mock_pipe.return_value = pipe
+        f = FFMPEGMuxer(session, Mock())
+        with patch('subprocess.Popen', manager.popen), \
+             patch.object(f, '_start_pipe_threads', manager.start_pipe_threads):
+            f.open()
+        assert [name for name, args, kwargs in manager.mock_calls] == ["popen", "pipe.close_read_end", "start_pipe_threads"], \
+            "Starts the copy threads once ffmpeg has inherited the read ends and they have been closed"
+
+
+def test_ffmpeg_open_anonymous_pipes_popen_error(session):
+    with patch('streamlink.stream.ffmpegmux.which', return_value="ffmpeg"), \
+         patch('streamlink.stream.ffmpegmux.FFMPEGMuxer.ANONYMOUS_PIPES', True), \
+         patch('streamlink.stream.ffmpegmux.AnonymousPipe') as mock_pipe:
+        pipes = [Mock(path="pipe:5", read_fd=5), Mock(path="pipe:6", read_fd=6)]
+        mock_pipe.side_effect = pipes
+        f = FFMPEGMuxer(session, Mock(), Mock())
+        with patch('subprocess.Popen', side_effect=OSError("No such file or directory")), \
+             patch.object(f, '_start_pipe_threads') as mock_start_pipe_threads:
+            with pytest.raises(OSError):
+                f.open()
+        assert not mock_start_pipe_threads.called
+        for pipe in pipes:
+            pipe.close.assert_called_once_with()
+
+
+@pytest.mark.skipif(not AnonymousPipe.is_supported(), reason="test only applicable on a POSIX OS with Python 3")
+def test_copy_to_anonymous_pipe():
+    pipe = AnonymousPipe()
+    read_fd = pipe.read_fd
+    FFMPEGMuxer.copy_to_pipe(io.BytesIO(b"foo"), pipe)
+    assert pipe.write_fd is None, "Closes the write end"
+    assert pipe.read_fd == read_fd, "Doesn't close the read end, which gets inherited by ffmpeg"
+    assert os.read(read_fd, 1024) == b"foo"
+    pipe.close()
+
+
+def test_ffmpeg_open_named_pipes(session):
+    with patch('streamlink.stream.ffmpegmux.which', return_value="ffmpeg"), \
+         patch('streamlink.stream.ffmpegmux.FFMPEGMuxer.ANONYMOUS_PIPES', False), \
+         patch('streamlink.stream.ffmpegmux.FFMPEGMuxer.copy_to_pipe'), \
+         patch('streamlink.stream.ffmpegmux.NamedPipe') as mock_pipe:
+        mock_pipe.return_value = Mock(path="/tmp/pipe")
+        f = FFMPEGMuxer(session, Mock())
+        with patch('subprocess.Popen') as popen:
+            f.open()
+            popen.assert_called_with(['ffmpeg', '-nostats', '-y', '-i', '/tmp/pipe',
+                                      '-c:v', FFMPEGMuxer.DEFAULT_VIDEO_CODEC, '-c:a', FFMPEGMuxer.DEFAULT_AUDIO_CODEC,
+                                      '-f', 'matroska', 'pipe:1'],
+                                     stderr=ANY,
+                                     stdout=ANY,
+                                     stdin=ANY)
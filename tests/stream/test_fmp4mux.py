@@ -0,0 +1,132 @@
+import struct
+import unittest
+from io import BytesIO
+
+from streamlink.stream.fmp4mux import Box, FMP4Muxer, TFHD_BASE_DATA_OFFSET_PRESENT
+from tests.mock import Mock
+
+
+def fullbox(type, version=0, flags=0, payload=b""):
+    return Box(type, struct.pack(">I", (version << 24) | flags) + payload)
+
+
+def init_segment(track_id, timescale, movie_timescale=1000, duration=0):
+    tkhd = fullbox(b"tkhd", payload=struct.pack(">IIIII", 0, 0, track_id, 0, duration) + b"\x00" * 60)
+    mdhd = fullbox(b"mdhd", payload=struct.pack(">IIII", 0, 0, timescale, 0) + b"\x00" * 4)
+    elst = fullbox(b"elst", payload=struct.pack(">IIiI", 1, duration, 0, 0x10000))
+    trak = Box(b"trak", children=[tkhd, Box(b"edts", children=[elst]), Box(b"mdia", children=[mdhd])])
+    mvhd = fullbox(b"mvhd", payload=struct.pack(">III", 0, 0, movie_timescale) + b"\x00" * 84 + struct.pack(">I", track_id + 1))
+    trex = fullbox(b"trex", payload=struct.pack(">IIIII", track_id, 1, 0, 0, 0))
+    moov = Box(b"moov", children=[mvhd, trak, Box(b"mvex", children=[trex])])
+
+    return Box(b"ftyp", b"iso6\x00\x00\x00\x00").serialize() + moov.serialize()
+
+
+def fragment(track_id, sequence_number, decode_time, data, base_data_offset=None):
+    mfhd = fullbox(b"mfhd", payload=struct.pack(">I", sequence_number))
+    if base_data_offset is None:
+        tfhd = fullbox(b"tfhd", flags=0x020000, payload=struct.pack(">I", track_id))
+    else:
+        tfhd = fullbox(b"tfhd", flags=TFHD_BASE_DATA_OFFSET_PRESENT, payload=struct.pack(">IQ", track_id, base_data_offset))
+    tfdt = fullbox(b"tfdt", version=1, payload=struct.pack(">Q", decode_time))
+    moof = Box(b"moof", children=[mfhd, Box(b"traf", children=[tfhd, tfdt])])
+
+    return moof.serialize() + Box(b"mdat", data).serialize()
+
+
+def parse(data):
+    boxes = []
+    while data:
+        size, type = struct.unpack(">I4s", data[:8])
+        boxes.append(Box.parse(type, data[8:size]))
+        data = data[size:]
+
+    return boxes
+
+
+class TestFMP4Muxer(unittest.TestCase):
+    def subject(self, *streams):
+        muxer = FMP4Muxer(Mock(), *[BytesIO(stream) for stream in streams]).open()
+        data = b"".join(iter(lambda: muxer.read(8192), b""))
+        muxer.close()
+
+        return parse(data)
+
+    def test_is_supported(self):
+        self.assertTrue(FMP4Muxer.is_supported("video/mp4", "audio/mp4"))
+        self.assertFalse(FMP4Muxer.is_supported("video/webm", "audio/mp4"))
+
+    def test_merge_init_segments(self):
+        boxes = self.subject(
+            init_segment(1, 90000),
+            init_segment(1, 48000, movie_timescale=48000, duration=96000),
+        )
+        self.assertEqual([box.type for box in boxes], [b"ftyp", b"moov"])
+
+        moov = boxes[1]
+        self.assertEqual([child.type for child in moov.children], [b"mvhd", b"trak", b"trak", b"mvex"])
+        traks = moov.find_all(b"trak")
+        self.assertEqual([trak.find(b"tkhd").get_uint(12, 4) for trak in traks], [1, 2], "Renumbers the track IDs")
+        self.assertEqual(traks[1].find(b"tkhd").get_uint(20, 4), 2000, "Rescales the track duration")
+        self.assertEqual(traks[1].find(b"edts").find(b"elst").get_uint(8, 4), 2000, "Rescales the edit list")
+        self.assertEqual([trex.get_uint(4, 4) for trex in moov.find(b"mvex").find_all(b"trex")], [1, 2])
+        mvhd = moov.find(b"mvhd")
+        self.assertEqual(mvhd.get_uint(len(mvhd.payload) - 4, 4), 3, "Updates the next track ID")
+
+    def test_interleave_fragments(self):
+        video = init_segment(1, 90000) + b"".join(
+            fragment(1, n + 1, n * 180000, "video{0}".format(n).encode("ascii")) for n in range(3)
+        )
+        audio = init_segment(1, 48000) + b"".join(
+            fragment(1, n + 1, n * 48000, "audio{0}".format(n).encode("ascii")) for n in range(5)
+        )
+        boxes = self.subject(video, audio)
+
+        mdats = [box.payload for box in boxes if box.type == b"mdat"]
+        self.assertEqual(mdats, [
+            b"video0", b"audio0", b"audio1", b"video1", b"audio2", b"audio3", b"video2", b"audio4",
+        ], "Interleaves fragments by their decode time")
+
+        moofs = [box for box in boxes if box.type == b"moof"]
+        self.assertEqual([moof.find(b"mfhd").get_uint(4, 4) for moof in moofs], list(range(1, 9)))
+        self.assertEqual(
+            [moof.find(b"traf").find(b"tfhd").get_uint(4, 4) for moof in moofs],
+            [1, 2, 2, 1, 2, 2, 1, 2],
+            "Rewrites the track IDs of the fragments",
+        )
+
+    def test_skip_index_boxes(self):
+        video = init_segment(1, 90000) + Box(b"sidx", b"\x00" * 24).serialize() + fragment(1, 1, 0, b"video")
+        audio = init_segment(1, 48000) + Box(b"styp", b"msdh").serialize() + fragment(1, 1, 0, b"audio")
+        boxes = self.subject(video, audio)
+
+        self.assertEqual([box.type for box in boxes], [b"ftyp", b"moov", b"moof", b"mdat", b"styp", b"moof", b"mdat"])
+
+    def test_base_data_offset(self):
+        video_init = init_segment(1, 90000)
+        audio_init = init_segment(1, 48000)
+        video = video_init + fragment(1, 1, 0, b"video", base_data_offset=len(video_init))
+        audio = audio_init + fragment(1, 1, 1, b"audio", base_data_offset=len(audio_init))
+        boxes = self.subject(video, audio)
+
+        offset = 0
+        positions = []
+        for box in boxes:
+            if box.type == b"moof":
+                tfhd = box.find(b"traf").find(b"tfhd")
+                positions.append((offset, tfhd.get_uint(8, 8)))
+            offset += len(box.serialize())
+        self.assertEqual(len(positions), 2)
+        self.assertTrue(all(position == base for position, base in positions), "Moves absolute base data offsets")
+
+    def test_missing_init_segment(self):
+        muxer = FMP4Muxer(Mock(), BytesIO(fragment(1, 1, 0, b"video")), BytesIO(b""))
+        with self.assertRaises(IOError):
+            muxer.read(8192)
+
+    def test_close(self):
+        streams = [Mock(), Mock()]
+        muxer = FMP4Muxer(Mock(), *streams)
+        muxer.close()
+        self.assertTrue(muxer.closed)
+        self.assertTrue(all(stream.close.called for stream in streams))
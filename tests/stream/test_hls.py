@@ -5,8 +5,10 @@ import pytest
 import requests_mock
 
 from streamlink.compat import str
+from streamlink.exceptions import StreamError
 from streamlink.session import Streamlink
-from streamlink.stream.hls import HLSStream, HLSStreamReader
+from streamlink.stream.hls import HLSStream, HLSStreamReader, HLSStreamWriter, MuxedHLSStream, Sequence
+from streamlink.stream.hls_playlist import load as load_hls_playlist
 from streamlink.utils.crypto import AES, pad
 from tests.mixins.stream_hls import EventedHLSStreamWriter, Playlist, Segment, Tag, TestMixinStreamHLS
 from tests.mock import Mock, call, patch
@@ -128,6 +130,145 @@ class TestHLSStream(TestMixinStreamHLS, unittest.TestCase):
         self.assertFalse(any([self.called(s) for s in segments.values() if 0 > s.num > 3]), "Skips other segments")
 
 
+@patch("streamlink.stream.hls.HLSStreamWorker.wait", Mock(return_value=True))
+class TestHLSStreamMap(TestMixinStreamHLS, unittest.TestCase):
+    def mock_maps(self, *maps):
+        for map_ in maps:
+            self.mock("GET", self.url(map_), content=map_.content)
+
+    def test_map(self):
+        map1 = TagMap(1, self.id())
+        map2 = TagMap(2, self.id())
+        self.mock_maps(map1, map2)
+
+        thread, segments = self.subject([
+            Playlist(0, [map1, Segment(0), Segment(1), map2, Segment(2), Segment(3)], end=True)
+        ])
+
+        data = self.await_read(read_all=True)
+        self.assertEqual(data, self.content([
+            map1, segments[0], segments[1], map2, segments[2], segments[3]
+        ]), "Writes the maps only before the first segment and whenever they change")
+        self.assertEqual(self.get_mock(map1).call_count, 1)
+        self.assertEqual(self.get_mock(map2).call_count, 1)
+
+    def test_map_discontinuity(self):
+        map1 = TagMap(1, self.id())
+        self.mock_maps(map1)
+
+        thread, segments = self.subject([
+            Playlist(0, [map1, Segment(0), Segment(1), Tag("EXT-X-DISCONTINUITY"), map1, Segment(2)], end=True)
+        ])
+
+        data = self.await_read(read_all=True)
+        self.assertEqual(data, self.content([
+            map1, segments[0], segments[1], map1, segments[2]
+        ]), "Writes the map again after a discontinuity")
+        self.assertEqual(self.get_mock(map1).call_count, 1, "Fetches the map only once")
+
+    def test_map_byterange(self):
+        map1 = TagMap(1, self.id(), {"BYTERANGE": "\"5@0\""})
+        self.mock_maps(map1)
+
+        thread, segments = self.subject([
+            Playlist(0, [map1, Segment(0), Segment(1)], end=True)
+        ])
+
+        data = self.await_read(read_all=True)
+        self.assertEqual(data, self.content([map1, segments[0], segments[1]]))
+        self.assertEqual(self.get_mock(map1).last_request.headers["Range"], "bytes=0-4")
+
+    def test_map_failed(self):
+        map1 = TagMap(1, self.id())
+        self.mock("GET", self.url(map1), [{"status_code": 404}, {"status_code": 404}, {"content": map1.content}])
+        session = Streamlink({"stream-segment-attempts": 1})
+        playlist = load_hls_playlist(
+            Playlist(0, [map1, Segment(0), Segment(1)], end=True).build(self.id()),
+            base_uri="http://mocked/{0}/".format(self.id())
+        )
+        writer = HLSStreamWriter(HLSStreamReader(HLSStream(session, "http://mocked/{0}/".format(self.id()))))
+        try:
+            writer.put(Sequence(0, playlist.segments[0]))
+            sequence, map_future = writer.futures.get_nowait()
+            self.assertIsNone(map_future.result(timeout=5), "Fails fetching the map")
+            writer.futures.get_nowait()
+
+            writer.put(Sequence(1, playlist.segments[1]))
+            sequence, map_future = writer.futures.get_nowait()
+            self.assertEqual(sequence.num, 1)
+            self.assertEqual(map_future.result(timeout=5), map1.content, "Fetches the map again with the next segment")
+            self.assertEqual(self.get_mock(map1).call_count, 3)
+        finally:
+            writer.executor.shutdown(wait=True)
+
+
+class SegmentRange(Segment):
+    def __init__(self, num, offset, *args, **kwargs):
+        super(SegmentRange, self).__init__(num, *args, **kwargs)
+        self.offset = offset
+        self.content = "[segment-{0}]".format(self.num).encode("ascii")
+
+    def build(self, namespace):
+        return "#EXT-X-BYTERANGE:{length}@{offset}\n#EXTINF:{duration:.3f},\nresource.ts".format(
+            length=len(self.content),
+            offset=self.offset,
+            duration=self.duration,
+        )
+
+
+@patch("streamlink.stream.hls.HLSStreamWorker.wait", Mock(return_value=True))
+class TestHLSStreamByterangeCoalescing(TestMixinStreamHLS, unittest.TestCase):
+    def subject(self, num, options=None):
+        segments = []
+        offset = 0
+        for n in range(num):
+            segment = SegmentRange(n, offset)
+            segments.append(segment)
+            offset += len(segment.content)
+        resource = self.content(segments)
+
+        self.ranges = []
+
+        def callback(request, context):
+            start, end = map(int, request.headers["Range"][len("bytes="):].split("-"))
+            self.ranges.append((start, end))
+            context.status_code = 206
+            return resource[start:end + 1]
+
+        self.mocker.get("http://mocked/{0}/resource.ts".format(self.id()), content=callback)
+
+        return super(TestHLSStreamByterangeCoalescing, self).subject(
+            [Playlist(0, segments, end=True)],
+            options=options,
+        )
+
+    def test_disabled(self):
+        thread, segments = self.subject(4)
+
+        data = self.await_read(read_all=True)
+        self.assertEqual(data, self.content(segments))
+        self.assertEqual(len(self.ranges), 4, "Requests each segment separately")
+
+    def test_coalesce(self):
+        thread, segments = self.subject(4, {"hls-segment-coalesce-size": 1024})
+
+        data = self.await_read(read_all=True)
+        self.assertEqual(data, self.content(segments))
+        self.assertEqual(self.ranges, [(0, len(data) - 1)], "Requests all segments at once")
+
+    def test_coalesce_size_limit(self):
+        thread, segments = self.subject(5, {"hls-segment-coalesce-size": 30})
+
+        data = self.await_read(read_all=True)
+        self.assertEqual(data, self.content(segments))
+        size = len(segments[0].content)
+        self.assertEqual(self.ranges, [
+            (0, 2 * size - 1),
+            (2 * size, 4 * size - 1),
+            (4 * size, 5 * size - 1),
+        ], "Splits the requests by the size limit")
+
+
 @patch("streamlink.stream.hls.HLSStreamWorker.wait", Mock(return_value=True))
 class TestHLSStreamEncrypted(TestMixinStreamHLS, unittest.TestCase):
     __stream__ = EventedHLSStream
@@ -286,6 +427,36 @@ class TestHLSStreamEncrypted(TestMixinStreamHLS, unittest.TestCase):
         assert data == self.content([segments[1]], prop="content_plain")
         assert mock_log.error.mock_calls == [call("Error while decrypting segment 0: PKCS#7 padding is incorrect.")]
 
+    def test_hls_encrypted_aes128_map(self):
+        aesKey, aesIv, key = self.gen_key()
+        map1 = TagMapEnc(1, aesKey, aesIv, self.id())
+        self.mock("GET", self.url(map1), content=map1.content)
+
+        # noinspection PyTypeChecker
+        thread, segments = self.subject([
+            Playlist(0, [key, map1] + [SegmentEnc(num, aesKey, aesIv) for num in range(0, 2)], end=True)
+        ])
+
+        self.await_write(1 + 2)
+        data = self.await_read(read_all=True)
+        expected = map1.content_plain + self.content(segments, prop="content_plain")
+        self.assertEqual(data, expected, "Decrypts the map and the segments")
+
+    def test_hls_encrypted_aes128_unencrypted_map(self):
+        aesKey, aesIv, key = self.gen_key()
+        map1 = TagMap(1, self.id())
+        self.mock("GET", self.url(map1), content=map1.content)
+
+        # noinspection PyTypeChecker
+        thread, segments = self.subject([
+            Playlist(0, [map1, key] + [SegmentEnc(num, aesKey, aesIv) for num in range(0, 2)], end=True)
+        ])
+
+        self.await_write(1 + 2)
+        data = self.await_read(read_all=True)
+        expected = map1.content + self.content(segments, prop="content_plain")
+        self.assertEqual(data, expected, "Only decrypts the map if a key was in effect at its EXT-X-MAP tag")
+
 
 @patch("streamlink.stream.hls.HLSStreamWorker.wait", Mock(return_value=True))
 @patch("streamlink.stream.hls.HLSStreamWriter.run", Mock(return_value=True))
@@ -450,3 +621,128 @@ class TestHlsExtAudio(unittest.TestCase):
 
         # Check result
         self.assertEqual(result, expected)
+
+
+class TestHLSStreamMetrics(unittest.TestCase):
+    def test_events(self):
+        session = Streamlink()
+        events = []
+        session.metrics.subscribe(events.append)
+        with requests_mock.Mocker() as mocker:
+            mocker.get("http://test/playlist.m3u8", text=(
+                "#EXTM3U\n#EXT-X-TARGETDURATION:2\n#EXTINF:2.000,\n0.ts\n#EXTINF:2.000,\n1.ts\n#EXT-X-ENDLIST\n"
+            ))
+            mocker.get("http://test/0.ts", content=b"foo")
+            mocker.get("http://test/1.ts", content=b"barbaz")
+
+            reader = HLSStream(session, "http://test/playlist.m3u8").open()
+            data = b"".join(iter(lambda: reader.read(8192), b""))
+            reader.close()
+
+        self.assertEqual(data, b"foobarbaz")
+        self.assertEqual(events[0].name, "playlist.reload")
+        self.assertEqual(events[0].labels, {"stream": "hls"})
+        for num in 0, 1:
+            self.assertEqual([event.name for event in events if event.data.get("segment") == num], [
+                "segment.queued",
+                "segment.request",
+                "segment.first_byte",
+                "segment.complete",
+                "segment.written",
+                "segment.consumed",
+            ])
+        self.assertEqual([event.data["size"] for event in events if event.name == "segment.written"], [3, 6])
+
+        metrics = dict((name, metric) for name, labels, metric in session.metrics.collect())
+        self.assertEqual(metrics["streamlink_segments_total"].value, 2)
+        self.assertEqual(metrics["streamlink_segment_bytes_total"].value, 9)
+        self.assertEqual(metrics["streamlink_segment_download_seconds"].count, 2)
+        self.assertEqual(metrics["streamlink_playlist_reload_seconds"].count, 1)
+        self.assertEqual(metrics["streamlink_buffer_size_bytes"].value, session.get_option("ringbuffer-size"))
+
+
+class TestMuxedHLSStream(unittest.TestCase):
+    def setUp(self):
+        self.session = Streamlink()
+        self.session.set_option("hls-muxer", "ts")
+        self.stream = MuxedHLSStream(self.session, video="http://test/video.m3u8", audio=["http://test/audio.m3u8"])
+        self.readers = [Mock(), Mock()]
+
+    @patch("streamlink.stream.hls.HLSStream.open")
+    @patch("streamlink.stream.ffmpegmux.FFMPEGMuxer")
+    @patch("streamlink.stream.hls.TSMuxer")
+    def test_open_ts_muxer(self, tsmuxer, ffmpegmuxer, hlsstream_open):
+        hlsstream_open.side_effect = self.readers
+
+        self.assertIs(self.stream.open(), tsmuxer.return_value.open.return_value)
+        self.assertSequenceEqual(tsmuxer.mock_calls, [call(self.session, *self.readers), call().open()])
+        ffmpegmuxer.assert_not_called()
+
+    @patch("streamlink.stream.hls.HLSStream.open")
+    @patch("streamlink.stream.hls.FFMPEGMuxer.is_usable", Mock(return_value=True))
+    @patch("streamlink.stream.ffmpegmux.FFMPEGMuxer")
+    @patch("streamlink.stream.hls.TSMuxer")
+    def test_open_ts_muxer_fallback(self, tsmuxer, ffmpegmuxer, hlsstream_open):
+        reopened = [Mock(), Mock()]
+        hlsstream_open.side_effect = self.readers + reopened
+        tsmuxer.return_value.open.side_effect = StreamError("Input stream 1 is not an MPEG-TS stream")
+
+        self.assertIs(self.stream.open(), ffmpegmuxer.return_value.open.return_value)
+        for reader in self.readers:
+            reader.close.assert_called_once_with()
+        self.assertEqual(ffmpegmuxer.call_args[0], (self.session,) + tuple(reopened), "Reopens the substreams")
+
+    @patch("streamlink.stream.hls.HLSStream.open")
+    @patch("streamlink.stream.hls.FFMPEGMuxer.is_usable", Mock(return_value=False))
+    @patch("streamlink.stream.ffmpegmux.FFMPEGMuxer")
+    @patch("streamlink.stream.hls.TSMuxer")
+    def test_open_ts_muxer_fallback_no_ffmpeg(self, tsmuxer, ffmpegmuxer, hlsstream_open):
+        hlsstream_open.side_effect = self.readers
+        tsmuxer.return_value.open.side_effect = StreamError("Input stream 1 is not an MPEG-TS stream")
+
+        with self.assertRaises(StreamError) as cm:
+            self.stream.open()
+        self.assertEqual(str(cm.exception), "Input stream 1 is not an MPEG-TS stream, "
+                                            "and FFmpeg, which is required for muxing other formats, could not be found")
+        for reader in self.readers:
+            reader.close.assert_called_once_with()
+        ffmpegmuxer.assert_not_called()
+
+    @patch("streamlink.stream.hls.HLSStream.open")
+    @patch("streamlink.stream.hls.TSMuxer")
+    def test_open_substream_error(self, tsmuxer, hlsstream_open):
+        hlsstream_open.side_effect = [self.readers[0], StreamError("foo")]
+
+        with self.assertRaises(StreamError):
+            self.stream.open()
+        self.readers[0].close.assert_called_once_with()
+        tsmuxer.assert_not_called()
+
+    @patch("streamlink.stream.hls.HLSStream.open")
+    @patch("streamlink.stream.ffmpegmux.FFMPEGMuxer")
+    @patch("streamlink.stream.hls.TSMuxer")
+    def test_open_ffmpeg_options(self, tsmuxer, ffmpegmuxer, hlsstream_open):
+        hlsstream_open.side_effect = self.readers
+        self.session.set_option("ffmpeg-fout", "matroska")
+
+        self.assertIs(self.stream.open(), ffmpegmuxer.return_value.open.return_value)
+        tsmuxer.assert_not_called()
+
+    def test_metrics_labels(self):
+        self.assertEqual([HLSStreamReader(substream).metrics_labels for substream in self.stream.substreams], [
+            {"stream": "hls", "track": "video"},
+            {"stream": "hls", "track": "audio"},
+        ])
+        stream = MuxedHLSStream(self.session, video="http://test/video.m3u8",
+                                audio=["http://test/1.m3u8", "http://test/2.m3u8"])
+        self.assertEqual([substream.track for substream in stream.substreams], ["video", "audio1", "audio2"])
+        self.assertEqual(HLSStreamReader(HLSStream(self.session, "http://test/video.m3u8")).metrics_labels, {"stream": "hls"})
+
+    @patch("streamlink.stream.hls.FFMPEGMuxer.is_usable", Mock(return_value=False))
+    def test_is_usable(self):
+        self.assertTrue(MuxedHLSStream.is_usable(self.session))
+        self.session.set_option("ffmpeg-audio-transcode", "aac")
+        self.assertFalse(MuxedHLSStream.is_usable(self.session))
+        self.session.set_option("ffmpeg-audio-transcode", None)
+        self.session.set_option("hls-muxer", "ffmpeg")
+        self.assertFalse(MuxedHLSStream.is_usable(self.session))
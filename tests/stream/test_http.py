@@ -0,0 +1,109 @@
+import re
+import unittest
+
+import requests_mock
+
+from streamlink import Streamlink
+from streamlink.buffers import iter_chunks
+from streamlink.stream.http import HTTPRangeStreamReader, HTTPStream, iter_ranges
+from streamlink.stream.wrappers import StreamIOThreadWrapper
+
+
+CONTENT = bytes(bytearray(i % 251 for i in range(100000)))
+
+
+class TestHTTPStream(unittest.TestCase):
+    def setUp(self):
+        self.session = Streamlink()
+        self.session.set_option("http-stream-connections", 4)
+        self.stream = HTTPStream(self.session, "http://test/video.mp4")
+        self.stream.range_size = 8192
+        self.mocker = requests_mock.Mocker()
+        self.mocker.start()
+        self.requests = []
+        self.truncated = False
+
+    def tearDown(self):
+        self.mocker.stop()
+
+    def mock(self, accept_ranges="bytes", truncate=None, fail_start=None):
+        def callback(request, context):
+            range_header = request.headers.get("Range")
+            self.requests.append(range_header)
+            context.headers["Accept-Ranges"] = accept_ranges
+            if not range_header:
+                context.status_code = 200
+                context.headers["Content-Length"] = str(len(CONTENT))
+                return CONTENT
+            start, end = map(int, re.match(r"bytes=(\d+)-(\d+)", range_header).groups())
+            if start == fail_start:
+                context.status_code = 404
+                return b""
+            context.status_code = 206
+            data = CONTENT[start:end + 1]
+            # drop the connection of the first request of the first range
+            if truncate and start == 0 and not self.truncated:
+                self.truncated = True
+                return data[:truncate]
+            return data
+
+        self.mocker.get("http://test/video.mp4", content=callback)
+
+    def read(self, fd):
+        data = b"".join(iter(lambda: fd.read(8192), b""))
+        fd.close()
+        return data
+
+    def test_iter_ranges(self):
+        self.assertEqual(
+            [(r.start, r.end) for r in iter_ranges(10, 4)],
+            [(0, 3), (4, 7), (8, 9)],
+        )
+
+    def test_single_connection(self):
+        self.session.set_option("http-stream-connections", 1)
+        self.mock()
+        fd = self.stream.open()
+        self.assertIsInstance(fd, StreamIOThreadWrapper)
+        self.assertEqual(self.read(fd), CONTENT)
+        self.assertEqual(self.requests, [None])
+
+    def test_no_range_support(self):
+        self.mock(accept_ranges="none")
+        fd = self.stream.open()
+        self.assertIsInstance(fd, StreamIOThreadWrapper)
+        self.assertEqual(self.read(fd), CONTENT)
+
+    def test_ranges(self):
+        self.mock()
+        fd = self.stream.open()
+        self.assertIsInstance(fd, HTTPRangeStreamReader)
+        self.assertEqual(self.read(fd), CONTENT)
+        self.assertEqual(len(self.requests), 1 + len(list(iter_ranges(len(CONTENT), 8192))))
+
+    def test_ranges_resume(self):
+        self.mock(truncate=1000)
+        fd = self.stream.open()
+        self.assertEqual(self.read(fd), CONTENT)
+        self.assertIn("bytes=1000-8191", self.requests, "Resumes the range from the last received byte")
+
+    def test_ranges_failed(self):
+        self.session.set_option("stream-segment-attempts", 2)
+        self.mock(fail_start=8192 * 3)
+        fd = self.stream.open()
+        data = b""
+        with self.assertRaises(IOError) as cm:
+            for chunk in iter(lambda: fd.read(8192), b""):
+                data += chunk
+        fd.close()
+        self.assertEqual(str(cm.exception), "Failed to fetch range 24576-32767")
+        self.assertEqual(data, CONTENT[:8192 * 3], "Writes the ranges preceding the failed range")
+
+    def test_readinto(self):
+        self.mock()
+        for connections in (1, 4):
+            self.session.set_option("http-stream-connections", connections)
+            fd = self.stream.open()
+            data = b"".join(bytes(chunk) for chunk in iter_chunks(fd))
+            fd.close()
+            self.assertEqual(data, CONTENT)
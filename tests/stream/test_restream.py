@@ -0,0 +1,202 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import requests_mock
+
+from streamlink import Streamlink
+from streamlink.stream.dash import DASHStream
+from streamlink.stream.hls import HLSStream
+from streamlink.stream.restream import SegmentWindow
+from streamlink.stream.stream import Stream
+from tests.mock import patch
+
+
+def add_segments(window, *segments):
+    for data, duration in segments:
+        window.start_segment()
+        window.write(data)
+        window.finish_segment(duration)
+
+
+class TestSegmentWindow(unittest.TestCase):
+    def test_playlist(self):
+        window = SegmentWindow(size=2)
+        add_segments(window, (b"foo", 2.0), (b"bar", 2.5), (b"baz", 2.0))
+
+        self.assertEqual(window.playlist(), (
+            "#EXTM3U\n"
+            "#EXT-X-VERSION:3\n"
+            "#EXT-X-TARGETDURATION:3\n"
+            "#EXT-X-MEDIA-SEQUENCE:1\n"
+            "#EXTINF:2.500,\n"
+            "1.ts\n"
+            "#EXTINF:2.000,\n"
+            "2.ts\n"
+        ))
+        self.assertIsNone(window.get("0.ts"), "Discards segments which have fallen out of the window")
+        self.assertEqual(window.get("1.ts"), b"bar")
+        self.assertEqual(window.get("2.ts"), b"baz")
+
+        window.end()
+        self.assertTrue(window.playlist().endswith("#EXT-X-ENDLIST\n"))
+
+    def test_incomplete_segment(self):
+        window = SegmentWindow()
+        window.start_segment()
+        window.write(b"incomplete")
+        add_segments(window, (b"foo", 2.0))
+
+        self.assertEqual(window.get("0.ts"), b"foo", "Discards incomplete segments")
+
+    def test_map(self):
+        window = SegmentWindow(size=2)
+        window.set_map(b"init1")
+        add_segments(window, (b"foo", 2.0))
+        window.set_map(b"init1")
+        add_segments(window, (b"bar", 2.0))
+        window.start_segment()
+        window.write(b"init2")
+        window.finish_map()
+        add_segments(window, (b"baz", 2.0))
+
+        self.assertEqual(window.playlist(), (
+            "#EXTM3U\n"
+            "#EXT-X-VERSION:7\n"
+            "#EXT-X-TARGETDURATION:2\n"
+            "#EXT-X-MEDIA-SEQUENCE:1\n"
+            "#EXT-X-MAP:URI=\"init-1.mp4\"\n"
+            "#EXTINF:2.000,\n"
+            "1.m4s\n"
+            "#EXT-X-DISCONTINUITY\n"
+            "#EXT-X-MAP:URI=\"init-2.mp4\"\n"
+            "#EXTINF:2.000,\n"
+            "2.m4s\n"
+        ))
+        self.assertEqual(window.get("init-1.mp4"), b"init1")
+        self.assertEqual(window.get("init-2.mp4"), b"init2")
+
+        add_segments(window, (b"qux", 2.0))
+        self.assertIsNone(window.get("init-1.mp4"), "Discards unused maps")
+        self.assertNotIn("#EXT-X-DISCONTINUITY-SEQUENCE", window.playlist())
+
+        add_segments(window, (b"quux", 2.0))
+        self.assertIn("#EXT-X-DISCONTINUITY-SEQUENCE:1\n", window.playlist(),
+                      "Counts the discontinuities which have fallen out of the window")
+
+    def test_restart(self):
+        window = SegmentWindow()
+        add_segments(window, (b"foo", 2.0))
+        window.close()
+        add_segments(window, (b"ignored", 2.0))
+        window.restart()
+        add_segments(window, (b"bar", 2.0))
+
+        self.assertEqual(window.playlist().splitlines()[-3:], ["#EXT-X-DISCONTINUITY", "#EXTINF:2.000,", "1.ts"])
+
+    def test_path(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, "restream")
+            window = SegmentWindow(size=1, path=path)
+            add_segments(window, (b"foo", 2.0), (b"bar", 2.0))
+
+            self.assertEqual(os.listdir(path), ["1.ts"])
+            self.assertEqual(window.get("1.ts"), b"bar")
+
+            window.clear()
+            self.assertEqual(os.listdir(path), [])
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+class TestRestream(unittest.TestCase):
+    def setUp(self):
+        self.session = Streamlink()
+        self.window = SegmentWindow()
+        self.mocker = requests_mock.Mocker()
+        self.mocker.start()
+
+    def tearDown(self):
+        self.mocker.stop()
+
+    def restream(self, stream):
+        reader = stream.open_restream(self.window)
+        timeout = time.time() + 5
+        while not self.window.closed and time.time() < timeout:
+            time.sleep(0.01)
+        closed = self.window.closed
+        reader.close()
+        self.assertTrue(closed, "Closes the window at the end of the stream")
+
+    def test_unsupported_stream(self):
+        with self.assertRaises(TypeError):
+            Stream(self.session).open_restream(self.window)
+
+    def test_hls(self):
+        self.mocker.get("http://test/playlist.m3u8", text=(
+            "#EXTM3U\n#EXT-X-TARGETDURATION:4\n#EXT-X-MEDIA-SEQUENCE:5\n"
+            "#EXTINF:4.000,\n5.ts\n#EXTINF:3.500,\n6.ts\n#EXT-X-DISCONTINUITY\n#EXTINF:4.000,\n7.ts\n#EXT-X-ENDLIST\n"
+        ))
+        for num in range(5, 8):
+            self.mocker.get("http://test/{0}.ts".format(num), content="[{0}]".format(num).encode("ascii"))
+
+        self.restream(HLSStream(self.session, "http://test/playlist.m3u8"))
+
+        self.assertEqual(self.window.playlist(), (
+            "#EXTM3U\n"
+            "#EXT-X-VERSION:3\n"
+            "#EXT-X-TARGETDURATION:4\n"
+            "#EXT-X-MEDIA-SEQUENCE:0\n"
+            "#EXTINF:4.000,\n"
+            "0.ts\n"
+            "#EXTINF:3.500,\n"
+            "1.ts\n"
+            "#EXT-X-DISCONTINUITY\n"
+            "#EXTINF:4.000,\n"
+            "2.ts\n"
+        ))
+        self.assertEqual([self.window.get("{0}.ts".format(num)) for num in range(3)], [b"[5]", b"[6]", b"[7]"])
+
+    def test_hls_map(self):
+        self.mocker.get("http://test/playlist.m3u8", text=(
+            "#EXTM3U\n#EXT-X-TARGETDURATION:2\n#EXT-X-MEDIA-SEQUENCE:0\n#EXT-X-MAP:URI=\"init.mp4\"\n"
+            "#EXTINF:2.000,\n0.m4s\n#EXTINF:2.000,\n1.m4s\n#EXT-X-ENDLIST\n"
+        ))
+        self.mocker.get("http://test/init.mp4", content=b"[init]")
+        self.mocker.get("http://test/0.m4s", content=b"[0]")
+        self.mocker.get("http://test/1.m4s", content=b"[1]")
+
+        self.restream(HLSStream(self.session, "http://test/playlist.m3u8"))
+
+        playlist = self.window.playlist()
+        self.assertIn("#EXT-X-MAP:URI=\"init-1.mp4\"\n#EXTINF:2.000,\n0.m4s\n#EXTINF:2.000,\n1.m4s\n", playlist)
+        self.assertEqual(self.window.get("init-1.mp4"), b"[init]")
+        self.assertEqual(self.window.get("1.m4s"), b"[1]")
+
+    def test_dash(self):
+        self.mocker.get("http://test/manifest.mpd", text="""<?xml version="1.0"?>
+<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" profiles="urn:mpeg:dash:profile:isoff-live:2011" type="static"
+     mediaPresentationDuration="PT4S" minBufferTime="PT2S">
+  <Period>
+    <AdaptationSet mimeType="video/mp4">
+      <Representation id="1" bandwidth="1000" width="640" height="360" codecs="avc1.4d401e">
+        <SegmentTemplate initialization="init.mp4" media="$Number$.m4s" startNumber="1" duration="2" timescale="1"/>
+      </Representation>
+    </AdaptationSet>
+  </Period>
+</MPD>
+""")
+        self.mocker.get("http://test/init.mp4", content=b"[init]")
+        self.mocker.get("http://test/1.m4s", content=b"[1]")
+        self.mocker.get("http://test/2.m4s", content=b"[2]")
+
+        streams = DASHStream.parse_manifest(self.session, "http://test/manifest.mpd")
+        # don't wait for the refresh interval of the static manifest
+        with patch("streamlink.stream.dash.sleeper"):
+            self.restream(list(streams.values())[0])
+
+        self.assertIn("#EXT-X-MAP:URI=\"init-1.mp4\"\n#EXTINF:2.000,\n0.m4s\n#EXTINF:2.000,\n1.m4s\n", self.window.playlist())
+        self.assertEqual([self.window.get("0.m4s"), self.window.get("1.m4s")], [b"[1]", b"[2]"])
@@ -0,0 +1,141 @@
+import struct
+import unittest
+
+import requests_mock
+
+from streamlink import Streamlink
+from streamlink.buffers import Buffer
+from streamlink.stream import tsinspect
+from streamlink.stream.hls import HLSStream
+from streamlink.stream.tsinspect import TSInspector
+from tests.mock import patch
+
+
+def packet(pid, cc, payload=True, pcr=None, discontinuity=False):
+    flags = (0x10 if payload else 0) | cc
+    adaptation_field = b""
+    if pcr is not None or discontinuity:
+        af_flags = (0x80 if discontinuity else 0) | (0x10 if pcr is not None else 0)
+        adaptation_field = struct.pack(">B", af_flags)
+        if pcr is not None:
+            adaptation_field += struct.pack(">IH", pcr >> 1, (pcr & 1) << 15 | 0x7E00)
+        adaptation_field = struct.pack(">B", len(adaptation_field)) + adaptation_field
+        flags |= 0x20
+    data = struct.pack(">BHB", 0x47, pid, flags) + adaptation_field
+
+    return data.ljust(188, b"\xff" if payload else b"\x00")
+
+
+def stream(*ccs, **kwargs):
+    return b"".join(packet(kwargs.get("pid", 0x100), cc) for cc in ccs)
+
+
+class TestTSInspector(unittest.TestCase):
+    use_numpy = False
+
+    def subject(self, *chunks, **kwargs):
+        buffer = Buffer()
+        inspector = TSInspector(buffer, use_numpy=self.use_numpy, **kwargs)
+        for chunk in chunks:
+            inspector.write(chunk)
+        inspector.close()
+
+        return inspector.stats, buffer.read()
+
+    def test_continuity(self):
+        data = stream(0, 1, 2, 2, 3, 5, 6) + stream(15, 0, 1, pid=0x101)
+        stats, output = self.subject(data[:300], data[300:1000], data[1000:])
+
+        self.assertEqual(output, data)
+        self.assertEqual(stats.packets, 10)
+        self.assertEqual(stats.bytes, 1880)
+        self.assertEqual(stats.continuity_errors, 1, "Allows duplicate packets and counts gaps across writes")
+        self.assertEqual(stats.pids[0x100].continuity_errors, 1)
+        self.assertEqual(stats.pids[0x101].continuity_errors, 0)
+        self.assertEqual(stats.pids[0x101].packets, 3)
+
+    def test_continuity_no_payload(self):
+        data = stream(0, 1) + packet(0x100, 5, payload=False) + packet(0x100, 2, discontinuity=True) + stream(7)
+        stats, output = self.subject(data)
+
+        self.assertEqual(stats.continuity_errors, 1, "Ignores packets without payload and flagged discontinuities")
+
+    def test_pcr(self):
+        data = b"".join(
+            packet(0x100, n & 0x0F, pcr=n * 90) if n % 10 == 0 else packet(0x100, n & 0x0F)
+            for n in range(100)
+        )
+        stats, output = self.subject(data[:5000], data[5000:])
+
+        self.assertEqual(stats.bitrate, 10 * 188 * 8 * 90000 // 900)
+        self.assertEqual(stats.pcr_discontinuities, 0)
+
+    def test_pcr_discontinuity(self):
+        data = packet(0x100, 0, pcr=900000) + packet(0x100, 1, pcr=900) + packet(0x100, 2, pcr=0, discontinuity=True)
+        stats, output = self.subject(data)
+
+        self.assertEqual(stats.pcr_discontinuities, 1)
+        self.assertIsNone(stats.bitrate)
+
+    def test_drop_null(self):
+        data = stream(0, 1) + stream(3, 3, pid=0x1FFF) + stream(2)
+        stats, output = self.subject(data, drop_null=True)
+
+        self.assertEqual(output, stream(0, 1, 2))
+        self.assertEqual((stats.null_packets, stats.dropped_packets), (2, 2))
+        self.assertEqual(stats.continuity_errors, 0)
+
+    def test_sync_loss(self):
+        data = stream(0, 1) + b"garbage" + stream(2)
+        stats, output = self.subject(data)
+
+        self.assertEqual(output, data, "Keeps unsynchronized data")
+        self.assertEqual((stats.sync_losses, stats.skipped_bytes), (1, 7))
+
+    def test_repair(self):
+        data = stream(0, 1) + b"garbage" + packet(0x100, 5, discontinuity=False, pcr=0) + stream(6, 8) + b"partial"
+        stats, output = self.subject(data, repair=True)
+
+        expected = stream(0, 1) + packet(0x100, 5, discontinuity=True, pcr=0) + stream(6, 8)
+        self.assertEqual(output, expected, "Drops unsynchronized data and flags gaps of packets with an adaptation field")
+        self.assertEqual((stats.continuity_errors, stats.repaired_packets), (2, 1))
+        self.assertEqual(stats.skipped_bytes, 14)
+
+    def test_not_mpegts(self):
+        data = b"\x00\x00\x00\x18ftypiso6" + b"\x00" * 500
+        stats, output = self.subject(data[:100], data[100:])
+
+        self.assertEqual(output, data)
+        self.assertEqual(stats.packets, 0)
+
+    def test_delegate(self):
+        inspector = TSInspector(Buffer())
+        inspector.write(stream(0, 1, 2))
+        self.assertEqual(inspector.length, 564)
+        self.assertEqual(inspector.read(188), stream(0))
+
+
+@unittest.skipIf(not tsinspect.numpy_available(), "NumPy is not installed")
+@patch("streamlink.stream.tsinspect.NUMPY_MIN_PACKETS", 1)
+class TestTSInspectorNumPy(TestTSInspector):
+    use_numpy = True
+
+
+class TestSegmentedStreamInspection(unittest.TestCase):
+    def test_hls(self):
+        session = Streamlink()
+        session.set_option("stream-ts-inspect", True)
+        with requests_mock.Mocker() as mocker:
+            mocker.get("http://test/playlist.m3u8", text=(
+                "#EXTM3U\n#EXT-X-TARGETDURATION:2\n#EXTINF:2.000,\n0.ts\n#EXTINF:2.000,\n1.ts\n#EXT-X-ENDLIST\n"
+            ))
+            mocker.get("http://test/0.ts", content=stream(0, 1, 2))
+            mocker.get("http://test/1.ts", content=stream(5, 6))
+
+            reader = HLSStream(session, "http://test/playlist.m3u8").open()
+            data = b"".join(iter(lambda: reader.read(8192), b""))
+            reader.close()
+
+        self.assertEqual(data, stream(0, 1, 2, 5, 6))
+        self.assertIsInstance(reader.buffer, TSInspector)
+        self.assertEqual((reader.buffer.stats.packets, reader.buffer.stats.continuity_errors), (5, 1))
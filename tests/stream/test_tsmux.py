@@ -0,0 +1,147 @@
+import struct
+import unittest
+from io import BytesIO
+
+from streamlink.exceptions import StreamError
+from streamlink.stream.tsmux import (
+    ElementaryStream, PACKET_SIZE, TSMuxer, build_pat, build_pmt, crc32, packetize_section, parse_pmt
+)
+from tests.mock import Mock
+
+
+def pts(value):
+    return struct.pack(
+        ">BHH",
+        0x21 | ((value >> 30) & 0x07) << 1,
+        ((value >> 15) & 0x7FFF) << 1 | 1,
+        (value & 0x7FFF) << 1 | 1,
+    )
+
+
+def pes(pid, timestamp, payload, cc=0):
+    """A PES packet with a PTS, followed by a continuation packet without a PES header."""
+    header = b"\x00\x00\x01\xe0\x00\x00\x80\x80\x05" + pts(timestamp)
+    first = struct.pack(">BHB", 0x47, 0x4000 | pid, 0x10 | cc) + header + payload
+    second = struct.pack(">BHB", 0x47, pid, 0x10 | (cc + 1) & 0x0F) + payload
+
+    return first.ljust(PACKET_SIZE, b"\xff") + second.ljust(PACKET_SIZE, b"\xff")
+
+
+def tables(streams, pcr_pid=0x100, pmt_pid=0x1000):
+    return packetize_section(0, build_pat(pmt_pid))[0] + packetize_section(pmt_pid, build_pmt(pcr_pid, streams))[0]
+
+
+def parse(data):
+    packets = []
+    for offset in range(0, len(data), PACKET_SIZE):
+        packet = data[offset:offset + PACKET_SIZE]
+        pid = struct.unpack(">H", packet[1:3])[0] & 0x1FFF
+        packets.append((pid, packet))
+
+    return packets
+
+
+def section(packet):
+    length = 3 + (struct.unpack(">H", packet[6:8])[0] & 0x0FFF)
+    return packet[5:5 + length]
+
+
+VIDEO = ElementaryStream(0x1B, 0x100, b"")
+AUDIO = ElementaryStream(0x0F, 0x101, b"")
+AUDIO_DE = ElementaryStream(0x0F, 0x100, b"\x0a\x04deu\x00")
+
+
+class TestTables(unittest.TestCase):
+    def test_pat(self):
+        # FFmpeg's default PAT
+        self.assertEqual(build_pat(0x1000), bytes(bytearray([
+            0x00, 0xb0, 0x0d, 0x00, 0x01, 0xc1, 0x00, 0x00, 0x00, 0x01, 0xf0, 0x00, 0x2a, 0xb1, 0x04, 0xb2
+        ])))
+        self.assertEqual(crc32(build_pat(0x1000)), 0)
+
+    def test_pmt(self):
+        section = build_pmt(0x100, [VIDEO, AUDIO_DE], version=3)
+        self.assertEqual(crc32(section), 0)
+        self.assertEqual(parse_pmt(section), (0x100, [VIDEO, AUDIO_DE]))
+
+    def test_packetize_section(self):
+        streams = [ElementaryStream(0x0F, 0x100 + i, b"\x0a\x04und\x00" * 4) for i in range(10)]
+        data, cc = packetize_section(0x1000, build_pmt(0x100, streams), continuity_counter=15)
+        self.assertEqual(len(data), PACKET_SIZE * 2)
+        self.assertEqual(cc, 1)
+        self.assertEqual(data[1:4], b"\x50\x00\x1f")
+        self.assertEqual(data[PACKET_SIZE + 1:PACKET_SIZE + 4], b"\x10\x00\x10")
+
+
+class TestTSMuxer(unittest.TestCase):
+    def subject(self, *streams):
+        muxer = TSMuxer(Mock(), *[BytesIO(stream) for stream in streams]).open()
+        data = b"".join(iter(lambda: muxer.read(8192), b""))
+        muxer.close()
+
+        return parse(data)
+
+    def test_remux(self):
+        packets = self.subject(
+            tables([VIDEO, AUDIO]) + pes(0x100, 0, b"v0") + pes(0x101, 0, b"a0") + pes(0x100, 3000, b"v1"),
+            tables([AUDIO_DE]) + pes(0x100, 1500, b"de0") + pes(0x100, 4500, b"de1"),
+        )
+
+        self.assertEqual([pid for pid, packet in packets], [
+            0x0000, 0x1000,
+            0x100, 0x100,
+            0x101, 0x101,
+            0x102, 0x102,
+            0x100, 0x100,
+            0x102, 0x102,
+        ], "Interleaves the PES packets by their timestamps and rewrites the PIDs")
+        self.assertEqual(packets[6][1][4:], pes(0x100, 1500, b"de0")[4:PACKET_SIZE], "Keeps the payload")
+
+        pmt = parse_pmt(section(packets[1][1]))
+        self.assertEqual(pmt, (0x100, [VIDEO, AUDIO, AUDIO_DE._replace(pid=0x102)]), "Keeps the descriptors")
+
+    def test_select_streams(self):
+        packets = self.subject(
+            tables([VIDEO]) + pes(0x100, 0, b"v0"),
+            tables([ElementaryStream(0x1B, 0x200, b""), AUDIO], pcr_pid=0x200) + pes(0x200, 0, b"v1") + pes(0x101, 0, b"a"),
+        )
+
+        self.assertEqual([pid for pid, packet in packets], [0x0000, 0x1000, 0x100, 0x100, 0x101, 0x101],
+                         "Only keeps the audio streams of the other inputs")
+
+    def test_repeat_tables(self):
+        packets = self.subject(
+            tables([VIDEO]) + pes(0x100, 0, b"v0") + tables([VIDEO]) + pes(0x100, 900000, b"v1"),
+        )
+
+        self.assertEqual([pid for pid, packet in packets], [0x0000, 0x1000, 0x100, 0x100, 0x0000, 0x1000, 0x100, 0x100])
+        self.assertEqual([bytearray(packet)[3] & 0x0F for pid, packet in packets if pid == 0x1000], [0, 1],
+                         "Continues the continuity counters of the tables")
+
+    def test_changed_pmt(self):
+        packets = self.subject(
+            tables([VIDEO]) + pes(0x100, 0, b"v0") + tables([VIDEO, AUDIO]) + pes(0x101, 3000, b"a0"),
+        )
+
+        self.assertEqual([pid for pid, packet in packets], [0x0000, 0x1000, 0x100, 0x100, 0x0000, 0x1000, 0x101, 0x101])
+        pmt = packets[5][1]
+        self.assertEqual((bytearray(pmt)[10] >> 1) & 0x1F, 1, "Increases the PMT version")
+        self.assertEqual(parse_pmt(section(pmt))[1], [VIDEO, AUDIO])
+
+    def test_timestamp_wrap(self):
+        packets = self.subject(
+            tables([VIDEO]) + pes(0x100, (1 << 33) - 3000, b"v0") + pes(0x100, 0, b"v1") + pes(0x100, 3000, b"v2"),
+            tables([AUDIO_DE]) + pes(0x100, (1 << 33) - 1500, b"a0") + pes(0x100, 1500, b"a1"),
+        )
+
+        self.assertEqual([pid for pid, packet in packets][2::2], [0x100, 0x101, 0x100, 0x101, 0x100])
+
+    def test_resync(self):
+        packets = self.subject(tables([VIDEO]) + b"\x00" * 10 + pes(0x100, 0, b"v0"))
+
+        self.assertEqual([pid for pid, packet in packets], [0x0000, 0x1000, 0x100, 0x100])
+
+    def test_not_mpegts(self):
+        muxer = TSMuxer(Mock(), BytesIO(tables([VIDEO])), BytesIO(b"ID3\x04" + b"\x00" * 400))
+        with self.assertRaises(StreamError):
+            muxer.open()
@@ -0,0 +1,245 @@
+import json
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+import requests_mock
+
+from streamlink import Streamlink
+from streamlink.exceptions import StreamError
+from streamlink.stream.dash import DASHStream, DASHVODDownloader
+from streamlink.stream.hls import HLSStream, HLSStreamReader
+from streamlink.stream.http import HTTPStream
+from streamlink.stream.stream import Stream
+from streamlink.stream.vod import VODDownloader, VODJournal
+from streamlink.utils.crypto import AES, pad
+
+
+MPD = """<?xml version="1.0" encoding="UTF-8"?>
+<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="static" mediaPresentationDuration="PT8S" minBufferTime="PT2S"
+     profiles="urn:mpeg:dash:profile:isoff-live:2011">
+  <BaseURL>http://test/</BaseURL>
+  <Period>
+    <AdaptationSet mimeType="video/mp4">
+      <Representation id="video" bandwidth="100000" width="640" height="360" codecs="avc1.4d401e">
+        <SegmentTemplate initialization="init.mp4" media="$Number$.m4s" startNumber="0" duration="2" timescale="1"/>
+      </Representation>
+    </AdaptationSet>
+  </Period>
+</MPD>
+"""
+
+PLAYLIST = """#EXTM3U
+#EXT-X-TARGETDURATION:2
+#EXT-X-MEDIA-SEQUENCE:0
+{segments}
+{endlist}
+"""
+
+
+def playlist(segments, endlist=True):
+    return PLAYLIST.format(
+        segments="\n".join("#EXTINF:2.000,\n{0}".format(segment) for segment in segments),
+        endlist="#EXT-X-ENDLIST" if endlist else "",
+    )
+
+
+class TestVODDownloader(unittest.TestCase):
+    def setUp(self):
+        self.session = Streamlink()
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "output.ts")
+        self.mocker = requests_mock.Mocker()
+        self.mocker.start()
+
+    def tearDown(self):
+        self.mocker.stop()
+        shutil.rmtree(self.tmpdir)
+
+    def read(self):
+        with open(self.path, "rb") as fd:
+            return fd.read()
+
+    def test_unsupported_stream(self):
+        with self.assertRaises(TypeError):
+            Stream(self.session).to_vod_downloader()
+
+    def test_custom_reader(self):
+        class CustomHLSStreamReader(HLSStreamReader):
+            pass
+
+        class CustomHLSStream(HLSStream):
+            __reader__ = CustomHLSStreamReader
+
+        with self.assertRaises(TypeError):
+            CustomHLSStream(self.session, "http://test/playlist.m3u8").to_vod_downloader(threads=4)
+        self.assertEqual(self.mocker.request_history, [], "Doesn't request the playlist like a HTTPStream file")
+
+    def test_live_playlist(self):
+        self.mocker.get("http://test/playlist.m3u8", text=playlist(["0.ts"], endlist=False))
+        self.assertIsNone(HLSStream(self.session, "http://test/playlist.m3u8").to_vod_downloader())
+
+    def test_start_offset(self):
+        self.mocker.get("http://test/playlist.m3u8", text=playlist(["0.ts"]))
+        self.assertIsNone(HLSStream(self.session, "http://test/playlist.m3u8", start_offset=10).to_vod_downloader())
+
+    def test_download(self):
+        segments = ["{0}.ts".format(num) for num in range(10)]
+        self.mocker.get("http://test/playlist.m3u8", text=playlist(segments))
+        for num, segment in enumerate(segments):
+            self.mocker.get("http://test/{0}".format(segment), content="[{0}]".format(num).encode("ascii") * (num + 1))
+
+        downloader = HLSStream(self.session, "http://test/playlist.m3u8").to_vod_downloader(threads=4)
+        written = list(downloader.download(self.path))
+
+        expected = b"".join("[{0}]".format(num).encode("ascii") * (num + 1) for num in range(10))
+        self.assertEqual(self.read(), expected)
+        self.assertTrue(all(isinstance(size, int) for size in written), "Only reports the sizes of the written data")
+        self.assertEqual(sum(written), len(expected))
+        self.assertFalse(os.path.exists(self.path + VODJournal.SUFFIX), "Removes the journal")
+
+    def test_download_map(self):
+        self.mocker.get("http://test/playlist.m3u8", text=(
+            "#EXTM3U\n#EXT-X-TARGETDURATION:2\n#EXT-X-MEDIA-SEQUENCE:0\n"
+            "#EXT-X-MAP:URI=\"init.mp4\"\n"
+            "#EXTINF:2.000,\n0.m4s\n#EXTINF:2.000,\n1.m4s\n#EXT-X-ENDLIST\n"
+        ))
+        self.mocker.get("http://test/init.mp4", content=b"[init]")
+        self.mocker.get("http://test/0.m4s", content=b"[0]")
+        self.mocker.get("http://test/1.m4s", content=b"[1]")
+
+        downloader = HLSStream(self.session, "http://test/playlist.m3u8").to_vod_downloader(threads=2)
+        list(downloader.download(self.path))
+
+        self.assertEqual(self.read(), b"[init][0][1]")
+
+    def test_download_encrypted(self):
+        key = os.urandom(16)
+        self.mocker.get("http://test/playlist.m3u8", text=(
+            "#EXTM3U\n#EXT-X-TARGETDURATION:2\n#EXT-X-MEDIA-SEQUENCE:5\n"
+            "#EXT-X-KEY:METHOD=AES-128,URI=\"http://test/key\"\n"
+            "#EXTINF:2.000,\n0.ts\n#EXTINF:2.000,\n1.ts\n#EXT-X-ENDLIST\n"
+        ))
+        self.mocker.get("http://test/key", content=key)
+        for num in range(2):
+            iv = struct.pack(">8xq", 5 + num)
+            aes = AES.new(key, AES.MODE_CBC, iv)
+            self.mocker.get("http://test/{0}.ts".format(num), content=aes.encrypt(pad(b"segment" * (num + 1), AES.block_size)))
+
+        downloader = HLSStream(self.session, "http://test/playlist.m3u8").to_vod_downloader(threads=2)
+        list(downloader.download(self.path))
+
+        self.assertEqual(self.read(), b"segment" + b"segment" * 2)
+
+    def test_download_failure(self):
+        self.mocker.get("http://test/playlist.m3u8", text=playlist(["0.ts", "1.ts"]))
+        self.mocker.get("http://test/0.ts", content=b"foo")
+        self.mocker.get("http://test/1.ts", status_code=404)
+
+        downloader = HLSStream(self.session, "http://test/playlist.m3u8").to_vod_downloader(threads=2, retries=2)
+        with self.assertRaises(StreamError):
+            list(downloader.download(self.path))
+        self.assertTrue(os.path.exists(self.path + VODJournal.SUFFIX), "Keeps the journal")
+
+    def test_ignore_names(self):
+        self.session.set_option("hls-segment-ignore-names", ["ad"])
+        self.mocker.get("http://test/playlist.m3u8", text=playlist(["0.ts", "ad.ts", "1.ts"]))
+        self.mocker.get("http://test/0.ts", content=b"foo")
+        self.mocker.get("http://test/1.ts", content=b"bar")
+
+        downloader = HLSStream(self.session, "http://test/playlist.m3u8").to_vod_downloader()
+        self.assertEqual(len(downloader.segments), 2, "Skips ignored segment names")
+        list(downloader.download(self.path))
+
+        self.assertEqual(self.read(), b"foobar")
+
+    def test_resume(self):
+        segments = ["0.ts", "1.ts", "2.ts"]
+        self.mocker.get("http://test/playlist.m3u8", text=playlist(segments))
+        self.mocker.get("http://test/0.ts", content=b"aaa")
+        self.mocker.get("http://test/1.ts", content=b"bb")
+        self.mocker.get("http://test/2.ts", content=b"cccc")
+
+        downloader = HLSStream(self.session, "http://test/playlist.m3u8").to_vod_downloader()
+        with open(self.path, "wb") as fd:
+            fd.write(b"aaa\x00\x00")
+        with open(self.path + VODJournal.SUFFIX, "w") as fd:
+            fd.write(json.dumps({"version": VODJournal.VERSION, "id": downloader.identifier}) + "\n")
+            fd.write(json.dumps({"num": 0, "size": 3}) + "\n")
+            fd.write(json.dumps({"num": 0, "done": True}) + "\n")
+            fd.write("{\"num\": 1, \"si")
+
+        self.assertTrue(downloader.can_resume(self.path))
+        list(downloader.download(self.path))
+
+        self.assertEqual(self.read(), b"aaabbcccc")
+        self.assertNotIn("http://test/0.ts", [req.url for req in self.mocker.request_history],
+                         "Doesn't download completed segments again")
+
+    def test_resume_other_stream(self):
+        self.mocker.get("http://test/playlist.m3u8", text=playlist(["0.ts"]))
+        downloader = HLSStream(self.session, "http://test/playlist.m3u8").to_vod_downloader()
+        with open(self.path, "wb") as fd:
+            fd.write(b"foo")
+        with open(self.path + VODJournal.SUFFIX, "w") as fd:
+            fd.write(json.dumps({"version": VODJournal.VERSION, "id": "other"}) + "\n")
+
+        self.assertFalse(downloader.can_resume(self.path))
+
+    def test_content_size(self):
+        class Res(object):
+            def __init__(self, headers):
+                self.headers = headers
+
+        self.assertEqual(VODDownloader.content_size(Res({"Content-Length": "10"})), 10)
+        self.assertIsNone(VODDownloader.content_size(Res({"Content-Length": "10", "Content-Encoding": "gzip"})))
+        self.assertIsNone(VODDownloader.content_size(Res({})))
+
+    def test_download_http(self):
+        content = bytes(bytearray(i % 251 for i in range(50000)))
+
+        def callback(request, context):
+            context.headers["Accept-Ranges"] = "bytes"
+            range_header = request.headers.get("Range")
+            if not range_header:
+                context.headers["Content-Length"] = str(len(content))
+                return content
+            start, end = map(int, range_header[len("bytes="):].split("-"))
+            context.status_code = 206
+            context.headers["Content-Range"] = "bytes {0}-{1}/{2}".format(start, end, len(content))
+            return content[start:end + 1]
+
+        self.mocker.get("http://test/video.mp4", content=callback)
+        stream = HTTPStream(self.session, "http://test/video.mp4")
+        stream.range_size = 8192
+
+        downloader = stream.to_vod_downloader(threads=3)
+        self.assertEqual(self.mocker.request_history[0].headers["Range"], "bytes=0-0", "Only probes the first byte")
+        self.assertEqual(len(downloader.segments), 7)
+        list(downloader.download(self.path))
+
+        self.assertEqual(self.read(), content)
+
+    def test_download_http_no_range_support(self):
+        self.mocker.get("http://test/video.mp4", content=b"foo" * 10000)
+        stream = HTTPStream(self.session, "http://test/video.mp4")
+        stream.range_size = 8192
+        self.assertIsNone(stream.to_vod_downloader(threads=3))
+
+    def test_download_dash(self):
+        streams = DASHStream.parse_manifest(self.session, MPD)
+        downloader = streams["360p"].to_vod_downloader(threads=2)
+        self.assertIsInstance(downloader, DASHVODDownloader)
+
+        urls = [segment.url for segment in downloader.segments]
+        self.assertEqual(urls[0], "http://test/init.mp4")
+        for num, url in enumerate(urls):
+            self.mocker.get(url, content="[{0}]".format(num).encode("ascii") * (num + 1))
+        written = list(downloader.download(self.path))
+
+        expected = b"".join("[{0}]".format(num).encode("ascii") * (num + 1) for num in range(len(urls)))
+        self.assertEqual(self.read(), expected)
+        self.assertEqual(sum(written), len(expected))
+        self.assertFalse(os.path.exists(self.path + VODJournal.SUFFIX), "Removes the journal")
@@ -1,13 +1,16 @@
 # -*- coding: utf-8 -*-
 
+import re
 import unittest
+from io import BytesIO
 
 import pytest
 import requests
+import requests_mock
 
 from streamlink.exceptions import PluginError
 from streamlink.plugin.api.http_session import HTTPSession, urllib3_version
-from tests.mock import PropertyMock, call, patch
+from tests.mock import Mock, PropertyMock, call, patch
 
 
 @pytest.mark.skipif(urllib3_version < (1, 25, 4), reason="test only applicable on urllib3 >=1.25.4")
@@ -59,6 +62,17 @@ class TestPluginAPIHTTPSession(unittest.TestCase):
             call(5)
         ])
 
+    @patch("streamlink.plugin.api.http_session.time.sleep", Mock())
+    @patch("streamlink.plugin.api.http_session.Session.request")
+    def test_on_retry(self, mock_request):
+        err = requests.Timeout()
+        mock_request.side_effect = [err, err, Mock(status_code=200)]
+        on_retry = Mock()
+
+        HTTPSession().get("http://localhost/", retries=3, on_retry=on_retry)
+        self.assertEqual(on_retry.mock_calls, [call(1, err), call(2, err)])
+        self.assertNotIn("on_retry", mock_request.call_args[1])
+
     def test_json_encoding(self):
         json_str = u"{\"test\": \"Α and Ω\"}"
 
@@ -70,6 +84,16 @@ class TestPluginAPIHTTPSession(unittest.TestCase):
 
                 self.assertEqual(HTTPSession.json(res), {u"test": u"\u0391 and \u03a9"})
 
+    def test_json_utf8_content(self):
+        json_text = u"{\"test\": \"Α and Ω\"}".encode("utf-8")
+
+        with patch('requests.Response.content', new_callable=PropertyMock) as mock_content:
+            mock_content.return_value = json_text
+            res = requests.Response()
+            res.encoding = "utf8"
+
+            self.assertEqual(HTTPSession.json(res), {u"test": u"\u0391 and \u03a9"})
+
     def test_json_encoding_override(self):
         json_text = u"{\"test\": \"Α and Ω\"}".encode("cp949")
 
@@ -79,3 +103,60 @@ class TestPluginAPIHTTPSession(unittest.TestCase):
             res.encoding = "cp949"
 
             self.assertEqual(HTTPSession.json(res), {u"test": u"\u0391 and \u03a9"})
+
+
+class TestHTTPSessionSearch:
+    @pytest.fixture
+    def httpsession(self):
+        # type: () -> HTTPSession
+        with requests_mock.Mocker() as mocker:
+            session = HTTPSession()
+            session.mocker = mocker
+            yield session
+
+    def test_search(self, httpsession):
+        text = u"<html>" + u"foo " * 10000 + u"<source src=\"https://foo/bär.m3u8\">" + u"bar " * 10000 + u"</html>"
+        httpsession.mocker.get("http://localhost/", content=text.encode("utf-8"),
+                               headers={"Content-Type": "text/html; charset=utf-8"})
+        patterns = re.compile(r"src=\"([^\"]+)\""), re.compile(r"^<html>"), re.compile(r"</html>$"), re.compile(r"baz")
+
+        results = httpsession.search("http://localhost/", *patterns, window=100, chunk_size=7)
+        assert [match and match.span() for match in results] == [pattern.search(text) and pattern.search(text).span()
+                                                                 for pattern in patterns]
+        assert results[0].group(1) == u"https://foo/bär.m3u8"
+        assert results[3] is None
+
+    def test_search_early_close(self, httpsession):
+        class Body(BytesIO):
+            size = 0
+
+            def read(self, *args):
+                data = BytesIO.read(self, *args)
+                self.size += len(data)
+                return data
+
+        body = Body(b"foo <title>bar</title>" + b" " * 1000000)
+        httpsession.mocker.get("http://localhost/", body=body, headers={"Content-Type": "text/html; charset=utf-8"})
+
+        match, = httpsession.search("http://localhost/", re.compile(r"<title>(.+?)</title>"), window=100, chunk_size=100)
+        assert match.group(1) == "bar"
+        assert body.closed
+        assert body.size < 1000
+
+    def test_search_encoding(self, httpsession):
+        httpsession.mocker.get("http://localhost/", content=u"foo=bär".encode("iso-8859-1"),
+                               headers={"Content-Type": "text/html; charset=iso-8859-1"})
+
+        match, = httpsession.search("http://localhost/", re.compile(r"foo=(\w+)"), chunk_size=1)
+        assert match.group(1) == u"bär"
+
+    def test_search_request_args(self, httpsession):
+        httpsession.mocker.post("http://localhost/", text="foo")
+
+        match, = httpsession.search("http://localhost/", re.compile(r"foo"), method="POST", params={"bar": "baz"})
+        assert match.group(0) == "foo"
+        assert httpsession.mocker.last_request.qs == {"bar": ["baz"]}
+
+    def test_search_no_patterns(self, httpsession):
+        assert httpsession.search("http://localhost/") == []
+        assert not httpsession.mocker.called, "Doesn't send the request"
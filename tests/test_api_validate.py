@@ -8,6 +8,14 @@ from lxml.etree import Element, tostring as etree_tostring
 from streamlink.compat import str as text_type
 from streamlink.exceptions import PluginError
 from streamlink.plugin.api import validate
+from streamlink.plugin.api.validate._compile import compile_schema
+
+
+@pytest.fixture(autouse=True, params=["interpreted", "compiled"])
+def validate_mode(request, monkeypatch):
+    # compiled schemas must have the same results and errors as interpreted ones
+    if request.param == "compiled":
+        monkeypatch.setattr(validate, "validate", lambda schema, value: compile_schema(schema)(value))
 
 
 def assert_validationerror(exception, expected):
@@ -1250,3 +1258,44 @@ class TestValidationError(object):
             ValidationError:
               foo <Some really long error message that exceeds the maximum...> bar <'Some really long error message that exceeds the maximu...> baz
         """)  # noqa: 501
+
+
+class TestCompileSchema(object):
+    def test_memoized(self):
+        schema = validate.Schema({"foo": validate.all(int, validate.transform(str))})
+        compiled = compile_schema(schema)
+        assert compile_schema(schema) is compiled, "Compiles each schema container only once"
+        assert schema.validate({"foo": 1}) == {"foo": "1"}
+        assert compile_schema(schema) is compiled
+
+    def test_lazy_error_messages(self):
+        class Value(object):
+            reprs = 0
+
+            def __repr__(self):
+                Value.reprs += 1
+                return "Value()"
+
+        value = Value()
+        assert compile_schema(validate.any(None, int, Value))(value) is value
+        assert Value.reprs == 0, "Doesn't format the errors of discarded branches"
+
+        with pytest.raises(validate.ValidationError) as cm:
+            compile_schema(validate.any(None, int))(value)
+        assert_validationerror(cm.value, """
+            ValidationError(AnySchema):
+              ValidationError(equality):
+                Value() does not equal None
+              ValidationError(type):
+                Type of Value() should be int, but is Value
+        """)
+
+    def test_registered_type(self):
+        class Custom(object):
+            pass
+
+        @validate._validate.validate.register(Custom)
+        def _validate_custom(schema, value):
+            return "custom"
+
+        assert compile_schema(Custom())("foo") == "custom", "Uses validators of other types registered on validate()"
@@ -1,6 +1,12 @@
+import io
+import os
+import threading
+import time
 import unittest
 
-from streamlink.buffers import Buffer, RingBuffer
+from streamlink.buffers import Buffer, ChunkSize, RingBuffer, iter_chunks, readinto
+from streamlink.compat import is_py2
+from tests.mock import patch
 
 
 class TestBuffer(unittest.TestCase):
@@ -24,6 +30,7 @@ class TestBuffer(unittest.TestCase):
         self.assertEqual(self.buffer.read(4096), b"")
         self.assertEqual(self.buffer.read(), b"")
         self.assertEqual(self.buffer.length, 0)
+        self.assertEqual((self.buffer.written, self.buffer.consumed), (8192 + 4096, 8192 + 4096))
 
     def test_readwrite(self):
         self.buffer.write(b"1" * 8192)
@@ -52,11 +59,7 @@ class TestBuffer(unittest.TestCase):
         """Objects should be reusable after write()"""
 
         original = b"original"
-        tests = [bytearray(original)]
-        m = memoryview(bytearray(original))
-        # Python 2.7 doesn't do bytes(memoryview) properly
-        if bytes(m) == original:
-            tests.append(m)
+        tests = [bytearray(original), memoryview(bytearray(original))]
 
         for data in tests:
             self.buffer.write(data)
@@ -68,6 +71,18 @@ class TestBuffer(unittest.TestCase):
             StopIteration,
             lambda: next(self.buffer._iterate_chunks(10)))
 
+    def test_readinto(self):
+        self.buffer.write(b"1" * 5)
+        self.buffer.write(b"2" * 5)
+        data = bytearray(8)
+
+        self.assertEqual(self.buffer.readinto(data), 8)
+        self.assertEqual(data, b"1" * 5 + b"2" * 3)
+        self.assertEqual(self.buffer.length, 2)
+        self.assertEqual(self.buffer.readinto(memoryview(data)[4:]), 2)
+        self.assertEqual(data, b"1" * 4 + b"2" * 4)
+        self.assertEqual(self.buffer.readinto(data), 0)
+
 
 class TestRingBuffer(unittest.TestCase):
     BUFFER_SIZE = 8192 * 4
@@ -96,6 +111,23 @@ class TestRingBuffer(unittest.TestCase):
             IOError,
             self.buffer.read, timeout=0.1)
 
+    def test_readinto_timeout(self):
+        self.assertRaises(
+            IOError,
+            self.buffer.readinto, bytearray(1), timeout=0.1)
+
+    def test_readinto(self):
+        self.buffer.write(b"1" * self.BUFFER_SIZE)
+        self.assertTrue(self.buffer.is_full)
+
+        data = bytearray(4096)
+        self.assertEqual(self.buffer.readinto(data), 4096)
+        self.assertEqual(data, b"1" * 4096)
+        self.assertFalse(self.buffer.is_full, "Frees the buffer")
+
+        self.buffer.close()
+        self.assertEqual(self.buffer.readinto(bytearray(self.BUFFER_SIZE)), self.BUFFER_SIZE - 4096)
+
     def test_write_after_close(self):
         self.buffer.close()
         self.buffer.write(b"1" * 8192)
@@ -111,3 +143,75 @@ class TestRingBuffer(unittest.TestCase):
         self.assertEqual(self.buffer.free, self.BUFFER_SIZE)
         self.buffer.write(b'1' * 100)
         self.assertEqual(self.buffer.free, self.BUFFER_SIZE - 100)
+
+
+class TestChunkSize(unittest.TestCase):
+    def test_fixed(self):
+        chunk_size = ChunkSize(65536)
+        self.assertEqual(chunk_size.update(65536), 65536)
+        self.assertEqual(chunk_size.max_size, 65536)
+
+    def test_auto(self):
+        chunk_size = ChunkSize()
+        self.assertEqual(chunk_size.size, ChunkSize.MIN_SIZE)
+        for _ in range(20):
+            chunk_size.update(chunk_size.size)
+        self.assertEqual(chunk_size.size, ChunkSize.MAX_SIZE, "Grows while reads fill the whole chunk")
+
+        for _ in range(ChunkSize.SHRINK_READS - 1):
+            chunk_size.update(1)
+        self.assertEqual(chunk_size.size, ChunkSize.MAX_SIZE)
+        chunk_size.update(1)
+        self.assertEqual(chunk_size.size, ChunkSize.MAX_SIZE // 2, "Shrinks after repeated small reads")
+
+
+class TestIterChunks(unittest.TestCase):
+    class ReadOnly(object):
+        def __init__(self, data):
+            self.fd = io.BytesIO(data)
+
+        def read(self, size):
+            return self.fd.read(size)
+
+    def test_readinto_fallback(self):
+        data = bytearray(4)
+        self.assertEqual(readinto(self.ReadOnly(b"foo"), data), 3)
+        self.assertEqual(data, b"foo\x00")
+
+    def test_iter_chunks(self):
+        data = bytes(bytearray(i % 256 for i in range(100000)))
+        for fd in io.BytesIO(data), self.ReadOnly(data):
+            chunks = [bytes(chunk) for chunk in iter_chunks(fd)]
+            self.assertEqual(b"".join(chunks), data)
+            self.assertEqual(len(chunks[0]), ChunkSize.MIN_SIZE)
+            self.assertEqual(len(chunks[1]), ChunkSize.MIN_SIZE * 2, "Uses the automatic chunk size")
+
+        self.assertEqual([len(chunk) for chunk in iter_chunks(io.BytesIO(data), 40000)], [40000, 40000, 20000])
+
+    def test_iter_chunks_py2(self):
+        data = b"foo" * 10000
+        with patch("streamlink.buffers.is_py2", True):
+            chunks = list(iter_chunks(io.BytesIO(data)))
+        self.assertTrue(all(type(chunk) is bytes for chunk in chunks), "Yields bytes which Python 2's files can write")
+        self.assertEqual(b"".join(chunks), data)
+
+    @unittest.skipIf(is_py2, "Python 2's BufferedReader doesn't implement readinto1")
+    def test_iter_chunks_slow_pipe(self):
+        read_fd, write_fd = os.pipe()
+
+        def writer():
+            with os.fdopen(write_fd, "wb", 0) as fd:
+                for _ in range(5):
+                    fd.write(b"x" * 100)
+                    time.sleep(0.05)
+
+        thread = threading.Thread(target=writer)
+        thread.daemon = True
+        start = time.time()
+        thread.start()
+        with io.open(read_fd, "rb") as fd:
+            chunks = iter_chunks(fd)
+            self.assertEqual(len(next(chunks)), 100, "Yields the available data instead of waiting for a full chunk")
+            self.assertLess(time.time() - start, 0.2)
+            self.assertEqual(sum(len(chunk) for chunk in chunks), 400)
+        thread.join()
@@ -2,6 +2,7 @@
 
 import logging
 import os
+import re
 import sys
 import tempfile
 import unittest
@@ -9,7 +10,9 @@ from textwrap import dedent
 
 import streamlink_cli.main
 from streamlink.exceptions import StreamError
+from streamlink.plugin import Plugin, PluginArgument, PluginArguments, pluginmatcher
 from streamlink.session import Streamlink
+from streamlink_cli.argparser import build_parser
 from streamlink_cli.compat import is_py2, is_win32, stdout
 from streamlink_cli.main import (
     Formatter,
@@ -573,9 +576,9 @@ class TestCLIMainLogging(_TestCLIMainLogging):
 
     @patch("streamlink_cli.main.log")
     @patch("streamlink_cli.main.streamlink_version", "streamlink")
-    @patch("streamlink_cli.main.requests.__version__", "requests")
-    @patch("streamlink_cli.main.socks_version", "socks")
-    @patch("streamlink_cli.main.websocket_version", "websocket")
+    @patch("requests.__version__", "requests")
+    @patch("socks.__version__", "socks")
+    @patch("websocket.__version__", "websocket")
     @patch("platform.python_version", Mock(return_value="python"))
     def test_log_current_versions(self, mock_log):
         self.subject(["streamlink", "--loglevel", "info"])
@@ -737,3 +740,75 @@ class TestCLIMainPrint(unittest.TestCase):
     def test_print_plugins_json(self, mock_stdout):
         self.subject()
         self.assertEqual(self.get_stdout(mock_stdout), """[\n  "testplugin"\n]\n""")
+
+
+@pluginmatcher(re.compile(r"https?://other\.se"))
+class OtherPlugin(Plugin):
+    module = "other"
+    arguments = PluginArguments(
+        PluginArgument("foo", default="bar")
+    )
+
+    def _get_streams(self):  # pragma: no cover
+        pass
+
+
+class TestCLIMainSetupPluginArgs(unittest.TestCase):
+    def subject(self, argv):
+        with patch.object(Streamlink, "load_builtin_plugins"):
+            session = Streamlink()
+        session.load_plugins(os.path.join(os.path.dirname(__file__), "plugin"))
+        session.plugins["other"] = OtherPlugin
+        parser = build_parser()
+
+        # stop test execution at the setup_signals() call, as we're not interested in what comes afterwards
+        class StopTest(Exception):
+            pass
+
+        with patch("streamlink_cli.main.os.geteuid", create=True, new=Mock(return_value=1000)), \
+             patch("streamlink_cli.main.streamlink", session), \
+             patch("streamlink_cli.main.build_parser", return_value=parser), \
+             patch("streamlink_cli.main.setup_signals", side_effect=StopTest), \
+             patch("streamlink_cli.main.CONFIG_FILES", ["/dev/null"]), \
+             patch("streamlink_cli.main.setup_streamlink"), \
+             patch("streamlink_cli.main.setup_plugins"), \
+             patch("streamlink_cli.main.setup_http_session"), \
+             patch("sys.stdout"), \
+             patch("sys.argv", argv):
+            try:
+                streamlink_cli.main.main()
+            except StopTest:
+                pass
+
+        return session, [
+            item
+            for action in parser._actions
+            for item in action.option_strings
+            if item.startswith(("--testplugin-", "--other-"))
+        ]
+
+    def tearDown(self):
+        streamlink_cli.main.logger.root.handlers *= 0
+
+    def test_resolved_plugin(self):
+        session, options = self.subject(["streamlink", "https://test.se", "--testplugin-bool"])
+        self.assertEqual(options, ["--testplugin-bool", "--testplugin-password"])
+        self.assertTrue(streamlink_cli.main.args.testplugin_bool)
+        self.assertEqual(session.get_plugin_option("other", "foo"), "bar", "Sets the defaults of all plugins")
+
+    def test_other_plugin_arguments(self):
+        session, options = self.subject(["streamlink", "https://test.se", "--other-foo", "baz"])
+        self.assertEqual(options, ["--testplugin-bool", "--testplugin-password", "--other-foo"])
+        self.assertEqual(streamlink_cli.main.args.url, "https://test.se")
+        self.assertEqual(streamlink_cli.main.args.other_foo, "baz")
+
+    def test_no_resolved_plugin(self):
+        session, options = self.subject(["streamlink", "https://unknown.se"])
+        self.assertEqual(options, ["--testplugin-bool", "--testplugin-password", "--other-foo"])
+
+    @patch("sys.stderr")
+    def test_unknown_arguments(self, mock_stderr):
+        with self.assertRaises(SystemExit) as cm:
+            self.subject(["streamlink", "https://test.se", "--unknown"])
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn("unrecognized arguments: --unknown", "".join(c[0][0] for c in mock_stderr.write.call_args_list))
@@ -0,0 +1,182 @@
+import socket
+import unittest
+
+import requests
+
+from streamlink.stream.restream import SegmentWindow
+from streamlink_cli.utils.http_server import ClientLagError, HTTPStreamServer, RestreamServer, SharedStreamBuffer
+
+
+class TestSharedStreamBuffer(unittest.TestCase):
+    def test_read(self):
+        buffer = SharedStreamBuffer(1024)
+        buffer.write(b"foo")
+        buffer.write(b"bar")
+
+        self.assertEqual(buffer.read(0), (b"foobar", 6))
+        self.assertEqual(buffer.read(4), (b"ar", 6))
+        self.assertEqual(buffer.read(6, timeout=0), (b"", 6), "Returns no data on timeout")
+        self.assertEqual(buffer.read(0, size=2), (b"foo", 3), "Doesn't split chunks")
+
+        buffer.close()
+        self.assertEqual(buffer.read(6), (b"", 6))
+
+    def test_lag(self):
+        buffer = SharedStreamBuffer(4)
+        buffer.write(b"foo")
+        buffer.write(b"bar")
+        buffer.write(b"baz")
+
+        self.assertEqual((buffer.start, buffer.end), (6, 9), "Discards old data")
+        self.assertEqual(buffer.read(6), (b"baz", 9))
+        with self.assertRaises(ClientLagError):
+            buffer.read(3)
+
+    def test_join(self):
+        buffer = SharedStreamBuffer(4)
+        self.assertEqual(buffer.join(), 0)
+        buffer.write(b"\x47foo")
+        buffer.write(b"bar")
+        self.assertEqual(buffer.join(), 7, "Joins MPEG-TS at the current position")
+
+        buffer = SharedStreamBuffer(6)
+        buffer.write(b"foo")
+        self.assertEqual(buffer.join(), 0, "Joins other formats at the beginning of the stream")
+        buffer.write(b"bar")
+        self.assertEqual(buffer.join(), 0)
+        buffer.write(b"baz")
+        self.assertIsNone(buffer.join(), "Can't join other formats after their beginning was discarded")
+
+
+class TestHTTPStreamServer(unittest.TestCase):
+    def setUp(self):
+        self.server = HTTPStreamServer(max_clients=2, buffer_size=1024)
+        self.server.bind(host="127.0.0.1", port=0)
+        self.server.start()
+        self.sockets = []
+
+    def tearDown(self):
+        for sock in self.sockets:
+            sock.close()
+        self.server.close()
+
+    def connect(self):
+        sock = socket.create_connection(("127.0.0.1", self.server.port), timeout=5)
+        self.sockets.append(sock)
+        return sock
+
+    def request(self, method="GET", version="HTTP/1.0", headers=""):
+        sock = self.connect()
+        sock.sendall("{0} / {1}\r\n{2}\r\n".format(method, version, headers).encode("ascii"))
+        return sock
+
+    @staticmethod
+    def read_headers(sock):
+        data = b""
+        while b"\r\n\r\n" not in data:
+            data += sock.recv(1)
+        return data
+
+    @staticmethod
+    def recv(sock, size):
+        data = b""
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                break
+            data += chunk
+        return data
+
+    def test_multiple_clients(self):
+        clients = [self.request(), self.request()]
+        for client in clients:
+            self.assertIn(b"HTTP/1.1 200 OK", self.read_headers(client))
+        self.assertTrue(self.server.wait_for_clients(timeout=5))
+        while self.server.streaming < 2:
+            self.server.wait_for_clients(timeout=0.1)
+
+        self.server.write(b"foo")
+        self.server.write(b"bar")
+        self.server.end_stream()
+
+        for client in clients:
+            self.assertEqual(self.recv(client, 1024), b"foobar", "Shares the stream data with all clients")
+
+    def test_late_client(self):
+        client = self.request()
+        self.read_headers(client)
+        self.assertTrue(self.server.wait_for_clients(timeout=5))
+        self.server.write(b"header")
+
+        late = self.request()
+        self.assertIn(b"HTTP/1.1 200 OK", self.read_headers(late))
+        self.server.write(b"data")
+        self.assertEqual(self.recv(late, 10), b"headerdata", "Starts at the beginning of non-MPEG-TS streams")
+
+        self.server.write(b"x" * 1024)
+
+        rejected = self.request()
+        self.assertIn(b"503 Service Unavailable", self.read_headers(rejected))
+
+    def test_keep_alive_head_and_chunked(self):
+        client = self.request("HEAD", "HTTP/1.1")
+        headers = self.read_headers(client)
+        self.assertIn(b"Connection: keep-alive", headers)
+
+        client.sendall(b"GET / HTTP/1.1\r\n\r\n")
+        self.assertIn(b"Transfer-Encoding: chunked", self.read_headers(client))
+        self.assertTrue(self.server.wait_for_clients(timeout=5))
+
+        self.server.write(b"foobar")
+        self.server.end_stream()
+        self.assertEqual(self.recv(client, 16), b"6\r\nfoobar\r\n0\r\n\r\n")
+
+    def test_max_clients(self):
+        self.request()
+        self.request()
+        client = self.request()
+        self.assertIn(b"503 Service Unavailable", self.read_headers(client))
+
+    def test_no_clients(self):
+        with self.assertRaises(IOError):
+            self.server.write(b"foo")
+
+
+class TestRestreamServer(unittest.TestCase):
+    def setUp(self):
+        self.window = SegmentWindow()
+        self.window.write(b"foo")
+        self.window.finish_segment(2.0)
+        self.server = RestreamServer(self.window)
+        self.server.bind(host="127.0.0.1", port=0)
+        self.server.start()
+        self.session = requests.Session()
+
+    def tearDown(self):
+        self.session.close()
+        self.server.close()
+
+    def get(self, path, method="GET"):
+        return self.session.request(method, "http://127.0.0.1:{0}/{1}".format(self.server.port, path), timeout=5)
+
+    def test_urls(self):
+        self.assertEqual(self.server.url, "http://127.0.0.1:{0}/playlist.m3u8".format(self.server.port))
+
+    def test_requests(self):
+        res = self.get("playlist.m3u8")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.headers["Content-Type"], "application/vnd.apple.mpegurl")
+        self.assertEqual(res.text, self.window.playlist())
+        self.assertEqual(self.get("").text, self.window.playlist())
+
+        res = self.get("0.ts")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.headers["Content-Type"], "video/mp2t")
+        self.assertEqual(res.content, b"foo")
+
+        res = self.get("0.ts", method="HEAD")
+        self.assertEqual(res.headers["Content-Length"], "3")
+        self.assertEqual(res.content, b"")
+
+        self.assertEqual(self.get("1.ts").status_code, 404)
+        self.assertEqual(len(self.server.clients), 1, "Keeps the connection alive")
@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import requests
+
+from streamlink.metrics import Metrics
+from streamlink_cli.utils.metrics import MetricsFile, MetricsServer, format_metrics, record_output_write
+
+
+class TestFormatMetrics(unittest.TestCase):
+    def test_format(self):
+        metrics = Metrics()
+        metrics.counter("streamlink_segments_total", {"stream": "hls"}).inc(2)
+        metrics.counter("streamlink_segments_total", {"stream": "dash"}).inc()
+        metrics.gauge("streamlink_buffer_fill_bytes", {"stream": "hls"}).set(1024)
+        metrics.histogram("streamlink_playlist_reload_seconds", {"stream": "hls"}, buckets=(0.1, 1.0)).observe(0.5)
+        metrics.gauge("label_escapes", {"name": "a\"b\\c\nd"}).set(0.25)
+
+        self.assertEqual(format_metrics(metrics), "\n".join([
+            "# TYPE label_escapes gauge",
+            "label_escapes{name=\"a\\\"b\\\\c\\nd\"} 0.25",
+            "# TYPE streamlink_buffer_fill_bytes gauge",
+            "streamlink_buffer_fill_bytes{stream=\"hls\"} 1024",
+            "# TYPE streamlink_playlist_reload_seconds histogram",
+            "streamlink_playlist_reload_seconds_bucket{stream=\"hls\",le=\"0.1\"} 0",
+            "streamlink_playlist_reload_seconds_bucket{stream=\"hls\",le=\"1.0\"} 1",
+            "streamlink_playlist_reload_seconds_bucket{stream=\"hls\",le=\"+Inf\"} 1",
+            "streamlink_playlist_reload_seconds_sum{stream=\"hls\"} 0.5",
+            "streamlink_playlist_reload_seconds_count{stream=\"hls\"} 1",
+            "# TYPE streamlink_segments_total counter",
+            "streamlink_segments_total{stream=\"hls\"} 2",
+            "streamlink_segments_total{stream=\"dash\"} 1",
+        ]) + "\n")
+
+    def test_record_output_write(self):
+        metrics = Metrics()
+        record_output_write(metrics, 100, 0.01)
+        record_output_write(metrics, 50, 2.0)
+
+        self.assertEqual(metrics.counter("streamlink_output_bytes_total").value, 150)
+        self.assertEqual(metrics.counter("streamlink_output_write_stalls_total").value, 1)
+        self.assertEqual(metrics.histogram("streamlink_output_write_seconds").count, 2)
+
+
+class TestMetricsExporters(unittest.TestCase):
+    def setUp(self):
+        self.metrics = Metrics()
+        self.metrics.counter("streamlink_segments_total").inc()
+
+    def test_server(self):
+        server = MetricsServer(self.metrics, port=0)
+        server.start()
+        try:
+            self.assertTrue(self.metrics.enabled)
+            res = requests.get(server.url)
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(res.text, format_metrics(self.metrics))
+            self.assertTrue(res.headers["Content-Type"].startswith("text/plain; version=0.0.4"))
+            self.assertEqual(requests.get(server.url.replace("/metrics", "/foo")).status_code, 404)
+        finally:
+            server.close()
+
+    def test_file(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, "streamlink.prom")
+            metrics_file = MetricsFile(self.metrics, path, interval=60)
+            metrics_file.start()
+            self.metrics.counter("streamlink_segments_total").inc()
+            metrics_file.close()
+
+            self.assertFalse(metrics_file.is_alive())
+            with open(path) as fd:
+                self.assertIn("streamlink_segments_total 2\n", fd.read(), "Writes the final values when closed")
+            self.assertEqual(os.listdir(tmpdir), ["streamlink.prom"], "Removes the temporary file")
+        finally:
+            shutil.rmtree(tmpdir)
@@ -0,0 +1,67 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import streamlink
+
+
+HEAVY_MODULES = [
+    "Crypto",
+    "isodate",
+    "iso3166",
+    "iso639",
+    "lxml",
+    "numpy",
+    "pycountry",
+    "requests",
+    "websocket",
+]
+
+SCRIPT = """
+import json, sys
+{statement}
+print(json.dumps({{"modules": sorted(sys.modules)}}))
+"""
+
+
+def run(statement):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [os.path.dirname(os.path.dirname(os.path.abspath(streamlink.__file__)))]
+        + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else [])
+    )
+    output = subprocess.check_output([sys.executable, "-c", SCRIPT.format(statement=statement)], env=env)
+
+    return json.loads(output.decode("utf-8"))
+
+
+def imported(modules, names):
+    return sorted(name for name in names if any(module == name or module.startswith(name + ".") for module in modules))
+
+
+# module level __getattr__ functions are required for deferring the imports of the packages' attributes
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="lazy imports require Python 3.7")
+class TestImports:
+    # the import times are measured by script/benchmark/import_time.py
+    @pytest.mark.parametrize("statement,excluded", [
+        pytest.param(
+            "import streamlink",
+            HEAVY_MODULES + ["streamlink.session", "streamlink.stream", "streamlink.plugin"],
+            id="streamlink",
+        ),
+        pytest.param(
+            "import streamlink_cli.main",
+            HEAVY_MODULES + ["http.server", "BaseHTTPServer", "streamlink.session"],
+            id="streamlink_cli",
+        ),
+        pytest.param(
+            "from streamlink.stream import DASHStream, HLSStream; from streamlink.plugin.api import validate",
+            [name for name in HEAVY_MODULES if name != "requests"],
+            id="streams",
+        ),
+    ])
+    def test_imports(self, statement, excluded):
+        assert imported(run(statement)["modules"], excluded) == []
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import logging
+import threading
 import unittest
 import warnings
 
@@ -7,6 +8,7 @@ from streamlink import Streamlink, logger
 from streamlink.compat import is_py2
 from streamlink.utils.encoding import maybe_decode
 from tests import catch_warnings
+from tests.mock import Mock, patch
 
 if is_py2:
     from io import BytesIO as StringIO
@@ -61,6 +63,51 @@ class TestLogging(unittest.TestCase):
         log.info(u"Special Character: Ѩ")
         self.assertEqual(maybe_decode(output.getvalue()), u"[test][info] Special Character: Ѩ\n")
 
+    def test_lazy_arguments(self):
+        log, output = self._new_logger()
+        logger.root.setLevel("info")
+        arg = Mock(__format__=Mock(return_value="bar"))
+        log.debug("foo {0}", arg)
+        self.assertFalse(arg.__format__.called, "Doesn't format the arguments of disabled log levels")
+        log.info("foo {0}", arg)
+        self.assertEqual(output.getvalue(), "[test][info] foo bar\n")
+
+
+@unittest.skipIf(is_py2, "QueueHandler requires Python 3")
+class TestQueuedLogging(unittest.TestCase):
+    def setUp(self):
+        self.output = StringIO()
+        self.handler = logger.basicConfig(stream=self.output, format="[{name}][{levelname}] {message}", style="{",
+                                          queue=True)
+        self.queue_handler = logger.root.handlers[-1]
+        logger.root.setLevel("info")
+
+    def tearDown(self):
+        logger.root.removeHandler(self.queue_handler)
+        logger._stop_listeners()
+
+    def test_output(self):
+        log = logging.getLogger("streamlink.test")
+        self.assertIsNot(self.queue_handler, self.handler)
+        self.assertIs(self.handler.stream, self.output)
+
+        args = ["foo"]
+        log.info("test {0}", args)
+        log.debug("test {0}", args)
+        # the message gets merged with its arguments when it gets logged
+        args.append("bar")
+        logger.flush()
+        self.assertEqual(self.output.getvalue(), "[test][info] test ['foo']\n")
+
+    def test_write_thread(self):
+        log = logging.getLogger("streamlink.test")
+        threads = []
+        with patch.object(self.handler, "emit", side_effect=lambda record: threads.append(threading.current_thread())):
+            log.info("test")
+            logger.flush()
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread(), "Writes the log records in a separate thread")
+
 
 class TestDeprecatedLogger(unittest.TestCase):
     def setUp(self):
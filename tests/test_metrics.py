@@ -0,0 +1,79 @@
+import unittest
+from threading import Thread
+
+from streamlink.metrics import Counter, Histogram, Metrics
+from tests.mock import Mock
+
+
+class TestMetrics(unittest.TestCase):
+    def test_subscribe(self):
+        metrics = Metrics()
+        callback = Mock()
+        metrics.emit("ignored")
+        self.assertFalse(metrics.enabled)
+
+        metrics.subscribe(callback)
+        self.assertTrue(metrics.enabled)
+        metrics.emit("segment.queued", {"stream": "hls"}, timestamp=123, segment=1)
+        event = callback.call_args[0][0]
+        self.assertEqual(event, ("segment.queued", 123, {"stream": "hls"}, {"segment": 1}))
+        self.assertEqual((event.name, event.time, event.data), ("segment.queued", 123, {"segment": 1}))
+
+        metrics.unsubscribe(callback)
+        self.assertFalse(metrics.enabled)
+        metrics.emit("ignored")
+        self.assertEqual(callback.call_count, 1)
+
+    def test_enable(self):
+        metrics = Metrics()
+        callback = Mock()
+        metrics.enable()
+        metrics.subscribe(callback)
+        metrics.unsubscribe(callback)
+        self.assertTrue(metrics.enabled, "Stays enabled without subscribers")
+
+    def test_registry(self):
+        metrics = Metrics()
+        counter = metrics.counter("foo_total", {"stream": "hls"})
+        counter.inc()
+        counter.inc(2)
+        self.assertIs(metrics.counter("foo_total", {"stream": "hls"}), counter)
+        self.assertIsNot(metrics.counter("foo_total", {"stream": "dash"}), counter)
+        metrics.gauge("bar").set(5)
+        with self.assertRaises(TypeError):
+            metrics.gauge("foo_total", {"stream": "hls"})
+
+        self.assertEqual([(name, labels, metric.type, metric.value) for name, labels, metric in metrics.collect()], [
+            ("foo_total", {"stream": "hls"}, "counter", 3),
+            ("foo_total", {"stream": "dash"}, "counter", 0),
+            ("bar", {}, "gauge", 5),
+        ])
+        self.assertIsInstance(counter, Counter)
+
+    def test_histogram(self):
+        histogram = Histogram(buckets=(1.0, 0.5))
+        for value in 0.1, 0.5, 0.7, 3:
+            histogram.observe(value)
+
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 4.3)
+        self.assertEqual(histogram.cumulative_counts(), [(0.5, 2), (1.0, 3), (float("inf"), 4)])
+
+    def test_threads(self):
+        counter = Counter()
+        histogram = Histogram()
+
+        def update():
+            for _ in range(10000):
+                counter.inc()
+                histogram.observe(0.1)
+
+        threads = [Thread(target=update) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(counter.value, 40000, "Doesn't lose concurrent updates")
+        self.assertEqual(histogram.count, 40000)
+        self.assertEqual(histogram.cumulative_counts()[-1], (float("inf"), 40000))
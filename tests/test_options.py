@@ -151,6 +151,33 @@ class TestSetupOptions(unittest.TestCase):
         self.assertEqual(plugin.options.get("test2"), "default2")
         self.assertEqual(plugin.options.get("test3"), None)
 
+    def test_setup_plugin_args_pnames(self):
+        session = Mock()
+        plugin_foo = Mock()
+        plugin_bar = Mock()
+        parser = argparse.ArgumentParser(add_help=False)
+
+        session.plugins = {"foo": plugin_foo, "bar": plugin_bar}
+        plugin_foo.arguments = Arguments(Argument("test1", default="default1"))
+        plugin_bar.arguments = Arguments(Argument("test2", default="default2"))
+
+        setup_plugin_args(session, parser, ["bar"])
+        self.assertEqual(
+            [item for action in parser._actions for item in action.option_strings],
+            ["--bar-test2"],
+            "Only adds the arguments of the specified plugins"
+        )
+        self.assertEqual(plugin_foo.options.get("test1"), "default1", "Sets the defaults of all plugins")
+        self.assertEqual(plugin_bar.options.get("test2"), "default2", "Sets the defaults of all plugins")
+
+        setup_plugin_args(session, parser)
+        self.assertEqual(
+            [item for action in parser._actions for item in action.option_strings],
+            ["--bar-test2", "--foo-test1"],
+            "Adds the arguments of the remaining plugins"
+        )
+        self.assertEqual(len([grp for grp in parser._action_groups if grp.title == "Plugin options"]), 1)
+
     def test_setup_plugin_options(self):
         session = Mock()
         plugin = Mock(module="plugin")
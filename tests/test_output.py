@@ -1,9 +1,12 @@
+import errno
 import ntpath
 import posixpath
 import unittest
+from threading import Event
 
-from streamlink_cli.output import PlayerOutput
-from tests.mock import patch
+from streamlink.metrics import Metrics
+from streamlink_cli.output import FileOutput, HTTPOutput, Output, PlayerOutput
+from tests.mock import Mock, call, patch
 
 
 class TestPlayerOutput(unittest.TestCase):
@@ -64,3 +67,136 @@ class TestPlayerOutput(unittest.TestCase):
                          PlayerOutput.supported_player("C:\\mplayer\\not-vlc.exe"))
         self.assertEqual(None,
                          PlayerOutput.supported_player("C:\\NotPlayer\\NotPlayerMini64.exe"))
+
+
+class FakeOutput(Output):
+    def __init__(self, blocked=False):
+        super(FakeOutput, self).__init__()
+        self.data = []
+        self.unblocked = Event()
+        if not blocked:
+            self.unblocked.set()
+
+    def _write(self, data):
+        self.unblocked.wait(5)
+        self.data.append(data)
+
+
+class TestOutputSink(unittest.TestCase):
+    def subject(self, policy, blocked=True, size=4):
+        output = FakeOutput(blocked=blocked)
+        output.set_sink("fake", size, policy)
+        output.open()
+        return output
+
+    def test_write(self):
+        output = self.subject("block", blocked=False)
+        for chunk in (b"foo", b"bar", b"baz"):
+            output.write(chunk)
+        output.close()
+
+        self.assertEqual(output.data, [b"foo", b"bar", b"baz"])
+        self.assertEqual(output.sink.metrics()["written"], 9)
+        self.assertEqual(output.sink.lag, 0)
+
+    def test_policy_drop(self):
+        output = self.subject("drop")
+        output.write(b"aa")  # gets taken by the blocked writer thread
+        output.write(b"bb")
+        output.write(b"cc")
+        output.write(b"dd")
+        output.unblocked.set()
+        output.close()
+
+        self.assertIn(b"aa", output.data)
+        metrics = output.sink.metrics()
+        self.assertEqual(metrics["written"] + metrics["dropped"], 8)
+        self.assertGreater(metrics["dropped"], 0, "Drops new data if the buffer is full")
+        self.assertFalse(metrics["disconnected"])
+
+    def test_policy_disconnect(self):
+        output = self.subject("disconnect")
+        for chunk in (b"aa", b"bb", b"cc", b"dd"):
+            output.write(chunk)
+        output.unblocked.set()
+        output.write(b"ee")
+        output.close()
+
+        self.assertTrue(output.sink.disconnected)
+        self.assertNotIn(b"ee", output.data, "Doesn't write anything after the disconnect")
+
+    def test_error(self):
+        output = FileOutput(fd=Mock(write=Mock(side_effect=IOError(errno.EPIPE, "Broken pipe"))))
+        output.set_sink("stdout", 1024)
+        output.open()
+        output.write(b"foo")
+        output.sink.join(5)
+
+        with self.assertRaises(IOError) as cm:
+            output.write(b"bar")
+        self.assertEqual(cm.exception.errno, errno.EPIPE, "Raises the writer thread's error")
+
+    def test_decoupled_record(self):
+        record = FakeOutput(blocked=True)
+        record.set_sink("record", 4, "drop")
+        fd = Mock()
+        output = FileOutput(fd=fd, record=record)
+        output.set_sink("stdout", 1024)
+        output.open()
+        for chunk in (b"aa", b"bb", b"cc", b"dd"):
+            output.write(chunk)
+        output.sink.close()
+
+        self.assertEqual(fd.write.call_args_list, [call(b"aa"), call(b"bb"), call(b"cc"), call(b"dd")],
+                         "Isn't held back by the stalled recording")
+        record.unblocked.set()
+        output.close()
+
+    def test_record_not_held_back(self):
+        record = FakeOutput()
+        record.set_sink("record", 1024)
+        output = FakeOutput(blocked=True)
+        output.record = record
+        output.set_sink("player", 4, "disconnect")
+        output.open()
+        for chunk in (b"aa", b"bb", b"cc", b"dd"):
+            output.write(chunk)
+        record.sink.close()
+
+        self.assertEqual(record.data, [b"aa", b"bb", b"cc", b"dd"], "Isn't held back or disconnected by the stalled output")
+        self.assertTrue(output.sink.disconnected)
+        self.assertFalse(output.disconnected, "Keeps writing while the recording is still connected")
+        output.unblocked.set()
+        output.close()
+        self.assertFalse(record.opened, "Closes the recording")
+
+    def test_http_output(self):
+        http = Mock()
+        output = HTTPOutput(http)
+        output.set_sink("http", 1024)
+        output.open()
+        output.write(b"foo")
+        output.close()
+        self.assertEqual(http.write.call_args_list, [call(b"foo")])
+
+    def test_metrics(self):
+        metrics = Metrics()
+        metrics.enable()
+        output = FakeOutput(blocked=True)
+        output.set_sink("player", 4, "drop", metrics)
+        output.open()
+        output.write(b"aa")  # gets taken by the blocked writer thread
+        output.write(b"bb")
+        output.write(b"cc")
+        output.write(b"dd")
+        labels = {"output": "player"}
+        self.assertEqual(metrics.gauge("streamlink_output_sink_lag_bytes", labels).value, output.sink.lag)
+        self.assertGreater(metrics.gauge("streamlink_output_sink_lag_bytes", labels).value, 0)
+        output.unblocked.set()
+        output.close()
+
+        sink_metrics = output.sink.metrics()
+        self.assertEqual(metrics.gauge("streamlink_output_sink_lag_bytes", labels).value, 0)
+        self.assertEqual(metrics.counter("streamlink_output_sink_written_bytes_total", labels).value, sink_metrics["written"])
+        self.assertEqual(metrics.counter("streamlink_output_sink_dropped_bytes_total", labels).value, sink_metrics["dropped"])
+        self.assertEqual(metrics.gauge("streamlink_output_sink_disconnected", labels).value, 0)
@@ -3,7 +3,7 @@ from __future__ import unicode_literals
 import sys
 import unittest
 
-from streamlink.plugin.api.utils import itertags
+from streamlink.plugin.api.utils import Tag, itertags
 
 
 def unsupported_versions_1979():
@@ -100,3 +100,36 @@ href="http://test.se/foo">bar</a>
         self.assertEqual(links[0].tag, "p")
         self.assertEqual(links[0].text.strip(), '<a \nhref="http://test.se/foo">bar</a>')
         self.assertEqual(links[0].attributes, {})
+
+    def test_nested_tags(self):
+        tags = list(itertags("<div a='1'><div a=\"2\">foo</div>bar</div>", "div"))
+        self.assertEqual(tags, [
+            Tag("div", {"a": "1"}, "<div a=\"2\">foo"),
+            Tag("div", {"a": "2"}, "foo"),
+        ])
+
+    def test_self_closing_tag_text(self):
+        self.assertEqual(list(itertags("<div/>foo</ div >", "div")), [Tag("div", {}, "foo")])
+        self.assertEqual(list(itertags("<div />foo", "div")), [Tag("div", {}, None)])
+
+    def test_tag_names(self):
+        html = "<DIV>foo</DIV><divx>bar</divx><h1>baz</h1>"
+        self.assertEqual(list(itertags(html, "div")), [])
+        self.assertEqual(list(itertags(html, "DIV")), [Tag("DIV", {}, "foo")])
+        self.assertEqual(list(itertags(html, "h1")), [])
+        self.assertEqual(list(itertags(html, "h")), [Tag("h", {"1": None}, None)])
+        self.assertEqual(list(itertags(html, "")), [])
+
+    def test_unterminated_tag(self):
+        self.assertEqual(list(itertags("<a href='foo'><a <a href='bar'", "a")), [Tag("a", {"href": "foo"}, None)])
+        self.assertEqual(list(itertags("<a <a href='bar'>", "a")), [
+            Tag("a", {"a": None, "href": "bar"}, None),
+            Tag("a", {"href": "bar"}, None),
+        ])
+
+    def test_early_stop(self):
+        html = "<meta a='1'><meta a='2'>" + "<p>" * 100000
+        tags = itertags(html, "meta")
+        self.assertEqual(next(tags), Tag("meta", {"a": "1"}, None))
+        self.assertEqual(next(tags), Tag("meta", {"a": "2"}, None))
+        self.assertEqual(list(tags), [])
@@ -0,0 +1,104 @@
+import os
+import pstats
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from streamlink import Streamlink
+from streamlink.profiler import Profiler, thread_tags
+from streamlink.stream.hls import HLSStream
+from streamlink.stream.segmented import CompatThreadPoolExecutor
+
+
+def busy(duration=0.1):
+    start = time.time()
+    while time.time() - start < duration:
+        sum(range(1000))
+
+
+class FakeThread(object):
+    def __init__(self, name, stream=None):
+        self.name = name
+        self.stream = stream
+
+
+class TestThreadTags(unittest.TestCase):
+    def test_thread_tags(self):
+        self.assertEqual(thread_tags(FakeThread("Thread-HLSStreamWriter", HLSStream)), ("HLSStreamWriter", "hls"))
+        self.assertEqual(thread_tags(FakeThread("Thread-HLSStreamWriter-executor_0")), ("HLSStreamWriter-executor", None))
+        self.assertEqual(thread_tags(FakeThread("ThreadPoolExecutor-1_12")), ("ThreadPoolExecutor", None))
+        self.assertEqual(thread_tags(FakeThread("Thread-12")), ("Thread", None))
+        self.assertEqual(thread_tags(FakeThread("MainThread")), ("MainThread", None))
+        self.assertEqual(thread_tags(None), ("unknown", None))
+
+
+class TestExecutorThreadNames(unittest.TestCase):
+    def test_thread_name_prefix(self):
+        executor = CompatThreadPoolExecutor(max_workers=2, thread_name_prefix="Thread-HLSStreamWriter-executor")
+        try:
+            names = set(executor.submit(lambda: threading.current_thread().name).result() for _ in range(4))
+        finally:
+            executor.shutdown(wait=True)
+        self.assertTrue(names, "Runs the tasks")
+        self.assertTrue(names <= {"Thread-HLSStreamWriter-executor_0", "Thread-HLSStreamWriter-executor_1"})
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "profile")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def run_thread(self, profiler):
+        thread = threading.Thread(target=busy, name="Thread-FFMPEGMuxer-pipe")
+        with profiler:
+            thread.start()
+            thread.join()
+        profiler.dump(self.path)
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            Profiler(format="foo")
+
+    def test_collapsed(self):
+        self.run_thread(Profiler(format="collapsed", interval=0.001))
+
+        with open(self.path) as fd:
+            stacks = dict(line.rsplit(" ", 1) for line in fd.read().splitlines())
+        self.assertTrue(any(
+            stack.startswith("FFMPEGMuxer-pipe;stream=-;") and stack.endswith(";tests.test_profiler:busy")
+            for stack in stacks
+        ), "Tags the stacks of other threads with their role")
+        self.assertFalse(any(stack.startswith("Profiler;") for stack in stacks), "Doesn't sample itself")
+
+    def test_pstats(self):
+        self.run_thread(Profiler(format="pstats"))
+
+        stats = pstats.Stats(self.path)
+        functions = set(function for filename, lineno, function in stats.stats)
+        self.assertIn("busy", functions, "Includes the profile of the other thread")
+        self.assertIn("join", functions, "Includes the profile of the starting thread")
+
+    def test_session(self):
+        session = Streamlink()
+        profiler = session.start_profiling(format="pstats")
+        self.assertIs(session.profiler, profiler)
+        self.assertTrue(profiler.running)
+        self.assertIs(session.start_profiling(), profiler, "Keeps the running profiler")
+
+        thread = threading.Thread(target=busy, name="Thread-FFMPEGMuxer-pipe")
+        thread.start()
+        thread.join()
+        self.assertIs(session.stop_profiling(self.path), profiler)
+        self.assertFalse(profiler.running)
+
+        stats = pstats.Stats(self.path)
+        self.assertIn("busy", set(function for filename, lineno, function in stats.stats))
+
+    def test_session_not_started(self):
+        self.assertIsNone(Streamlink().stop_profiling(self.path))
+        self.assertFalse(os.path.exists(self.path))
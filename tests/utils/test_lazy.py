@@ -0,0 +1,70 @@
+import sys
+import types
+import unittest
+
+import pytest
+
+from streamlink.utils import lazy
+from streamlink.utils.lazy import LazyModule, lazy_attributes, lazy_module
+from tests.mock import patch
+
+
+class TestLazyModule(unittest.TestCase):
+    def test_imported(self):
+        self.assertIs(lazy_module("json"), sys.modules["json"])
+
+    @patch("streamlink.utils.lazy.import_module")
+    def test_lazy(self, mock_import_module):
+        module = mock_import_module.return_value = types.ModuleType("foo")
+        module.bar = 123
+
+        proxy = lazy_module("tests.utils.lazy-module-which-doesnt-exist")
+        self.assertIsInstance(proxy, LazyModule)
+        self.assertEqual(mock_import_module.call_count, 0)
+
+        self.assertEqual(proxy.bar, 123)
+        self.assertEqual(mock_import_module.call_count, 1)
+        proxy.bar = 456
+        self.assertEqual(module.bar, 456)
+        self.assertEqual(proxy.bar, 456)
+        del proxy.bar
+        self.assertFalse(hasattr(module, "bar"))
+        self.assertEqual(mock_import_module.call_count, 1)
+
+    def test_missing(self):
+        proxy = lazy_module("tests.utils.lazy-module-which-doesnt-exist")
+        with self.assertRaises(ImportError):
+            proxy.foo
+
+
+class TestLazyAttributes:
+    @pytest.fixture
+    def module(self):
+        module = types.ModuleType("tests.utils.lazy-module")
+        with patch.dict(sys.modules, {module.__name__: module}):
+            yield module
+
+    @pytest.mark.skipif(sys.version_info < (3, 7), reason="module level __getattr__ functions require Python 3.7")
+    def test_lazy(self, module):
+        with patch.object(lazy, "import_module", side_effect=lambda name: sys.modules[name]) as mock_import_module:
+            lazy_attributes(module.__name__, {"OrderedDict": "collections", "dumps": "json"})
+            assert "dumps" not in vars(module)
+            assert "dumps" in dir(module)
+            assert mock_import_module.call_count == 0
+
+            from json import dumps
+            assert module.dumps is dumps
+            assert vars(module)["dumps"] is dumps
+            assert mock_import_module.call_count == 1
+            assert "OrderedDict" not in vars(module)
+
+            with pytest.raises(AttributeError):
+                module.foo
+
+    def test_eager(self, module):
+        with patch.object(lazy, "_pep562", False):
+            lazy_attributes(module.__name__, {"dumps": "json"})
+
+        from json import dumps
+        assert vars(module)["dumps"] is dumps
+        assert "__getattr__" not in vars(module)
@@ -1,10 +1,13 @@
+import errno
 import os
 import stat
+import subprocess
+import sys
 import threading
 import unittest
 
 from streamlink.compat import is_py3, is_win32
-from streamlink.utils.named_pipe import NamedPipe, NamedPipePosix, NamedPipeWindows
+from streamlink.utils.named_pipe import AnonymousPipePosix, NamedPipe, NamedPipePosix, NamedPipeWindows, set_pipe_size
 from tests.mock import Mock, call, patch
 
 if is_win32:
@@ -135,6 +138,57 @@ class TestNamedPipePosix(unittest.TestCase):
         self.assertFalse(reader.is_alive())
 
 
+@unittest.skipIf(not AnonymousPipePosix.is_supported(), "test only applicable on a POSIX OS with Python 3")
+class TestAnonymousPipePosix(unittest.TestCase):
+    def test_anonymous_pipe(self):
+        pipe = AnonymousPipePosix()
+        self.assertEqual(pipe.path, "pipe:{0}".format(pipe.read_fd))
+
+        code = "import os,sys; sys.stdout.write(str(len(os.fdopen({0}, 'rb').read())))".format(pipe.read_fd)
+        child = subprocess.Popen(
+            [sys.executable, "-c", code],
+            stdout=subprocess.PIPE,
+            pass_fds=[pipe.read_fd],
+        )
+        pipe.close_read_end()
+        self.assertIsNone(pipe.read_fd)
+
+        pipe.open()
+        data = b"1" * (1024 * 1024)
+        self.assertEqual(pipe.write(data), len(data))
+        self.assertEqual(pipe.write(memoryview(data)[:3]), 3)
+        pipe.close()
+
+        self.assertEqual(child.communicate()[0], str(len(data) + 3).encode("ascii"), "The child process reads all data")
+        self.assertEqual(child.returncode, 0)
+        # closing twice doesn't raise
+        pipe.close()
+
+    def test_write_after_reader_closed(self):
+        pipe = AnonymousPipePosix()
+        pipe.close_read_end()
+        with self.assertRaises(OSError):
+            pipe.write(b"foo")
+        pipe.close()
+
+    @unittest.skipIf(not sys.platform.startswith("linux"), "test only applicable on Linux")
+    def test_pipe_size(self):
+        pipe = AnonymousPipePosix(size=256 * 1024)
+        import fcntl
+        self.assertEqual(fcntl.fcntl(pipe.write_fd, 1032), 256 * 1024)  # F_GETPIPE_SZ
+        pipe.close()
+
+    @unittest.skipIf(not sys.platform.startswith("linux"), "test only applicable on Linux")
+    def test_pipe_size_limit(self):
+        with patch("streamlink.utils.named_pipe.fcntl.fcntl") as mock_fcntl:
+            mock_fcntl.side_effect = [OSError(errno.EPERM, "Operation not permitted"), 512 * 1024]
+            self.assertEqual(set_pipe_size(123, 1024 * 1024), 512 * 1024, "Tries smaller sizes")
+            self.assertEqual(mock_fcntl.call_args_list, [call(123, 1031, 1024 * 1024), call(123, 1031, 512 * 1024)])
+
+            mock_fcntl.side_effect = OSError(errno.EBADF, "Bad file descriptor")
+            self.assertIsNone(set_pipe_size(123, 1024 * 1024))
+
+
 @unittest.skipIf(not is_win32, "test only applicable on Windows")
 class TestNamedPipeWindows(unittest.TestCase):
     def test_export(self):
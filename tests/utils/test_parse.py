@@ -9,7 +9,9 @@ from lxml.etree import Element
 from streamlink.exceptions import PluginError
 from streamlink.plugin.api import validate
 from streamlink.plugin.api.validate import xml_element
-from streamlink.utils.parse import parse_html, parse_json, parse_qsd, parse_xml
+from streamlink.utils import parse as parse_module
+from streamlink.utils.parse import parse_html, parse_json, parse_json_content, parse_qsd, parse_xml
+from tests.mock import Mock, patch
 
 
 class TestUtilsParse(unittest.TestCase):
@@ -21,6 +23,48 @@ class TestUtilsParse(unittest.TestCase):
         self.assertRaises(IOError, parse_json, """{"test: 1}""", exception=IOError)
         self.assertRaises(PluginError, parse_json, """{"test: 1}""" * 10)
 
+    @unittest.skipIf(parse_module.orjson is None, "orjson is not installed")
+    def test_parse_json_orjson(self):
+        def outcome(data):
+            try:
+                result = parse_json(data)
+                return result, type(result)
+            except PluginError as err:
+                return str(err)
+
+        for data in (
+            "{\"test\": [1, -0, 1.5, 1e-400, null, true, \"\\u0391\"]}",
+            b"{\"test\": 1, \"test\": 2}",
+            "123456789012345678901234567890",
+            "-9223372036854775809",
+            "1e400",
+            "NaN",
+            "\ufeff{}",
+            b"\xef\xbb\xbf{}",
+            "\"\\ud800\"",
+            b"\"\xff\"",
+            "[1,]",
+            "",
+        ):
+            with patch.object(parse_module, "orjson", None):
+                expected = outcome(data)
+            self.assertEqual(outcome(data), expected, "Parses {0!r} like the json module".format(data))
+
+    def test_parse_json_content(self):
+        text = Mock(return_value="{\"test\": \"\u0391\"}")
+        self.assertEqual(parse_json_content("{\"test\": \"\u0391\"}".encode("utf-8"), text), {"test": "\u0391"})
+        self.assertEqual(text.call_count, 0 if parse_module.orjson else 1)
+
+        text = Mock(return_value="{\"test\": \"\ufffd\"}")
+        self.assertEqual(parse_json_content(b"{\"test\": \"\xff\"}", text), {"test": "\ufffd"},
+                         "Parses the decoded text if the content is invalid")
+        self.assertEqual(text.call_count, 1)
+
+        text = Mock(return_value="{\"test\": 1}")
+        self.assertEqual(parse_json_content(b"{\"test\": 1}", text, schema=validate.Schema({"test": 1})), {"test": 1})
+        with self.assertRaises(IOError):
+            parse_json_content(b"{\"test\": 1}", text, schema=validate.Schema({"test": 2}), exception=IOError)
+
     def test_parse_xml(self):
         expected = Element("test", {"foo": "bar"})
         actual = parse_xml("""<test foo="bar"/>""", ignore_ns=True)